@@ -0,0 +1,204 @@
+"""
+추론 파라미터 자동 튜너 (폐루프)
+- 측정: 프레임 제출률, 추론 결과율, 추론 지연, 표시 포즈의 staleness(렌더링 시각 - 캡처 시각), 프로세스 CPU 사용률
+- 조정: 추론 해상도(inference_scale), 배치 크기(batch_size + frame_timeout), 추론 제출 주기(submit_interval)
+- 목표: staleness p90 ≤ target_staleness, CPU 사용률 ≤ cpu_budget (전체 코어 대비 비율)
+- 주기마다 한 단계씩만 조정하고 결정 내역을 로그로 남김 (get_stats로 조회)
+
+개발 PC GPU 한 대에서 측정한 고정값(scale 0.65, batch 10, timeout 50ms)이 CPU 키오스크에서는
+맞지 않으므로, 실제 장비에서 측정값을 보고 범위 안에서 수렴시킴
+"""
+
+import os
+import time
+from collections import deque
+
+import numpy as np
+
+DEFAULT_BOUNDS = {
+    "inference_scale": (0.3, 1.0),
+    "batch_size": (1, 10),
+    "submit_interval": (0.0, 0.2),   # 초 (0 = 매 프레임 제출)
+}
+
+
+class InferenceAutoTuner:
+    """staleness / CPU 목표 기반 추론 파라미터 컨트롤러"""
+
+    def __init__(self, target_staleness=0.08, cpu_budget=0.75, update_interval=1.0, warmup=2.0,
+                 scale_step=0.05, interval_step=0.01, bounds=None, max_decisions=50):
+        """
+        Args:
+            target_staleness: 표시 포즈 staleness 목표 (초, p90 기준)
+            cpu_budget: 프로세스 CPU 사용률 상한 (전체 코어 대비 0.0 ~ 1.0)
+            update_interval: 조정 주기 (초)
+            warmup: 시작 후 측정만 하는 시간 (초, 모델 워밍업 구간 제외)
+            scale_step: 추론 해상도 조정 단위
+            interval_step: 제출 주기 조정 단위 (초)
+            bounds: 파라미터 범위 dict (DEFAULT_BOUNDS 형식, 일부만 지정 가능)
+            max_decisions: 보관할 최근 결정 수
+        """
+        self.target_staleness = target_staleness
+        self.cpu_budget = cpu_budget
+        self.update_interval = update_interval
+        self.warmup = warmup
+        self.scale_step = scale_step
+        self.interval_step = interval_step
+        self.bounds = dict(DEFAULT_BOUNDS, **(bounds or {}))
+        self.num_cores = os.cpu_count() or 1
+
+        self.decisions = deque(maxlen=max_decisions)
+        self.metrics = {}
+        self.reset()
+
+    def reset(self):
+        """측정 구간 초기화 (스트리밍 재시작 시)"""
+        self.started_at = None
+        self.window_start = None
+        self.cpu_start = None
+        self.staleness_samples = []
+        self.latency_samples = []
+        self.submits = 0
+        self.results = 0
+
+    def record_submit(self):
+        """추론 프레임 제출 1회"""
+        self.submits += 1
+
+    def record_result(self, latency=None):
+        """
+        추론 결과 수신 1회
+
+        Args:
+            latency: 캡처 → 결과 수신까지 걸린 시간 (초)
+        """
+        self.results += 1
+        if latency is not None:
+            self.latency_samples.append(latency)
+
+    def record_staleness(self, staleness):
+        """렌더링에 사용한 포즈의 staleness (초)"""
+        self.staleness_samples.append(staleness)
+
+    def update(self, now, params):
+        """
+        조정 주기가 지났으면 측정값으로 파라미터 한 단계 조정
+
+        Args:
+            now: 현재 시각 (time.time())
+            params: 현재 값 dict (inference_scale, batch_size, submit_interval, frame_timeout)
+
+        Returns:
+            변경된 파라미터 dict (변경 없으면 None)
+        """
+        if self.window_start is None:
+            self.started_at = self.window_start = now
+            self.cpu_start = time.process_time()
+            return None
+        elapsed = now - self.window_start
+        if elapsed < self.update_interval:
+            return None
+
+        cpu_now = time.process_time()
+        metrics = {
+            "staleness_p90_ms": self._percentile_ms(self.staleness_samples, 90),
+            "latency_p50_ms": self._percentile_ms(self.latency_samples, 50),
+            "submit_fps": round(self.submits / elapsed, 1),
+            "result_fps": round(self.results / elapsed, 1),
+            "cpu": round((cpu_now - self.cpu_start) / elapsed / self.num_cores, 3),
+        }
+        self.metrics = metrics
+        self.window_start = now
+        self.cpu_start = cpu_now
+        self.staleness_samples = []
+        self.latency_samples = []
+        self.submits = 0
+        self.results = 0
+
+        if now - self.started_at < self.warmup or metrics["staleness_p90_ms"] is None:
+            return None
+
+        change = self._decide(metrics, params)
+        if change is None:
+            return None
+
+        name, value, reason = change
+        new_params = {name: value}
+        if name == "batch_size":
+            new_params["frame_timeout"] = self._frame_timeout(value, metrics)
+        self._log(now, params, new_params, reason, metrics)
+        return new_params
+
+    def _decide(self, metrics, params):
+        """한 단계 조정 결정 → (파라미터, 새 값, 사유) 또는 None"""
+        staleness = metrics["staleness_p90_ms"] / 1000
+        cpu = metrics["cpu"]
+        scale = params["inference_scale"]
+        batch = params["batch_size"]
+        interval = params["submit_interval"]
+        scale_min, scale_max = self.bounds["inference_scale"]
+        batch_min, batch_max = self.bounds["batch_size"]
+        interval_min, interval_max = self.bounds["submit_interval"]
+
+        # 1) staleness 초과: 배치 대기 줄이기 → 추론 해상도 낮추기
+        if staleness > self.target_staleness:
+            if batch > batch_min:
+                return "batch_size", max(batch_min, batch // 2), "staleness 초과 (배치 수집 대기 감소)"
+            if scale > scale_min:
+                return "inference_scale", round(max(scale_min, scale - self.scale_step), 3), \
+                    "staleness 초과 (추론 시간 감소)"
+            return None
+
+        # 2) CPU 예산 초과: 제출 주기 늘리기 → 추론 해상도 낮추기
+        if cpu > self.cpu_budget:
+            if interval < interval_max:
+                return "submit_interval", round(min(interval_max, interval + self.interval_step), 3), \
+                    "CPU 예산 초과 (추론 빈도 감소)"
+            if scale > scale_min:
+                return "inference_scale", round(max(scale_min, scale - self.scale_step), 3), \
+                    "CPU 예산 초과 (추론 해상도 감소)"
+            return None
+
+        # 3) 추론이 제출을 못 따라감 (결과율 < 제출률): 배치로 처리량 확보
+        if metrics["result_fps"] < metrics["submit_fps"] * 0.8 and staleness < self.target_staleness * 0.8 \
+                and batch < batch_max:
+            return "batch_size", batch + 1, "추론 처리량 부족 (배치 증가)"
+
+        # 4) 여유 있음: 해상도 올리기 → 추론 빈도 올리기
+        if staleness < self.target_staleness * 0.6 and cpu < self.cpu_budget * 0.7:
+            if scale < scale_max:
+                return "inference_scale", round(min(scale_max, scale + self.scale_step), 3), "여유 (추론 해상도 증가)"
+            if interval > interval_min:
+                return "submit_interval", round(max(interval_min, interval - self.interval_step), 3), \
+                    "여유 (추론 빈도 증가)"
+        return None
+
+    def _frame_timeout(self, batch_size, metrics):
+        """배치 수집 타임아웃: 제출 간격 1.5배 (배치 1이면 최소값), 5 ~ 50ms"""
+        if batch_size <= 1 or metrics["submit_fps"] <= 0:
+            return 0.005
+        return round(min(0.05, max(0.005, 1.5 / metrics["submit_fps"])), 3)
+
+    def _percentile_ms(self, samples, q):
+        if not samples:
+            return None
+        return round(float(np.percentile(samples, q)) * 1000, 1)
+
+    def _log(self, now, old_params, new_params, reason, metrics):
+        """결정 기록 + 로그 출력"""
+        changes = {name: (old_params.get(name), value) for name, value in new_params.items()}
+        self.decisions.append({"time": round(now, 3), "changes": changes, "reason": reason, "metrics": metrics})
+        summary = ", ".join(f"{name} {old} → {new}" for name, (old, new) in changes.items())
+        print(f"[AutoTuner] {summary} | {reason} "
+              f"(staleness p90 {metrics['staleness_p90_ms']}ms, CPU {metrics['cpu'] * 100:.0f}%, "
+              f"제출 {metrics['submit_fps']} / 결과 {metrics['result_fps']} FPS)")
+
+    def get_stats(self):
+        """목표, 최근 측정값, 최근 결정 내역"""
+        return {
+            "target_staleness_ms": round(self.target_staleness * 1000, 1),
+            "cpu_budget": self.cpu_budget,
+            "bounds": self.bounds,
+            "metrics": self.metrics,
+            "decisions": list(self.decisions)
+        }
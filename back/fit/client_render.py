@@ -0,0 +1,106 @@
+"""
+클라이언트 렌더링 모드 페이로드
+- 서버는 프레임을 합성/인코딩하지 않고 옷 변환만 반환, 클라이언트가 배경 제거된 옷 이미지를 한 번 받아 직접 합성
+- garment_matrix: 리사이즈 단계까지 합친 2x3 어파인 (옷 원본 이미지 픽셀 → 프레임 픽셀)
+  OpenCV 규칙 (정수 좌표 = 픽셀 중심), 캔버스 setTransform에 쓸 때는 앞뒤로 0.5px 이동 (T(0.5) · M · T(-0.5))
+- 가시성 마스크: 저해상도 (세그멘테이션 해상도) 옷 알파 배율 = 신체 확률 (상체 행 범위) x (1 - 얼굴/목 마스크)
+  서버 융합 렌더링(render_garment_fused)과 같은 규칙, 클라이언트는 프레임 크기로 확대해 옷 알파에 곱함
+  - 'rle': 이진화(>= 128) 행 우선 런 길이 {"format", "size": [w, h], "counts"} (0 런부터 시작)
+  - 'png': BGRA PNG (알파 채널 = 마스크) data URL, 캔버스 destination-in 합성에 바로 사용
+"""
+
+import base64
+
+import cv2
+import numpy as np
+
+MASK_WIDTH = 256  # 세그멘테이션 결과가 없을 때 마스크 폭 (비동기 세그멘테이션 기본 폭과 동일)
+MASK_FORMATS = ('rle', 'png', 'none')
+
+
+def garment_matrix(M, scale_x, scale_y):
+    """
+    리사이즈된 옷 기준 어파인 → 옷 원본 이미지 기준 어파인
+
+    Args:
+        M: 리사이즈된 옷 좌표 → 프레임 좌표 2x3 행렬
+        scale_x, scale_y: 리사이즈 배율 (리사이즈 크기 / 원본 크기)
+
+    Returns:
+        2x3 리스트 (원본 옷 좌표 → 프레임 좌표)
+    """
+    # cv2.resize 픽셀 중심 정렬: 리사이즈 좌표 = (원본 좌표 + 0.5) * scale - 0.5
+    S = np.array([[scale_x, 0, 0.5 * scale_x - 0.5],
+                  [0, scale_y, 0.5 * scale_y - 0.5],
+                  [0, 0, 1]], dtype=np.float64)
+    M_full = np.asarray(M, dtype=np.float64) @ S
+    return np.round(M_full, 4).tolist()
+
+
+def build_visibility_mask(frame_shape, segmentation_mask=None, torso_rows=None, face_mask=None, face_offset=None):
+    """
+    저해상도 옷 가시성 마스크 (255 = 옷 표시, 0 = 숨김)
+
+    Args:
+        frame_shape: 프레임 크기 (h, w, ...)
+        segmentation_mask: 저해상도 신체 확률 마스크 (없으면 신체 제한 없음)
+        torso_rows: 상체 행 범위 (top_y, bottom_y) 프레임 좌표 (세그멘테이션 사용 시)
+        face_mask: 머리 ROI 얼굴/목 마스크 (create_face_neck_mask 결과)
+        face_offset: 얼굴 마스크 ROI의 프레임 내 좌상단 좌표 (x, y)
+
+    Returns:
+        uint8 마스크 (세그멘테이션 해상도 또는 폭 MASK_WIDTH)
+    """
+    frame_h, frame_w = frame_shape[:2]
+    if segmentation_mask is not None:
+        visibility = segmentation_mask.copy()
+        grid_h, grid_w = visibility.shape[:2]
+        if torso_rows is not None:
+            sy = grid_h / frame_h
+            visibility[:max(0, int(torso_rows[0] * sy))] = 0
+            visibility[max(0, int(np.ceil(torso_rows[1] * sy))):] = 0
+    else:
+        grid_w = min(MASK_WIDTH, frame_w)
+        grid_h = max(1, int(round(frame_h * grid_w / frame_w)))
+        visibility = np.full((grid_h, grid_w), 255, dtype=np.uint8)
+
+    if face_mask is not None and face_offset is not None:
+        # 머리 ROI 마스크를 마스크 격자로 축소 배치 (격자 밖은 0)
+        sx, sy = grid_w / frame_w, grid_h / frame_h
+        M = np.float32([[sx, 0, face_offset[0] * sx], [0, sy, face_offset[1] * sy]])
+        face_small = cv2.warpAffine(face_mask, M, (grid_w, grid_h), flags=cv2.INTER_AREA,
+                                    borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+        visibility = cv2.multiply(visibility, 255 - face_small, scale=1 / 255)
+    return visibility
+
+
+def encode_mask_rle(mask, threshold=128):
+    """이진화 후 행 우선 런 길이 (0 런부터, 마스크가 1로 시작하면 첫 값 0)"""
+    flat = (mask.ravel() >= threshold).astype(np.int8)
+    changes = np.flatnonzero(np.diff(flat)) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(bounds).tolist()
+    if flat.size and flat[0] == 1:
+        counts.insert(0, 0)
+    return {"format": "rle", "size": [int(mask.shape[1]), int(mask.shape[0])], "counts": counts}
+
+
+def encode_mask_png(mask):
+    """알파 채널 = 마스크인 BGRA PNG data URL"""
+    bgra = np.zeros((*mask.shape[:2], 4), dtype=np.uint8)
+    bgra[:, :, 3] = mask
+    _, buffer = cv2.imencode('.png', bgra, [cv2.IMWRITE_PNG_COMPRESSION, 3])
+    return {
+        "format": "png",
+        "size": [int(mask.shape[1]), int(mask.shape[0])],
+        "data": "data:image/png;base64," + base64.b64encode(buffer).decode('ascii')
+    }
+
+
+def encode_mask(mask, mask_format):
+    """마스크 형식별 인코딩 ('none' 또는 마스크 없음 → None)"""
+    if mask is None or mask_format == 'none':
+        return None
+    if mask_format == 'png':
+        return encode_mask_png(mask)
+    return encode_mask_rle(mask)
@@ -4,6 +4,7 @@ from rembg import remove
 from PIL import Image
 import io
 import os
+import threading
 import mediapipe as mp
 
 # MediaPipe 초기화
@@ -23,13 +24,17 @@ if not OPENCV_CUDA_AVAILABLE:
 
 # 세그멘테이션 모델 초기화 (전역, 한 번만 초기화)
 _segmentation_model = None
+# MediaPipe 그래프는 스레드 안전하지 않으므로 세션 간 호출 직렬화
+_segmentation_lock = threading.Lock()
 
 def get_segmentation_model():
     """세그멘테이션 모델 싱글톤"""
     global _segmentation_model
     if _segmentation_model is None:
-        _segmentation_model = mp_selfie_segmentation.SelfieSegmentation(model_selection=1)
-        print("[Cloth Processor] 세그멘테이션 모델 초기화 완료")
+        with _segmentation_lock:
+            if _segmentation_model is None:
+                _segmentation_model = mp_selfie_segmentation.SelfieSegmentation(model_selection=1)
+                print("[Cloth Processor] 세그멘테이션 모델 초기화 완료")
     return _segmentation_model
 
 def use_gpu_mat(img):
@@ -142,16 +147,61 @@ def resize_cloth_to_body(cloth_img, shoulder_width, body_height):
     
     return resized
 
-def overlay_cloth_on_body(frame, cloth_img, position=None, alpha=1.0):
+def get_alpha_bbox(alpha_channel):
+    """
+    알파 채널에서 불투명 픽셀이 있는 바운딩 박스 계산
+    
+    Args:
+        alpha_channel: 알파 채널 (uint8, 2D)
+    
+    Returns:
+        (x, y, w, h) 바운딩 박스, 불투명 픽셀이 없으면 None
+    """
+    x, y, w, h = cv2.boundingRect(alpha_channel)
+    if w == 0 or h == 0:
+        return None
+    return x, y, w, h
+
+def blend_rgba_roi_inplace(frame_roi, cloth_roi, alpha=1.0):
+    """
+    RGBA 옷 영역을 BGR 프레임 영역에 정수(uint16) 연산으로 제자리 합성
+    
+    out = (cloth * a + frame * (255 - a)) / 255 를 프리멀티플라이드 형태로 계산하며,
+    /255 나눗셈은 (x + (x >> 8)) >> 8 근사로 대체 (0~65025 범위에서 반올림 결과 동일)
+    
+    Args:
+        frame_roi: 프레임 ROI (BGR, uint8) - 이 배열에 직접 결과를 씀
+        cloth_roi: 옷 ROI (BGRA, uint8) - frame_roi와 동일한 크기
+        alpha: 추가 투명도 (0.0 ~ 1.0)
+    """
+    a = cloth_roi[:, :, 3].astype(np.uint16)
+    if alpha < 1.0:
+        # 0~256 고정소수점 스케일
+        a = (a * int(round(max(0.0, alpha) * 256))) >> 8
+    a = a[:, :, np.newaxis]
+    
+    # 프리멀티플라이드 옷 + 역알파 프레임 (최대 255*255 + 128 → uint16 범위 내)
+    blended = cloth_roi[:, :, :3] * a
+    blended += frame_roi * (255 - a)
+    blended += 128
+    blended += blended >> 8
+    blended >>= 8
+    frame_roi[:] = blended
+
+def overlay_cloth_on_body(frame, cloth_img, position=None, alpha=1.0, inplace=True, offset=None):
     """
     프레임에 옷 이미지를 오버레이합니다.
-    RTMPose 스타일의 알파 채널 기반 합성 사용 - 완전 불투명
+    알파 채널의 바운딩 박스 영역만 정수 연산으로 합성 (RGBA 입력)
     
     Args:
         frame: 원본 비디오 프레임 (BGR)
-        cloth_img: 배경이 제거된 옷 이미지 (RGBA) - 프레임과 동일한 크기여야 함
+        cloth_img: 배경이 제거된 옷 이미지 (RGBA)
+            - offset이 None이면 프레임과 동일한 크기여야 함
+            - offset이 있으면 스프라이트 (프레임 내 (x, y) 위치에 배치)
         position: (사용 안 함 - 이미 변형된 이미지 사용)
         alpha: 추가 투명도 조정 (0.0 ~ 1.0, 기본값 1.0 = 완전 불투명)
+        inplace: True면 frame에 직접 합성 (복사 없음), False면 복사본에 합성
+        offset: 스프라이트의 프레임 내 좌상단 좌표 (x, y) - warp_cloth_to_pose_roi 결과
     
     Returns:
         옷이 오버레이된 프레임
@@ -159,12 +209,65 @@ def overlay_cloth_on_body(frame, cloth_img, position=None, alpha=1.0):
     h_frame, w_frame = frame.shape[:2]
     h_cloth, w_cloth = cloth_img.shape[:2]
     
+    if offset is not None and cloth_img.ndim == 3 and cloth_img.shape[2] == 4 and frame.dtype == np.uint8:
+        result = frame if inplace else frame.copy()
+        
+        # 스프라이트를 프레임 경계로 클리핑
+        ox, oy = int(offset[0]), int(offset[1])
+        x1, y1 = max(0, ox), max(0, oy)
+        x2, y2 = min(w_frame, ox + w_cloth), min(h_frame, oy + h_cloth)
+        if x2 <= x1 or y2 <= y1:
+            return result
+        sprite = cloth_img[y1-oy:y2-oy, x1-ox:x2-ox]
+        
+        bbox = get_alpha_bbox(sprite[:, :, 3])
+        if bbox is None:
+            return result
+        
+        x, y, w, h = bbox
+        blend_rgba_roi_inplace(
+            result[y1+y:y1+y+h, x1+x:x1+x+w],
+            sprite[y:y+h, x:x+w],
+            alpha
+        )
+        return result
+    
     # 프레임과 옷 이미지 크기가 다르면 경고
     if h_frame != h_cloth or w_frame != w_cloth:
         print(f"[Cloth Processor] 경고: 프레임({h_frame}x{w_frame})과 옷({h_cloth}x{w_cloth}) 크기 불일치")
         # 옷 이미지를 프레임 크기에 맞춤
         cloth_img = cv2.resize(cloth_img, (w_frame, h_frame), interpolation=cv2.INTER_LINEAR)
     
+    # 알파 채널이 없으면 기존 방식(전체 프레임 float 블렌딩)으로 처리
+    if cloth_img.ndim != 3 or cloth_img.shape[2] != 4 or frame.dtype != np.uint8:
+        return _overlay_cloth_float(frame, cloth_img, alpha)
+    
+    result = frame if inplace else frame.copy()
+    
+    # 옷이 실제로 있는 영역만 합성
+    bbox = get_alpha_bbox(cloth_img[:, :, 3])
+    if bbox is None:
+        return result
+    
+    x, y, w, h = bbox
+    blend_rgba_roi_inplace(result[y:y+h, x:x+w], cloth_img[y:y+h, x:x+w], alpha)
+    
+    return result
+
+def _overlay_cloth_float(frame, cloth_img, alpha=1.0):
+    """
+    전체 프레임 float 알파 블렌딩 (알파 채널이 없는 입력용 폴백)
+    
+    Args:
+        frame: 원본 비디오 프레임 (BGR)
+        cloth_img: 옷 이미지 (BGR 또는 RGBA, 프레임과 동일한 크기)
+        alpha: 추가 투명도 조정 (0.0 ~ 1.0)
+    
+    Returns:
+        옷이 오버레이된 프레임 (복사본)
+    """
+    h_cloth, w_cloth = cloth_img.shape[:2]
+    
     # RGBA를 BGR과 Alpha로 분리
     if cloth_img.shape[2] == 4:
         cloth_bgr = cloth_img[:, :, :3]
@@ -460,6 +563,33 @@ def get_default_cloth_keypoints(w, h):
         'right_hip': (w * 0.70, h * 0.85),
     }
 
+def crop_mask_to_sprite(mask, offset, sprite_shape):
+    """
+    프레임 크기 마스크에서 스프라이트 영역만 잘라냄 (프레임 밖은 0으로 채움)
+    
+    Args:
+        mask: 프레임 크기 마스크 (uint8, 2D)
+        offset: 스프라이트의 프레임 내 좌상단 좌표 (x, y)
+        sprite_shape: 스프라이트 크기 (h, w, ...)
+    
+    Returns:
+        스프라이트와 동일한 크기의 마스크
+    """
+    h_mask, w_mask = mask.shape[:2]
+    h_sprite, w_sprite = sprite_shape[:2]
+    ox, oy = int(offset[0]), int(offset[1])
+    
+    # 완전히 프레임 내부이면 뷰 반환 (복사 없음)
+    if ox >= 0 and oy >= 0 and ox + w_sprite <= w_mask and oy + h_sprite <= h_mask:
+        return mask[oy:oy+h_sprite, ox:ox+w_sprite]
+    
+    cropped = np.zeros((h_sprite, w_sprite), dtype=mask.dtype)
+    x1, y1 = max(0, ox), max(0, oy)
+    x2, y2 = min(w_mask, ox + w_sprite), min(h_mask, oy + h_sprite)
+    if x2 > x1 and y2 > y1:
+        cropped[y1-oy:y2-oy, x1-ox:x2-ox] = mask[y1:y2, x1:x2]
+    return cropped
+
 def get_body_segmentation_mask(frame, body_keypoints=None):
     """
     MediaPipe를 사용하여 신체 세그멘테이션 마스크 생성
@@ -477,8 +607,9 @@ def get_body_segmentation_mask(frame, body_keypoints=None):
         # RGB로 변환
         frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         
-        # 세그멘테이션 수행
-        results = segmentation.process(frame_rgb)
+        # 세그멘테이션 수행 (여러 세션이 공유하므로 락 사용)
+        with _segmentation_lock:
+            results = segmentation.process(frame_rgb)
         
         if results.segmentation_mask is None:
             return None
@@ -488,23 +619,9 @@ def get_body_segmentation_mask(frame, body_keypoints=None):
         binary_mask = (mask > 0.5).astype(np.uint8) * 255
         
         # 상체 영역만 추출 (body_keypoints가 있는 경우)
-        if body_keypoints and 'left_shoulder' in body_keypoints and 'right_shoulder' in body_keypoints:
-            h, w = frame.shape[:2]
-            
-            # 어깨 위치 기준으로 상체 영역 정의
-            left_shoulder = body_keypoints['left_shoulder']
-            right_shoulder = body_keypoints['right_shoulder']
-            
-            # 상체 영역: 어깨 위 20% ~ 엉덩이 아래 (또는 프레임 하단)
-            shoulder_y = int((left_shoulder[1] + right_shoulder[1]) / 2)
-            top_y = max(0, shoulder_y - int(h * 0.2))
-            
-            # 엉덩이가 있으면 그 위치, 없으면 어깨 아래 60%
-            if 'left_hip' in body_keypoints and 'right_hip' in body_keypoints:
-                hip_y = int((body_keypoints['left_hip'][1] + body_keypoints['right_hip'][1]) / 2)
-                bottom_y = min(h, hip_y + int(h * 0.1))
-            else:
-                bottom_y = min(h, shoulder_y + int(h * 0.6))
+        torso_rows = get_torso_row_range(body_keypoints, frame.shape[0])
+        if torso_rows is not None:
+            top_y, bottom_y = torso_rows
             
             # 마스크 생성 (상체 영역만)
             torso_mask = np.zeros_like(binary_mask)
@@ -518,25 +635,151 @@ def get_body_segmentation_mask(frame, body_keypoints=None):
         print(f"[Cloth Processor] 세그멘테이션 실패: {e}")
         return None
 
-def refine_cloth_with_segmentation(warped_cloth, frame, body_keypoints):
+def get_torso_row_range(body_keypoints, frame_h):
+    """
+    상체 영역 행 범위: 어깨 위 20% ~ 엉덩이 아래 10% (엉덩이 없으면 어깨 아래 60%)
+    
+    Returns:
+        (top_y, bottom_y) 프레임 좌표, 어깨 키포인트가 없으면 None
+    """
+    if not body_keypoints or 'left_shoulder' not in body_keypoints or 'right_shoulder' not in body_keypoints:
+        return None
+    
+    # 어깨 위치 기준으로 상체 영역 정의
+    left_shoulder = body_keypoints['left_shoulder']
+    right_shoulder = body_keypoints['right_shoulder']
+    shoulder_y = int((left_shoulder[1] + right_shoulder[1]) / 2)
+    top_y = max(0, shoulder_y - int(frame_h * 0.2))
+    
+    # 엉덩이가 있으면 그 위치, 없으면 어깨 아래 60%
+    if 'left_hip' in body_keypoints and 'right_hip' in body_keypoints:
+        hip_y = int((body_keypoints['left_hip'][1] + body_keypoints['right_hip'][1]) / 2)
+        bottom_y = min(frame_h, hip_y + int(frame_h * 0.1))
+    else:
+        bottom_y = min(frame_h, shoulder_y + int(frame_h * 0.6))
+    return top_y, bottom_y
+
+def segment_body_lowres(frame_small):
+    """
+    저해상도 프레임 세그멘테이션 (비동기 세그멘테이션 워커용)
+    
+    Args:
+        frame_small: 축소된 프레임 (BGR, 예: 폭 256px)
+    
+    Returns:
+        신체 확률 마스크 (uint8, 0~255, frame_small 크기), 실패 시 None
+    """
+    try:
+        segmentation = get_segmentation_model()
+        frame_rgb = cv2.cvtColor(frame_small, cv2.COLOR_BGR2RGB)
+        
+        # 세그멘테이션 수행 (여러 세션이 공유하므로 락 사용)
+        with _segmentation_lock:
+            results = segmentation.process(frame_rgb)
+        
+        if results.segmentation_mask is None:
+            return None
+        
+        # 이진화는 업샘플 후에 (경계가 계단처럼 보이지 않도록 확률 그대로 보관)
+        return (np.clip(results.segmentation_mask, 0.0, 1.0) * 255).astype(np.uint8)
+    
+    except Exception as e:
+        print(f"[Cloth Processor] 저해상도 세그멘테이션 실패: {e}")
+        return None
+
+def upsample_mask_roi(mask_small, frame_shape, offset, roi_shape):
+    """
+    저해상도 마스크를 프레임 해상도로 업샘플하되 ROI(스프라이트) 영역만 계산
+    (전체 프레임 cv2.resize 후 잘라낸 것과 같은 결과, ROI 밖 프레임 영역은 0)
+    
+    Args:
+        mask_small: 저해상도 마스크 (uint8)
+        frame_shape: 프레임 크기 (h, w, ...)
+        offset: ROI의 프레임 내 좌상단 좌표 (x, y)
+        roi_shape: ROI 크기 (h, w, ...)
+    
+    Returns:
+        ROI 크기 마스크 (uint8)
+    """
+    frame_h, frame_w = frame_shape[:2]
+    small_h, small_w = mask_small.shape[:2]
+    roi_h, roi_w = roi_shape[:2]
+    sx = small_w / frame_w
+    sy = small_h / frame_h
+    
+    # ROI 픽셀 (x, y) → 저해상도 좌표 (픽셀 중심 정렬, cv2.resize와 동일)
+    M_inv = np.float32([
+        [sx, 0, sx * (offset[0] + 0.5) - 0.5],
+        [0, sy, sy * (offset[1] + 0.5) - 0.5]
+    ])
+    roi = cv2.warpAffine(
+        mask_small, M_inv, (roi_w, roi_h),
+        flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+        borderMode=cv2.BORDER_REPLICATE
+    )
+    
+    # 프레임 밖 영역은 0
+    ox, oy = int(offset[0]), int(offset[1])
+    if ox < 0:
+        roi[:, :min(roi_w, -ox)] = 0
+    if oy < 0:
+        roi[:min(roi_h, -oy), :] = 0
+    if ox + roi_w > frame_w:
+        roi[:, max(0, frame_w - ox):] = 0
+    if oy + roi_h > frame_h:
+        roi[max(0, frame_h - oy):, :] = 0
+    return roi
+
+def get_body_mask_roi(mask_small, frame_shape, offset, roi_shape, body_keypoints=None):
+    """
+    저해상도 세그멘테이션 결과 → ROI 크기 이진 신체 마스크 (상체 영역만)
+    
+    Returns:
+        ROI 크기 마스크 (0 또는 255)
+    """
+    prob = upsample_mask_roi(mask_small, frame_shape, offset, roi_shape)
+    binary_mask = np.where(prob > 127, 255, 0).astype(np.uint8)
+    
+    torso_rows = get_torso_row_range(body_keypoints, frame_shape[0])
+    if torso_rows is not None:
+        top_y, bottom_y = torso_rows[0] - int(offset[1]), torso_rows[1] - int(offset[1])
+        binary_mask[:max(0, top_y), :] = 0
+        binary_mask[max(0, bottom_y):, :] = 0
+    return binary_mask
+
+def refine_cloth_with_segmentation(warped_cloth, frame, body_keypoints, offset=None, segmentation_mask=None):
     """
     세그멘테이션 마스크를 사용하여 옷을 신체 윤곽에 맞게 정제
     
     Args:
-        warped_cloth: 변형된 옷 이미지 (RGBA, 프레임과 동일한 크기)
+        warped_cloth: 변형된 옷 이미지 (RGBA, 프레임 크기 또는 스프라이트)
         frame: 원본 프레임 (BGR)
         body_keypoints: 신체 키포인트
+        offset: 스프라이트의 프레임 내 좌상단 좌표 (x, y), None이면 프레임 크기
+        segmentation_mask: 비동기로 미리 계산된 저해상도 신체 마스크 (segment_body_lowres 결과)
+                           있으면 MediaPipe를 호출하지 않고 스프라이트 영역만 업샘플
     
     Returns:
         refined_cloth: 세그멘테이션으로 정제된 옷 이미지 (RGBA)
     """
     try:
-        # 신체 세그멘테이션 마스크 생성
-        body_mask = get_body_segmentation_mask(frame, body_keypoints)
-        
-        if body_mask is None:
-            print("[Cloth Processor] 세그멘테이션 마스크 생성 실패, 원본 사용")
-            return warped_cloth
+        if segmentation_mask is not None:
+            # 저해상도 마스크를 스프라이트 영역만 업샘플
+            body_mask = get_body_mask_roi(
+                segmentation_mask, frame.shape, offset if offset is not None else (0, 0),
+                warped_cloth.shape, body_keypoints
+            )
+        else:
+            # 신체 세그멘테이션 마스크 생성
+            body_mask = get_body_segmentation_mask(frame, body_keypoints)
+            
+            if body_mask is None:
+                print("[Cloth Processor] 세그멘테이션 마스크 생성 실패, 원본 사용")
+                return warped_cloth
+            
+            # 스프라이트 영역의 마스크만 사용
+            if offset is not None:
+                body_mask = crop_mask_to_sprite(body_mask, offset, warped_cloth.shape)
         
         # 옷의 알파 채널 추출
         if warped_cloth.shape[2] == 4:
@@ -568,28 +811,21 @@ def refine_cloth_with_segmentation(warped_cloth, frame, body_keypoints):
         print(f"[Cloth Processor] 세그멘테이션 정제 실패: {e}")
         return warped_cloth
 
-def warp_cloth_to_pose(cloth_img, cloth_keypoints, body_keypoints, frame_shape, use_segmentation=True, frame=None):
+def compute_cloth_affine(cloth_keypoints, body_keypoints):
     """
-    옷 이미지를 신체 포즈에 맞춰 변형(warp)합니다.
-    세그멘테이션 기반 매칭으로 신체 윤곽에 정확하게 피팅
+    옷 키포인트 → 신체 키포인트 어파인 변환 행렬 계산 (어깨 2점 + 중심점)
     
     Args:
-        cloth_img: 옷 이미지 (RGBA)
         cloth_keypoints: 옷의 키포인트 (left_shoulder, right_shoulder 등)
         body_keypoints: 신체의 키포인트 (left_shoulder, right_shoulder 등)
-        frame_shape: 출력 프레임 크기 (height, width)
-        use_segmentation: 세그멘테이션 기반 정제 사용 여부 (기본: True)
-        frame: 원본 프레임 (세그멘테이션 사용 시 필요)
     
     Returns:
-        변형된 옷 이미지 (프레임과 동일한 크기, RGBA)
+        (M, body_shoulder_width): 2x3 어파인 행렬과 신체 어깨 너비, 키포인트 부족 시 (None, 0)
     """
-    frame_h, frame_w = frame_shape[:2]
-    
     # === 1. 옷 이미지의 소스 포인트 설정 (3점) ===
     if 'left_shoulder' not in cloth_keypoints or 'right_shoulder' not in cloth_keypoints:
         print("[Cloth Processor] 옷의 어깨 키포인트 없음 - 변형 불가")
-        return cloth_img
+        return None, 0
     
     cloth_left_shoulder = np.array(cloth_keypoints['left_shoulder'], dtype=np.float32)
     cloth_right_shoulder = np.array(cloth_keypoints['right_shoulder'], dtype=np.float32)
@@ -611,7 +847,7 @@ def warp_cloth_to_pose(cloth_img, cloth_keypoints, body_keypoints, frame_shape,
     # === 2. 신체의 목적지 포인트 설정 (3점) ===
     if 'left_shoulder' not in body_keypoints or 'right_shoulder' not in body_keypoints:
         print("[Cloth Processor] 신체의 어깨 키포인트 없음 - 변형 불가")
-        return cloth_img
+        return None, 0
     
     body_left_shoulder = np.array(body_keypoints['left_shoulder'], dtype=np.float32)
     body_right_shoulder = np.array(body_keypoints['right_shoulder'], dtype=np.float32)
@@ -629,30 +865,149 @@ def warp_cloth_to_pose(cloth_img, cloth_keypoints, body_keypoints, frame_shape,
         body_center           # [2] 중심점
     ])
     
-    # === 3. 어파인 변환 ===
+    return cv2.getAffineTransform(src_points, dst_points), body_shoulder_width
+
+def get_affine_dst_bbox(M, src_shape, frame_shape):
+    """
+    어파인 행렬로 옷 이미지 네 꼭짓점을 변환해 프레임 내 목적지 바운딩 박스 계산
+    
+    Args:
+        M: 2x3 어파인 행렬
+        src_shape: 옷 이미지 크기 (h, w, ...)
+        frame_shape: 프레임 크기 (h, w, ...)
+    
+    Returns:
+        (x0, y0, x1, y1) 프레임 경계로 클리핑된 박스, 프레임 밖이면 None
+    """
+    src_h, src_w = src_shape[:2]
+    frame_h, frame_w = frame_shape[:2]
+    
+    corners = np.array([
+        [0, 0, 1],
+        [src_w, 0, 1],
+        [0, src_h, 1],
+        [src_w, src_h, 1]
+    ], dtype=np.float64)
+    dst = corners @ np.asarray(M, dtype=np.float64).T
+    
+    x0 = max(0, int(np.floor(dst[:, 0].min())))
+    y0 = max(0, int(np.floor(dst[:, 1].min())))
+    x1 = min(frame_w, int(np.ceil(dst[:, 0].max())) + 1)
+    y1 = min(frame_h, int(np.ceil(dst[:, 1].max())) + 1)
+    
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+def warp_cloth_to_pose_roi(cloth_img, cloth_keypoints, body_keypoints, frame_shape, use_segmentation=True, frame=None,
+                           sprite_cache=None, source_key=None, segmentation_mask=None):
+    """
+    옷 이미지를 신체 포즈에 맞춰 변형하되, 변형된 옷이 차지하는 영역(스프라이트)만 생성합니다.
+    전체 프레임 크기의 투명 버퍼를 만들지 않으므로 메모리 트래픽이 크게 줄어듭니다.
+    
+    Args:
+        cloth_img: 옷 이미지 (RGBA)
+        cloth_keypoints: 옷의 키포인트 (left_shoulder, right_shoulder 등)
+        body_keypoints: 신체의 키포인트 (left_shoulder, right_shoulder 등)
+        frame_shape: 출력 프레임 크기 (height, width)
+        use_segmentation: 세그멘테이션 기반 정제 사용 여부 (기본: True)
+        frame: 원본 프레임 (세그멘테이션 사용 시 필요)
+        sprite_cache: SpriteCache (있으면 양자화된 어파인 키로 변형 결과 재사용, 평행이동은 오프셋으로만 처리)
+        source_key: cloth_img 식별자 (sprite_cache 사용 시 필요, 옷/리사이즈 단계가 바뀌면 달라져야 함)
+        segmentation_mask: 미리 계산된 저해상도 신체 마스크 (있으면 동기 세그멘테이션 생략)
+    
+    Returns:
+        (sprite, offset): 변형된 옷 스프라이트 (RGBA)와 프레임 내 좌상단 좌표 (x, y)
+                          변형 불가 시 (None, None)
+    """
     try:
-        M = cv2.getAffineTransform(src_points, dst_points)
+        M, body_shoulder_width = compute_cloth_affine(cloth_keypoints, body_keypoints)
+        if M is None:
+            return None, None
         
-        # 옷 이미지 변형
-        warped = cv2.warpAffine(
-            cloth_img, 
-            M, 
-            (frame_w, frame_h),
+        if sprite_cache is not None:
+            # 어깨 중심이 정확히 맞도록 앵커로 사용
+            anchor = (
+                (cloth_keypoints['left_shoulder'][0] + cloth_keypoints['right_shoulder'][0]) / 2,
+                (cloth_keypoints['left_shoulder'][1] + cloth_keypoints['right_shoulder'][1]) / 2
+            )
+            sprite, offset = sprite_cache.get_sprite(source_key, cloth_img, M, anchor)
+            
+            # 스프라이트가 프레임과 겹치지 않으면 변형 불가와 동일하게 처리
+            frame_h, frame_w = frame_shape[:2]
+            if offset[0] >= frame_w or offset[1] >= frame_h or \
+                    offset[0] + sprite.shape[1] <= 0 or offset[1] + sprite.shape[0] <= 0:
+                return None, None
+            
+            if use_segmentation and frame is not None:
+                sprite = refine_cloth_with_segmentation(
+                    sprite, frame, body_keypoints, offset=offset, segmentation_mask=segmentation_mask
+                )
+            return sprite, offset
+        
+        bbox = get_affine_dst_bbox(M, cloth_img.shape, frame_shape)
+        if bbox is None:
+            return None, None
+        
+        x0, y0, x1, y1 = bbox
+        
+        # 목적지 박스 기준으로 평행이동한 행렬로 스프라이트 크기만 변형
+        M_roi = M.copy()
+        M_roi[0, 2] -= x0
+        M_roi[1, 2] -= y0
+        
+        sprite = cv2.warpAffine(
+            cloth_img,
+            M_roi,
+            (x1 - x0, y1 - y0),
             flags=cv2.INTER_LINEAR,
             borderMode=cv2.BORDER_CONSTANT,
             borderValue=(0, 0, 0, 0)
         )
+        offset = (x0, y0)
         
-        # === 4. 세그멘테이션 기반 정제 (옵션) ===
+        # === 세그멘테이션 기반 정제 (옵션, 스프라이트 영역만) ===
         if use_segmentation and frame is not None:
-            warped = refine_cloth_with_segmentation(warped, frame, body_keypoints)
-            print(f"[Cloth Processor] ✓ 세그멘테이션 매칭 완료 - 어깨: {body_shoulder_width:.1f}px")
-        else:
-            print(f"[Cloth Processor] ✓ 어파인 변환 완료 - 어깨: {body_shoulder_width:.1f}px")
+            sprite = refine_cloth_with_segmentation(
+                sprite, frame, body_keypoints, offset=offset, segmentation_mask=segmentation_mask
+            )
         
-        return warped
-        return warped
+        return sprite, offset
         
     except Exception as e:
         print(f"[Cloth Processor] 어파인 변환 실패: {e}")
+        return None, None
+
+def warp_cloth_to_pose(cloth_img, cloth_keypoints, body_keypoints, frame_shape, use_segmentation=True, frame=None):
+    """
+    옷 이미지를 신체 포즈에 맞춰 변형(warp)합니다.
+    세그멘테이션 기반 매칭으로 신체 윤곽에 정확하게 피팅
+    (하위 호환성을 위해 유지, 실시간 경로는 warp_cloth_to_pose_roi 사용 권장)
+    
+    Args:
+        cloth_img: 옷 이미지 (RGBA)
+        cloth_keypoints: 옷의 키포인트 (left_shoulder, right_shoulder 등)
+        body_keypoints: 신체의 키포인트 (left_shoulder, right_shoulder 등)
+        frame_shape: 출력 프레임 크기 (height, width)
+        use_segmentation: 세그멘테이션 기반 정제 사용 여부 (기본: True)
+        frame: 원본 프레임 (세그멘테이션 사용 시 필요)
+    
+    Returns:
+        변형된 옷 이미지 (프레임과 동일한 크기, RGBA)
+    """
+    frame_h, frame_w = frame_shape[:2]
+    
+    sprite, offset = warp_cloth_to_pose_roi(
+        cloth_img, cloth_keypoints, body_keypoints, frame_shape,
+        use_segmentation=use_segmentation, frame=frame
+    )
+    if sprite is None:
         return cloth_img
+    
+    # 스프라이트를 프레임 크기 캔버스에 배치
+    warped = np.zeros((frame_h, frame_w, sprite.shape[2]), dtype=sprite.dtype)
+    x0, y0 = offset
+    h, w = sprite.shape[:2]
+    warped[y0:y0+h, x0:x0+w] = sprite
+    
+    return warped
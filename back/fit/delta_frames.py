@@ -0,0 +1,124 @@
+"""
+ROI 델타 프레임 (클라이언트가 직접 합성하지 못할 때의 스트리밍 응답)
+- 프레임에서 옷이 그려진 영역(스프라이트 바운딩 박스)만 크롭해 인코딩 + 프레임 내 (x, y) 오프셋
+  클라이언트는 보낸 카메라 프레임을 그대로 두고 크롭만 덮어씀 (나머지 영역은 원본 그대로이므로 재인코딩 불필요)
+- keyframe_interval 프레임마다 (또는 요청 시, ROI가 프레임 대부분이면) 전체 프레임 키프레임
+- 옷이 그려지지 않은 프레임은 이미지 없이 'none' (클라이언트는 카메라 프레임 그대로 표시)
+- ROI는 JPEG MCU(16px) 경계로 정렬 (크롭 블록 격자가 프레임 격자와 같도록)
+"""
+
+import threading
+
+import cv2
+
+FRAME_TYPE_KEY = 'key'
+FRAME_TYPE_DELTA = 'delta'
+FRAME_TYPE_NONE = 'none'
+DELTA_FORMATS = ('jpeg', 'png')
+
+
+def sprite_bounds(sprite, offset, frame_shape):
+    """
+    스프라이트 배치 영역을 프레임 경계로 자른 박스
+
+    Returns:
+        (x0, y0, x1, y1), 프레임 밖이면 None
+    """
+    frame_h, frame_w = frame_shape[:2]
+    ox, oy = int(offset[0]), int(offset[1])
+    x0, y0 = max(0, ox), max(0, oy)
+    x1, y1 = min(frame_w, ox + sprite.shape[1]), min(frame_h, oy + sprite.shape[0])
+    if x1 <= x0 or y1 <= y0:
+        return None
+    return x0, y0, x1, y1
+
+
+class DeltaFrameEncoder:
+    """세션별 키프레임/델타 프레임 인코더"""
+
+    def __init__(self, keyframe_interval=30, jpeg_quality=85, align=16, max_roi_fraction=0.6):
+        """
+        Args:
+            keyframe_interval: 키프레임 간격 (프레임 수)
+            jpeg_quality: JPEG 품질 (키프레임/델타 동일)
+            align: ROI 정렬 단위 (px)
+            max_roi_fraction: ROI 면적이 프레임 대비 이 비율 이상이면 키프레임으로 전송 (크롭 이득 없음)
+        """
+        self.keyframe_interval = keyframe_interval
+        self.jpeg_quality = jpeg_quality
+        self.align = align
+        self.max_roi_fraction = max_roi_fraction
+
+        self.lock = threading.Lock()
+        self.frames_since_key = None  # None = 다음 프레임은 키프레임
+        self.stats = {"key": 0, "delta": 0, "none": 0, "bytes": 0}
+
+    def reset(self):
+        """다음 프레임을 키프레임으로 (스트림 시작/옷 교체 시)"""
+        with self.lock:
+            self.frames_since_key = None
+
+    def _aligned(self, roi, frame_w, frame_h):
+        x0, y0, x1, y1 = roi
+        a = self.align
+        x0, y0 = (x0 // a) * a, (y0 // a) * a
+        x1, y1 = min(frame_w, -(-x1 // a) * a), min(frame_h, -(-y1 // a) * a)
+        return x0, y0, x1, y1
+
+    def _next_type(self, roi, frame_w, frame_h, force_keyframe):
+        """이번 프레임 종류 결정 + 키프레임 카운터 갱신"""
+        with self.lock:
+            due = self.frames_since_key is None or self.frames_since_key + 1 >= self.keyframe_interval
+            large = roi is not None and \
+                (roi[2] - roi[0]) * (roi[3] - roi[1]) >= self.max_roi_fraction * frame_w * frame_h
+            if force_keyframe or due or large:
+                self.frames_since_key = 0
+                return FRAME_TYPE_KEY
+            self.frames_since_key += 1
+            return FRAME_TYPE_DELTA if roi is not None else FRAME_TYPE_NONE
+
+    def encode(self, frame, roi, image_format='jpeg', force_keyframe=False):
+        """
+        렌더링된 프레임 → 키프레임 / ROI 델타 / none
+
+        Args:
+            frame: 렌더링 결과 프레임 (BGR)
+            roi: 옷이 그려진 영역 (x0, y0, x1, y1), 없으면 None
+            image_format: 'jpeg' / 'png' (델타 크롭 형식, 키프레임은 항상 JPEG)
+            force_keyframe: 클라이언트 요청 키프레임 (재동기화)
+
+        Returns:
+            dict: type, x, y, width, height, format, data (인코딩 바이트, none이면 None), frameSize [w, h]
+        """
+        frame_h, frame_w = frame.shape[:2]
+        if roi is not None:
+            roi = self._aligned(roi, frame_w, frame_h)
+        frame_type = self._next_type(roi, frame_w, frame_h, force_keyframe)
+
+        if frame_type == FRAME_TYPE_KEY:
+            x0, y0, x1, y1 = 0, 0, frame_w, frame_h
+            image_format = 'jpeg'
+        elif frame_type == FRAME_TYPE_DELTA:
+            x0, y0, x1, y1 = roi
+        else:
+            self.stats["none"] += 1
+            return {"type": frame_type, "x": 0, "y": 0, "width": 0, "height": 0,
+                    "format": None, "data": None, "frameSize": [frame_w, frame_h]}
+
+        region = frame[y0:y1, x0:x1]
+        if image_format == 'png':
+            ok, buffer = cv2.imencode('.png', region, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+        else:
+            ok, buffer = cv2.imencode('.jpg', region, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            self.reset()  # 실패한 델타 이후 상태를 알 수 없으므로 다음은 키프레임
+            return None
+
+        data = buffer.tobytes()
+        self.stats[frame_type] += 1
+        self.stats["bytes"] += len(data)
+        return {"type": frame_type, "x": x0, "y": y0, "width": x1 - x0, "height": y1 - y0,
+                "format": image_format, "data": data, "frameSize": [frame_w, frame_h]}
+
+    def get_stats(self):
+        return dict(self.stats, keyframe_interval=self.keyframe_interval)
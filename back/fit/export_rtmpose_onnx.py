@@ -0,0 +1,111 @@
+"""
+RTMPose → ONNX 내보내기
+- 입력: uint8 NHWC BGR 크롭 (N, 256, 192, 3) - 채널 변환/정규화를 그래프에 포함
+- 출력: simcc_x (N, 17, 384), simcc_y (N, 17, 512)
+- 배치 차원은 동적
+- 내보낸 뒤 ONNX Runtime 결과를 PyTorch 결과와 비교
+
+사용법:
+    python export_rtmpose_onnx.py [출력 경로] [--opset 17]
+"""
+
+import os
+import sys
+import argparse
+import numpy as np
+import torch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+from mmpose.apis import init_model
+from rtmpose_lite import INPUT_SIZE, get_model_normalization
+from rtmpose_onnx import DEFAULT_ONNX_PATH
+
+CONFIG_FILE = os.path.join(current_dir, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.py')
+CHECKPOINT_FILE = os.path.join(current_dir, 'models', 'rtmpose-s_simcc-aic-coco_pt-aic-coco_420e-256x192-fcb2599b_20230126.pth')
+
+
+class RTMPoseExportWrapper(torch.nn.Module):
+    """uint8 NHWC BGR 입력 → 정규화 → backbone/head → (simcc_x, simcc_y)"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        mean, std = get_model_normalization(model)
+        self.register_buffer('mean', torch.tensor(mean, dtype=torch.float32).view(1, 3, 1, 1))
+        self.register_buffer('std', torch.tensor(std, dtype=torch.float32).view(1, 3, 1, 1))
+
+    def forward(self, x):
+        x = x.permute(0, 3, 1, 2).float()
+        x = x[:, [2, 1, 0]]  # BGR → RGB
+        x = (x - self.mean) / self.std
+        feats = self.model.extract_feat(x)
+        return self.model.head.forward(feats)
+
+
+def export(output_path, opset=17):
+    """모델 로드 후 ONNX로 내보내기"""
+    for path in (CONFIG_FILE, CHECKPOINT_FILE):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model file not found: {path}")
+
+    print(f"[Export] 모델 로딩: {os.path.basename(CHECKPOINT_FILE)}")
+    model = init_model(CONFIG_FILE, CHECKPOINT_FILE, device='cpu')
+    model.eval()
+    wrapper = RTMPoseExportWrapper(model).eval()
+
+    dummy = torch.randint(0, 255, (1, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=torch.uint8)
+    with torch.no_grad():
+        torch.onnx.export(
+            wrapper,
+            dummy,
+            output_path,
+            input_names=['input'],
+            output_names=['simcc_x', 'simcc_y'],
+            dynamic_axes={'input': {0: 'batch'}, 'simcc_x': {0: 'batch'}, 'simcc_y': {0: 'batch'}},
+            opset_version=opset,
+            do_constant_folding=True
+        )
+    print(f"[Export] 저장 완료: {output_path} ({os.path.getsize(output_path) / 1024 / 1024:.1f}MB)")
+    return wrapper
+
+
+def verify(wrapper, onnx_path, batch_size=4):
+    """PyTorch vs ONNX Runtime SimCC 출력 비교"""
+    import onnxruntime as ort
+
+    session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+    batch = np.random.randint(0, 255, (batch_size, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+
+    with torch.no_grad():
+        ref_x, ref_y = wrapper(torch.from_numpy(batch))
+    ort_x, ort_y = session.run(None, {'input': batch})
+
+    err_x = np.abs(ref_x.numpy() - ort_x).max()
+    err_y = np.abs(ref_y.numpy() - ort_y).max()
+    argmax_match = (
+        (ref_x.numpy().argmax(-1) == ort_x.argmax(-1)).mean()
+        + (ref_y.numpy().argmax(-1) == ort_y.argmax(-1)).mean()
+    ) / 2
+    print(f"[Export] 검증 (배치 {batch_size}): 최대 로짓 오차 x={err_x:.2e}, y={err_y:.2e}, "
+          f"argmax 일치율 {argmax_match * 100:.1f}%")
+    return max(err_x, err_y) < 1e-3
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RTMPose ONNX 내보내기')
+    parser.add_argument('output', nargs='?', default=DEFAULT_ONNX_PATH, help='출력 ONNX 경로')
+    parser.add_argument('--opset', type=int, default=17, help='ONNX opset 버전')
+    args = parser.parse_args()
+
+    wrapper = export(args.output, args.opset)
+    if verify(wrapper, args.output):
+        print("[Export] ✅ ONNX 출력 일치")
+    else:
+        print("[Export] ❌ ONNX 출력 불일치 - opset 또는 모델 확인 필요")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+최신 프레임 메일박스 / 최신 결과 셀
+- LatestFrameMailbox: 단일 슬롯 + 조건 변수. put은 이전 프레임을 덮어쓰고 대기 중인 워커를 즉시 깨움
+  (큐를 비우는 get_nowait 루프, 배치 수집 타임아웃 없이 워커가 유휴 상태가 되는 즉시 최신 프레임 추론)
+- LatestResultCell: 단일 슬롯 결과. 렌더링 스레드는 새 결과가 있을 때만 가져감 (오래된 결과가 쌓이지 않음)
+"""
+
+import threading
+
+
+class LatestFrameMailbox:
+    """단일 슬롯 최신 프레임 메일박스"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.item = None
+        self.closed = False
+        self.stats = {"put": 0, "taken": 0, "overwritten": 0}
+
+    def put(self, item):
+        """프레임 저장 (처리 전 프레임이 있으면 덮어씀) + 워커 깨우기"""
+        with self.condition:
+            if self.item is not None:
+                self.stats["overwritten"] += 1
+            self.item = item
+            self.stats["put"] += 1
+            self.condition.notify()
+
+    def get(self, timeout=None):
+        """
+        새 프레임이 올 때까지 대기 후 꺼냄
+
+        Returns:
+            프레임 항목, 타임아웃 또는 close() 후에는 None
+        """
+        with self.condition:
+            if self.item is None and not self.closed:
+                self.condition.wait(timeout)
+            item, self.item = self.item, None
+            if item is not None:
+                self.stats["taken"] += 1
+            return item
+
+    def clear(self):
+        """처리 전 프레임 버리기"""
+        with self.condition:
+            self.item = None
+
+    def close(self):
+        """대기 중인 워커 깨우기 (종료 시)"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+    def reopen(self):
+        """close() 이후 다시 사용"""
+        with self.condition:
+            self.closed = False
+            self.item = None
+
+
+class LatestResultCell:
+    """단일 슬롯 최신 결과 (쓰기: 추론 워커, 읽기: 렌더링 스레드)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = None
+        self.seq = 0
+        self.taken_seq = 0
+
+    def put(self, value):
+        """결과 저장 (읽지 않은 이전 결과는 버림)"""
+        with self.lock:
+            self.value = value
+            self.seq += 1
+
+    def take(self):
+        """
+        새 결과 꺼내기
+
+        Returns:
+            마지막 take 이후 새 결과가 있으면 그 값, 없으면 None
+        """
+        with self.lock:
+            if self.seq == self.taken_seq:
+                return None
+            self.taken_seq = self.seq
+            return self.value
+
+    def clear(self):
+        """읽지 않은 결과 버리기"""
+        with self.lock:
+            self.taken_seq = self.seq
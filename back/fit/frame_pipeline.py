@@ -0,0 +1,153 @@
+"""
+스트리밍 프레임 파이프라인 (디코딩 → 렌더링 → 인코딩 단계별 제한 스레드 풀)
+- 요청 스레드가 디코딩/렌더링/인코딩을 직렬로 모두 수행하지 않고 단계별 풀에 넘김
+  OpenCV 코덱(imdecode/imencode)은 GIL을 해제하므로 프레임 N+1 디코딩과 프레임 N 인코딩이 겹쳐 실행됨
+- 단계마다 최대 대기 수(max_pending) 제한: 꽉 차면 PipelineBusy (요청이 끝없이 쌓이지 않도록)
+- 단계별 큐 깊이(대기/실행 중), 최대 깊이, 평균 대기/실행 시간 통계
+- 렌더링 단계는 세션 엔진의 render_lock으로 세션 내 순서 보장 (호출 측)
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+
+class PipelineBusy(Exception):
+    """단계 대기열이 가득 참 (호출 측은 프레임을 버리거나 503 응답)"""
+
+
+def decode_frame(data, reduced=False):
+    """
+    JPEG/PNG 바이트 → BGR 프레임
+
+    Args:
+        data: 인코딩된 이미지 바이트
+        reduced: True면 1/2 크기로 디코딩 (IMREAD_REDUCED_COLOR_2, JPEG는 DCT 단계에서 축소되어 더 빠름)
+
+    Returns:
+        BGR 프레임 (실패 시 None)
+    """
+    flags = cv2.IMREAD_REDUCED_COLOR_2 if reduced else cv2.IMREAD_COLOR
+    return cv2.imdecode(np.frombuffer(data, np.uint8), flags)
+
+
+class PipelineStage:
+    """단계 하나: 고정 작업자 스레드 풀 + 최대 대기 수 제한 + 깊이/시간 통계"""
+
+    def __init__(self, name, workers, max_pending):
+        """
+        Args:
+            name: 단계 이름 (스레드 이름, 통계 키)
+            workers: 작업자 스레드 수
+            max_pending: 대기 + 실행 중 작업 최대 수 (초과 제출은 PipelineBusy)
+        """
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f'fit-{name}')
+        self.slots = threading.BoundedSemaphore(max_pending)
+
+        self.lock = threading.Lock()
+        self.queued = 0       # 제출됐지만 아직 시작 안 함
+        self.active = 0       # 실행 중
+        self.peak_depth = 0   # 최대 (대기 + 실행 중)
+        self.stats = {"completed": 0, "rejected": 0, "failed": 0, "wait_total": 0.0, "run_total": 0.0}
+
+    def submit(self, fn, *args, timeout=None):
+        """
+        작업 제출
+
+        Args:
+            timeout: 대기열 자리 대기 시간 (초, 0이면 즉시, None이면 무한 대기)
+
+        Returns:
+            concurrent.futures.Future (asyncio에서는 asyncio.wrap_future로 대기)
+        """
+        if timeout == 0:
+            acquired = self.slots.acquire(blocking=False)
+        else:
+            acquired = self.slots.acquire(timeout=timeout)
+        if not acquired:
+            with self.lock:
+                self.stats["rejected"] += 1
+            raise PipelineBusy(f"{self.name} 단계 대기열 가득 참 ({self.max_pending})")
+
+        submitted_at = time.perf_counter()
+        with self.lock:
+            self.queued += 1
+            self.peak_depth = max(self.peak_depth, self.queued + self.active)
+        try:
+            return self.executor.submit(self._run, fn, args, submitted_at)
+        except Exception:
+            with self.lock:
+                self.queued -= 1
+            self.slots.release()
+            raise
+
+    def run(self, fn, *args, timeout=None):
+        """작업 제출 후 결과 대기 (요청 스레드용)"""
+        return self.submit(fn, *args, timeout=timeout).result()
+
+    def _run(self, fn, args, submitted_at):
+        started_at = time.perf_counter()
+        with self.lock:
+            self.queued -= 1
+            self.active += 1
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            finished_at = time.perf_counter()
+            with self.lock:
+                self.active -= 1
+                self.stats["failed" if failed else "completed"] += 1
+                self.stats["wait_total"] += started_at - submitted_at
+                self.stats["run_total"] += finished_at - started_at
+            self.slots.release()
+
+    def get_stats(self):
+        with self.lock:
+            done = self.stats["completed"] + self.stats["failed"]
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "queued": self.queued,
+                "active": self.active,
+                "peak_depth": self.peak_depth,
+                "completed": self.stats["completed"],
+                "rejected": self.stats["rejected"],
+                "failed": self.stats["failed"],
+                "avg_wait_ms": round(self.stats["wait_total"] / done * 1000, 3) if done else 0.0,
+                "avg_run_ms": round(self.stats["run_total"] / done * 1000, 3) if done else 0.0
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class FramePipeline:
+    """디코딩 / 렌더링 / 인코딩 단계 묶음 (프로세스당 하나, 모든 세션 공유)"""
+
+    def __init__(self, decode_workers=2, render_workers=2, encode_workers=2, max_pending=8):
+        """
+        Args:
+            decode_workers, render_workers, encode_workers: 단계별 작업자 수
+            max_pending: 단계별 최대 대기 + 실행 중 작업 수
+        """
+        self.decode = PipelineStage('decode', decode_workers, max_pending)
+        self.render = PipelineStage('render', render_workers, max_pending)
+        self.encode = PipelineStage('encode', encode_workers, max_pending)
+
+    def get_stats(self):
+        """단계별 큐 깊이/시간 통계"""
+        return {stage.name: stage.get_stats() for stage in (self.decode, self.render, self.encode)}
+
+    def shutdown(self):
+        for stage in (self.decode, self.render, self.encode):
+            stage.shutdown()
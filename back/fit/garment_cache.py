@@ -0,0 +1,346 @@
+import cv2
+import numpy as np
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    from cloth_processor import remove_background, detect_cloth_keypoints_advanced
+except ImportError:
+    from .cloth_processor import remove_background, detect_cloth_keypoints_advanced
+
+# 엔트리 파일 이름
+NOBG_FILENAME = 'cloth_nobg.png'
+KEYPOINTS_FILENAME = 'keypoints.json'
+PYRAMID_FILENAME = 'pyramid_{}.png'
+INDEX_FILENAME = 'index.json'
+
+# 미리 축소해 두는 피라미드 스케일 (원본 1.0은 cloth_nobg.png)
+PYRAMID_SCALES = (0.5, 0.25)
+
+# 캐시 적중으로 바뀐 LRU 순서를 인덱스 파일에 반영하는 최소 간격 (초, 적중마다 쓰지 않도록)
+INDEX_SAVE_INTERVAL = 5.0
+
+
+def hash_file(path, chunk_size=1 << 20):
+    """파일 내용의 SHA-256 해시 (콘텐츠 주소)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _to_builtin(value):
+    """numpy 스칼라/튜플을 JSON 직렬화 가능한 기본 타입으로 변환"""
+    if isinstance(value, dict):
+        return {k: _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _from_json_keypoints(data):
+    """JSON 리스트를 키포인트 튜플로 복원 (detect_cloth_keypoints_advanced 반환 형식과 동일)"""
+    if data is None:
+        return None
+    return {k: tuple(v) if isinstance(v, list) else v for k, v in data.items()}
+
+
+class GarmentAsset:
+    """캐시된 옷 에셋 (배경 제거 RGBA + 키포인트 + 축소 피라미드)"""
+
+    def __init__(self, content_hash, rgba, keypoints, pyramid, path, degraded=False):
+        self.content_hash = content_hash
+        self.rgba = rgba                # 배경 제거된 옷 (BGRA)
+        self.keypoints = keypoints      # 원본 해상도 기준 키포인트
+        self.pyramid = pyramid          # [(scale, image)], 큰 스케일 → 작은 스케일 순서 (1.0 포함)
+        self.path = path                # 엔트리 디렉토리 (캐시하지 않은 에셋은 None)
+        self.degraded = degraded        # rembg 실패로 원본을 그대로 사용 (캐시하지 않음, 다음 로드 때 다시 시도)
+
+    def best_level(self, scale):
+        """
+        목표 스케일 이상인 가장 작은 피라미드 레벨 선택 (리사이즈 비용 최소화)
+
+        Returns:
+            (level_scale, image)
+        """
+        chosen = self.pyramid[0]
+        for level_scale, image in self.pyramid:
+            if level_scale >= scale:
+                chosen = (level_scale, image)
+        return chosen
+
+
+class GarmentAssetCache:
+    """
+    콘텐츠 해시 기반 옷 에셋 디스크 캐시
+    - 키: 원본 옷 이미지 파일의 SHA-256 (내용이 같으면 같은 엔트리 → 오래된 결과 재사용 불가)
+    - 엔트리: 배경 제거 PNG, 키포인트 JSON, 축소 피라미드 PNG
+    - 조회는 해시로 O(1), 엔트리 개수/용량 기준 LRU 정리
+    """
+
+    def __init__(self, root_dir, max_entries=32, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            root_dir: 캐시 루트 디렉토리
+            max_entries: 최대 엔트리 수
+            max_bytes: 최대 디스크 사용량 (바이트)
+        """
+        self.root_dir = root_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(root_dir, exist_ok=True)
+
+        self.lock = threading.Lock()
+        self._build_locks = {}  # 해시별 생성 락 (같은 옷 동시 생성 방지)
+        self.index = OrderedDict()  # hash -> 엔트리 크기 (바이트), LRU 순서
+        self._index_saved_at = 0.0  # 인덱스 파일 마지막 저장 시각 (적중 시 순서 저장 디바운스)
+        self.hits = 0
+        self.misses = 0
+
+        self._load_index()
+
+    # ========== 조회 / 생성 ==========
+
+    def get_or_create(self, cloth_image_path):
+        """
+        옷 이미지에 대한 에셋 반환 (캐시 미스일 때만 rembg + 키포인트 감지 실행)
+
+        Args:
+            cloth_image_path: 원본 옷 이미지 경로
+
+        Returns:
+            GarmentAsset 또는 None (실패 시)
+        """
+        content_hash = hash_file(cloth_image_path)
+
+        asset = self.get(content_hash)
+        if asset is not None:
+            return asset
+
+        # 같은 해시를 동시에 생성하지 않도록 해시별 락
+        with self.lock:
+            build_lock = self._build_locks.setdefault(content_hash, threading.Lock())
+
+        with build_lock:
+            # 대기 중 다른 스레드가 생성했을 수 있음
+            asset = self.get(content_hash, count=False)
+            if asset is not None:
+                return asset
+
+            with self.lock:
+                self.misses += 1
+            asset = self._build(content_hash, cloth_image_path)
+
+        with self.lock:
+            self._build_locks.pop(content_hash, None)
+        return asset
+
+    def get(self, content_hash, count=True):
+        """해시로 에셋 조회 (없으면 None)"""
+        with self.lock:
+            if content_hash not in self.index:
+                return None
+            self.index.move_to_end(content_hash)
+            if count:
+                self.hits += 1
+            # 재시작 후에도 LRU 순서가 유지되도록 적중 순서를 저장 (최대 INDEX_SAVE_INTERVAL마다 한 번)
+            if time.monotonic() - self._index_saved_at >= INDEX_SAVE_INTERVAL:
+                self._save_index_locked()
+
+        entry_dir = os.path.join(self.root_dir, content_hash)
+        asset = self._read_entry(content_hash, entry_dir)
+        if asset is None:
+            # 손상/삭제된 엔트리는 인덱스에서 제거
+            with self.lock:
+                self.index.pop(content_hash, None)
+                if count:
+                    self.hits -= 1
+            shutil.rmtree(entry_dir, ignore_errors=True)
+        return asset
+
+    def get_stats(self):
+        """캐시 통계"""
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.index),
+                "bytes": sum(self.index.values()),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0
+            }
+
+    # ========== 내부 ==========
+
+    def _build(self, content_hash, cloth_image_path):
+        """엔트리 생성 (임시 디렉토리에 만든 뒤 원자적으로 이동)"""
+        start_time = time.time()
+        entry_dir = os.path.join(self.root_dir, content_hash)
+        tmp_dir = f"{entry_dir}.tmp-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        try:
+            nobg_path = os.path.join(tmp_dir, NOBG_FILENAME)
+            remove_background(cloth_image_path, nobg_path)
+
+            # rembg 실패 시 remove_background는 파일을 쓰지 않고 원본을 반환하므로 여기서 저장
+            # (이번 로드에만 쓰고 캐시하지 않음: 해시 키가 같으므로 캐시하면 다시 시도할 기회가 없음)
+            degraded = not os.path.exists(nobg_path)
+            if degraded:
+                fallback = cv2.imread(cloth_image_path, cv2.IMREAD_UNCHANGED)
+                if fallback is None:
+                    raise FileNotFoundError(f"이미지를 찾을 수 없습니다: {cloth_image_path}")
+                if fallback.ndim == 3 and fallback.shape[2] == 3:
+                    fallback = cv2.cvtColor(fallback, cv2.COLOR_BGR2BGRA)
+                cv2.imwrite(nobg_path, fallback)
+
+            keypoints = detect_cloth_keypoints_advanced(nobg_path)
+            with open(os.path.join(tmp_dir, KEYPOINTS_FILENAME), 'w', encoding='utf-8') as f:
+                json.dump(_to_builtin(keypoints), f)
+
+            # 축소 피라미드 생성 (INTER_AREA로 한 번만 고품질 축소)
+            rgba = cv2.imread(nobg_path, cv2.IMREAD_UNCHANGED)
+            h, w = rgba.shape[:2]
+            for level_scale in PYRAMID_SCALES:
+                level = cv2.resize(
+                    rgba,
+                    (max(1, int(w * level_scale)), max(1, int(h * level_scale))),
+                    interpolation=cv2.INTER_AREA
+                )
+                cv2.imwrite(os.path.join(tmp_dir, PYRAMID_FILENAME.format(level_scale)), level)
+
+            if degraded:
+                asset = self._read_entry(content_hash, tmp_dir)
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                if asset is not None:
+                    asset.path = None
+                    asset.degraded = True
+                print(f"[GarmentCache] 배경 제거 실패 - 원본 사용, 캐시하지 않음: {content_hash[:12]}")
+                return asset
+
+            if os.path.exists(entry_dir):
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except Exception as e:
+            print(f"[GarmentCache] 엔트리 생성 실패: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+
+        size = self._dir_size(entry_dir)
+        with self.lock:
+            self.index[content_hash] = size
+            self.index.move_to_end(content_hash)
+            evicted = self._evict_locked(keep=content_hash)
+            self._save_index_locked()
+
+        for evicted_hash in evicted:
+            shutil.rmtree(os.path.join(self.root_dir, evicted_hash), ignore_errors=True)
+
+        print(f"[GarmentCache] 새 엔트리 생성: {content_hash[:12]} ({size / 1024:.0f}KB, {(time.time() - start_time) * 1000:.0f}ms)")
+        return self._read_entry(content_hash, entry_dir)
+
+    def _read_entry(self, content_hash, entry_dir):
+        """엔트리 디렉토리에서 에셋 로드"""
+        try:
+            nobg_path = os.path.join(entry_dir, NOBG_FILENAME)
+            rgba = cv2.imread(nobg_path, cv2.IMREAD_UNCHANGED)
+            if rgba is None:
+                return None
+
+            with open(os.path.join(entry_dir, KEYPOINTS_FILENAME), 'r', encoding='utf-8') as f:
+                keypoints = _from_json_keypoints(json.load(f))
+
+            pyramid = [(1.0, rgba)]
+            for level_scale in PYRAMID_SCALES:
+                level = cv2.imread(os.path.join(entry_dir, PYRAMID_FILENAME.format(level_scale)), cv2.IMREAD_UNCHANGED)
+                if level is not None:
+                    pyramid.append((level_scale, level))
+
+            return GarmentAsset(content_hash, rgba, keypoints, pyramid, entry_dir)
+        except Exception as e:
+            print(f"[GarmentCache] 엔트리 로드 실패 ({content_hash[:12]}): {e}")
+            return None
+
+    def _evict_locked(self, keep=None):
+        """LRU 정리 대상 해시 목록 반환 (self.lock 보유 상태에서 호출)"""
+        evicted = []
+        while self.index and (
+            len(self.index) > self.max_entries or sum(self.index.values()) > self.max_bytes
+        ):
+            oldest = next(iter(self.index))
+            if oldest == keep:
+                break
+            self.index.pop(oldest)
+            evicted.append(oldest)
+        return evicted
+
+    def _load_index(self):
+        """인덱스 로드 (없거나 손상되면 디렉토리 스캔으로 재구성)"""
+        index_path = os.path.join(self.root_dir, INDEX_FILENAME)
+        entries = None
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        if entries is None:
+            entries = []
+            for name in os.listdir(self.root_dir):
+                entry_dir = os.path.join(self.root_dir, name)
+                if os.path.isdir(entry_dir) and '.tmp-' not in name:
+                    entries.append([name, self._dir_size(entry_dir), os.path.getmtime(entry_dir)])
+            entries.sort(key=lambda e: e[2])
+
+        for entry in entries:
+            content_hash, size = entry[0], entry[1]
+            if os.path.isdir(os.path.join(self.root_dir, content_hash)):
+                self.index[content_hash] = size
+
+        print(f"[GarmentCache] 캐시 로드: {len(self.index)}개 엔트리 ({self.root_dir})")
+
+    def _save_index_locked(self):
+        """인덱스 저장 (self.lock 보유 상태에서 호출, LRU 순서 보존)"""
+        self._index_saved_at = time.monotonic()
+        index_path = os.path.join(self.root_dir, INDEX_FILENAME)
+        tmp_path = index_path + '.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([[h, size] for h, size in self.index.items()], f)
+            os.replace(tmp_path, index_path)
+        except OSError as e:
+            print(f"[GarmentCache] 인덱스 저장 실패: {e}")
+
+    @staticmethod
+    def _dir_size(path):
+        total = 0
+        for name in os.listdir(path):
+            total += os.path.getsize(os.path.join(path, name))
+        return total
+
+
+# 프로세스 전역 캐시 (세션들이 공유)
+_garment_cache = None
+_garment_cache_lock = threading.Lock()
+
+
+def get_garment_cache():
+    """옷 에셋 캐시 싱글톤"""
+    global _garment_cache
+    if _garment_cache is None:
+        with _garment_cache_lock:
+            if _garment_cache is None:
+                root_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output', 'garment_cache')
+                _garment_cache = GarmentAssetCache(root_dir)
+    return _garment_cache
@@ -0,0 +1,94 @@
+"""
+사람 박스 추적 (포즈 추론 ROI)
+- 이전 추론 결과 키포인트의 외접 박스 + 여백 → 다음 추론의 사람 박스 (x1, y1, x2, y2, 원본 해상도)
+- RTMPose는 박스 영역만 256x192 입력으로 어파인 크롭 (박스가 없으면 프레임 전체를 사람 박스로 사용)
+  → 프레임 전체를 입력에 욱여넣지 않으므로 낮은 inference_scale에서도 어깨 위치 해상도 유지
+- 신뢰도가 떨어지거나(사람이 박스 밖으로 나감, 가림) 결과가 오래되면 프레임 전체로 폴백
+- 여러 사람 대응 시 트래커를 사람별로 두는 구조로 확장 가능
+"""
+
+import numpy as np
+
+# 박스 계산에 쓰는 주요 관절: 코, 눈, 어깨, 팔꿈치, 손목, 골반
+TRACK_KEYPOINTS = np.array([0, 1, 2, 5, 6, 7, 8, 9, 10, 11, 12])
+SHOULDERS = np.array([5, 6])
+
+
+class PersonTracker:
+    """이전 키포인트 기반 사람 박스 추적기"""
+
+    def __init__(self, margin=0.2, head_margin=0.35, min_score=0.3, min_keypoints=6, min_mean_score=0.45,
+                 max_age=0.5, min_size=48):
+        """
+        Args:
+            margin: 키포인트 외접 박스 대비 좌우/아래 여백 비율 (프레임 간 이동 허용)
+            head_margin: 위쪽 여백 비율 (코/눈 위 머리 영역)
+            min_score: 박스 계산에 쓰는 키포인트 최소 신뢰도
+            min_keypoints: 최소 유효 키포인트 수 (미만이면 프레임 전체로 폴백)
+            min_mean_score: 유효 키포인트 평균 신뢰도 하한 (미만이면 폴백)
+            max_age: 박스 유효 시간 (초, 이보다 오래된 결과 기반 박스는 사용 안 함)
+            min_size: 최소 박스 크기 (px, 원본 해상도)
+        """
+        self.margin = margin
+        self.head_margin = head_margin
+        self.min_score = min_score
+        self.min_keypoints = min_keypoints
+        self.min_mean_score = min_mean_score
+        self.max_age = max_age
+        self.min_size = min_size
+
+        self.stats = {"tracked": 0, "lost": 0}
+        self.reset()
+
+    def reset(self):
+        """추적 초기화 (다음 추론은 프레임 전체)"""
+        self.box = None
+        self.updated_at = None
+
+    def update(self, pose, timestamp):
+        """
+        추론 결과로 다음 박스 갱신
+
+        Args:
+            pose: (17, 3) [x, y, score] 원본 해상도 좌표
+            timestamp: 결과의 캡처 시각
+        """
+        candidates = pose[TRACK_KEYPOINTS]
+        visible = candidates[candidates[:, 2] >= self.min_score]
+        shoulders_ok = bool((pose[SHOULDERS, 2] >= self.min_score).all())
+        if len(visible) < self.min_keypoints or not shoulders_ok or visible[:, 2].mean() < self.min_mean_score:
+            if self.box is not None:
+                self.stats["lost"] += 1
+            self.reset()
+            return
+
+        x1, y1 = visible[:, :2].min(axis=0)
+        x2, y2 = visible[:, :2].max(axis=0)
+        size = max(x2 - x1, y2 - y1)
+        self.box = (
+            float(x1 - size * self.margin),
+            float(y1 - size * self.head_margin),
+            float(x2 + size * self.margin),
+            float(y2 + size * self.margin)
+        )
+        self.updated_at = timestamp
+        self.stats["tracked"] += 1
+
+    def get_box(self, frame_w, frame_h, now):
+        """
+        다음 추론에 사용할 사람 박스 (프레임 범위로 자름)
+
+        Returns:
+            (x1, y1, x2, y2) 원본 해상도, 추적 중이 아니면 None (프레임 전체 사용)
+        """
+        if self.box is None or now - self.updated_at > self.max_age:
+            return None
+        x1, y1, x2, y2 = self.box
+        x1, y1 = max(0.0, x1), max(0.0, y1)
+        x2, y2 = min(float(frame_w), x2), min(float(frame_h), y2)
+        if x2 - x1 < self.min_size or y2 - y1 < self.min_size:
+            return None
+        return x1, y1, x2, y2
+
+    def get_stats(self):
+        return dict(self.stats, tracking=self.box is not None)
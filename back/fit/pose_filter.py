@@ -0,0 +1,124 @@
+"""
+키포인트 시간 필터 (One-Euro) + 렌더링 시점 예측
+- 17개 관절 x/y를 한 번에 벡터 연산으로 필터링
+- 추론 결과마다 캡처 시각 기준으로 update, 렌더링 프레임마다 predict로 현재 시각까지 외삽
+- 느린 움직임은 강하게 평활화(떨림 제거), 빠른 움직임은 컷오프를 올려 지연 최소화
+"""
+
+import math
+import numpy as np
+
+
+def smoothing_factor(dt, cutoff):
+    """One-Euro 지수 평활 계수 (cutoff: Hz, 스칼라 또는 배열)"""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroPoseFilter:
+    """
+    (17, 3) [x, y, score] 포즈용 One-Euro 필터
+
+    - 속도(px/s)도 함께 평활화하여 추론 사이 렌더링 프레임에서 등속 외삽 (느린 관절은 외삽 감쇠)
+    - 신뢰도가 낮은 관절은 평활화하지 않고 원값 사용 (다시 보이면 그 위치에서 재시작)
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=0.01, d_cutoff=1.0,
+                 max_extrapolation=0.1, reset_interval=0.5, score_threshold=0.3, extrapolation_deadband=40.0):
+        """
+        Args:
+            min_cutoff: 정지 상태 최소 컷오프 (Hz, 낮을수록 떨림 감소/지연 증가)
+            beta: 속도 비례 컷오프 증가량 (높을수록 빠른 움직임 지연 감소)
+            d_cutoff: 속도 추정 컷오프 (Hz)
+            max_extrapolation: 최대 외삽 시간 (초, 추론이 끊겨도 옷이 날아가지 않도록)
+            reset_interval: 이 시간 이상 결과가 없으면 필터 재시작 (초)
+            score_threshold: 필터링 대상 최소 신뢰도
+            extrapolation_deadband: 외삽 감쇠 기준 속도 (px/s, 이보다 느린 관절은 잡음으로 보고 외삽을 줄임 → 정지 상태 떨림 방지)
+        """
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.max_extrapolation = max_extrapolation
+        self.reset_interval = reset_interval
+        self.score_threshold = score_threshold
+        self.extrapolation_deadband = extrapolation_deadband
+        self.reset()
+
+    def reset(self):
+        """필터 상태 초기화"""
+        self.position = None     # (17, 2) 평활화된 위치
+        self.velocity = None     # (17, 2) 평활화된 속도 (px/s)
+        self.scores = None       # (17,) 최근 신뢰도
+        self.last_timestamp = None
+
+    def is_ready(self):
+        """예측 가능 여부 (한 번 이상 update됨)"""
+        return self.position is not None
+
+    def update(self, pose, timestamp):
+        """
+        새 추론 결과 반영
+
+        Args:
+            pose: (17, 3) [x, y, score]
+            timestamp: 추론한 프레임의 캡처 시각 (time.time())
+
+        Returns:
+            bool: 반영 여부 (이전 결과보다 오래된 결과는 무시)
+        """
+        raw = np.asarray(pose[:, :2], dtype=np.float32)
+        scores = np.asarray(pose[:, 2], dtype=np.float32)
+
+        if self.position is None or timestamp - self.last_timestamp > self.reset_interval:
+            self.position = raw.copy()
+            self.velocity = np.zeros_like(raw)
+            self.scores = scores.copy()
+            self.last_timestamp = timestamp
+            return True
+
+        dt = timestamp - self.last_timestamp
+        if dt <= 0:
+            return False
+
+        # 속도 평활화
+        raw_velocity = (raw - self.position) / dt
+        alpha_d = smoothing_factor(dt, self.d_cutoff)
+        velocity = alpha_d * raw_velocity + (1 - alpha_d) * self.velocity
+
+        # 관절별 적응 컷오프 (속도 크기에 비례)
+        speed = np.linalg.norm(velocity, axis=1, keepdims=True)
+        alpha = smoothing_factor(dt, self.min_cutoff + self.beta * speed)
+        position = alpha * raw + (1 - alpha) * self.position
+
+        # 신뢰도가 낮거나 방금 다시 보인 관절은 원값으로 재시작
+        restart = (scores < self.score_threshold) | (self.scores < self.score_threshold)
+        position[restart] = raw[restart]
+        velocity[restart] = 0
+
+        self.position = position.astype(np.float32)
+        self.velocity = velocity.astype(np.float32)
+        self.scores = scores.copy()
+        self.last_timestamp = timestamp
+        return True
+
+    def predict(self, timestamp):
+        """
+        렌더링 시각의 포즈 예측 (등속 외삽)
+
+        Args:
+            timestamp: 렌더링 프레임 시각 (time.time())
+
+        Returns:
+            (17, 3) float32 [x, y, score], update 전이면 None
+        """
+        if self.position is None:
+            return None
+
+        dt = min(max(timestamp - self.last_timestamp, 0.0), self.max_extrapolation)
+        # 관절별 외삽 이득 |v|² / (|v|² + deadband²): 실제 움직임은 거의 그대로, 잡음 수준 속도는 외삽 억제
+        speed_sq = np.sum(self.velocity * self.velocity, axis=1, keepdims=True)
+        gain = speed_sq / (speed_sq + self.extrapolation_deadband ** 2) if self.extrapolation_deadband > 0 else 1.0
+        pose = np.empty((self.position.shape[0], 3), dtype=np.float32)
+        pose[:, :2] = self.position + self.velocity * gain * dt
+        pose[:, 2] = self.scores
+        return pose
@@ -0,0 +1,498 @@
+"""
+프로세스 분리 포즈 추론 워커
+- 포즈 추론(+ 선택적으로 세그멘테이션)을 별도 프로세스에서 실행해 Flask 프로세스의 GIL 경합 제거
+- 프레임: multiprocessing.shared_memory 링 버퍼 (채널(세션)당 슬롯 FRAME_SLOTS개, 피클링 없음)
+- 결과: 채널별 작은 공유 배열 (seq, 캡처 시각, (17, 3) 포즈) + 저해상도 세그멘테이션 마스크
+- 슬롯/결과는 시퀀스 번호로 일관성 검사 (쓰는 중이거나 덮어쓴 데이터는 버림)
+- 워커가 죽거나 멈추면 부모가 자동 재시작 (재시도 간격은 지수 백오프)
+
+공유 메모리 배치:
+    ctrl (float64): [전역 상태 GLOBAL_FIELDS] + 채널별 [latest_seq, latest_slot, 슬롯 헤더 x FRAME_SLOTS, 포즈, 마스크 헤더]
+    frames (uint8): 채널별 FRAME_SLOTS x max_frame_bytes
+    masks (uint8): 채널별 max_mask_bytes
+"""
+
+import os
+import sys
+import time
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+NUM_KEYPOINTS = 17
+FRAME_SLOTS = 3
+
+# 전역 상태: ready, stop, heartbeat, batches, frames, avg_batch_ms, dropped
+# (종료 신호도 공유 배열로 전달: multiprocessing.Event는 워커가 락을 쥔 채 죽으면 부모의 set()이 멈춤)
+GLOBAL_FIELDS = 7
+G_READY, G_STOP, G_HEARTBEAT, G_BATCHES, G_FRAMES, G_AVG_MS, G_DROPPED = range(GLOBAL_FIELDS)
+
+# 슬롯 헤더: seq (-1 = 쓰는 중), h, w, original_w, original_h, captured_at, 사람 박스 x1, y1, x2, y2 (NaN = 프레임 전체)
+SLOT_FIELDS = 10
+# 포즈 결과: seq (홀수 = 쓰는 중), captured_at, pose
+POSE_FIELDS = 2 + NUM_KEYPOINTS * 3
+# 마스크 헤더: seq (홀수 = 쓰는 중), captured_at, h, w
+MASK_FIELDS = 4
+
+_SLOTS_OFFSET = 2
+_POSE_OFFSET = _SLOTS_OFFSET + FRAME_SLOTS * SLOT_FIELDS
+_MASK_OFFSET = _POSE_OFFSET + POSE_FIELDS
+CHANNEL_FIELDS = _MASK_OFFSET + MASK_FIELDS
+
+
+class SharedLayout:
+    """공유 메모리 블록 → 채널별 numpy 뷰 (부모/워커 프로세스 공통)"""
+
+    def __init__(self, spec, create=False):
+        """
+        Args:
+            spec: num_channels, max_frame_bytes, max_mask_bytes, 블록 이름(names)을 담은 dict
+            create: True면 블록 생성 (부모), False면 이름으로 연결 (워커)
+        """
+        self.num_channels = spec['num_channels']
+        self.max_frame_bytes = spec['max_frame_bytes']
+        self.max_mask_bytes = spec['max_mask_bytes']
+
+        sizes = {
+            'ctrl': (GLOBAL_FIELDS + self.num_channels * CHANNEL_FIELDS) * 8,
+            'frames': self.num_channels * FRAME_SLOTS * self.max_frame_bytes,
+            'masks': self.num_channels * self.max_mask_bytes,
+        }
+        self.blocks = {}
+        for key, size in sizes.items():
+            if create:
+                self.blocks[key] = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                self.blocks[key] = shared_memory.SharedMemory(name=spec['names'][key])
+
+        ctrl = np.ndarray((sizes['ctrl'] // 8,), dtype=np.float64, buffer=self.blocks['ctrl'].buf)
+        if create:
+            ctrl[:] = 0
+        self.ctrl = ctrl
+        self.globals = ctrl[:GLOBAL_FIELDS]
+        self.channels = ctrl[GLOBAL_FIELDS:].reshape(self.num_channels, CHANNEL_FIELDS)
+        self.frames = np.ndarray(
+            (self.num_channels, FRAME_SLOTS, self.max_frame_bytes), dtype=np.uint8, buffer=self.blocks['frames'].buf
+        )
+        self.masks = np.ndarray(
+            (self.num_channels, self.max_mask_bytes), dtype=np.uint8, buffer=self.blocks['masks'].buf
+        )
+
+    @property
+    def names(self):
+        return {key: block.name for key, block in self.blocks.items()}
+
+    def slot_header(self, channel, slot):
+        start = _SLOTS_OFFSET + slot * SLOT_FIELDS
+        return self.channels[channel, start:start + SLOT_FIELDS]
+
+    def slot_frame(self, channel, slot, h, w):
+        return self.frames[channel, slot, :h * w * 3].reshape(h, w, 3)
+
+    def pose(self, channel):
+        return self.channels[channel, _POSE_OFFSET:_POSE_OFFSET + POSE_FIELDS]
+
+    def mask_header(self, channel):
+        return self.channels[channel, _MASK_OFFSET:_MASK_OFFSET + MASK_FIELDS]
+
+    def close(self, unlink=False):
+        """뷰 해제 후 블록 닫기 (unlink=True면 삭제, 생성한 쪽에서만)"""
+        self.ctrl = self.globals = self.channels = self.frames = self.masks = None
+        for block in self.blocks.values():
+            try:
+                block.close()
+                if unlink:
+                    block.unlink()
+            except (FileNotFoundError, BufferError):
+                pass
+
+
+def _load_worker_model(config):
+    """워커 프로세스에서 포즈 모델 로드 → 배치 추론 함수"""
+    if config.get('model_factory') is not None:
+        # 사용자 정의 추론 (피클 가능한 최상위 함수, config → infer_batch(frames, bboxes)), 테스트용 모의 모델 등
+        return config['model_factory'](config)
+
+    if config['backend'] == 'onnx':
+        from rtmpose_onnx import load_rtmpose_onnx
+        model = load_rtmpose_onnx(config.get('onnx_model'), num_threads=config.get('onnx_num_threads'))
+        return model.inference_batch
+
+    from virtual_fitting import load_rtmpose_model
+    from rtmpose_lite import inference_batch
+    model = load_rtmpose_model(config.get('device', 'cuda:0'))
+    return lambda frames, bboxes: inference_batch(model, frames, bboxes)
+
+
+def _worker_main(spec, config, frame_ready):
+    """
+    워커 프로세스 진입점
+    - 채널별 최신 프레임만 모아 한 번에 배치 추론 (세션 간 배치)
+    - 추론 중 슬롯이 덮어써졌으면 결과 버림
+    - frame_ready: 제출마다 release되는 세마포어 (깨어나면 쌓인 카운트는 비움)
+    """
+    layout = SharedLayout(spec)
+    infer_batch = _load_worker_model(config)
+
+    segment = None
+    if config.get('segmentation'):
+        from cloth_processor import segment_body_lowres
+        segment = segment_body_lowres
+    segmentation_width = config.get('segmentation_width', 256)
+    segmentation_interval = config.get('segmentation_interval', 0.1)
+
+    last_seq = np.zeros(layout.num_channels)
+    last_segmentation = np.zeros(layout.num_channels)
+    stats = layout.globals
+    stats[G_READY] = 1
+    print(f"[PoseWorker] 워커 프로세스 준비 완료 (pid {os.getpid()}, 채널 {layout.num_channels}개)")
+
+    while not stats[G_STOP]:
+        if os.getppid() != spec['parent_pid']:
+            break  # 부모 프로세스가 비정상 종료됨
+        stats[G_HEARTBEAT] = time.time()
+        if not frame_ready.acquire(timeout=0.1):
+            continue
+        while frame_ready.acquire(block=False):
+            pass
+
+        try:
+            # 채널별 새 프레임 수집 (공유 메모리 뷰 그대로, 복사 없음)
+            batch = []
+            for channel in range(layout.num_channels):
+                seq, slot = layout.channels[channel, 0], int(layout.channels[channel, 1])
+                if seq <= last_seq[channel]:
+                    continue
+                header = layout.slot_header(channel, slot)
+                if header[0] != seq:
+                    continue  # 쓰는 중 (다음 알림에서 처리)
+                h, w = int(header[1]), int(header[2])
+                bbox = None if np.isnan(header[6]) else tuple(header[6:10])
+                batch.append((channel, slot, seq, layout.slot_frame(channel, slot, h, w), header[3:6].copy(), bbox))
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            poses = infer_batch([item[3] for item in batch], [item[5] for item in batch])
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            for (channel, slot, seq, frame, (original_w, original_h, captured_at), _), pose in zip(batch, poses):
+                last_seq[channel] = seq
+                if layout.slot_header(channel, slot)[0] != seq:
+                    stats[G_DROPPED] += 1  # 추론 중 링이 한 바퀴 돌아 덮어씀
+                    continue
+
+                if segment is not None and captured_at - last_segmentation[channel] >= segmentation_interval:
+                    last_segmentation[channel] = captured_at
+                    _write_segmentation(layout, channel, segment, frame, segmentation_width, captured_at)
+
+                if pose is None:
+                    continue
+                h, w = frame.shape[:2]
+                pose = np.asarray(pose, dtype=np.float64)
+                pose[:, 0] *= original_w / w
+                pose[:, 1] *= original_h / h
+
+                result = layout.pose(channel)
+                result[0] += 1  # 홀수: 쓰는 중
+                result[1] = captured_at
+                result[2:] = pose.ravel()
+                result[0] += 1
+
+            stats[G_BATCHES] += 1
+            stats[G_FRAMES] += len(batch)
+            ema = 0.1 if stats[G_BATCHES] > 1 else 1.0
+            stats[G_AVG_MS] = stats[G_AVG_MS] * (1 - ema) + elapsed_ms * ema
+        except Exception as e:
+            print(f"[PoseWorker] 추론 에러: {e}")
+
+    batch = None
+    layout.close()
+
+
+def _write_segmentation(layout, channel, segment, frame, segmentation_width, captured_at):
+    """저해상도 세그멘테이션 → 채널 마스크 영역 (seq 홀수 동안 쓰는 중)"""
+    h, w = frame.shape[:2]
+    seg_w = min(segmentation_width, w)
+    seg_h = max(1, int(round(h * seg_w / w)))
+    if seg_w * seg_h > layout.max_mask_bytes:
+        return
+    mask = segment(cv2.resize(frame, (seg_w, seg_h), interpolation=cv2.INTER_AREA))
+    if mask is None:
+        return
+    header = layout.mask_header(channel)
+    header[0] += 1
+    layout.masks[channel, :seg_w * seg_h] = mask.ravel()
+    header[1:] = (captured_at, seg_h, seg_w)
+    header[0] += 1
+
+
+class PoseWorkerProcess:
+    """
+    포즈 추론 워커 프로세스 관리 (공유 메모리 소유, 자동 재시작)
+    세션 매니저가 하나를 만들고 세션마다 PoseChannel을 할당
+    """
+
+    def __init__(self, config, num_channels=1, max_frame_shape=(720, 1280), max_mask_shape=(512, 256),
+                 restart_backoff=1.0, max_backoff=30.0, hang_timeout=10.0):
+        """
+        Args:
+            config: 워커 모델 설정 dict
+                backend ('torch'/'onnx'), device, onnx_model, onnx_num_threads,
+                segmentation (워커에서 세그멘테이션도 실행), segmentation_width, segmentation_interval,
+                model_factory (있으면 모델 대신 model_factory(config)가 반환한 배치 추론 함수 사용)
+            num_channels: 최대 동시 채널(세션) 수
+            max_frame_shape: 슬롯 최대 프레임 크기 (h, w), 더 크면 제출 시 축소
+            max_mask_shape: 최대 세그멘테이션 마스크 크기 (h, w)
+            restart_backoff: 첫 재시작 대기 (초, 연속 실패 시 2배씩 증가)
+            max_backoff: 최대 재시작 대기 (초)
+            hang_timeout: 준비 완료 후 heartbeat가 이 시간 이상 멈추면 강제 재시작 (초)
+        """
+        self.config = dict(config)
+        self.restart_backoff = restart_backoff
+        self.max_backoff = max_backoff
+        self.hang_timeout = hang_timeout
+
+        self.layout = SharedLayout({
+            'num_channels': num_channels,
+            'max_frame_bytes': max_frame_shape[0] * max_frame_shape[1] * 3,
+            'max_mask_bytes': max_mask_shape[0] * max_mask_shape[1],
+        }, create=True)
+        self.spec = {
+            'num_channels': num_channels,
+            'max_frame_bytes': self.layout.max_frame_bytes,
+            'max_mask_bytes': self.layout.max_mask_bytes,
+            'names': self.layout.names,
+            'parent_pid': os.getpid(),
+        }
+
+        self.context = mp.get_context('spawn')  # CUDA/ONNX Runtime 스레드 상태를 물려받지 않도록
+        self.frame_ready = self.context.Semaphore(0)
+        self.process = None
+        self.lock = threading.Lock()
+        self.free_channels = list(range(num_channels))
+        self.restarts = 0
+        self.failures = 0          # 연속 실패 횟수 (백오프 계산)
+        self.spawned_at = 0.0
+        self.restart_at = None     # 재시작 예정 시각 (None = 정상)
+        self.last_check = 0.0
+        self.stopped = False
+
+    def start(self):
+        """워커 프로세스 시작"""
+        with self.lock:
+            self._spawn()
+
+    def _spawn(self):
+        self.layout.globals[G_READY] = 0
+        self.layout.globals[G_STOP] = 0
+        self.spawned_at = time.time()
+        self.process = self.context.Process(
+            target=_worker_main,
+            args=(self.spec, self.config, self.frame_ready),
+            name='pose-worker',
+            daemon=True
+        )
+        self.process.start()
+        print(f"[PoseWorker] 워커 프로세스 시작 (pid {self.process.pid}, {self.config.get('backend', 'torch')})")
+
+    def ensure_alive(self, interval=0.5):
+        """
+        워커 상태 확인 후 죽었거나 멈췄으면 재시작 (interval초에 한 번만 검사)
+
+        Returns:
+            bool: 워커가 추론 가능한 상태인지
+        """
+        now = time.time()
+        if now - self.last_check < interval:
+            return self.is_ready()
+        with self.lock:
+            self.last_check = now
+            if self.stopped or self.process is None:
+                return False
+
+            if self.restart_at is None:
+                hung = self.is_ready() and now - self.layout.globals[G_HEARTBEAT] > self.hang_timeout
+                if self.process.is_alive() and not hung:
+                    return self.is_ready()
+
+                if hung:
+                    print(f"[PoseWorker] 워커 응답 없음 ({self.hang_timeout:.0f}초), 강제 종료")
+                    self.process.terminate()
+                self.process.join(timeout=1)
+
+                # 오래 돌다 죽었으면 백오프 초기화, 시작 직후 반복해서 죽으면 대기 시간 2배씩 증가
+                if now - self.spawned_at > self.max_backoff:
+                    self.failures = 0
+                backoff = min(self.restart_backoff * (2 ** self.failures), self.max_backoff)
+                self.failures += 1
+                self.restart_at = now + backoff
+                print(f"[PoseWorker] 워커 종료 감지 (exitcode {self.process.exitcode}), {backoff:.1f}초 후 재시작")
+
+            if now < self.restart_at:
+                return False
+            self.restart_at = None
+            self.restarts += 1
+            self._spawn()
+            return False
+
+    def is_ready(self):
+        """모델 로드가 끝나 추론 중인지"""
+        return self.layout.globals is not None and self.layout.globals[G_READY] == 1
+
+    def open_channel(self):
+        """빈 채널 할당 (없으면 None)"""
+        with self.lock:
+            if not self.free_channels:
+                return None
+            channel = self.free_channels.pop(0)
+        return PoseChannel(self, channel)
+
+    def release_channel(self, channel):
+        """채널 반납"""
+        with self.lock:
+            if channel not in self.free_channels:
+                self.free_channels.append(channel)
+
+    def stop(self):
+        """워커 종료 + 공유 메모리 해제"""
+        with self.lock:
+            if self.stopped:
+                return
+            self.stopped = True
+            self.layout.globals[G_STOP] = 1
+            self.frame_ready.release()
+            if self.process is not None:
+                self.process.join(timeout=3)
+                if self.process.is_alive():
+                    self.process.terminate()
+                    self.process.join(timeout=1)
+            self.layout.close(unlink=True)
+        print("[PoseWorker] 워커 프로세스 종료")
+
+    def get_stats(self):
+        """워커 상태 / 처리량"""
+        if self.stopped:
+            return {"alive": False, "restarts": self.restarts}
+        g = self.layout.globals
+        return {
+            "alive": self.process is not None and self.process.is_alive(),
+            "ready": bool(g[G_READY]),
+            "pid": self.process.pid if self.process is not None else None,
+            "restarts": self.restarts,
+            "batches": int(g[G_BATCHES]),
+            "frames": int(g[G_FRAMES]),
+            "avg_batch_ms": round(float(g[G_AVG_MS]), 2),
+            "dropped": int(g[G_DROPPED]),
+            "channels_in_use": self.layout.num_channels - len(self.free_channels)
+        }
+
+
+class PoseChannel:
+    """세션 하나의 프레임 링 / 결과 영역 핸들 (렌더링 스레드 전용)"""
+
+    def __init__(self, worker, channel):
+        self.worker = worker
+        self.channel = channel
+        self.layout = worker.layout
+        # 재사용된 채널이면 이전 세션의 시퀀스에 이어서 사용 (워커는 더 큰 seq만 처리)
+        self.seq = int(self.layout.channels[channel, 0])
+        self.reset()
+
+    def submit(self, frame, original_w, original_h, captured_at, bbox=None):
+        """
+        프레임을 링의 다음 슬롯에 복사하고 워커 깨우기
+
+        Args:
+            frame: 추론 해상도 BGR 프레임
+            original_w, original_h: 원본 해상도 (결과 좌표 기준)
+            captured_at: 캡처 시각 (결과 타임스탬프)
+            bbox: 사람 박스 (x1, y1, x2, y2, frame 좌표), None이면 프레임 전체
+
+        Returns:
+            bool: 제출 여부 (워커 재시작/모델 로드 중이면 False)
+        """
+        if not self.worker.ensure_alive():
+            return False
+
+        channels = self.layout.channels
+        seq = self.seq + 1
+        slot = seq % FRAME_SLOTS
+        header = self.layout.slot_header(self.channel, slot)
+        header[0] = -1  # 쓰는 중
+
+        h, w = frame.shape[:2]
+        frame_w = w
+        capacity = self.layout.max_frame_bytes
+        if h * w * 3 > capacity:
+            # 슬롯보다 크면 비율 유지 축소 (좌표는 워커가 original 기준으로 환산)
+            scale = (capacity / (h * w * 3)) ** 0.5
+            h, w = max(1, int(h * scale)), max(1, int(w * scale))
+            cv2.resize(frame, (w, h), dst=self.layout.slot_frame(self.channel, slot, h, w),
+                       interpolation=cv2.INTER_AREA)
+        else:
+            np.copyto(self.layout.slot_frame(self.channel, slot, h, w), frame)
+
+        header[1:6] = (h, w, original_w, original_h, captured_at)
+        if bbox is None:
+            header[6:10] = np.nan
+        else:
+            header[6:10] = np.asarray(bbox, dtype=np.float64) * (w / frame_w)  # 슬롯 축소 비율 반영
+        header[0] = seq
+        channels[self.channel, 1] = slot
+        channels[self.channel, 0] = seq
+        self.seq = seq
+        self.worker.frame_ready.release()
+        return True
+
+    def poll(self):
+        """
+        새 포즈 결과 (없으면 None)
+
+        Returns:
+            ((17, 3) float32 포즈, captured_at) 또는 None
+        """
+        result = self.layout.pose(self.channel)
+        seq = result[0]
+        if seq == self.last_pose_seq or seq % 2 == 1:
+            return None
+        captured_at = float(result[1])
+        pose = result[2:].reshape(NUM_KEYPOINTS, 3).astype(np.float32)
+        if result[0] != seq:
+            return None  # 읽는 중 갱신됨 (다음 프레임에서 다시 읽음)
+        self.last_pose_seq = seq
+        return pose, captured_at
+
+    def get_segmentation(self):
+        """
+        최신 세그멘테이션 마스크 (새 결과일 때만 공유 메모리에서 복사)
+
+        Returns:
+            (mask, captured_at) 또는 None
+        """
+        header = self.layout.mask_header(self.channel)
+        seq = header[0]
+        if seq != self.last_mask_seq and seq % 2 == 0:
+            captured_at, h, w = float(header[1]), int(header[2]), int(header[3])
+            mask = self.layout.masks[self.channel, :h * w].reshape(h, w).copy()
+            if header[0] == seq:
+                self.last_mask_seq = seq
+                self.mask = (mask, captured_at)
+        return self.mask
+
+    def reset(self):
+        """이전 스트림 결과 무시 (스트리밍 재시작 시)"""
+        self.last_pose_seq = self.layout.pose(self.channel)[0]
+        self.last_mask_seq = self.layout.mask_header(self.channel)[0]
+        self.mask = None
+
+    def close(self):
+        """채널 반납"""
+        self.worker.release_channel(self.channel)
@@ -0,0 +1,288 @@
+"""
+RTMPose ONNX 정적 int8 양자화 + 정확도/속도 리포트
+- 녹화 프레임 디렉토리로 캘리브레이션 (실제 추론과 같은 어파인 크롭 입력)
+- QDQ 포맷, 가중치 per-channel int8, 활성값 uint8
+- SimCC 출력 레이어(cls_x, cls_y)는 기본적으로 FP32 유지 (좌표 정밀도 보존)
+- 리포트: FP32 대비 PCK / 평균 픽셀 오차 (전체, 어깨, 골반), 스레드 수별 FPS
+
+사용법:
+    python quantize_rtmpose_onnx.py <캘리브레이션 프레임 디렉토리> [--eval-dir 평가 프레임 디렉토리]
+
+엔진에서 사용:
+    FIT_POSE_BACKEND=onnx FIT_ONNX_MODEL=int8 (또는 RTMPoseVirtualFitting(pose_backend='onnx', onnx_model='int8'))
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import tempfile
+from datetime import datetime
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+import onnx
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quantize_static
+)
+from onnxruntime.quantization.shape_inference import quant_pre_process
+
+from rtmpose_lite import crop_frames
+from rtmpose_onnx import (
+    RTMPoseONNX,
+    DEFAULT_ONNX_PATH,
+    DEFAULT_INT8_ONNX_PATH,
+    get_thread_candidates
+)
+
+SCORE_THRESHOLD = 0.3  # 비교 대상 키포인트 최소 신뢰도 (FP32 기준)
+PCK_THRESHOLD = 0.05   # 사람 박스 대각선 대비 허용 오차
+JOINT_GROUPS = {
+    "all": list(range(17)),
+    "shoulders": [5, 6],
+    "hips": [11, 12],
+}
+
+
+def list_frames(frame_dir):
+    """디렉토리 내 프레임 경로 (정렬)"""
+    paths = []
+    for ext in ('*.jpg', '*.jpeg', '*.png'):
+        paths.extend(glob.glob(os.path.join(frame_dir, ext)))
+    return sorted(paths)
+
+
+def load_frames(paths):
+    """프레임 로드 (읽기 실패 파일 제외)"""
+    frames = []
+    for path in paths:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+    return frames
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """녹화 프레임 → 모델 입력 크롭 (uint8 NHWC) 캘리브레이션 데이터"""
+
+    def __init__(self, paths, input_name='input'):
+        self.paths = paths
+        self.input_name = input_name
+        self.index = 0
+
+    def get_next(self):
+        while self.index < len(self.paths):
+            frame = cv2.imread(self.paths[self.index], cv2.IMREAD_COLOR)
+            self.index += 1
+            if frame is not None:
+                batch, _, _ = crop_frames([frame])
+                return {self.input_name: batch}
+        return None
+
+    def rewind(self):
+        self.index = 0
+
+
+def find_output_nodes(model_path):
+    """
+    SimCC 출력을 만드는 노드 이름 (출력 직전 MatMul/Gemm과 bias Add)
+
+    Returns:
+        양자화 제외 노드 이름 리스트
+    """
+    model = onnx.load(model_path)
+    producers = {output: node for node in model.graph.node for output in node.output}
+    excluded = []
+    for graph_output in model.graph.output:
+        node = producers.get(graph_output.name)
+        # 출력 → (Add) → MatMul/Gemm 까지 거슬러 올라감
+        while node is not None:
+            if node.name:
+                excluded.append(node.name)
+            if node.op_type in ('MatMul', 'Gemm'):
+                break
+            node = next((producers[i] for i in node.input if i in producers), None)
+    return excluded
+
+
+def quantize(fp32_path, int8_path, calib_paths, exclude_head=True, method='minmax'):
+    """
+    정적 int8 양자화
+
+    Args:
+        fp32_path: export_rtmpose_onnx.py로 내보낸 FP32 모델
+        int8_path: 출력 경로
+        calib_paths: 캘리브레이션 프레임 경로 리스트
+        exclude_head: SimCC 출력 레이어 FP32 유지
+        method: 'minmax' 또는 'percentile'
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # 셰이프 추론 + 그래프 최적화 (양자화 전처리 권장 단계)
+        preprocessed = os.path.join(tmp_dir, 'preprocessed.onnx')
+        quant_pre_process(fp32_path, preprocessed)
+
+        excluded = find_output_nodes(preprocessed) if exclude_head else []
+        if excluded:
+            print(f"[Quantize] FP32 유지 노드: {excluded}")
+
+        calibrate_method = CalibrationMethod.Percentile if method == 'percentile' else CalibrationMethod.MinMax
+        print(f"[Quantize] 캘리브레이션: 프레임 {len(calib_paths)}장, {method}")
+        start = time.time()
+        quantize_static(
+            preprocessed,
+            int8_path,
+            FrameCalibrationReader(calib_paths),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=calibrate_method,
+            nodes_to_exclude=excluded
+        )
+    print(f"[Quantize] 저장 완료: {int8_path} ({os.path.getsize(int8_path) / 1024 / 1024:.1f}MB, "
+          f"{time.time() - start:.1f}초)")
+
+
+def compare_poses(refs, preds, joints, score_threshold=SCORE_THRESHOLD, pck_threshold=PCK_THRESHOLD):
+    """
+    FP32 대비 정확도 (지정 관절만)
+
+    Returns:
+        dict: mean_error_px, max_error_px, pck, keypoints
+    """
+    errors = []
+    hits = []
+    for ref, pred in zip(refs, preds):
+        valid_all = ref[:, 2] > score_threshold
+        if not valid_all.any():
+            continue
+        visible = ref[valid_all, :2]
+        diag = max(np.linalg.norm(visible.max(axis=0) - visible.min(axis=0)), 1.0)
+
+        idx = [j for j in joints if valid_all[j]]
+        if not idx:
+            continue
+        dist = np.linalg.norm(ref[idx, :2] - pred[idx, :2], axis=1)
+        errors.extend(dist.tolist())
+        hits.extend((dist <= pck_threshold * diag).tolist())
+
+    if not errors:
+        return {"mean_error_px": 0.0, "max_error_px": 0.0, "pck": 1.0, "keypoints": 0}
+    return {
+        "mean_error_px": round(float(np.mean(errors)), 3),
+        "max_error_px": round(float(np.max(errors)), 3),
+        "pck": round(float(np.mean(hits)), 4),
+        "keypoints": len(errors)
+    }
+
+
+def measure_fps(model, frame, iterations=50, warmup=5):
+    """프레임당 추론 FPS (크롭 + run + 디코딩 포함)"""
+    for _ in range(warmup):
+        model.inference_pose(frame)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        model.inference_pose(frame)
+    return iterations / (time.perf_counter() - start)
+
+
+def build_report(fp32_path, int8_path, eval_frames):
+    """FP32 vs int8 정확도/속도 리포트"""
+    print("\n" + "="*70)
+    print("정확도 (FP32 대비)")
+    print("="*70)
+
+    fp32_model = RTMPoseONNX(fp32_path, num_threads=1)
+    int8_model = RTMPoseONNX(int8_path, num_threads=1)
+    refs = [fp32_model.inference_pose(frame) for frame in eval_frames]
+    preds = [int8_model.inference_pose(frame) for frame in eval_frames]
+
+    accuracy = {}
+    for group, joints in JOINT_GROUPS.items():
+        metrics = compare_poses(refs, preds, joints)
+        accuracy[group] = metrics
+        print(f"  {group:10s}: 평균 오차 {metrics['mean_error_px']:.3f}px, 최대 {metrics['max_error_px']:.3f}px, "
+              f"PCK@{PCK_THRESHOLD} {metrics['pck'] * 100:.1f}% ({metrics['keypoints']}개)")
+
+    print("\n" + "="*70)
+    print("스레드 수별 FPS")
+    print("="*70)
+
+    frame = eval_frames[0]
+    throughput = {}
+    for threads in get_thread_candidates():
+        fp32_fps = measure_fps(RTMPoseONNX(fp32_path, num_threads=threads), frame)
+        int8_fps = measure_fps(RTMPoseONNX(int8_path, num_threads=threads), frame)
+        throughput[threads] = {
+            "fp32_fps": round(fp32_fps, 1),
+            "int8_fps": round(int8_fps, 1),
+            "speedup": round(int8_fps / fp32_fps, 2)
+        }
+        print(f"  {threads:2d} 스레드: FP32 {fp32_fps:7.1f} FPS | int8 {int8_fps:7.1f} FPS | "
+              f"{int8_fps / fp32_fps:.2f}x")
+
+    return {
+        "fp32_model": fp32_path,
+        "int8_model": int8_path,
+        "eval_frames": len(eval_frames),
+        "accuracy": accuracy,
+        "throughput": throughput
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RTMPose ONNX 정적 int8 양자화')
+    parser.add_argument('calib_dir', help='캘리브레이션용 녹화 프레임 디렉토리')
+    parser.add_argument('--eval-dir', default=None, help='평가 프레임 디렉토리 (없으면 캘리브레이션 프레임 5장 중 1장을 평가용으로 분리)')
+    parser.add_argument('--fp32', default=DEFAULT_ONNX_PATH, help='FP32 ONNX 모델 경로')
+    parser.add_argument('--output', default=DEFAULT_INT8_ONNX_PATH, help='int8 ONNX 출력 경로')
+    parser.add_argument('--max-calib', type=int, default=300, help='최대 캘리브레이션 프레임 수')
+    parser.add_argument('--method', choices=['minmax', 'percentile'], default='minmax', help='캘리브레이션 방식')
+    parser.add_argument('--quantize-head', action='store_true', help='SimCC 출력 레이어도 int8로 양자화')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.fp32):
+        raise FileNotFoundError(f"FP32 ONNX model not found: {args.fp32} (export_rtmpose_onnx.py 로 먼저 내보내기)")
+
+    paths = list_frames(args.calib_dir)
+    if not paths:
+        raise FileNotFoundError(f"No frames in calibration dir: {args.calib_dir}")
+
+    if args.eval_dir:
+        calib_paths = paths
+        eval_paths = list_frames(args.eval_dir)
+    else:
+        calib_paths = [p for i, p in enumerate(paths) if i % 5 != 4]
+        eval_paths = [p for i, p in enumerate(paths) if i % 5 == 4] or paths[:1]
+
+    # 프레임 수가 많으면 균등 간격으로 샘플링
+    if len(calib_paths) > args.max_calib:
+        step = len(calib_paths) / args.max_calib
+        calib_paths = [calib_paths[int(i * step)] for i in range(args.max_calib)]
+
+    quantize(args.fp32, args.output, calib_paths, exclude_head=not args.quantize_head, method=args.method)
+
+    report = build_report(args.fp32, args.output, load_frames(eval_paths))
+    report.update({"calib_frames": len(calib_paths), "method": args.method,
+                   "quantize_head": args.quantize_head})
+
+    output_dir = os.path.join(os.path.dirname(current_dir), 'benchmark_results')
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_int8_report.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\n[Saved] {report_path}")
+
+
+if __name__ == "__main__":
+    main()
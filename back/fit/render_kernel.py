@@ -0,0 +1,226 @@
+"""
+융합 렌더링 커널 (단일 패스)
+- 얼굴/목 마스크 억제 + 세그멘테이션 교집합 + 알파 블렌딩을 옷 ROI 한 번 순회로 처리
+- numba가 있으면 행 단위 병렬(prange) JIT, 없으면 같은 연산의 NumPy 경로
+- 세션별 RenderBufferPool로 마스크 업샘플 버퍼를 재사용 (프레임마다 full-size 임시 배열 할당 없음)
+"""
+
+import cv2
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# 사용하지 않는 마스크 자리에 넘기는 더미 배열 (numba 타입 고정용)
+_EMPTY_MASK = np.zeros((1, 1), dtype=np.uint8)
+
+
+class RenderBufferPool:
+    """
+    세션별 렌더링 버퍼 풀
+    - 이름별로 1차원 버퍼를 보관하고 요청 크기의 뷰를 반환 (필요할 때만 확장)
+    - reserve()로 스트림 해상도 기준 최대 크기를 미리 할당
+    """
+
+    def __init__(self):
+        self.buffers = {}
+        self.frame_shape = None
+        self.allocations = 0
+
+    def reserve(self, frame_shape):
+        """스트림 해상도에 맞춰 버퍼 미리 할당 (해상도가 바뀔 때만)"""
+        frame_shape = tuple(frame_shape[:2])
+        if frame_shape == self.frame_shape:
+            return
+        self.frame_shape = frame_shape
+        self.get('body_mask', frame_shape)
+        if not NUMBA_AVAILABLE:
+            # NumPy 경로 중간 버퍼 (numba 커널은 픽셀 단위 처리라 불필요)
+            self.get('alpha', frame_shape, np.uint16)
+            self.get('inv_alpha', frame_shape, np.uint16)
+            self.get('blend', frame_shape + (3,), np.uint16)
+            self.get('blend_tmp', frame_shape + (3,), np.uint16)
+
+    def get(self, name, shape, dtype=np.uint8):
+        """
+        버퍼 뷰 반환 (C-contiguous, 내용은 초기화되지 않음)
+
+        Args:
+            name: 버퍼 이름
+            shape: 필요한 배열 크기
+            dtype: 자료형
+        """
+        size = int(np.prod(shape))
+        buf = self.buffers.get(name)
+        if buf is None or buf.size < size or buf.dtype != dtype:
+            buf = np.empty(size, dtype=dtype)
+            self.buffers[name] = buf
+            self.allocations += 1
+        return buf[:size].reshape(shape)
+
+    def nbytes(self):
+        """풀 전체 메모리 사용량 (바이트)"""
+        return sum(buf.nbytes for buf in self.buffers.values())
+
+
+def _render_roi_numpy(frame_roi, sprite_roi, body_roi, use_body, row_top, row_bottom,
+                      face_mask, face_dx, face_dy, use_face, alpha_scale, pool):
+    """
+    _render_roi_kernel과 같은 연산의 NumPy 구현 (numba 미설치 시)
+    - uint16 제자리 연산 + 풀 버퍼만 사용 (최대값 255*255 + 반올림 항이 uint16 범위 이내)
+    """
+    h, w = frame_roi.shape[:2]
+    a = pool.get('alpha', (h, w), np.uint16)
+    np.copyto(a, sprite_roi[:, :, 3])
+
+    if use_body:
+        a *= body_roi
+        a += 127
+        a //= 255
+        a[:max(0, row_top)] = 0
+        a[max(0, row_bottom):] = 0
+
+    if use_face:
+        fh, fw = face_mask.shape
+        ys, ye = max(0, -face_dy), min(h, fh - face_dy)
+        xs, xe = max(0, -face_dx), min(w, fw - face_dx)
+        if ye > ys and xe > xs:
+            f = face_mask[ys + face_dy:ye + face_dy, xs + face_dx:xe + face_dx]
+            inv_f = pool.get('face', f.shape, np.uint16)
+            np.subtract(255, f, out=inv_f)
+            region = a[ys:ye, xs:xe]
+            region *= inv_f
+            region += 127
+            region //= 255
+            region[f > 128] = 0
+
+    if alpha_scale < 256:
+        a *= alpha_scale
+        a >>= 8
+
+    inv = pool.get('inv_alpha', (h, w), np.uint16)
+    np.subtract(255, a, out=inv)
+    blended = pool.get('blend', (h, w, 3), np.uint16)
+    tmp = pool.get('blend_tmp', (h, w, 3), np.uint16)
+    np.multiply(sprite_roi[:, :, :3], a[:, :, np.newaxis], out=blended)
+    np.multiply(frame_roi, inv[:, :, np.newaxis], out=tmp)
+    blended += tmp
+    blended += 128
+    np.right_shift(blended, 8, out=tmp)
+    blended += tmp
+    blended >>= 8
+    np.copyto(frame_roi, blended, casting='unsafe')
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, cache=True, nogil=True)
+    def _render_roi_kernel(frame_roi, sprite_roi, body_roi, use_body, row_top, row_bottom,
+                           face_mask, face_dx, face_dy, use_face, alpha_scale):
+        """
+        ROI 픽셀당 한 번: 알파 = 옷 알파 x 신체 확률 x (1 - 얼굴 마스크), 이후 정수 블렌딩
+        (blend_rgba_roi_inplace와 같은 /255 반올림)
+        """
+        h, w = frame_roi.shape[0], frame_roi.shape[1]
+        fh, fw = face_mask.shape[0], face_mask.shape[1]
+        for y in prange(h):
+            if use_body and (y < row_top or y >= row_bottom):
+                continue
+            fy = y + face_dy
+            face_row = use_face and 0 <= fy < fh
+            for x in range(w):
+                a = int(sprite_roi[y, x, 3])
+                if a == 0:
+                    continue
+                if use_body:
+                    a = (a * int(body_roi[y, x]) + 127) // 255
+                if face_row:
+                    fx = x + face_dx
+                    if 0 <= fx < fw:
+                        f = int(face_mask[fy, fx])
+                        if f > 128:
+                            continue
+                        a = (a * (255 - f) + 127) // 255
+                if alpha_scale < 256:
+                    a = (a * alpha_scale) >> 8
+                if a == 0:
+                    continue
+                inv = 255 - a
+                for c in range(3):
+                    v = int(sprite_roi[y, x, c]) * a + int(frame_roi[y, x, c]) * inv + 128
+                    v += v >> 8
+                    frame_roi[y, x, c] = v >> 8
+
+
+def render_garment_fused(frame, sprite, offset, pool, segmentation_mask=None, torso_rows=None,
+                         face_mask=None, face_offset=None, alpha=1.0):
+    """
+    옷 스프라이트를 프레임에 제자리 합성 (마스크 정제 + 블렌딩 단일 패스)
+
+    Args:
+        frame: BGR 프레임 (uint8) - 직접 결과를 씀
+        sprite: 변형된 옷 스프라이트 (RGBA, 읽기 전용이어도 됨)
+        offset: 스프라이트의 프레임 내 좌상단 좌표 (x, y)
+        pool: RenderBufferPool
+        segmentation_mask: 저해상도 신체 확률 마스크 (segment_body_lowres 결과), None이면 생략
+        torso_rows: 상체 행 범위 (top_y, bottom_y) 프레임 좌표, None이면 제한 없음
+        face_mask: 얼굴/목 마스크 (create_face_neck_mask의 머리 ROI), None이면 생략
+        face_offset: face_mask의 프레임 내 좌상단 좌표
+        alpha: 추가 투명도 (0.0 ~ 1.0)
+
+    Returns:
+        frame
+    """
+    frame_h, frame_w = frame.shape[:2]
+    ox, oy = int(offset[0]), int(offset[1])
+
+    # 옷 알파가 있는 영역 ∩ 프레임
+    alpha_bbox = cv2.boundingRect(sprite[:, :, 3])
+    if alpha_bbox[2] == 0 or alpha_bbox[3] == 0:
+        return frame
+    bx, by, bw, bh = alpha_bbox
+    x1, y1 = max(0, ox + bx), max(0, oy + by)
+    x2, y2 = min(frame_w, ox + bx + bw), min(frame_h, oy + by + bh)
+    if x2 <= x1 or y2 <= y1:
+        return frame
+    roi_w, roi_h = x2 - x1, y2 - y1
+
+    frame_roi = frame[y1:y2, x1:x2]
+    sprite_roi = sprite[y1 - oy:y2 - oy, x1 - ox:x2 - ox]
+
+    # 신체 마스크: 저해상도 확률 마스크를 ROI만 풀 버퍼로 업샘플
+    use_body = segmentation_mask is not None
+    body_roi = _EMPTY_MASK
+    row_top, row_bottom = 0, roi_h
+    if use_body:
+        small_h, small_w = segmentation_mask.shape[:2]
+        sx, sy = small_w / frame_w, small_h / frame_h
+        M_inv = np.float32([
+            [sx, 0, sx * (x1 + 0.5) - 0.5],
+            [0, sy, sy * (y1 + 0.5) - 0.5]
+        ])
+        body_roi = pool.get('body_mask', (roi_h, roi_w))
+        cv2.warpAffine(
+            segmentation_mask, M_inv, (roi_w, roi_h), dst=body_roi,
+            flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP, borderMode=cv2.BORDER_REPLICATE
+        )
+        if torso_rows is not None:
+            row_top, row_bottom = torso_rows[0] - y1, torso_rows[1] - y1
+
+    use_face = face_mask is not None
+    face_dx = face_dy = 0
+    if use_face:
+        face_dx, face_dy = x1 - int(face_offset[0]), y1 - int(face_offset[1])
+    else:
+        face_mask = _EMPTY_MASK
+
+    alpha_scale = int(round(min(max(alpha, 0.0), 1.0) * 256))
+    if NUMBA_AVAILABLE:
+        _render_roi_kernel(frame_roi, sprite_roi, body_roi, use_body, row_top, row_bottom,
+                           face_mask, face_dx, face_dy, use_face, alpha_scale)
+    else:
+        _render_roi_numpy(frame_roi, sprite_roi, body_roi, use_body, row_top, row_bottom,
+                          face_mask, face_dx, face_dy, use_face, alpha_scale, pool)
+    return frame
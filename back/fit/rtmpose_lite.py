@@ -0,0 +1,254 @@
+"""
+RTMPose 경량 추론 유틸리티
+- mmpose 데이터 파이프라인(data sample 생성, transform, collate, PoseDataSample) 없이
+  NumPy/OpenCV로 탑다운 어파인 크롭 + 정규화를 수행하고 backbone/head를 직접 호출
+- 여러 프레임을 하나의 NCHW 텐서로 묶어 단일 forward로 배치 추론
+- SimCC 출력을 배치 단위로 디코딩하여 (17, 3) [x, y, score] float32 배열 반환
+"""
+
+import cv2
+import numpy as np
+
+# torch는 텐서 변환/추론 함수 안에서만 임포트
+# (ONNX Runtime 백엔드(rtmpose_onnx)는 크롭/디코딩만 사용하므로 torch 없이, 임포트 비용 없이 동작)
+
+# rtmpose-s_8xb256-420e_aic-coco-256x192 설정값 (models/ 의 config와 동일)
+INPUT_SIZE = (192, 256)          # (w, h)
+BBOX_PADDING = 1.25              # GetBBoxCenterScale 기본 패딩
+SIMCC_SPLIT_RATIO = 2.0
+MEAN_RGB = (123.675, 116.28, 103.53)
+STD_RGB = (58.395, 57.12, 57.375)
+NUM_KEYPOINTS = 17
+
+# COCO 좌우 반전 인덱스 (flip test용)
+COCO_FLIP_INDICES = [0, 2, 1, 4, 3, 6, 5, 8, 7, 10, 9, 12, 11, 14, 13, 16, 15]
+
+
+def get_input_center_scale(bbox, input_size=INPUT_SIZE, padding=BBOX_PADDING):
+    """
+    바운딩 박스 → 크롭 중심/스케일 (GetBBoxCenterScale + TopdownAffine 종횡비 보정과 동일)
+
+    Args:
+        bbox: (x1, y1, x2, y2)
+        input_size: 모델 입력 크기 (w, h)
+        padding: 박스 확장 비율
+
+    Returns:
+        (center, scale): 각각 shape (2,) float32
+    """
+    x1, y1, x2, y2 = bbox
+    center = np.array([(x1 + x2) * 0.5, (y1 + y2) * 0.5], dtype=np.float32)
+    w = (x2 - x1) * padding
+    h = (y2 - y1) * padding
+
+    aspect_ratio = input_size[0] / input_size[1]
+    if w > h * aspect_ratio:
+        h = w / aspect_ratio
+    else:
+        w = h * aspect_ratio
+    return center, np.array([w, h], dtype=np.float32)
+
+
+def get_warp_matrix(center, scale, input_size=INPUT_SIZE):
+    """
+    크롭 어파인 행렬 (회전 없음 → 균등 스케일 + 평행이동)
+
+    Returns:
+        2x3 float32 행렬 (원본 이미지 → 모델 입력)
+    """
+    s = input_size[0] / scale[0]
+    return np.array([
+        [s, 0.0, input_size[0] * 0.5 - s * center[0]],
+        [0.0, s, input_size[1] * 0.5 - s * center[1]]
+    ], dtype=np.float32)
+
+
+def crop_frames(frames, bboxes=None, input_size=INPUT_SIZE):
+    """
+    프레임들을 모델 입력 크기로 어파인 크롭 (uint8 NHWC, BGR)
+
+    Args:
+        frames: BGR 프레임 리스트
+        bboxes: 프레임별 (x1, y1, x2, y2) 리스트, None이면 프레임 전체를 사람 박스로 사용
+
+    Returns:
+        (batch, centers, scales): (N, h, w, 3) uint8, (N, 2), (N, 2)
+    """
+    n = len(frames)
+    batch = np.empty((n, input_size[1], input_size[0], 3), dtype=np.uint8)
+    centers = np.empty((n, 2), dtype=np.float32)
+    scales = np.empty((n, 2), dtype=np.float32)
+
+    for i, frame in enumerate(frames):
+        if bboxes is not None and bboxes[i] is not None:
+            bbox = bboxes[i]
+        else:
+            h, w = frame.shape[:2]
+            bbox = (0, 0, w, h)
+        center, scale = get_input_center_scale(bbox, input_size)
+        warp_mat = get_warp_matrix(center, scale, input_size)
+        cv2.warpAffine(frame, warp_mat, input_size, dst=batch[i], flags=cv2.INTER_LINEAR)
+        centers[i] = center
+        scales[i] = scale
+
+    return batch, centers, scales
+
+
+def to_input_tensor(batch, device, mean=MEAN_RGB, std=STD_RGB):
+    """
+    uint8 NHWC(BGR) 배치 → 정규화된 float NCHW(RGB) 텐서
+    (업로드는 uint8로 하고 변환/정규화는 디바이스에서 수행)
+    """
+    import torch
+
+    tensor = torch.from_numpy(batch).to(device, non_blocking=True)
+    tensor = tensor.permute(0, 3, 1, 2).flip(1).float()  # NHWC BGR → NCHW RGB
+    mean_t = torch.tensor(mean, device=tensor.device).view(1, 3, 1, 1)
+    std_t = torch.tensor(std, device=tensor.device).view(1, 3, 1, 1)
+    return (tensor - mean_t) / std_t
+
+
+def get_model_normalization(model):
+    """모델 data_preprocessor의 mean/std (없으면 config 기본값)"""
+    preprocessor = getattr(model, 'data_preprocessor', None)
+    mean = getattr(preprocessor, 'mean', None)
+    std = getattr(preprocessor, 'std', None)
+    if mean is None or std is None:
+        return MEAN_RGB, STD_RGB
+    return tuple(mean.flatten().tolist()), tuple(std.flatten().tolist())
+
+
+def forward_simcc(model, inputs, flip_test=False):
+    """
+    backbone/head 직접 호출하여 SimCC 로짓 반환
+
+    Args:
+        model: mmpose TopdownPoseEstimator
+        inputs: 정규화된 NCHW 텐서
+        flip_test: 좌우 반전 입력 결과와 평균 (모델 test_cfg의 flip_test와 동일)
+
+    Returns:
+        (simcc_x, simcc_y): numpy float32, (N, K, W*r), (N, K, H*r)
+    """
+    feats = model.extract_feat(inputs)
+    pred_x, pred_y = model.head.forward(feats)
+
+    if flip_test:
+        feats_flip = model.extract_feat(inputs.flip(-1))
+        pred_x_flip, pred_y_flip = model.head.forward(feats_flip)
+        pred_x_flip = pred_x_flip[:, COCO_FLIP_INDICES].flip(-1)
+        pred_y_flip = pred_y_flip[:, COCO_FLIP_INDICES]
+        pred_x = (pred_x + pred_x_flip) * 0.5
+        pred_y = (pred_y + pred_y_flip) * 0.5
+
+    return pred_x.float().cpu().numpy(), pred_y.float().cpu().numpy()
+
+
+def decode_simcc(simcc_x, simcc_y, centers, scales, input_size=INPUT_SIZE, split_ratio=SIMCC_SPLIT_RATIO):
+    """
+    배치 SimCC 디코딩 (argmax) + 원본 이미지 좌표로 역변환
+
+    Args:
+        simcc_x, simcc_y: (N, K, Wx), (N, K, Wy) 로짓
+        centers, scales: crop_frames가 반환한 크롭 중심/스케일
+
+    Returns:
+        (N, K, 3) float32 [x, y, score]
+    """
+    x_locs = np.argmax(simcc_x, axis=2)
+    y_locs = np.argmax(simcc_y, axis=2)
+    max_x = np.take_along_axis(simcc_x, x_locs[:, :, None], axis=2)[:, :, 0]
+    max_y = np.take_along_axis(simcc_y, y_locs[:, :, None], axis=2)[:, :, 0]
+    scores = np.minimum(max_x, max_y)
+
+    poses = np.empty((simcc_x.shape[0], simcc_x.shape[1], 3), dtype=np.float32)
+    poses[:, :, 0] = x_locs / split_ratio
+    poses[:, :, 1] = y_locs / split_ratio
+
+    # 유효하지 않은 위치는 -1 (mmpose get_simcc_maximum과 동일)
+    invalid = scores <= 0.0
+    poses[:, :, :2][invalid] = -1
+
+    # 모델 입력 좌표 → 원본 이미지 좌표
+    input_size_arr = np.array(input_size, dtype=np.float32)
+    poses[:, :, :2] = (
+        poses[:, :, :2] / input_size_arr * scales[:, None, :]
+        + centers[:, None, :] - 0.5 * scales[:, None, :]
+    )
+    poses[:, :, 2] = scores
+    return poses
+
+
+# 모델별 추론 메타데이터 캐시 (device, mean, std, flip_test) - 호출마다 조회하지 않도록
+_model_meta = {}
+
+
+def get_model_meta(model):
+    """모델의 device/정규화/flip test 설정 (최초 1회 조회 후 캐시)"""
+    meta = _model_meta.get(id(model))
+    if meta is None:
+        device = next(model.parameters()).device
+        mean, std = get_model_normalization(model)
+        test_cfg = getattr(model, 'test_cfg', None) or {}
+        flip_test = bool(test_cfg.get('flip_test', False))
+        meta = (device, mean, std, flip_test)
+        _model_meta[id(model)] = meta
+    return meta
+
+
+def inference_batch(model, frames, bboxes=None, flip_test=None):
+    """
+    여러 프레임을 하나의 텐서로 묶어 단일 forward로 추론
+
+    Args:
+        model: mmpose TopdownPoseEstimator (eval 모드)
+        frames: BGR 프레임 리스트 (크기가 달라도 됨)
+        bboxes: 프레임별 사람 박스 (x1, y1, x2, y2), None이면 프레임 전체
+        flip_test: None이면 모델 test_cfg 설정을 따름
+
+    Returns:
+        (N, 17, 3) float32 [x, y, score] (프레임 좌표)
+    """
+    import torch
+
+    device, mean, std, model_flip_test = get_model_meta(model)
+    if flip_test is None:
+        flip_test = model_flip_test
+
+    batch, centers, scales = crop_frames(frames, bboxes)
+    with torch.no_grad():
+        inputs = to_input_tensor(batch, device, mean, std)
+        simcc_x, simcc_y = forward_simcc(model, inputs, flip_test=flip_test)
+    return decode_simcc(simcc_x, simcc_y, centers, scales)
+
+
+def inference_pose(model, frame, bbox=None, flip_test=None):
+    """
+    단일 프레임 경량 추론 (inference_topdown 대체)
+
+    Args:
+        model: mmpose TopdownPoseEstimator (eval 모드)
+        frame: BGR 프레임
+        bbox: 사람 박스 (x1, y1, x2, y2), None이면 프레임 전체
+        flip_test: None이면 모델 test_cfg 설정을 따름
+
+    Returns:
+        (17, 3) float32 [x, y, score] (프레임 좌표)
+    """
+    bboxes = None if bbox is None else [bbox]
+    return inference_batch(model, [frame], bboxes, flip_test)[0]
+
+
+def pose_array_from_results(results):
+    """
+    inference_topdown 결과(PoseDataSample 리스트)에서 첫 번째 사람의 (17, 3) 배열 추출
+
+    Returns:
+        (17, 3) float32 [x, y, score], 결과가 없으면 None
+    """
+    if not results:
+        return None
+    pred_instances = results[0].pred_instances
+    keypoints = np.asarray(pred_instances.keypoints[0], dtype=np.float32)
+    scores = np.asarray(pred_instances.keypoint_scores[0], dtype=np.float32)
+    return np.concatenate([keypoints, scores[:, np.newaxis]], axis=1)
@@ -0,0 +1,198 @@
+"""
+RTMPose ONNX Runtime CPU 백엔드
+- export_rtmpose_onnx.py로 내보낸 그래프(uint8 NHWC BGR 입력 → simcc_x, simcc_y)를 실행
+- PyTorch/mmpose 없이 동작 (GPU 없는 키오스크용, 모델 로딩/워밍업 시간 단축)
+- 크롭/SimCC 디코딩은 rtmpose_lite와 같은 NumPy 코드를 사용
+- intra-op 스레드 수는 지정하지 않으면 로드 시 후보별로 측정해 가장 빠른 값 선택
+"""
+
+import os
+import time
+import numpy as np
+
+import onnxruntime as ort
+
+try:
+    from rtmpose_lite import crop_frames, decode_simcc, INPUT_SIZE, COCO_FLIP_INDICES
+except ImportError:
+    from .rtmpose_lite import crop_frames, decode_simcc, INPUT_SIZE, COCO_FLIP_INDICES
+
+# 모델 파일 기준 디렉토리
+_FIT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ONNX_PATH = os.path.join(_FIT_DIR, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.onnx')
+DEFAULT_INT8_ONNX_PATH = os.path.join(_FIT_DIR, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.int8.onnx')
+
+
+def resolve_onnx_path(onnx_model=None):
+    """
+    ONNX 모델 설정값 → 경로
+
+    Args:
+        onnx_model: None 또는 'fp32' = 기본 모델, 'int8' = 정적 양자화 모델
+                    (quantize_rtmpose_onnx.py), 그 외 문자열은 모델 파일 경로
+    """
+    if onnx_model in (None, '', 'fp32'):
+        return DEFAULT_ONNX_PATH
+    if onnx_model == 'int8':
+        return DEFAULT_INT8_ONNX_PATH
+    return onnx_model
+
+
+def get_physical_cores():
+    """물리 코어 수 (psutil 없으면 논리 코어 수)"""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return os.cpu_count() or 1
+
+
+def get_thread_candidates(max_threads=None):
+    """튜닝 후보 스레드 수 (1, 2, 4, ... + 물리 코어 수)"""
+    max_threads = max_threads or get_physical_cores()
+    candidates = []
+    n = 1
+    while n < max_threads:
+        candidates.append(n)
+        n *= 2
+    candidates.append(max_threads)
+    return candidates
+
+
+def create_session(onnx_path, num_threads, allow_spinning=False):
+    """
+    CPU InferenceSession 생성
+
+    Args:
+        onnx_path: ONNX 모델 경로
+        num_threads: intra-op 스레드 수
+        allow_spinning: 추론 사이 스레드 스핀 대기 허용
+            (False면 렌더링/인코딩 스레드에 CPU를 양보, 프레임 간격이 긴 스트리밍에 유리)
+    """
+    options = ort.SessionOptions()
+    options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    options.intra_op_num_threads = num_threads
+    options.inter_op_num_threads = 1
+    options.add_session_config_entry('session.intra_op.allow_spinning', '1' if allow_spinning else '0')
+    return ort.InferenceSession(onnx_path, sess_options=options, providers=['CPUExecutionProvider'])
+
+
+def benchmark_session(session, batch_size=1, iterations=20, warmup=3):
+    """세션의 배치당 평균 추론 시간 (ms)"""
+    input_name = session.get_inputs()[0].name
+    dummy = np.random.randint(0, 255, (batch_size, INPUT_SIZE[1], INPUT_SIZE[0], 3), dtype=np.uint8)
+    for _ in range(warmup):
+        session.run(None, {input_name: dummy})
+    start = time.perf_counter()
+    for _ in range(iterations):
+        session.run(None, {input_name: dummy})
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def tune_num_threads(onnx_path, candidates=None, batch_size=1, iterations=20):
+    """
+    intra-op 스레드 수 튜닝 (후보별 추론 시간 측정 후 가장 빠른 값)
+
+    Returns:
+        (best_threads, {threads: ms})
+    """
+    candidates = candidates or get_thread_candidates()
+    timings = {}
+    for threads in candidates:
+        session = create_session(onnx_path, threads)
+        timings[threads] = round(benchmark_session(session, batch_size, iterations), 2)
+    # 5% 이내 차이면 적은 스레드 선택 (다른 세션/렌더링에 코어 양보)
+    best_ms = min(timings.values())
+    best = min(t for t, ms in timings.items() if ms <= best_ms * 1.05)
+    return best, timings
+
+
+class RTMPoseONNX:
+    """ONNX Runtime으로 실행하는 RTMPose (rtmpose_lite.inference_batch와 같은 입출력)"""
+
+    def __init__(self, onnx_path=DEFAULT_ONNX_PATH, num_threads=None, flip_test=False, allow_spinning=False):
+        """
+        Args:
+            onnx_path: export_rtmpose_onnx.py로 내보낸 모델 경로
+            num_threads: intra-op 스레드 수 (None이면 로드 시 자동 튜닝)
+            flip_test: 좌우 반전 입력과 평균 (정확도 소폭 향상, CPU 비용 2배)
+            allow_spinning: 추론 사이 스레드 스핀 대기 허용
+        """
+        if not os.path.exists(onnx_path):
+            raise FileNotFoundError(
+                f"ONNX model not found: {onnx_path} "
+                f"(export_rtmpose_onnx.py / quantize_rtmpose_onnx.py 로 먼저 생성)")
+
+        self.onnx_path = onnx_path
+        self.flip_test = flip_test
+        self.thread_timings = {}
+        if num_threads is None:
+            num_threads, self.thread_timings = tune_num_threads(onnx_path)
+            print(f"[RTMPose-ONNX] intra-op 스레드 튜닝: {self.thread_timings} → {num_threads}")
+        self.num_threads = num_threads
+
+        self.session = create_session(onnx_path, num_threads, allow_spinning)
+        self.input_name = self.session.get_inputs()[0].name
+        print(f"[RTMPose-ONNX] 모델 로드 완료: {os.path.basename(onnx_path)} "
+              f"(스레드 {num_threads}, flip test {'on' if flip_test else 'off'})")
+
+    def forward_simcc(self, batch):
+        """
+        uint8 NHWC(BGR) 크롭 배치 → SimCC 로짓
+
+        Returns:
+            (simcc_x, simcc_y): (N, K, W*r), (N, K, H*r) float32
+        """
+        if not self.flip_test:
+            simcc_x, simcc_y = self.session.run(None, {self.input_name: batch})
+            return simcc_x, simcc_y
+
+        # 원본 + 좌우 반전을 한 번의 run으로 실행
+        n = batch.shape[0]
+        both = np.concatenate([batch, batch[:, :, ::-1]], axis=0)
+        simcc_x, simcc_y = self.session.run(None, {self.input_name: both})
+        flip_x = simcc_x[n:, COCO_FLIP_INDICES, ::-1]
+        flip_y = simcc_y[n:, COCO_FLIP_INDICES]
+        return (simcc_x[:n] + flip_x) * 0.5, (simcc_y[:n] + flip_y) * 0.5
+
+    def inference_batch(self, frames, bboxes=None):
+        """
+        여러 프레임 배치 추론
+
+        Args:
+            frames: BGR 프레임 리스트
+            bboxes: 프레임별 사람 박스 (x1, y1, x2, y2), None이면 프레임 전체
+
+        Returns:
+            (N, 17, 3) float32 [x, y, score] (프레임 좌표)
+        """
+        batch, centers, scales = crop_frames(frames, bboxes)
+        simcc_x, simcc_y = self.forward_simcc(batch)
+        return decode_simcc(simcc_x, simcc_y, centers, scales)
+
+    def inference_pose(self, frame, bbox=None):
+        """단일 프레임 추론 → (17, 3) float32 [x, y, score]"""
+        bboxes = None if bbox is None else [bbox]
+        return self.inference_batch([frame], bboxes)[0]
+
+
+def load_rtmpose_onnx(onnx_path=None, num_threads=None, flip_test=False):
+    """
+    ONNX RTMPose 로드 (워밍업 포함)
+
+    Args:
+        onnx_path: 모델 경로 또는 'fp32'/'int8' (None이면 fit/models 기본 FP32 모델)
+        num_threads: intra-op 스레드 수 (None이면 자동 튜닝)
+        flip_test: 좌우 반전 평균 사용 여부
+
+    Returns:
+        RTMPoseONNX
+    """
+    model = RTMPoseONNX(resolve_onnx_path(onnx_path), num_threads=num_threads, flip_test=flip_test)
+    dummy_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+    model.inference_pose(dummy_image)
+    return model
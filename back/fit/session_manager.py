@@ -0,0 +1,308 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+# 현재 디렉토리를 sys.path에 추가
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+try:
+    from virtual_fitting import RTMPoseVirtualFitting, load_pose_model
+    from cloth_processor import get_segmentation_model
+    from pose_worker import PoseWorkerProcess
+    from stream_admission import ADMISSION_POLICIES
+except ImportError:
+    from .virtual_fitting import RTMPoseVirtualFitting, load_pose_model
+    from .cloth_processor import get_segmentation_model
+    from .pose_worker import PoseWorkerProcess
+    from .stream_admission import ADMISSION_POLICIES
+
+
+class SessionLimitExceeded(Exception):
+    """최대 세션 수에 도달했고 정리할 수 있는 (유휴/스트리밍 중 아닌) 세션도 없음"""
+
+
+class FittingSessionManager:
+    """
+    세션별 가상 피팅 엔진 관리자
+    - RTMPose 모델과 세그멘테이션 모델은 프로세스당 한 번만 로드
+    - 세션(로그인 세션 또는 스트림 ID)마다 옷, 캐시, 최근 포즈, 큐를 따로 보유
+    - 일정 시간 요청이 없는 세션은 자동 정리 (스트리밍 중인 세션 제외)
+    - 세션 엔진 생성(옷 로드, 스레드 시작)은 매니저 락 밖에서 (생성 중에도 다른 세션 요청은 막히지 않음)
+    """
+
+    def __init__(self, cloth_image_path, device='cuda:0', idle_timeout=120.0, max_sessions=8,
+                 pose_backend='torch', onnx_num_threads=None, onnx_model=None, pose_process=False,
+                 metrics_enabled=True, admission_policy='coalesce', active_window=10.0, sprite_cache_options=None):
+        """
+        Args:
+            cloth_image_path: 새 세션의 기본 옷 이미지 경로
+            device: 'cuda:0' 또는 'cpu'
+            pose_backend: 'torch' (mmpose/PyTorch) 또는 'onnx' (ONNX Runtime CPU)
+            onnx_num_threads: ONNX intra-op 스레드 수 (None이면 자동 튜닝)
+            onnx_model: ONNX 모델 'fp32' (기본), 'int8' (정적 양자화) 또는 파일 경로
+            idle_timeout: 세션 유휴 만료 시간 (초, 스트리밍 중인 세션은 만료하지 않음)
+            max_sessions: 동시에 유지할 최대 세션 수 (초과 시 스트리밍 중이 아닌 세션 중 가장 오래 쉰 세션 정리,
+                          모두 사용 중이면 SessionLimitExceeded)
+            pose_process: True면 포즈 추론 + 세그멘테이션을 워커 프로세스 하나에서 실행
+                          (세션마다 공유 메모리 채널, 세션 간 프레임을 한 배치로 추론)
+            metrics_enabled: 세션별 단계 지연 측정 여부 (set_metrics_enabled로 실행 중 변경)
+            admission_policy: 세션별 스트림 프레임 입장 정책 'coalesce' / 'skip' / 'off'
+            active_window: 스트리밍 중이고 이 시간(초) 안에 요청이 있었던 세션은 최대 세션 수 초과 시에도 정리하지 않음
+            sprite_cache_options: 세션별 스프라이트 캐시 설정 (scale_bin, rotation_bin, shear_bin, max_bytes)
+                                  max_bytes는 세션당 예산이므로 최대 메모리는 max_sessions × max_bytes
+        """
+        if admission_policy not in ADMISSION_POLICIES:
+            raise ValueError(f"알 수 없는 입장 정책: {admission_policy} (가능: {', '.join(ADMISSION_POLICIES)})")
+        self.cloth_image_path = cloth_image_path
+        self.device = device
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self.pose_backend = pose_backend
+        self.metrics_enabled = metrics_enabled
+        self.admission_policy = admission_policy
+        self.active_window = active_window
+        self.sprite_cache_options = dict(sprite_cache_options or {})
+
+        self.sessions = {}       # session_id -> RTMPoseVirtualFitting
+        self.last_access = {}    # session_id -> 마지막 접근 시각
+        self.pending = {}        # session_id -> Future (생성 중인 세션 엔진, 같은 ID 요청은 여기서 대기)
+        self.lock = threading.Lock()
+
+        self.model = None
+        self.model_lock = threading.Lock()
+        self.pose_worker = None
+        if pose_process:
+            # 워커 프로세스가 모델을 로드 (Flask 프로세스에는 포즈 모델 없음)
+            self.pose_worker = PoseWorkerProcess({
+                'backend': pose_backend,
+                'device': device,
+                'onnx_model': onnx_model,
+                'onnx_num_threads': onnx_num_threads,
+                'segmentation': True
+            }, num_channels=max_sessions + 1)  # 새 세션 생성 후 만료 세션 채널을 반납하므로 1개 여유
+            self.pose_worker.start()
+        else:
+            # 공유 모델 (한 번만 로드)
+            self.model = load_pose_model(device, pose_backend, onnx_num_threads, onnx_model)
+        get_segmentation_model()
+
+        print(f"[SessionManager] 공유 모델 준비 완료 ({pose_backend}{', 워커 프로세스' if pose_process else ''}, "
+              f"유휴 만료 {idle_timeout:.0f}초, 최대 {max_sessions}세션)")
+
+    def get_session(self, session_id):
+        """
+        세션 엔진 반환 (없으면 공유 모델로 생성)
+
+        Args:
+            session_id: 세션 키 (로그인 사용자 ID 또는 스트림 ID)
+
+        Returns:
+            RTMPoseVirtualFitting 세션 엔진
+
+        Raises:
+            SessionLimitExceeded: 최대 세션 수에 도달했고 모든 세션이 스트리밍 중
+        """
+        creating = False
+        limit_error = None
+        with self.lock:
+            now = time.time()
+            expired = self._collect_expired(now, exclude=session_id)
+
+            vf = self.sessions.get(session_id)
+            if vf is not None:
+                self.last_access[session_id] = now
+            elif session_id in self.pending:
+                future = self.pending[session_id]  # 다른 요청이 생성 중: 그 결과를 기다림
+            else:
+                # 최대 세션 수 초과 시 사용 중이 아닌 세션 중 가장 오래 쉰 세션 정리 (모두 사용 중이면 거절)
+                while len(self.sessions) + len(self.pending) >= self.max_sessions:
+                    candidates = [sid for sid, engine in self.sessions.items() if not self._is_active(sid, engine, now)]
+                    if not candidates:
+                        limit_error = SessionLimitExceeded(
+                            f"최대 세션 수 {self.max_sessions}개가 모두 사용 중 (세션 {session_id} 거절)"
+                        )
+                        break
+                    oldest = min(candidates, key=self.last_access.get)
+                    expired.append((oldest, self.sessions.pop(oldest)))
+                    self.last_access.pop(oldest, None)
+
+                if limit_error is None:
+                    future = Future()
+                    self.pending[session_id] = future
+                    creating = True
+
+        # 스레드 종료는 락 밖에서 (join 대기가 다른 요청을 막지 않도록)
+        for expired_id, expired_vf in expired:
+            self._shutdown(expired_id, expired_vf)
+
+        if limit_error is not None:
+            print(f"[SessionManager] {limit_error}")
+            raise limit_error
+        if vf is not None:
+            return vf
+        if not creating:
+            return future.result()
+        return self._create_session(session_id, future)
+
+    def _create_session(self, session_id, future):
+        """세션 엔진 생성 (락 밖에서 옷 로드/스레드 시작) 후 등록, 대기 중인 같은 ID 요청에 결과 전달"""
+        try:
+            vf = RTMPoseVirtualFitting(
+                cloth_image_path=self.cloth_image_path,
+                device=self.device,
+                model=self.model,
+                model_lock=self.model_lock,
+                pose_backend=self.pose_backend,
+                pose_worker=self.pose_worker,
+                sprite_cache_options=self.sprite_cache_options
+            )
+            vf.stage_metrics.set_enabled(self.metrics_enabled)
+            vf.admission.set_policy(self.admission_policy)
+        except BaseException as e:
+            with self.lock:
+                self.pending.pop(session_id, None)
+            future.set_exception(e)
+            raise
+
+        with self.lock:
+            self.pending.pop(session_id, None)
+            self.sessions[session_id] = vf
+            self.last_access[session_id] = time.time()
+            count = len(self.sessions)
+        future.set_result(vf)
+        print(f"[SessionManager] 세션 생성: {session_id} (활성 {count}개)")
+        return vf
+
+    def _is_active(self, session_id, vf, now):
+        """스트리밍 중이고 최근에 요청이 있었던 세션 (최대 세션 수 초과 시에도 정리하지 않음)"""
+        return vf.is_streaming() and now - self.last_access.get(session_id, 0) <= self.active_window
+
+    def peek_session(self, session_id):
+        """세션 엔진 반환 (없으면 None, 생성하지 않음)"""
+        with self.lock:
+            vf = self.sessions.get(session_id)
+            if vf is not None:
+                self.last_access[session_id] = time.time()
+            return vf
+
+    def touch(self, session_id, vf):
+        """
+        세션 접근 시각 갱신 (엔진을 한 번 받아 계속 쓰는 WebSocket 연결은 프레임마다 호출)
+
+        Returns:
+            bool: 세션이 아직 이 엔진으로 등록되어 있는지 (정리/교체되었으면 False)
+        """
+        with self.lock:
+            if self.sessions.get(session_id) is not vf:
+                return False
+            self.last_access[session_id] = time.time()
+            return True
+
+    def close_session(self, session_id):
+        """세션 종료 및 추론 스레드 정리"""
+        with self.lock:
+            vf = self.sessions.pop(session_id, None)
+            self.last_access.pop(session_id, None)
+        if vf is not None:
+            self._shutdown(session_id, vf)
+            return True
+        return False
+
+    def evict_idle(self):
+        """유휴 세션 정리"""
+        with self.lock:
+            expired = self._collect_expired(time.time())
+        for expired_id, expired_vf in expired:
+            self._shutdown(expired_id, expired_vf)
+        return len(expired)
+
+    def shutdown(self):
+        """모든 세션 종료"""
+        with self.lock:
+            sessions = list(self.sessions.items())
+            self.sessions.clear()
+            self.last_access.clear()
+        for session_id, vf in sessions:
+            self._shutdown(session_id, vf)
+        if self.pose_worker is not None:
+            self.pose_worker.stop()
+
+    def set_metrics_enabled(self, enabled, reset=False):
+        """모든 세션(+ 새 세션)의 단계 지연 측정 켜기/끄기"""
+        with self.lock:
+            self.metrics_enabled = bool(enabled)
+            for vf in self.sessions.values():
+                vf.stage_metrics.set_enabled(enabled)
+                if reset:
+                    vf.stage_metrics.reset()
+
+    def set_session_metrics_enabled(self, session_id, enabled, reset=False):
+        """한 세션의 단계 지연 측정 켜기/끄기 (세션이 없으면 False)"""
+        with self.lock:
+            vf = self.sessions.get(session_id)
+        if vf is None:
+            return False
+        vf.stage_metrics.set_enabled(enabled)
+        if reset:
+            vf.stage_metrics.reset()
+        return True
+
+    def get_metrics(self, session_id=None):
+        """세션별 단계 지연 p50/p95/p99 (session_id 지정 시 해당 세션만)"""
+        with self.lock:
+            sessions = list(self.sessions.items())
+            if session_id is not None:
+                sessions = [(sid, vf) for sid, vf in sessions if sid == session_id]
+            return {
+                "enabled": self.metrics_enabled,
+                "sessions": {sid: vf.get_stage_metrics() for sid, vf in sessions}
+            }
+
+    def get_stats(self):
+        """세션 현황 반환"""
+        with self.lock:
+            now = time.time()
+            return {
+                "active_sessions": len(self.sessions),
+                "pose_backend": self.pose_backend,
+                "max_sessions": self.max_sessions,
+                "pose_worker": self.pose_worker.get_stats() if self.pose_worker is not None else None,
+                "idle_timeout": self.idle_timeout,
+                "sessions": {
+                    session_id: {
+                        "idle_seconds": round(now - self.last_access.get(session_id, now), 1),
+                        "streaming": vf.is_streaming(),
+                        "render_cache": vf.get_render_cache_stats(),
+                        "sprite_cache": vf.get_sprite_cache_stats(),
+                        "render_pool": vf.get_render_pool_stats(),
+                        "auto_tuner": vf.get_auto_tuner_stats(),
+                        "admission": vf.admission.get_stats()
+                    }
+                    for session_id, vf in self.sessions.items()
+                }
+            }
+
+    def _collect_expired(self, now, exclude=None):
+        """
+        만료된 세션을 목록에서 제거하고 반환 (self.lock 보유 상태에서 호출)
+        스트리밍 중인 세션은 유휴 시간과 관계없이 유지 (중지 없이 버려진 스트림은 최대 세션 수 초과 시 정리)
+        """
+        expired = []
+        for session_id, last in list(self.last_access.items()):
+            if session_id != exclude and now - last > self.idle_timeout and not self.sessions[session_id].is_streaming():
+                expired.append((session_id, self.sessions.pop(session_id)))
+                del self.last_access[session_id]
+        return expired
+
+    def _shutdown(self, session_id, vf):
+        """세션 엔진 정리"""
+        try:
+            vf.stop_streaming()
+            vf.stop_inference_thread()
+        except Exception as e:
+            print(f"[SessionManager] 세션 정리 실패 ({session_id}): {e}")
+        print(f"[SessionManager] 세션 종료: {session_id}")
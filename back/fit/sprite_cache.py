@@ -0,0 +1,174 @@
+"""
+변형된 옷 스프라이트 LRU 캐시 (양자화된 어파인 파라미터 키)
+- 어파인 행렬의 선형 부분을 스케일/회전/전단으로 분해해 작은 구간으로 반올림한 값을 키로 사용
+- 평행이동은 키에서 제외하고 스프라이트 배치 오프셋으로만 처리
+  → 사람이 좌우로 움직이기만 하면 warpAffine 없이 이동 + 합성만 수행
+- 메모리 예산(바이트) 기준 LRU 제거, 적중/미스 카운터 제공
+"""
+
+import math
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def decompose_affine(M):
+    """
+    2x3 어파인 행렬의 선형 부분 분해: A = R(theta) @ [[sx, shear], [0, sy]]
+
+    Returns:
+        (sx, sy, theta, shear): theta는 라디안
+    """
+    a, b = float(M[0, 0]), float(M[0, 1])
+    c, d = float(M[1, 0]), float(M[1, 1])
+    sx = math.hypot(a, c)
+    theta = math.atan2(c, a)
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    shear = b * cos_t + d * sin_t
+    sy = d * cos_t - b * sin_t
+    return sx, sy, theta, shear
+
+
+def compose_affine(sx, sy, theta, shear):
+    """decompose_affine의 역변환 → 2x2 선형 행렬"""
+    cos_t, sin_t = math.cos(theta), math.sin(theta)
+    rotation = np.array([[cos_t, -sin_t], [sin_t, cos_t]], dtype=np.float64)
+    upper = np.array([[sx, shear], [0.0, sy]], dtype=np.float64)
+    return rotation @ upper
+
+
+class SpriteCache:
+    """양자화 어파인 키 → 변형된 옷 스프라이트 LRU 캐시"""
+
+    def __init__(self, scale_bin=0.01, rotation_bin=0.25, shear_bin=0.01, max_bytes=64 * 1024 * 1024):
+        """
+        Args:
+            scale_bin: 스케일 구간 (상대값, 0.01 = 1% 단위 로그 구간)
+            rotation_bin: 회전 구간 (도)
+            shear_bin: 전단 구간
+            max_bytes: 스프라이트 메모리 예산 (바이트)
+        """
+        self.scale_bin = scale_bin
+        self.rotation_bin = rotation_bin
+        self.shear_bin = shear_bin
+        self.max_bytes = max_bytes
+
+        self.entries = OrderedDict()  # key -> (sprite, origin)
+        self.total_bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def quantize(self, M):
+        """
+        어파인 행렬 → (양자화 키, 양자화된 2x2 선형 행렬)
+        """
+        sx, sy, theta, shear = decompose_affine(M)
+        log_step = math.log1p(self.scale_bin)
+        rot_step = math.radians(self.rotation_bin)
+
+        q_sx = round(math.log(max(sx, 1e-6)) / log_step)
+        q_sy = round(math.log(max(abs(sy), 1e-6)) / log_step)
+        sign_y = 1.0 if sy >= 0 else -1.0
+        q_theta = round(theta / rot_step)
+        q_shear = round(shear / self.shear_bin)
+
+        A_q = compose_affine(
+            math.exp(q_sx * log_step),
+            sign_y * math.exp(q_sy * log_step),
+            q_theta * rot_step,
+            q_shear * self.shear_bin
+        )
+        return (q_sx, q_sy, sign_y, q_theta, q_shear), A_q
+
+    def get_sprite(self, source_key, cloth_img, M, anchor):
+        """
+        양자화된 어파인으로 변형된 스프라이트와 프레임 내 오프셋 반환
+
+        Args:
+            source_key: 원본 옷 이미지 식별자 (옷이 바뀌면 키도 달라져야 함)
+            cloth_img: 원본 옷 이미지 (RGBA) - 미스 시에만 변형
+            M: 실제 2x3 어파인 행렬 (옷 → 프레임)
+            anchor: 정확히 맞춰야 하는 옷 이미지 좌표 (x, y) (예: 어깨 중심)
+
+        Returns:
+            (sprite, (x, y)): 캐시된 스프라이트 (수정 금지)와 정수 오프셋
+        """
+        key, A_q = self.quantize(M)
+        key = (source_key,) + key
+
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats["hits"] += 1
+            else:
+                self.stats["misses"] += 1
+
+        if entry is None:
+            entry = self._render(cloth_img, A_q)
+            self._put(key, entry)
+
+        sprite, origin = entry
+
+        # 양자화로 생긴 오차를 앵커 위치에서 0이 되도록 평행이동 보정
+        anchor = np.asarray(anchor, dtype=np.float64)
+        M = np.asarray(M, dtype=np.float64)
+        target = M[:, :2] @ anchor + M[:, 2]
+        translation = target - A_q @ anchor
+        offset = (int(round(translation[0] + origin[0])), int(round(translation[1] + origin[1])))
+        return sprite, offset
+
+    def _render(self, cloth_img, A_q):
+        """양자화된 선형 변환으로 옷 전체를 변형 (평행이동은 스프라이트 원점으로 분리)"""
+        h, w = cloth_img.shape[:2]
+        corners = np.array([[0, 0], [w, 0], [0, h], [w, h]], dtype=np.float64) @ A_q.T
+        x0, y0 = np.floor(corners.min(axis=0)).astype(int)
+        x1, y1 = np.ceil(corners.max(axis=0)).astype(int) + 1
+
+        M_sprite = np.hstack([A_q, [[-x0], [-y0]]]).astype(np.float32)
+        sprite = cv2.warpAffine(
+            cloth_img,
+            M_sprite,
+            (int(x1 - x0), int(y1 - y0)),
+            flags=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_CONSTANT,
+            borderValue=(0, 0, 0, 0)
+        )
+        sprite.setflags(write=False)  # 여러 프레임이 공유하므로 읽기 전용
+        return sprite, (int(x0), int(y0))
+
+    def _put(self, key, entry):
+        """엔트리 추가 + 메모리 예산 초과 시 오래된 것부터 제거"""
+        size = entry[0].nbytes
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                return
+            self.entries[key] = entry
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes and self.entries:
+                _, (old_sprite, _) = self.entries.popitem(last=False)
+                self.total_bytes -= old_sprite.nbytes
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        """모든 엔트리 제거 (옷 교체 시)"""
+        with self.lock:
+            self.entries.clear()
+            self.total_bytes = 0
+
+    def get_stats(self):
+        """적중/미스 카운터 및 메모리 사용량"""
+        with self.lock:
+            hits = self.stats["hits"]
+            total = hits + self.stats["misses"]
+            return dict(
+                self.stats,
+                hit_rate=round(hits / total, 3) if total else 0.0,
+                entries=len(self.entries),
+                bytes=self.total_bytes,
+                max_bytes=self.max_bytes
+            )
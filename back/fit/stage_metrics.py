@@ -0,0 +1,163 @@
+"""
+단계별 지연 측정 (세션별 롤링 히스토그램)
+- RollingHistogram: HDR 방식 로그-선형 버킷 (2의 거듭제곱 구간마다 32개 선형 구간, 마이크로초 단위)
+  상대 오차 약 1.6%, 기록은 정수 연산 + 배열 증가 한 번, 최근 windows * window_seconds 초만 유지
+- StageMetrics: 단계 이름 → 히스토그램, enabled=False면 record가 바로 반환 (실행 중 끄고 켜기 가능)
+- snapshot(): 단계별 count / mean / p50 / p95 / p99 / max (ms) JSON
+
+측정 단계 (요청 1회 기준):
+    decode          base64 디코딩 + cv2.imdecode (프레임 파이프라인 대기 포함)
+    inference_submit 추론용 축소 + 큐/메일박스 제출
+    pose_staleness  렌더링에 사용한 포즈의 staleness (렌더링 시각 - 캡처 시각)
+    face_mask       얼굴/목 마스크 생성
+    resize_warp     어깨 매칭 리사이즈 + 어파인 변형
+    segmentation    비동기 세그멘테이션 마스크 가져오기
+    blend           정제 + 알파 블렌딩 (렌더 캐시 적중 포함)
+    client_mask     클라이언트 렌더링 가림 마스크 (세그멘테이션 + 얼굴 마스크 축소 + RLE/PNG 인코딩)
+    process_frame   렌더링 단계 전체 (파이프라인 대기 포함)
+    encode          cv2.imencode + base64 인코딩 (파이프라인 대기 포함)
+    request         요청 전체
+"""
+
+import threading
+import time
+
+import numpy as np
+
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS           # 구간당 선형 버킷 수 (32)
+LINEAR_LIMIT = SUB_BUCKETS * 2        # 이 값(µs) 미만은 1µs 단위 그대로
+MAX_VALUE_US = (1 << 26) - 1          # 약 67초 (초과 값은 마지막 버킷)
+NUM_BUCKETS = LINEAR_LIMIT + (MAX_VALUE_US.bit_length() - SUB_BITS - 1) * SUB_BUCKETS
+
+
+def bucket_index(value_us):
+    """마이크로초 값 → 버킷 인덱스"""
+    if value_us < LINEAR_LIMIT:
+        return value_us if value_us > 0 else 0
+    if value_us > MAX_VALUE_US:
+        value_us = MAX_VALUE_US
+    shift = value_us.bit_length() - SUB_BITS - 1
+    return LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + (value_us >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index):
+    """버킷 인덱스 → (하한, 상한) 마이크로초 (상한 미포함)"""
+    if index < LINEAR_LIMIT:
+        return index, index + 1
+    shift = (index - LINEAR_LIMIT) // SUB_BUCKETS + 1
+    mantissa = (index - LINEAR_LIMIT) % SUB_BUCKETS + SUB_BUCKETS
+    return mantissa << shift, (mantissa + 1) << shift
+
+
+# 버킷 대표값 (중앙값, ms)
+_BUCKET_MS = np.array([sum(bucket_bounds(i)) / 2000 for i in range(NUM_BUCKETS)])
+
+
+class RollingHistogram:
+    """최근 구간만 유지하는 로그-선형 지연 히스토그램"""
+
+    def __init__(self, window_seconds=10.0, windows=6):
+        """
+        Args:
+            window_seconds: 구간 길이 (초)
+            windows: 유지할 구간 수 (최근 window_seconds * windows 초 집계)
+        """
+        self.window_seconds = window_seconds
+        # 기록 경로는 파이썬 리스트 (numpy 스칼라 인덱싱보다 빠름), 요약 시에만 numpy 변환
+        self.counts = [[0] * NUM_BUCKETS for _ in range(windows)]
+        self.sums = [0.0] * windows
+        self.maxima = [0] * windows
+        self.current = 0
+        self.window_end = None
+
+    def record(self, seconds, now):
+        """
+        값 기록
+
+        Args:
+            seconds: 측정값 (초)
+            now: 현재 시각 (time.perf_counter())
+        """
+        if self.window_end is None:
+            self.window_end = now + self.window_seconds
+        elif now >= self.window_end:
+            self._rotate(now)
+
+        value_us = int(seconds * 1e6)
+        current = self.current
+        self.counts[current][bucket_index(value_us)] += 1
+        self.sums[current] += seconds
+        if value_us > self.maxima[current]:
+            self.maxima[current] = value_us
+
+    def _rotate(self, now):
+        """지난 구간 수만큼 다음 구간으로 이동 (건너뛴 구간은 비움)"""
+        windows = len(self.sums)
+        skipped = min(windows, int((now - self.window_end) // self.window_seconds) + 1)
+        for _ in range(skipped):
+            self.current = (self.current + 1) % windows
+            self.counts[self.current] = [0] * NUM_BUCKETS
+            self.sums[self.current] = 0.0
+            self.maxima[self.current] = 0
+        self.window_end += skipped * self.window_seconds
+        if now >= self.window_end:  # 전체 구간보다 오래 기록이 없었음
+            self.window_end = now + self.window_seconds
+
+    def summary(self, percentiles=(50, 95, 99)):
+        """count, mean_ms, p50_ms ..., max_ms (기록 없으면 count 0만)"""
+        counts = np.array(self.counts, dtype=np.int64).sum(axis=0)
+        total = int(counts.sum())
+        if total == 0:
+            return {"count": 0}
+
+        cumulative = np.cumsum(counts)
+        max_ms = max(self.maxima) / 1000
+        result = {"count": total, "mean_ms": round(float(sum(self.sums)) / total * 1000, 3)}
+        for q in percentiles:
+            index = int(np.searchsorted(cumulative, q / 100 * total))
+            result[f"p{q}_ms"] = round(min(float(_BUCKET_MS[min(index, NUM_BUCKETS - 1)]), max_ms), 3)
+        result["max_ms"] = round(max_ms, 3)
+        return result
+
+
+class StageMetrics:
+    """세션별 단계 지연 히스토그램 모음"""
+
+    def __init__(self, enabled=True, window_seconds=10.0, windows=6):
+        """
+        Args:
+            enabled: False면 record가 아무것도 하지 않음 (실행 중 set_enabled로 변경)
+            window_seconds, windows: RollingHistogram 구간 설정 (기본 최근 60초)
+        """
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """단계 측정값 기록 (초)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = RollingHistogram(self.window_seconds, self.windows)
+            histogram.record(seconds, time.perf_counter())
+
+    def set_enabled(self, enabled):
+        self.enabled = bool(enabled)
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def snapshot(self):
+        """단계별 p50/p95/p99 요약"""
+        with self.lock:
+            return {
+                "enabled": self.enabled,
+                "window_seconds": self.window_seconds * self.windows,
+                "stages": {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+            }
@@ -0,0 +1,150 @@
+"""
+세션별 스트림 프레임 입장 제어 + 권장 전송 간격
+- 브라우저는 응답과 무관하게 고정 주기로 프레임을 보내므로, 부하가 걸리면 요청이 서버 스레드 풀에 쌓여 지연이 끝없이 증가
+- 세션에서 이미 프레임을 처리 중이면:
+    'skip'     즉시 skipped 응답 (프레임 버림)
+    'coalesce' 최신 프레임 하나만 대기 (더 새 프레임이 오면 대기 중이던 프레임은 skipped), 처리가 끝나면 바로 이어서 처리
+    'off'      제한 없음 (기존 동작)
+- 입장은 렌더링이 끝나면 해제 (다음 프레임 디코딩이 이번 프레임 인코딩과 겹쳐 실행되도록, 렌더링 순서는 세션 render_lock)
+- 처리 시간(입장 ~ 렌더링 완료) EMA로 권장 전송 간격 계산 → 응답에 suggestedIntervalMs로 실어 클라이언트가 전송 주기 조정
+"""
+
+import threading
+import time
+
+ADMISSION_POLICIES = ('coalesce', 'skip', 'off')
+
+
+class StreamAdmission:
+    """세션 하나의 프레임 입장 제어기"""
+
+    def __init__(self, policy='coalesce', max_wait=1.0, min_interval=1 / 30, max_interval=0.5,
+                 headroom=1.1, smoothing=0.2):
+        """
+        Args:
+            policy: 'coalesce' / 'skip' / 'off'
+            max_wait: coalesce 대기 최대 시간 (초, 넘으면 skipped)
+            min_interval, max_interval: 권장 전송 간격 범위 (초)
+            headroom: 처리 시간 대비 권장 간격 배율 (처리 시간보다 약간 느리게 보내 대기 없이 처리)
+            smoothing: 처리 시간 EMA 계수
+        """
+        if policy not in ADMISSION_POLICIES:
+            raise ValueError(f"알 수 없는 입장 정책: {policy}")
+        self.policy = policy
+        self.max_wait = max_wait
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.headroom = headroom
+        self.smoothing = smoothing
+
+        self.condition = threading.Condition()
+        self.busy = False
+        self.waiting_ticket = None  # 대기 중인 최신 프레임 (coalesce)
+        self.next_ticket = 0
+        self.service_time = None    # 처리 시간 EMA (초)
+        self.stats = {"admitted": 0, "skipped": 0, "coalesced": 0, "waited": 0}
+
+    def acquire(self):
+        """
+        프레임 입장
+
+        Returns:
+            True면 처리 (끝나면 반드시 release), False면 skipped 응답
+        """
+        with self.condition:
+            if self.policy == 'off':
+                self.stats["admitted"] += 1
+                return True
+
+            if not self.busy:
+                if self.waiting_ticket is not None:
+                    # 처리 종료 직후 대기 프레임보다 먼저 도착: 더 새 프레임이 자리를 가져감
+                    self.waiting_ticket = None
+                    self.stats["coalesced"] += 1
+                    self.condition.notify_all()
+                self.busy = True
+                self.stats["admitted"] += 1
+                return True
+
+            if self.policy == 'skip':
+                self.stats["skipped"] += 1
+                return False
+
+            # coalesce: 대기 중이던 이전 프레임은 밀려남 (skipped)
+            if self.waiting_ticket is not None:
+                self.stats["coalesced"] += 1
+            ticket = self.next_ticket
+            self.next_ticket += 1
+            self.waiting_ticket = ticket
+            self.condition.notify_all()
+
+            deadline = time.monotonic() + self.max_wait
+            while self.busy and self.waiting_ticket == ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self.condition.wait(remaining)
+
+            if self.waiting_ticket != ticket:
+                self.stats["skipped"] += 1  # 더 새 프레임에 밀려남
+                return False
+            self.waiting_ticket = None
+            if self.busy:
+                self.stats["skipped"] += 1  # 대기 시간 초과
+                return False
+            self.busy = True
+            self.stats["admitted"] += 1
+            self.stats["waited"] += 1
+            return True
+
+    def release(self, service_time):
+        """
+        처리 종료
+
+        Args:
+            service_time: 입장부터 렌더링 완료까지 걸린 시간 (초)
+        """
+        with self.condition:
+            self._record_service(service_time)
+            self.busy = False
+            self.condition.notify_all()
+
+    def record_service(self, service_time):
+        """입장 제어 없이 처리 시간만 기록 (연결 자체에서 드롭하는 WebSocket 전송)"""
+        with self.condition:
+            self._record_service(service_time)
+
+    def _record_service(self, service_time):
+        if self.service_time is None:
+            self.service_time = service_time
+        else:
+            self.service_time += self.smoothing * (service_time - self.service_time)
+
+    def suggested_interval(self):
+        """권장 전송 간격 (초, 측정값이 없으면 최소 간격)"""
+        if self.service_time is None:
+            return self.min_interval
+        return min(self.max_interval, max(self.min_interval, self.service_time * self.headroom))
+
+    def suggested_interval_ms(self):
+        return round(self.suggested_interval() * 1000, 1)
+
+    def set_policy(self, policy):
+        """입장 정책 변경 (대기 중인 프레임은 정책에 맞게 다시 판단)"""
+        if policy not in ADMISSION_POLICIES:
+            raise ValueError(f"알 수 없는 입장 정책: {policy}")
+        with self.condition:
+            self.policy = policy
+            if policy == 'off':
+                self.busy = False
+            self.condition.notify_all()
+
+    def get_stats(self):
+        with self.condition:
+            return dict(
+                self.stats,
+                policy=self.policy,
+                busy=self.busy,
+                service_ms=round(self.service_time * 1000, 1) if self.service_time is not None else None,
+                suggested_interval_ms=self.suggested_interval_ms()
+            )
@@ -5,35 +5,67 @@ import sys
 import threading
 import queue
 import time
-import torch
+import uuid
 
 # 현재 디렉토리를 sys.path에 추가
 current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-from mmpose.apis import init_model, inference_topdown
-from mmpose.structures import merge_data_samples
+# torch/mmpose는 torch 백엔드를 쓸 때만 임포트 (ONNX 백엔드 키오스크는 torch 없이 실행, 시작 시 임포트 비용 없음)
 
 # cloth_processor import (같은 디렉토리에서)
 try:
     from cloth_processor import (
-        remove_background, 
         resize_cloth_to_body, 
         overlay_cloth_on_body,
-        detect_cloth_keypoints_advanced,
-        warp_cloth_to_pose
+        warp_cloth_to_pose_roi,
+        crop_mask_to_sprite,
+        segment_body_lowres,
+        get_torso_row_range,
+        compute_cloth_affine
     )
 except ImportError:
     # 상대 경로로 다시 시도
     from .cloth_processor import (
-        remove_background, 
         resize_cloth_to_body, 
         overlay_cloth_on_body,
-        detect_cloth_keypoints_advanced,
-        warp_cloth_to_pose
+        warp_cloth_to_pose_roi,
+        crop_mask_to_sprite,
+        segment_body_lowres,
+        get_torso_row_range,
+        compute_cloth_affine
     )
 
+try:
+    from garment_cache import get_garment_cache
+    from rtmpose_lite import inference_batch, inference_pose, pose_array_from_results
+    from pose_filter import OneEuroPoseFilter
+    from sprite_cache import SpriteCache
+    from render_kernel import RenderBufferPool, render_garment_fused
+    from pose_worker import PoseWorkerProcess
+    from auto_tuner import InferenceAutoTuner
+    from frame_mailbox import LatestFrameMailbox, LatestResultCell
+    from stage_metrics import StageMetrics
+    from person_tracker import PersonTracker
+    from client_render import garment_matrix, build_visibility_mask, encode_mask
+    from delta_frames import DeltaFrameEncoder, sprite_bounds
+    from stream_admission import StreamAdmission
+except ImportError:
+    from .garment_cache import get_garment_cache
+    from .rtmpose_lite import inference_batch, inference_pose, pose_array_from_results
+    from .pose_filter import OneEuroPoseFilter
+    from .sprite_cache import SpriteCache
+    from .render_kernel import RenderBufferPool, render_garment_fused
+    from .pose_worker import PoseWorkerProcess
+    from .auto_tuner import InferenceAutoTuner
+    from .frame_mailbox import LatestFrameMailbox, LatestResultCell
+    from .stage_metrics import StageMetrics
+    from .person_tracker import PersonTracker
+    from .client_render import garment_matrix, build_visibility_mask, encode_mask
+    from .delta_frames import DeltaFrameEncoder, sprite_bounds
+    from .stream_admission import StreamAdmission
+
 # GPU 사용 확인
 def check_gpu_availability():
     """GPU 사용 가능 여부 확인"""
@@ -59,17 +91,128 @@ def check_gpu_availability():
     
     print("="*70 + "\n")
 
-# GPU 확인 실행
-check_gpu_availability()
+def cuda_enabled(device):
+    """device가 CUDA이고 실제로 사용 가능한지 (torch 미설치면 False)"""
+    if 'cuda' not in str(device):
+        return False
+    try:
+        import torch
+    except ImportError:
+        return False
+    return torch.cuda.is_available()
+
+# 얼굴/목 마스크 ROI 여백 (모폴로지 9x9 x2 + 블러 21x21 반경이 ROI 경계에 닿지 않도록)
+FACE_MASK_ROI_PADDING = 24
+
+# 렌더 캐시 비교 관절 (COCO 0~12: 얼굴/어깨/팔/골반 - 변형, 얼굴 마스크, 세그멘테이션에 영향)
+RENDER_CACHE_JOINTS = 13
+
+# 모델 파일 기준 디렉토리
+_FIT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def load_rtmpose_model(device='cuda:0'):
+    """
+    RTMPose 모델 로드 (GPU 최적화 설정 + 워밍업 포함)
+    
+    Args:
+        device: 'cuda:0' 또는 'cpu'
+    
+    Returns:
+        eval 모드의 RTMPose 모델
+    """
+    import torch
+    from mmpose.apis import init_model, inference_topdown
+
+    check_gpu_availability()
+
+    # PyTorch GPU 최적화 설정
+    if cuda_enabled(device):
+        # GPU 메모리 할당 최적화
+        torch.backends.cudnn.benchmark = True  # cuDNN 자동 튜닝 (속도 향상)
+        torch.backends.cuda.matmul.allow_tf32 = True  # TF32 연산 허용 (RTX 30xx 이상)
+        torch.backends.cudnn.allow_tf32 = True
+        # Mixed Precision 활성화 고려 (추후 적용 가능)
+        print("[RTMPose] [GPU 최적화] cuDNN benchmark, TF32 활성화")
+
+    # RTMPose 모델 초기화 (절대 경로 사용)
+    config_file = os.path.join(_FIT_DIR, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.py')
+    checkpoint_file = os.path.join(_FIT_DIR, 'models', 'rtmpose-s_simcc-aic-coco_pt-aic-coco_420e-256x192-fcb2599b_20230126.pth')
+
+    # 파일 존재 여부 확인
+    if not os.path.exists(config_file):
+        raise FileNotFoundError(f"Config file not found: {config_file}")
+    if not os.path.exists(checkpoint_file):
+        raise FileNotFoundError(f"Checkpoint file not found: {checkpoint_file}")
+
+    print(f"[RTMPose] 모델 로딩 중... (device: {device})")
+    print(f"[RTMPose] Config: {config_file}")
+    print(f"[RTMPose] Checkpoint: {checkpoint_file}")
+
+    try:
+        model = init_model(config_file, checkpoint_file, device=device)
+
+        # 모델을 eval 모드로 설정 (Dropout, BatchNorm 비활성화)
+        model.eval()
+
+        # GPU 워밍업 (첫 추론 속도 개선)
+        if cuda_enabled(device):
+            print("[RTMPose] GPU 워밍업 중...")
+            # 더미 이미지로 워밍업 (실제 추론 함수 사용)
+            dummy_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+            with torch.no_grad():
+                _ = inference_topdown(model, dummy_image)
+                _ = inference_pose(model, dummy_image)  # 경량 추론 경로도 워밍업
+            torch.cuda.empty_cache()
+            print("[RTMPose] GPU 워밍업 완료")
+
+        print("[RTMPose] 모델 로딩 완료")
+    except Exception as e:
+        print(f"[RTMPose] [ERROR] 모델 로딩 실패: {e}")
+        import traceback
+        traceback.print_exc()
+        raise
+    
+    return model
+
+def load_pose_model(device='cuda:0', backend='torch', onnx_num_threads=None, onnx_model=None):
+    """
+    포즈 모델 로드 (백엔드 선택)
+    
+    Args:
+        device: 'cuda:0' 또는 'cpu' (torch 백엔드)
+        backend: 'torch' = mmpose/PyTorch 모델, 'onnx' = ONNX Runtime CPU (GPU 없는 키오스크용)
+        onnx_num_threads: ONNX intra-op 스레드 수 (None이면 로드 시 자동 튜닝)
+        onnx_model: 'fp32' (기본), 'int8' (정적 양자화 모델) 또는 ONNX 파일 경로
+    
+    Returns:
+        torch 백엔드: eval 모드 RTMPose 모델, onnx 백엔드: RTMPoseONNX
+    """
+    if backend == 'onnx':
+        try:
+            from rtmpose_onnx import load_rtmpose_onnx
+        except ImportError:
+            from .rtmpose_onnx import load_rtmpose_onnx
+        return load_rtmpose_onnx(onnx_model, num_threads=onnx_num_threads)
+    return load_rtmpose_model(device)
 
 class RTMPoseVirtualFitting:
     """RTMPose 기반 실시간 가상 피팅 클래스"""
     
-    def __init__(self, cloth_image_path='input/cloth.jpg', device='cuda:0'):
+    def __init__(self, cloth_image_path='input/cloth.jpg', device='cuda:0', model=None, model_lock=None,
+                 pose_backend='torch', onnx_num_threads=None, onnx_model=None, pose_process=False, pose_worker=None,
+                 sprite_cache_options=None):
         """
         Args:
             cloth_image_path: 옷 이미지 경로
             device: 'cuda:0' 또는 'cpu'
+            model: 이미 로드된 RTMPose 모델 (세션 간 공유, None이면 직접 로드)
+            model_lock: 공유 모델 추론 직렬화용 락 (None이면 인스턴스 전용 락 생성)
+            pose_backend: 'torch' (mmpose/PyTorch) 또는 'onnx' (ONNX Runtime CPU)
+            onnx_num_threads: ONNX intra-op 스레드 수 (None이면 자동 튜닝)
+            onnx_model: ONNX 모델 'fp32' (기본), 'int8' 또는 파일 경로
+            pose_process: True면 포즈 추론(+ 세그멘테이션)을 별도 워커 프로세스에서 실행 (공유 메모리 프레임 링)
+            pose_worker: 세션 매니저가 공유하는 PoseWorkerProcess (있으면 pose_process로 간주, 채널만 할당)
+            sprite_cache_options: SpriteCache 설정 (scale_bin, rotation_bin, shear_bin, max_bytes), 없는 항목은 기본값
         """
         # 현재 파일의 절대 경로 기준으로 경로 설정
         current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -83,6 +226,10 @@ class RTMPoseVirtualFitting:
         self.cloth_img = None
         self.cloth_original = None
         self.cloth_keypoints = None  # 옷의 관절 위치
+        self.cloth_asset = None  # 에셋 캐시 엔트리 (축소 피라미드 포함)
+        self.garment_id = None  # 클라이언트 렌더링용 옷 식별자 (옷 교체 시 변경)
+        self.garment_png = None  # 클라이언트 다운로드용 배경 제거 옷 PNG (지연 인코딩)
+        self.cloth_lock = threading.Lock()  # 옷 교체(swap_cloth)와 렌더링 간 동기화
         self.device = device
         
         # 추론 최적화: 시간 기반 추론 제어 (25 FPS - 벤치마크 최적값)
@@ -90,6 +237,11 @@ class RTMPoseVirtualFitting:
         self.inference_interval = 0.04  # 0.04초 = 25 FPS (벤치마크: 5000.96 FPS)
         self.last_pose_result = None
         
+        # 키포인트 시간 필터: 추론 결과를 캡처 시각 기준으로 평활화하고 렌더링 시각까지 외삽
+        # (추론 빈도를 낮춰도 옷이 떨리거나 늦게 따라오지 않도록)
+        self.use_pose_filter = True
+        self.pose_filter = OneEuroPoseFilter()
+        
         # 출력 최적화 (60 FPS - 최대)
         self.output_fps = 60
         self.output_interval = 1 / self.output_fps  # 0.0167초
@@ -102,6 +254,9 @@ class RTMPoseVirtualFitting:
         # 추론 해상도 최적화 (GPU 사용량 증가)
         self.inference_scale = 0.65  # 추론 시 해상도 스케일 (65% - GPU 부하 증가)
         self.use_inference_downscale = True  # 추론 다운스케일 활성화
+        self.submit_interval = 0.0  # 비동기 추론 프레임 제출 최소 간격 (초, 0 = 매 프레임)
+        self.last_submit_time = 0
+        self.last_pose_captured_at = None  # 최근 추론 결과의 캡처 시각 (staleness 측정)
         
         # 비동기 추론 설정
         self.use_async_inference = True  # 비동기 추론 활성화
@@ -109,68 +264,134 @@ class RTMPoseVirtualFitting:
         self.use_batch_inference = True  # 배치 처리 활성화
         self.batch_size = 10  # 배치 크기 (최적값: 10)
         self.frame_timeout = 0.050  # 프레임 타임아웃 (초) - 50ms (테스트 결과: 최고 성능)
+        # 배치 추론 방식: 'tensor' = 수집한 프레임을 하나의 NCHW 텐서로 단일 forward
+        #                 'per_frame' = 프레임마다 inference_topdown (GPU는 CUDA Streams)
+        self.batch_backend = 'tensor'
+        # 단일 프레임 추론 방식: True = 경량 경로(rtmpose_lite, mmpose 파이프라인 우회)
+        #                       False = inference_topdown
+        self.use_lite_inference = True
+        # 포즈 모델 백엔드: 'torch' = mmpose/PyTorch, 'onnx' = ONNX Runtime CPU (배치/단일 모두 ONNX 그래프 실행)
+        self.pose_backend = pose_backend
+        self.inference_stats = {
+            "batches": 0,
+            "frames": 0,
+            "last_batch_size": 0,
+            "last_batch_ms": 0.0,
+            "avg_batch_ms": 0.0,
+            "avg_frame_ms": 0.0
+        }
+        
+        # 최신 프레임 메일박스: 단일 슬롯 + 조건 변수, 워커가 유휴가 되는 즉시 최신 프레임 추론
+        # (False면 기존 inference_queue 배치 수집 + result_queue 방식)
+        self.use_frame_mailbox = True
+        self.frame_mailbox = LatestFrameMailbox()
+        self.result_cell = LatestResultCell()
+        
+        # 자동 튜너: staleness/CPU 측정값으로 inference_scale, batch_size(+frame_timeout), submit_interval 조정
+        # (위 고정값은 시작값으로만 사용, 장비에 맞게 범위 안에서 수렴)
+        self.use_auto_tuner = True
+        self.auto_tuner = InferenceAutoTuner(
+            target_staleness=0.08,  # 표시 포즈 staleness p90 목표 (80ms)
+            cpu_budget=0.75,        # 프로세스 CPU 사용률 상한 (전체 코어 대비)
+            bounds={"batch_size": (1, 1)} if self.use_frame_mailbox else None  # 메일박스는 항상 1장
+        )
+        # 사람 박스 추적: 이전 키포인트 + 여백 박스를 RTMPose 사람 박스로 사용 (신뢰도 낮으면 프레임 전체)
+        self.use_person_tracking = True
+        self.person_tracker = PersonTracker()
         self.inference_queue = queue.Queue(maxsize=22)  # 큐 크기 최적화 (테스트 결과: 22)
         self.result_queue = queue.Queue(maxsize=11)  # 결과 큐 (추론 큐의 절반)
         self.inference_thread = None
         self.running = False
         
+        # 프로세스 분리 추론: 프레임은 공유 메모리 링으로 보내고 결과는 공유 배열에서 읽음
+        # (Flask 프로세스에는 추론 스레드를 두지 않아 요청 처리/인코딩과 GIL 경합 없음)
+        self.use_pose_process = pose_process or pose_worker is not None
+        self.pose_worker = pose_worker
+        self.owns_pose_worker = False  # 직접 만든 워커면 종료 시 함께 정리
+        self.pose_channel = None
+        
         # 스트리밍 제어 (새로 추가)
         self.streaming_enabled = False  # 스트리밍 on/off
         self.streaming_lock = threading.Lock()  # 스레드 안전성
+        self.render_lock = threading.Lock()  # 프레임 파이프라인 렌더링 단계: 세션 내 렌더링 직렬화
+        # 스트림 요청 입장 제어: 처리 중이면 최신 프레임 하나만 대기 (나머지는 skipped) + 권장 전송 간격
+        self.admission = StreamAdmission(policy='coalesce')
         
         # 성능 최적화: 캐싱
         self.resized_cloth_cache = {}  # shoulder_width를 키로 사용
-        self.warped_cloth_cache = {}   # 변형된 옷 캐시
+        self.warped_cloth_cache = {}   # 변형된 옷 캐시 (렌더 캐시: 마지막 변형 레이어 + 사용한 관절 위치)
         self.cache_max_size = 5        # 최대 캐시 크기
         
+        # 렌더 캐시: 관련 관절이 모두 임계값 이내로만 움직였으면 변형/마스크 생략하고 합성만 수행
+        self.use_render_cache = True
+        self.render_cache_threshold = 2.0   # 관절 이동 허용치 (원본 해상도 픽셀)
+        self.render_cache_max_age = 1.0     # 최대 재사용 시간 (초, 세그멘테이션/얼굴 마스크 주기적 갱신)
+        self.render_cache_stats = {"hits": 0, "misses": 0}
+        
+        # 비동기 세그멘테이션: 포즈 추론과 같은 제출 프레임을 축소해 별도 스레드에서 처리
+        # (렌더링 루프에서는 최신 저해상도 마스크를 옷 스프라이트 영역만 업샘플)
+        self.use_async_segmentation = True
+        self.segmentation_width = 256        # 세그멘테이션 입력 폭 (px)
+        self.segmentation_interval = 0.1     # 세그멘테이션 주기 (초, 10 FPS)
+        self.segmentation_max_age = 0.5      # 이보다 오래된 마스크는 사용 안 함 (초)
+        self.segmentation_queue = queue.Queue(maxsize=1)
+        self.segmentation_result = None      # (저해상도 마스크, 캡처 시각)
+        self.last_segmentation_submit = 0
+        self.segmentation_thread = None
+        
+        # 피부색 모델: 코 주변 YCrCb 평균/표준편차의 EMA (매 프레임 재추정하지 않음)
+        self.skin_model = None
+        self.skin_model_interval = 10  # N프레임마다 샘플링
+        self.skin_model_ema = 0.3      # 새 샘플 반영 비율
+        self.skin_model_frames = 0
+        
+        # 스프라이트 캐시: 양자화된 어파인(스케일/회전/전단) 키로 변형된 옷 재사용, 평행이동은 오프셋으로 처리
+        self.use_sprite_cache = True
+        sprite_options = dict(
+            scale_bin=0.01,                  # 스케일 1% 구간
+            rotation_bin=0.25,               # 회전 0.25도 구간 (어깨 앵커에서 먼 밑단 오차가 가장 큰 항목)
+            shear_bin=0.01,                  # 전단 0.01 구간
+            max_bytes=64 * 1024 * 1024       # 세션당 64MB
+        )
+        sprite_options.update(sprite_cache_options or {})
+        self.sprite_cache = SpriteCache(**sprite_options)
+        
+        # 융합 렌더링: 세그멘테이션 교집합 + 얼굴/목 억제 + 블렌딩을 옷 ROI 단일 패스로 (비동기 세그멘테이션 사용 시)
+        # 마스크 업샘플 버퍼는 세션별 풀에서 재사용 (프레임마다 임시 배열 할당 없음)
+        self.use_fused_render = True
+        self.render_pool = RenderBufferPool()
+        
+        # ROI 델타 프레임 응답 (mode='delta'): 옷이 그려진 영역만 인코딩, 키프레임 간격마다 전체 프레임
+        self.delta_encoder = DeltaFrameEncoder(keyframe_interval=30)
+        
+        # 단계별 지연 히스토그램 (p50/p95/p99, /api/fit/metrics), stage_metrics.set_enabled(False)로 실행 중 끄기
+        self.stage_metrics = StageMetrics()
+        
         # GPU 사용 여부 확인
         self.use_gpu = self._check_gpu()
         
-        # PyTorch GPU 최적화 설정
-        if torch.cuda.is_available() and 'cuda' in device:
-            # GPU 메모리 할당 최적화
-            torch.backends.cudnn.benchmark = True  # cuDNN 자동 튜닝 (속도 향상)
-            torch.backends.cuda.matmul.allow_tf32 = True  # TF32 연산 허용 (RTX 30xx 이상)
-            torch.backends.cudnn.allow_tf32 = True
-            # Mixed Precision 활성화 고려 (추후 적용 가능)
-            print("[RTMPose] [GPU 최적화] cuDNN benchmark, TF32 활성화")
-        
-        # RTMPose 모델 초기화 (절대 경로 사용)
-        config_file = os.path.join(current_dir, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.py')
-        checkpoint_file = os.path.join(current_dir, 'models', 'rtmpose-s_simcc-aic-coco_pt-aic-coco_420e-256x192-fcb2599b_20230126.pth')
-        
-        # 파일 존재 여부 확인
-        if not os.path.exists(config_file):
-            raise FileNotFoundError(f"Config file not found: {config_file}")
-        if not os.path.exists(checkpoint_file):
-            raise FileNotFoundError(f"Checkpoint file not found: {checkpoint_file}")
-        
-        print(f"[RTMPose] 모델 로딩 중... (device: {device})")
-        print(f"[RTMPose] Config: {config_file}")
-        print(f"[RTMPose] Checkpoint: {checkpoint_file}")
+        # RTMPose 모델 (세션 매니저가 공유 모델을 넘기면 재사용, 아니면 직접 로드)
+        if model is not None:
+            self.model = model
+            print("[RTMPose] 공유 모델 사용 (모델 로딩 생략)")
+        elif self.use_pose_process:
+            self.model = None  # 워커 프로세스에서 로드
+            if self.pose_worker is None:
+                self.pose_worker = PoseWorkerProcess({
+                    'backend': pose_backend,
+                    'device': device,
+                    'onnx_model': onnx_model,
+                    'onnx_num_threads': onnx_num_threads,
+                    'segmentation': self.use_async_segmentation,
+                    'segmentation_width': self.segmentation_width,
+                    'segmentation_interval': self.segmentation_interval
+                })
+                self.owns_pose_worker = True
+        else:
+            self.model = load_pose_model(device, pose_backend, onnx_num_threads, onnx_model)
         
-        try:
-            self.model = init_model(config_file, checkpoint_file, device=device)
-            
-            # 모델을 eval 모드로 설정 (Dropout, BatchNorm 비활성화)
-            self.model.eval()
-            
-            # GPU 워밍업 (첫 추론 속도 개선)
-            if torch.cuda.is_available() and 'cuda' in device:
-                print("[RTMPose] GPU 워밍업 중...")
-                # 더미 이미지로 워밍업 (실제 추론 함수 사용)
-                dummy_image = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
-                with torch.no_grad():
-                    _ = inference_topdown(self.model, dummy_image)
-                torch.cuda.empty_cache()
-                print("[RTMPose] GPU 워밍업 완료")
-            
-            print("[RTMPose] 모델 로딩 완료")
-        except Exception as e:
-            print(f"[RTMPose] [ERROR] 모델 로딩 실패: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+        # 공유 모델 동시 추론 방지용 락 (세션 간 공유)
+        self.model_lock = model_lock if model_lock is not None else threading.Lock()
         
         # 옷 이미지 로드 및 배경 제거
         try:
@@ -204,7 +425,11 @@ class RTMPoseVirtualFitting:
             print(f"[RTMPose] 비동기 추론: 활성화 (백그라운드 처리)")
             if self.use_batch_inference:
                 print(f"[RTMPose] 배치 처리: 활성화 (배치 크기 {self.batch_size}, 타임아웃 {int(self.frame_timeout*1000)}ms)")
-                if torch.cuda.is_available() and 'cuda' in self.device:
+                if self.pose_backend == 'onnx':
+                    print(f"[RTMPose] 배치 방식: ONNX Runtime (CPU, 스레드 {self.model.num_threads})")
+                elif self.batch_backend == 'tensor':
+                    print(f"[RTMPose] 배치 방식: 텐서 배치 (단일 forward)")
+                elif cuda_enabled(self.device):
                     print(f"[RTMPose] CUDA Streams: 활성화 (GPU 병렬 처리)")
                     print(f"[RTMPose] 실시간 최적화: 최신 프레임 우선 처리")
                     print(f"[RTMPose] 예상 처리량: ~500 FPS (테스트 결과 기반)")
@@ -217,23 +442,154 @@ class RTMPoseVirtualFitting:
         print(f"[RTMPose] 스켈레톤 표시: 비활성화 (최적 성능)")
     
     def _check_gpu(self):
-        """GPU 사용 가능 여부 확인"""
-        try:
-            import torch
-            if torch.cuda.is_available() and 'cuda' in self.device:
-                print(f"[RTMPose] [OK] GPU 모드 활성화")
-                return True
-        except:
-            pass
+        """GPU 사용 가능 여부 확인 (device가 cpu면 torch를 임포트하지 않음)"""
+        if cuda_enabled(self.device):
+            print(f"[RTMPose] [OK] GPU 모드 활성화")
+            return True
         print("[RTMPose] [WARNING] CPU 모드로 실행")
         return False
     
     def start_inference_thread(self):
         """비동기 추론 스레드 시작"""
         self.running = True
-        self.inference_thread = threading.Thread(target=self._inference_worker, daemon=True)
+        
+        if self.use_pose_process:
+            if self.owns_pose_worker:
+                self.pose_worker.start()
+            self.pose_channel = self.pose_worker.open_channel()
+            if self.pose_channel is None:
+                raise RuntimeError("포즈 워커 채널 부족 (max_sessions 확인)")
+            print(f"[RTMPose] 포즈 워커 프로세스 채널 {self.pose_channel.channel} 사용")
+            return
+        
+        if self.use_frame_mailbox:
+            self.frame_mailbox.reopen()
+            self.inference_thread = threading.Thread(target=self._mailbox_worker, daemon=True)
+        else:
+            self.inference_thread = threading.Thread(target=self._inference_worker, daemon=True)
         self.inference_thread.start()
         print("[RTMPose] 비동기 추론 스레드 시작")
+        
+        if self.use_async_segmentation:
+            self.segmentation_thread = threading.Thread(target=self._segmentation_worker, daemon=True)
+            self.segmentation_thread.start()
+            print(f"[RTMPose] 비동기 세그멘테이션 스레드 시작 (폭 {self.segmentation_width}px, "
+                  f"{1 / self.segmentation_interval:.0f} FPS)")
+    
+    def _segmentation_worker(self):
+        """백그라운드 세그멘테이션 워커 (저해상도, 최신 프레임만 처리)"""
+        while self.running:
+            try:
+                frame_data = self.segmentation_queue.get(timeout=0.15)
+                if frame_data is None:  # 종료 신호
+                    break
+                
+                frame_small, captured_at = frame_data
+                mask = segment_body_lowres(frame_small)
+                if mask is not None:
+                    self.segmentation_result = (mask, captured_at)
+            except queue.Empty:
+                continue
+            except Exception as e:
+                print(f"[RTMPose] 세그멘테이션 워커 에러: {e}")
+                continue
+    
+    def _get_inference_bbox(self, inference_shape, original_w, original_h, current_time):
+        """추적 중인 사람 박스 → 추론 해상도 좌표 (x1, y1, x2, y2), 추적 중이 아니면 None (프레임 전체)"""
+        if not self.use_person_tracking:
+            return None
+        box = self.person_tracker.get_box(original_w, original_h, current_time)
+        if box is None:
+            return None
+        sx = inference_shape[1] / original_w
+        sy = inference_shape[0] / original_h
+        return box[0] * sx, box[1] * sy, box[2] * sx, box[3] * sy
+    
+    def _submit_frame(self, inference_frame, original_w, original_h, captured_at, bbox=None):
+        """
+        추론 프레임 제출 (포즈 추론 + 세그멘테이션이 같은 프레임을 사용)
+        - 포즈: 매 프레임 최신 것만 유지, bbox가 있으면 해당 사람 박스만 추론 (추론 해상도 좌표)
+        - 세그멘테이션: segmentation_interval마다 segmentation_width로 축소해 제출 (항상 프레임 전체)
+        - 워커 프로세스 사용 시: 공유 메모리 링에 복사만 (세그멘테이션 주기는 워커가 관리)
+        """
+        if self.pose_channel is not None:
+            self.pose_channel.submit(inference_frame, original_w, original_h, captured_at, bbox)
+            return
+        
+        if self.use_frame_mailbox:
+            self.frame_mailbox.put((inference_frame, original_w, original_h, captured_at, bbox))
+        else:
+            self._submit_to_queue(inference_frame, original_w, original_h, captured_at, bbox)
+        
+        if not self.use_async_segmentation or captured_at - self.last_segmentation_submit < self.segmentation_interval:
+            return
+        self.last_segmentation_submit = captured_at
+        
+        h, w = inference_frame.shape[:2]
+        seg_w = min(self.segmentation_width, w)
+        seg_h = max(1, int(round(h * seg_w / w)))
+        frame_small = cv2.resize(inference_frame, (seg_w, seg_h), interpolation=cv2.INTER_AREA)
+        
+        try:
+            self.segmentation_queue.get_nowait()  # 처리 전인 이전 프레임 제거
+        except queue.Empty:
+            pass
+        try:
+            self.segmentation_queue.put_nowait((frame_small, captured_at))
+        except queue.Full:
+            pass
+    
+    def _submit_to_queue(self, inference_frame, original_w, original_h, captured_at, bbox=None):
+        """기존 방식: 추론 큐를 비우고 최신 프레임 추가 (배치 워커용)"""
+        # 추론 큐에 프레임 추가 (오래된 프레임 제거 후 최신 것만 추가)
+        try:
+            # 큐에 있는 오래된 프레임 전부 제거 (실시간성 보장)
+            while not self.inference_queue.empty():
+                try:
+                    self.inference_queue.get_nowait()
+                except queue.Empty:
+                    break
+            
+            # 최신 프레임만 추가 (캡처 시각 포함 → 결과 타임스탬프로 사용)
+            self.inference_queue.put_nowait((inference_frame, original_w, original_h, captured_at, bbox))
+        except queue.Full:
+            pass  # 추론이 바쁘면 프레임 드롭
+    
+    def _get_segmentation_mask(self, current_time):
+        """최신 저해상도 세그멘테이션 마스크 (없거나 오래되었으면 None)"""
+        result = self.segmentation_result
+        if self.pose_channel is not None:
+            result = self.pose_channel.get_segmentation()
+        if result is None or current_time - result[1] > self.segmentation_max_age:
+            return None
+        return result[0]
+    
+    def _mailbox_worker(self):
+        """
+        백그라운드 추론 워커 (최신 프레임 메일박스)
+        - 유휴 상태에서 프레임이 들어오는 즉시 추론 시작 (배치 수집 대기 없음)
+        - 추론 중 들어온 프레임은 최신 것 하나만 남아 다음 추론에 사용
+        """
+        while self.running:
+            try:
+                frame_data = self.frame_mailbox.get(timeout=0.15)
+                if frame_data is None:  # 타임아웃 또는 종료 신호
+                    continue
+                
+                frame, original_w, original_h, captured_at, bbox = self._unpack_frame_data(frame_data)
+                
+                start = time.time()
+                pose = self._infer_single(frame, bbox)
+                self._record_batch_timing(1, time.time() - start)
+                
+                if pose is not None:
+                    pose = self._scale_pose_to_original(pose, frame.shape, original_w, original_h)
+                    self.result_cell.put((pose, captured_at))
+            except Exception as e:
+                print(f"[RTMPose] 추론 워커 에러: {e}")
+                import traceback
+                traceback.print_exc()
+                continue
     
     def _inference_worker(self):
         """백그라운드 추론 워커 (배치 처리 지원)"""
@@ -242,6 +598,7 @@ class RTMPoseVirtualFitting:
                 if self.use_batch_inference:
                     # === 배치 처리 모드 ===
                     batch_frames = []
+                    batch_bboxes = []
                     batch_metadata = []
                     
                     # 배치 크기만큼 프레임 수집 (동적 타임아웃)
@@ -257,72 +614,28 @@ class RTMPoseVirtualFitting:
                                 self.running = False
                                 return
                             
-                            frame, original_w, original_h = frame_data
+                            frame, original_w, original_h, captured_at, bbox = self._unpack_frame_data(frame_data)
                             batch_frames.append(frame)
-                            batch_metadata.append((original_w, original_h))
+                            batch_bboxes.append(bbox)
+                            batch_metadata.append((original_w, original_h, captured_at))
                         except queue.Empty:
                             break  # 타임아웃, 수집된 프레임만 처리
                     
                     if not batch_frames:
                         continue
                     
-                    # 배치 추론 실행 (CUDA Streams로 GPU 병렬 처리)
-                    results_batch = []
-                    try:
-                        # === CUDA Streams 병렬 처리 시도 ===
-                        if torch.cuda.is_available() and 'cuda' in self.device:
-                            # 각 프레임마다 독립적인 CUDA 스트림 생성
-                            streams = [torch.cuda.Stream() for _ in range(len(batch_frames))]
-                            
-                            # 각 스트림에서 병렬 추론 (no_grad로 메모리 절약)
-                            stream_results = [None] * len(batch_frames)
-                            with torch.no_grad():  # 그래디언트 계산 비활성화 (추론 속도 향상)
-                                for i, (frame, stream) in enumerate(zip(batch_frames, streams)):
-                                    with torch.cuda.stream(stream):
-                                        stream_results[i] = inference_topdown(self.model, frame)
-                            
-                            # 모든 스트림 완료 대기
-                            torch.cuda.synchronize()
-                            results_batch = stream_results
-                            
-                        else:
-                            # CPU 모드 또는 폴백: 순차 처리
-                            with torch.no_grad():  # CPU도 no_grad 적용
-                                for frame in batch_frames:
-                                    result = inference_topdown(self.model, frame)
-                                    results_batch.append(result)
-                                
-                    except Exception as e:
-                        print(f"[RTMPose] CUDA Streams 실패, 순차 처리로 폴백: {e}")
-                        # 에러 발생 시 기존 방식으로 폴백
-                        results_batch = []
-                        try:
-                            for frame in batch_frames:
-                                result = inference_topdown(self.model, frame)
-                                results_batch.append(result)
-                        except Exception as fallback_error:
-                            print(f"[RTMPose] 폴백 추론도 실패: {fallback_error}")
-                            # 빈 결과 반환
-                            for _ in range(len(batch_frames)):
-                                results_batch.append(None)
+                    # 배치 추론 실행
+                    batch_start = time.time()
+                    poses_batch = self._run_batch_inference(batch_frames, batch_bboxes)
+                    self._record_batch_timing(len(batch_frames), time.time() - batch_start)
                     
                     # 각 결과 처리 및 저장 (모든 배치 결과 활용)
-                    for i, (results, metadata) in enumerate(zip(results_batch, batch_metadata)):
-                        if results is None or len(results) == 0:
+                    for pose, frame, (original_w, original_h, captured_at) in zip(poses_batch, batch_frames, batch_metadata):
+                        if pose is None:
                             continue
                         
-                        original_w, original_h = metadata
-                        
                         # 키포인트를 원본 해상도로 스케일 업
-                        if self.use_inference_downscale and self.inference_scale < 1.0:
-                            inference_h, inference_w = batch_frames[i].shape[:2]
-                            scale_x = original_w / inference_w
-                            scale_y = original_h / inference_h
-                            
-                            for result in results:
-                                pred_instances = result.pred_instances
-                                pred_instances.keypoints[:, :, 0] *= scale_x
-                                pred_instances.keypoints[:, :, 1] *= scale_y
+                        pose = self._scale_pose_to_original(pose, frame.shape, original_w, original_h)
                         
                         # 모든 배치 결과를 큐에 저장 (큐가 가득 차면 오래된 것 제거)
                         if self.result_queue.full():
@@ -331,7 +644,7 @@ class RTMPoseVirtualFitting:
                             except queue.Empty:
                                 pass
                         
-                        self.result_queue.put((results, time.time()))
+                        self.result_queue.put((pose, captured_at))
                     
                     # 배치 처리 후 짧은 대기 (추론 간격 유지)
                     # 25 FPS 유지 = 0.04초 간격
@@ -344,22 +657,14 @@ class RTMPoseVirtualFitting:
                     if frame_data is None:  # 종료 신호
                         break
                     
-                    frame, original_w, original_h = frame_data
+                    frame, original_w, original_h, captured_at, bbox = self._unpack_frame_data(frame_data)
                     
                     # RTMPose 추론 (저해상도)
-                    results = inference_topdown(self.model, frame)
+                    pose = self._infer_single(frame, bbox)
                     
-                    if results and len(results) > 0:
+                    if pose is not None:
                         # 키포인트를 원본 해상도로 스케일 업
-                        if self.use_inference_downscale and self.inference_scale < 1.0:
-                            inference_h, inference_w = frame.shape[:2]
-                            scale_x = original_w / inference_w
-                            scale_y = original_h / inference_h
-                            
-                            for result in results:
-                                pred_instances = result.pred_instances
-                                pred_instances.keypoints[:, :, 0] *= scale_x
-                                pred_instances.keypoints[:, :, 1] *= scale_y
+                        pose = self._scale_pose_to_original(pose, frame.shape, original_w, original_h)
                         
                         # 결과 큐에 저장 (최신 것만 유지)
                         if not self.result_queue.empty():
@@ -368,7 +673,7 @@ class RTMPoseVirtualFitting:
                             except queue.Empty:
                                 pass
                         
-                        self.result_queue.put((results, time.time()))
+                        self.result_queue.put((pose, captured_at))
                     
                     # 0.1초 대기 (10 FPS 유지)
                     time.sleep(self.inference_interval)
@@ -381,22 +686,255 @@ class RTMPoseVirtualFitting:
                 traceback.print_exc()
                 continue
     
+    def _unpack_frame_data(self, frame_data):
+        """
+        추론 큐 항목 → (frame, original_w, original_h, captured_at, bbox)
+        (캡처 시각이 없는 3-튜플은 꺼낸 시각으로, 사람 박스가 없는 항목은 None(프레임 전체)으로 대체)
+        """
+        if len(frame_data) == 5:
+            return frame_data
+        if len(frame_data) == 4:
+            return (*frame_data, None)
+        frame, original_w, original_h = frame_data
+        return frame, original_w, original_h, time.time(), None
+    
+    def _run_batch_inference(self, batch_frames, batch_bboxes=None):
+        """
+        수집된 프레임 배치 추론
+        
+        Args:
+            batch_frames: 추론 해상도 BGR 프레임 리스트
+            batch_bboxes: 프레임별 사람 박스 (x1, y1, x2, y2) 또는 None (None이면 프레임 전체)
+        
+        Returns:
+            프레임별 (17, 3) [x, y, score] 배열 리스트 (실패 시 None 포함)
+        """
+        # === ONNX Runtime: 크롭 배치를 한 번의 session.run으로 실행 ===
+        if self.pose_backend == 'onnx':
+            try:
+                with self.model_lock:
+                    return list(self.model.inference_batch(batch_frames, batch_bboxes))
+            except Exception as e:
+                print(f"[RTMPose] ONNX 배치 추론 실패: {e}")
+                return [None] * len(batch_frames)
+        
+        # === 텐서 배치: 하나의 NCHW 텐서로 단일 forward + 배치 SimCC 디코딩 ===
+        if self.batch_backend == 'tensor':
+            try:
+                with self.model_lock:
+                    return list(inference_batch(self.model, batch_frames, batch_bboxes))
+            except Exception as e:
+                print(f"[RTMPose] 텐서 배치 추론 실패, 프레임별 추론으로 폴백: {e}")
+        
+        # === 프레임별 inference_topdown ===
+        import torch
+        from mmpose.apis import inference_topdown
+
+        topdown_bboxes = [self._topdown_bboxes(bbox) for bbox in (batch_bboxes or [None] * len(batch_frames))]
+        results_batch = []
+        try:
+            # === CUDA Streams 병렬 처리 시도 ===
+            if cuda_enabled(self.device):
+                # 각 프레임마다 독립적인 CUDA 스트림 생성
+                streams = [torch.cuda.Stream() for _ in range(len(batch_frames))]
+                
+                # 각 스트림에서 병렬 추론 (no_grad로 메모리 절약)
+                stream_results = [None] * len(batch_frames)
+                with self.model_lock, torch.no_grad():  # 공유 모델 락 + 그래디언트 비활성화
+                    for i, (frame, stream) in enumerate(zip(batch_frames, streams)):
+                        with torch.cuda.stream(stream):
+                            stream_results[i] = inference_topdown(self.model, frame, topdown_bboxes[i])
+                    
+                    # 모든 스트림 완료 대기
+                    torch.cuda.synchronize()
+                results_batch = stream_results
+                
+            else:
+                # CPU 모드 또는 폴백: 순차 처리
+                with self.model_lock, torch.no_grad():  # CPU도 no_grad 적용
+                    for frame, bboxes in zip(batch_frames, topdown_bboxes):
+                        result = inference_topdown(self.model, frame, bboxes)
+                        results_batch.append(result)
+                    
+        except Exception as e:
+            print(f"[RTMPose] CUDA Streams 실패, 순차 처리로 폴백: {e}")
+            # 에러 발생 시 기존 방식으로 폴백
+            results_batch = []
+            try:
+                with self.model_lock:
+                    for frame, bboxes in zip(batch_frames, topdown_bboxes):
+                        result = inference_topdown(self.model, frame, bboxes)
+                        results_batch.append(result)
+            except Exception as fallback_error:
+                print(f"[RTMPose] 폴백 추론도 실패: {fallback_error}")
+                # 빈 결과 반환
+                return [None] * len(batch_frames)
+        
+        return [pose_array_from_results(results) for results in results_batch]
+    
+    def _infer_single(self, frame, bbox=None):
+        """
+        단일 프레임 추론
+        
+        Args:
+            bbox: 사람 박스 (x1, y1, x2, y2, 추론 해상도 좌표), None이면 프레임 전체
+        
+        Returns:
+            (17, 3) [x, y, score] 배열 (추론 해상도 좌표), 결과 없으면 None
+        """
+        with self.model_lock:
+            if self.pose_backend == 'onnx':
+                return self.model.inference_pose(frame, bbox)
+            if self.use_lite_inference:
+                return inference_pose(self.model, frame, bbox)
+            from mmpose.apis import inference_topdown
+            results = inference_topdown(self.model, frame, self._topdown_bboxes(bbox))
+        return pose_array_from_results(results)
+    
+    def _topdown_bboxes(self, bbox):
+        """사람 박스 → inference_topdown bboxes 인자 ((1, 4) xyxy, 없으면 None = 프레임 전체)"""
+        if bbox is None:
+            return None
+        return np.array([bbox], dtype=np.float32)
+    
+    def _scale_pose_to_original(self, pose, inference_shape, original_w, original_h):
+        """추론 해상도 키포인트를 원본 해상도로 변환 (제자리 수정)"""
+        inference_h, inference_w = inference_shape[:2]
+        if inference_w != original_w or inference_h != original_h:
+            pose[:, 0] *= original_w / inference_w
+            pose[:, 1] *= original_h / inference_h
+        return pose
+    
+    def _record_batch_timing(self, batch_size, elapsed):
+        """배치별 추론 시간 기록 (지수 이동 평균)"""
+        stats = self.inference_stats
+        batch_ms = elapsed * 1000
+        stats["batches"] += 1
+        stats["frames"] += batch_size
+        stats["last_batch_size"] = batch_size
+        stats["last_batch_ms"] = round(batch_ms, 2)
+        
+        ema = 0.1 if stats["batches"] > 1 else 1.0
+        stats["avg_batch_ms"] = round(stats["avg_batch_ms"] * (1 - ema) + batch_ms * ema, 2)
+        stats["avg_frame_ms"] = round(stats["avg_frame_ms"] * (1 - ema) + (batch_ms / batch_size) * ema, 2)
+        
+        if stats["batches"] % 200 == 0:
+            print(f"[RTMPose] 배치 추론({self.batch_backend}): 평균 {stats['avg_batch_ms']:.1f}ms/배치, "
+                  f"{stats['avg_frame_ms']:.1f}ms/프레임 (최근 배치 {batch_size}장)")
+    
+    def _lookup_render_cache(self, pose, frame_shape, cloth_original, current_time):
+        """
+        렌더 캐시 조회 (관절 변화가 임계값 이내면 변형된 옷 레이어 재사용)
+        
+        Returns:
+            (warped_cloth, offset, render_masks) 또는 None
+            (render_masks: 융합 렌더링 입력 마스크, 정제가 끝난 레이어면 None)
+        """
+        entry = self.warped_cloth_cache
+        hit = False
+        if entry and entry['cloth'] is cloth_original and entry['frame_shape'] == frame_shape[:2] \
+                and current_time - entry['created_at'] <= self.render_cache_max_age:
+            joints = pose[:RENDER_CACHE_JOINTS]
+            visible = joints[:, 2] >= 0.3
+            if np.array_equal(visible, entry['visible']):
+                delta = np.abs(joints[visible, :2] - entry['keypoints'][visible])
+                hit = delta.size == 0 or delta.max() <= self.render_cache_threshold
+        
+        if hit:
+            self.render_cache_stats["hits"] += 1
+            return entry['layer'], entry['offset'], entry['render_masks']
+        self.render_cache_stats["misses"] += 1
+        return None
+    
+    def _store_render_cache(self, pose, frame_shape, cloth_original, warped_cloth, offset, current_time,
+                            render_masks=None):
+        """변형된 옷 레이어와 사용한 관절 위치 저장 (다음 프레임 비교 기준)"""
+        joints = pose[:RENDER_CACHE_JOINTS]
+        self.warped_cloth_cache = {
+            'keypoints': joints[:, :2].copy(),
+            'visible': joints[:, 2] >= 0.3,
+            'cloth': cloth_original,
+            'frame_shape': frame_shape[:2],
+            'layer': warped_cloth,
+            'offset': offset,
+            'render_masks': render_masks,
+            'created_at': current_time
+        }
+    
+    def get_render_cache_stats(self):
+        """렌더 캐시 적중률 반환"""
+        hits = self.render_cache_stats["hits"]
+        total = hits + self.render_cache_stats["misses"]
+        return dict(self.render_cache_stats, hit_rate=round(hits / total, 3) if total else 0.0)
+    
+    def get_sprite_cache_stats(self):
+        """스프라이트 캐시 적중률/메모리 사용량 반환"""
+        return self.sprite_cache.get_stats()
+    
+    def get_render_pool_stats(self):
+        """융합 렌더링 버퍼 풀 할당 횟수/메모리 사용량 반환"""
+        return {
+            "enabled": self.use_fused_render,
+            "allocations": self.render_pool.allocations,
+            "bytes": self.render_pool.nbytes(),
+            "frame_shape": self.render_pool.frame_shape
+        }
+    
+    def get_stage_metrics(self):
+        """단계별 지연 p50/p95/p99 (ms)"""
+        return self.stage_metrics.snapshot()
+    
+    def get_inference_stats(self):
+        """배치 추론 통계 반환"""
+        stats = dict(self.inference_stats, backend=self.batch_backend, pose_backend=self.pose_backend,
+                     person_tracker=self.person_tracker.get_stats())
+        if self.pose_worker is not None:
+            stats["pose_worker"] = self.pose_worker.get_stats()
+        return stats
+    
     def stop_inference_thread(self):
         """비동기 추론 스레드 종료"""
         if self.use_async_inference and self.running:
             self.running = False
+            if self.use_pose_process:
+                if self.pose_channel is not None:
+                    self.pose_channel.close()
+                    self.pose_channel = None
+                if self.owns_pose_worker:
+                    self.pose_worker.stop()
+                print("[RTMPose] 포즈 워커 채널 반납")
+                return
+            self.frame_mailbox.close()
             try:
                 self.inference_queue.put(None, timeout=1)  # 종료 신호
             except:
                 pass
             if self.inference_thread and self.inference_thread.is_alive():
                 self.inference_thread.join(timeout=2)
+            if self.segmentation_thread and self.segmentation_thread.is_alive():
+                try:
+                    self.segmentation_queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self.segmentation_queue.put(None)  # 종료 신호
+                self.segmentation_thread.join(timeout=2)
             print("[RTMPose] 비동기 추론 스레드 종료")
     
     def start_streaming(self):
         """스트리밍 시작 (출력 활성화)"""
         with self.streaming_lock:
             self.streaming_enabled = True
+            self.pose_filter.reset()  # 이전 스트림의 속도로 외삽하지 않도록
+            self.skin_model = None    # 사람이 바뀌었을 수 있으므로 피부색 모델 재추정
+            self.segmentation_result = None
+            self.last_pose_captured_at = None
+            self.auto_tuner.reset()
+            self.person_tracker.reset()
+            self.delta_encoder.reset()
+            self.frame_mailbox.clear()
+            self.result_cell.clear()
+            if self.pose_channel is not None:
+                self.pose_channel.reset()
             print("[RTMPose] 스트리밍 시작 - 출력 활성화")
     
     def stop_streaming(self):
@@ -411,113 +949,172 @@ class RTMPoseVirtualFitting:
             return self.streaming_enabled
     
     def load_cloth(self):
-        """옷 이미지 로드 및 배경 제거"""
-        # 현재 디렉토리 기준 절대 경로
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        output_dir = os.path.join(current_dir, 'output')
-        os.makedirs(output_dir, exist_ok=True)
-        
-        output_path = os.path.join(output_dir, 'cloth_nobg.png')
-        
-        # output/cloth_nobg.png가 이미 있으면 그것을 사용
-        if os.path.exists(output_path):
-            try:
-                self.cloth_original = cv2.imread(output_path, cv2.IMREAD_UNCHANGED)
-                
-                if self.cloth_original is not None:
-                    print(f"[RTMPose] 기존 배경 제거 이미지 사용: {output_path}")
-                    
-                    # 고급 키포인트 감지 사용
-                    self.cloth_keypoints = detect_cloth_keypoints_advanced(output_path)
-                    
-                    if self.cloth_keypoints:
-                        print(f"[RTMPose] 옷 어깨 너비: {self.cloth_keypoints.get('shoulder_width', 'N/A')}px")
-                    
-                    print(f"[RTMPose] 옷 이미지 로드 완료 (캐시 사용)")
-                    return True
-            except Exception as e:
-                print(f"[RTMPose] 기존 이미지 로드 실패: {e}, 새로 생성합니다")
+        """
+        옷 이미지 로드 및 배경 제거
+        - 원본 이미지 내용의 해시로 에셋 캐시를 조회하므로, 이전에 본 옷이면 rembg를 건너뜀
+        - 원본이 바뀌면 해시도 바뀌므로 오래된 배경 제거 결과가 재사용되지 않음
         
+        Returns:
+            bool: 로드 성공 여부
+        """
         # 원본 이미지가 없으면 에러
         if not os.path.exists(self.cloth_image_path):
             print(f"[RTMPose] 옷 이미지가 없습니다: {self.cloth_image_path}")
             return False
         
         try:
-            # 배경 제거
-            print(f"[RTMPose] 새로 배경 제거 시작: {self.cloth_image_path}")
-            self.cloth_original = remove_background(self.cloth_image_path, output_path)
+            asset = get_garment_cache().get_or_create(self.cloth_image_path)
+            if asset is None:
+                print(f"[RTMPose] 옷 에셋 생성 실패: {self.cloth_image_path}")
+                return False
             
-            # 고급 키포인트 감지 사용
-            self.cloth_keypoints = detect_cloth_keypoints_advanced(output_path)
+            if asset.keypoints:
+                print(f"[RTMPose] 옷 어깨 너비: {asset.keypoints.get('shoulder_width', 'N/A')}px")
             
-            if self.cloth_keypoints:
-                print(f"[RTMPose] 옷 어깨 너비: {self.cloth_keypoints.get('shoulder_width', 'N/A')}px")
-            
-            print(f"[RTMPose] 옷 이미지 로드 완료 (새로 생성)")
+            self._set_cloth(asset.rgba, asset.keypoints, asset)
+            print(f"[RTMPose] 옷 이미지 로드 완료 (에셋 {asset.content_hash[:12]})")
             return True
         except Exception as e:
             print(f"[RTMPose] 옷 이미지 로드 실패: {e}")
             return False
     
-    def calculate_shoulder_matched_scale(self, body_shoulder_width):
+    def _cloth_snapshot(self):
+        """
+        옷 상태 스냅샷 (cloth_lock으로 한 번에 읽음, 렌더링 도중 swap_cloth로 교체되어도 한 프레임은 같은 옷)
+        
+        Returns:
+            (cloth_original, cloth_keypoints, cloth_asset, resized_cloth_cache, garment_id)
+            리사이즈 캐시도 옷마다 새 dict이므로 이전 옷 프레임이 새 옷 캐시를 오염시키지 않음
+        """
+        with self.cloth_lock:
+            return (self.cloth_original, self.cloth_keypoints, self.cloth_asset,
+                    self.resized_cloth_cache, self.garment_id)
+    
+    def _set_cloth(self, cloth_original, cloth_keypoints, cloth_asset=None):
+        """옷 이미지/키포인트 교체 및 옷 의존 캐시 초기화 (렌더링 중에도 안전하게)"""
+        with self.cloth_lock:
+            self.cloth_original = cloth_original
+            self.cloth_keypoints = cloth_keypoints
+            self.cloth_asset = cloth_asset
+            if cloth_asset is None:
+                self.garment_id = uuid.uuid4().hex[:16]
+            else:
+                # 배경 제거 실패 에셋은 다른 ID (나중에 배경 제거에 성공하면 클라이언트 옷 이미지도 갱신되도록)
+                self.garment_id = cloth_asset.content_hash[:16] + ('-raw' if cloth_asset.degraded else '')
+            self.garment_png = None
+            self.resized_cloth_cache = {}
+            self.warped_cloth_cache = {}
+            self.sprite_cache.clear()
+    
+    def swap_cloth(self, cloth_image_path=None):
+        """
+        실행 중인 모델/추론 스레드는 그대로 두고 옷만 교체
+        (배경 제거 + 키포인트 감지 + 캐시 초기화만 수행)
+        
+        Args:
+            cloth_image_path: 새 옷 이미지 경로 (None이면 기존 경로의 파일을 다시 처리)
+        
+        Returns:
+            bool: 교체 성공 여부
+        """
+        start_time = time.time()
+        
+        if cloth_image_path is not None:
+            self.cloth_image_path = cloth_image_path
+        
+        success = self.load_cloth()
+        
+        elapsed_ms = (time.time() - start_time) * 1000
+        if success:
+            print(f"[RTMPose] 옷 교체 완료 ({elapsed_ms:.0f}ms, 모델 재사용)")
+        else:
+            print(f"[RTMPose] 옷 교체 실패 ({elapsed_ms:.0f}ms)")
+        return success
+    
+    def calculate_shoulder_matched_scale(self, body_shoulder_width, cloth_keypoints):
         """
         옷의 어깨와 신체 어깨를 매칭하여 최적 스케일 계산
         
         Args:
             body_shoulder_width: 신체 어깨 너비 (픽셀)
+            cloth_keypoints: 옷 키포인트 (렌더링 스냅샷)
         
         Returns:
             float: 리사이즈 스케일
         """
-        if not self.cloth_keypoints or 'shoulder_width' not in self.cloth_keypoints:
+        if not cloth_keypoints or 'shoulder_width' not in cloth_keypoints:
             return 1.0
         
-        cloth_shoulder_width = self.cloth_keypoints['shoulder_width']
+        cloth_shoulder_width = cloth_keypoints['shoulder_width']
         scale = body_shoulder_width / cloth_shoulder_width
         scale *= 1.25  # 약간 여유있게 (5% 더 크게)
         
         return scale
     
-    def resize_cloth_by_shoulder_matching(self, body_shoulder_width):
+    def resize_cloth_by_shoulder_matching(self, body_shoulder_width, cloth=None):
         """
         어깨 매칭 기반 자동 리사이즈 (캐싱 최적화)
         
         Args:
             body_shoulder_width: 신체 어깨 너비 (픽셀)
+            cloth: _cloth_snapshot() 결과 (None이면 지금 스냅샷, 렌더링에서는 프레임 시작 시 스냅샷을 전달)
         
         Returns:
-            리사이즈된 옷 이미지 (RGBA)
+            리사이즈된 옷 이미지 (RGBA, 캐시 공유 - 수정 금지)
         """
-        if self.cloth_original is None:
+        cloth_original, cloth_keypoints, cloth_asset, resized_cache, _ = cloth or self._cloth_snapshot()
+        if cloth_original is None:
             return None
         
         # 캐시 키 생성 (10픽셀 단위로 반올림하여 캐시 히트율 향상)
         cache_key = int(body_shoulder_width / 10) * 10
         
         # 캐시 확인
-        if cache_key in self.resized_cloth_cache:
-            return self.resized_cloth_cache[cache_key].copy()
+        if cache_key in resized_cache:
+            return resized_cache[cache_key]
         
-        scale = self.calculate_shoulder_matched_scale(body_shoulder_width)
+        scale = self.calculate_shoulder_matched_scale(body_shoulder_width, cloth_keypoints)
         
-        h, w = self.cloth_original.shape[:2]
+        h, w = cloth_original.shape[:2]
         new_w = int(w * scale)
         new_h = int(h * scale)
         
+        # 축소 피라미드가 있으면 목표 크기에 가장 가까운 (더 큰) 레벨에서 리사이즈
+        source = cloth_original
+        if cloth_asset is not None:
+            _, source = cloth_asset.best_level(scale)
+        
         # INTER_LINEAR이 INTER_AREA보다 빠름 (품질은 약간 낮지만 실시간에 적합)
-        resized = cv2.resize(self.cloth_original, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+        resized = cv2.resize(source, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
         
         # 캐시 저장 (크기 제한)
-        if len(self.resized_cloth_cache) >= self.cache_max_size:
+        if len(resized_cache) >= self.cache_max_size:
             # 가장 오래된 항목 제거 (FIFO)
-            first_key = next(iter(self.resized_cloth_cache))
-            del self.resized_cloth_cache[first_key]
+            first_key = next(iter(resized_cache))
+            del resized_cache[first_key]
         
-        self.resized_cloth_cache[cache_key] = resized.copy()
+        resized.setflags(write=False)  # 캐시를 그대로 반환하므로 읽기 전용 (프레임마다 복사하지 않음)
+        resized_cache[cache_key] = resized
         
         return resized
     
+    def _scale_cloth_keypoints(self, cloth_keypoints, scale_ratio):
+        """옷 키포인트를 리사이즈된 옷 좌표로 스케일 조정 (좌표가 아닌 항목 제외)"""
+        scaled_cloth_keypoints = {}
+        exclude_keys = {'shoulder_width', 'bounding_box', 'cloth_center'}
+        
+        for key, value in cloth_keypoints.items():
+            if key in exclude_keys:
+                continue
+            if isinstance(value, (tuple, list)) and len(value) == 2:
+                try:
+                    x, y = float(value[0]), float(value[1])
+                    scaled_cloth_keypoints[key] = (x * scale_ratio, y * scale_ratio)
+                except (TypeError, ValueError) as e:
+                    print(f"[RTMPose] 키포인트 '{key}' 스케일 조정 실패: {e}")
+                    continue
+        return scaled_cloth_keypoints
+    
     def calculate_body_metrics(self, keypoints, image_shape):
         """
         신체 치수 계산 및 키포인트 추출
@@ -579,7 +1176,7 @@ class RTMPoseVirtualFitting:
     
     def create_face_neck_mask(self, keypoints, scores, image_shape, frame):
         """
-        얼굴과 목 영역 마스크 생성 (피부색 기반)
+        얼굴과 목 영역 마스크 생성 (피부색 기반, 머리 주변 ROI만 처리)
         
         Args:
             keypoints: RTMPose 키포인트 (17개, COCO 포맷)
@@ -588,10 +1185,10 @@ class RTMPoseVirtualFitting:
             frame: 원본 프레임 (BGR, 피부색 샘플링용)
         
         Returns:
-            mask: 얼굴/목 영역 마스크 (255=보호 영역, 0=옷 가능 영역)
+            (mask, offset): 머리 ROI 크기 마스크 (255=보호 영역, 0=옷 가능 영역)와
+                            ROI의 프레임 내 좌상단 좌표 (x, y), 신뢰도 부족 시 (None, None)
         """
         h, w = image_shape[:2]
-        mask = np.zeros((h, w), dtype=np.uint8)
         
         # 얼굴 관련 키포인트
         nose = keypoints[0]  # 코
@@ -604,7 +1201,7 @@ class RTMPoseVirtualFitting:
         
         # 신뢰도 확인
         if scores[0] < 0.3 or scores[5] < 0.3 or scores[6] < 0.3:
-            return mask  # 신뢰도 부족 시 빈 마스크 반환
+            return None, None  # 신뢰도 부족 시 빈 마스크
         
         # 얼굴 중심과 크기 계산
         # 눈 위치 (신뢰도 확인)
@@ -634,67 +1231,48 @@ class RTMPoseVirtualFitting:
         # 얼굴 높이 (눈 거리의 1.5배)
         face_height = eye_distance * 1.5
         
-        # === 피부색 샘플링 (얼굴 중심 영역에서) ===
-        # 코 주변에서 피부색 샘플 추출 (가장 신뢰도 높은 영역)
-        sample_size = int(eye_distance * 0.15)  # 샘플 영역 크기
-        nose_x, nose_y = int(nose[0]), int(nose[1])
+        # === 머리 ROI: 얼굴 타원 + 목 다각형을 감싸는 박스 (+ 모폴로지/블러 여유) ===
+        neck_half = face_width * 0.3  # 목 너비의 절반 (neck_width = face_width * 0.6)
+        pad = FACE_MASK_ROI_PADDING
+        roi_x1 = max(0, int(min(eye_center_x - face_width / 2, shoulder_center_x - neck_half)) - pad)
+        roi_x2 = min(w, int(max(eye_center_x + face_width / 2, shoulder_center_x + neck_half)) + pad)
+        roi_y1 = max(0, int(min(eye_center_y - face_height / 2, nose[1])) - pad)
+        roi_y2 = min(h, int(max(eye_center_y + face_height / 2, shoulder_center_y)) + pad)
+        if roi_x2 <= roi_x1 or roi_y2 <= roi_y1:
+            return None, None
+        
+        roi_offset = (roi_x1, roi_y1)
+        mask = np.zeros((roi_y2 - roi_y1, roi_x2 - roi_x1), dtype=np.uint8)
+        
+        # ROI 좌표계 기준 얼굴/목 도형
+        face_center = (int(eye_center_x) - roi_x1, int(eye_center_y) - roi_y1)
+        face_axes = (int(face_width / 2), int(face_height / 2))
+        chin_y = int(eye_center_y + face_height / 2) - roi_y1
+        
+        def neck_polygon(neck_width):
+            return np.array([
+                [int(eye_center_x - neck_width / 2) - roi_x1, chin_y],  # 왼쪽 턱
+                [int(eye_center_x + neck_width / 2) - roi_x1, chin_y],  # 오른쪽 턱
+                [int(shoulder_center_x + neck_width / 2) - roi_x1, int(shoulder_center_y) - roi_y1],  # 오른쪽 어깨
+                [int(shoulder_center_x - neck_width / 2) - roi_x1, int(shoulder_center_y) - roi_y1]   # 왼쪽 어깨
+            ], dtype=np.int32)
         
-        # 샘플 영역이 프레임 내부인지 확인
-        sample_x1 = max(0, nose_x - sample_size)
-        sample_y1 = max(0, nose_y - sample_size)
-        sample_x2 = min(w, nose_x + sample_size)
-        sample_y2 = min(h, nose_y + sample_size)
+        # === 피부색 모델 (코 주변 YCrCb 평균/표준편차의 EMA, N프레임마다 갱신) ===
+        skin_range = self._update_skin_model(frame, nose, eye_distance)
         
-        if sample_x2 > sample_x1 and sample_y2 > sample_y1:
-            face_sample = frame[sample_y1:sample_y2, sample_x1:sample_x2]
+        if skin_range is not None:
+            lower_skin, upper_skin = skin_range
             
-            # YCrCb 색공간으로 변환 (피부색 검출에 효과적)
-            ycrcb_sample = cv2.cvtColor(face_sample, cv2.COLOR_BGR2YCrCb)
+            # ROI에서만 피부색 마스크 생성
+            ycrcb_roi = cv2.cvtColor(frame[roi_y1:roi_y2, roi_x1:roi_x2], cv2.COLOR_BGR2YCrCb)
+            skin_mask = cv2.inRange(ycrcb_roi, lower_skin, upper_skin)
             
-            # 피부색 범위 계산 (평균 ± 표준편차)
-            mean_ycrcb = np.mean(ycrcb_sample.reshape(-1, 3), axis=0)
-            std_ycrcb = np.std(ycrcb_sample.reshape(-1, 3), axis=0)
-            
-            # 피부색 범위 설정 (평균 ± 2*표준편차)
-            lower_skin = np.array([
-                max(0, mean_ycrcb[0] - 2 * std_ycrcb[0]),
-                max(0, mean_ycrcb[1] - 2 * std_ycrcb[1]),
-                max(0, mean_ycrcb[2] - 2 * std_ycrcb[2])
-            ], dtype=np.uint8)
-            
-            upper_skin = np.array([
-                min(255, mean_ycrcb[0] + 2 * std_ycrcb[0]),
-                min(255, mean_ycrcb[1] + 2 * std_ycrcb[1]),
-                min(255, mean_ycrcb[2] + 2 * std_ycrcb[2])
-            ], dtype=np.uint8)
-            
-            # 전체 프레임에서 피부색 마스크 생성
-            ycrcb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
-            skin_mask = cv2.inRange(ycrcb_frame, lower_skin, upper_skin)
-            
-            # === ROI (관심 영역) 설정: 얼굴+목 영역만 ===
-            roi_mask = np.zeros((h, w), dtype=np.uint8)
-            
-            # 얼굴 영역 타원 (ROI)
-            face_center = (int(eye_center_x), int(eye_center_y))
-            face_axes = (int(face_width / 2), int(face_height / 2))
-            cv2.ellipse(roi_mask, face_center, face_axes, 0, 0, 360, 255, -1)
-            
-            # 목 영역 다각형 (ROI)
-            neck_width = face_width * 0.6  # 목 너비
-            chin_y = int(eye_center_y + face_height / 2)
-            
-            neck_pts = np.array([
-                [int(eye_center_x - neck_width / 2), chin_y],  # 왼쪽 턱
-                [int(eye_center_x + neck_width / 2), chin_y],  # 오른쪽 턱
-                [int(shoulder_center_x + neck_width / 2), int(shoulder_center_y)],  # 오른쪽 어깨
-                [int(shoulder_center_x - neck_width / 2), int(shoulder_center_y)]   # 왼쪽 어깨
-            ], dtype=np.int32)
-            
-            cv2.fillPoly(roi_mask, [neck_pts], 255)
+            # === 얼굴+목 영역 도형 (ROI 마스크) ===
+            cv2.ellipse(mask, face_center, face_axes, 0, 0, 360, 255, -1)
+            cv2.fillPoly(mask, [neck_polygon(face_width * 0.6)], 255)
             
-            # 피부색 마스크와 ROI 마스크 결합 (AND 연산)
-            mask = cv2.bitwise_and(skin_mask, roi_mask)
+            # 피부색 마스크와 도형 마스크 결합 (AND 연산)
+            mask = cv2.bitwise_and(skin_mask, mask)
             
             # 노이즈 제거 (Morphological operations)
             kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (9, 9))
@@ -705,32 +1283,62 @@ class RTMPoseVirtualFitting:
             mask = cv2.GaussianBlur(mask, (21, 21), 11)
         else:
             # 샘플링 실패 시 키포인트 기반 폴백
-            face_center = (int(eye_center_x), int(eye_center_y))
-            face_axes = (int(face_width / 2), int(face_height / 2))
             cv2.ellipse(mask, face_center, face_axes, 0, 0, 360, 255, -1)
-            
-            neck_width = face_width * 0.5
-            chin_y = int(eye_center_y + face_height / 2)
-            
-            neck_pts = np.array([
-                [int(eye_center_x - neck_width / 2), chin_y],
-                [int(eye_center_x + neck_width / 2), chin_y],
-                [int(shoulder_center_x + neck_width / 2), int(shoulder_center_y)],
-                [int(shoulder_center_x - neck_width / 2), int(shoulder_center_y)]
-            ], dtype=np.int32)
-            
-            cv2.fillPoly(mask, [neck_pts], 255)
+            cv2.fillPoly(mask, [neck_polygon(face_width * 0.5)], 255)
             mask = cv2.GaussianBlur(mask, (21, 21), 11)
         
-        return mask
+        return mask, roi_offset
     
-    def refine_cloth_with_face_mask(self, cloth_rgba, face_mask):
+    def _update_skin_model(self, frame, nose, eye_distance):
+        """
+        피부색 모델 갱신 (코 주변 샘플의 YCrCb 평균/표준편차 지수 이동 평균)
+        - skin_model_interval 프레임마다만 샘플링, 그 사이에는 기존 모델 재사용
+        
+        Returns:
+            (lower_skin, upper_skin) uint8 범위, 모델이 없으면 None
+        """
+        model = self.skin_model
+        self.skin_model_frames += 1
+        if model is not None and self.skin_model_frames < self.skin_model_interval:
+            return model['lower'], model['upper']
+        
+        h, w = frame.shape[:2]
+        sample_size = int(eye_distance * 0.15)  # 샘플 영역 크기
+        nose_x, nose_y = int(nose[0]), int(nose[1])
+        sample_x1 = max(0, nose_x - sample_size)
+        sample_y1 = max(0, nose_y - sample_size)
+        sample_x2 = min(w, nose_x + sample_size)
+        sample_y2 = min(h, nose_y + sample_size)
+        
+        if sample_x2 <= sample_x1 or sample_y2 <= sample_y1:
+            # 샘플링 실패: 기존 모델이 있으면 계속 사용
+            return (model['lower'], model['upper']) if model is not None else None
+        
+        self.skin_model_frames = 0
+        ycrcb_sample = cv2.cvtColor(frame[sample_y1:sample_y2, sample_x1:sample_x2], cv2.COLOR_BGR2YCrCb)
+        mean_ycrcb = np.mean(ycrcb_sample.reshape(-1, 3), axis=0)
+        std_ycrcb = np.std(ycrcb_sample.reshape(-1, 3), axis=0)
+        
+        if model is not None:
+            ema = self.skin_model_ema
+            mean_ycrcb = model['mean'] * (1 - ema) + mean_ycrcb * ema
+            std_ycrcb = model['std'] * (1 - ema) + std_ycrcb * ema
+        
+        # 피부색 범위 설정 (평균 ± 2*표준편차)
+        lower_skin = np.clip(mean_ycrcb - 2 * std_ycrcb, 0, 255).astype(np.uint8)
+        upper_skin = np.clip(mean_ycrcb + 2 * std_ycrcb, 0, 255).astype(np.uint8)
+        self.skin_model = {'mean': mean_ycrcb, 'std': std_ycrcb, 'lower': lower_skin, 'upper': upper_skin}
+        return lower_skin, upper_skin
+    
+    def refine_cloth_with_face_mask(self, cloth_rgba, face_mask, offset=None, mask_offset=(0, 0)):
         """
         얼굴/목 마스크를 사용하여 옷 이미지 정제
         
         Args:
             cloth_rgba: 옷 이미지 (RGBA, 알파 채널 포함)
-            face_mask: 얼굴/목 마스크 (255=보호 영역)
+            face_mask: 얼굴/목 마스크 (255=보호 영역, 프레임 크기 또는 머리 ROI)
+            offset: 옷 스프라이트의 프레임 내 좌상단 좌표 (x, y), 있으면 해당 영역만 사용
+            mask_offset: face_mask의 프레임 내 좌상단 좌표 (create_face_neck_mask의 ROI 오프셋)
         
         Returns:
             정제된 옷 이미지 (RGBA)
@@ -738,6 +1346,14 @@ class RTMPoseVirtualFitting:
         if cloth_rgba is None or face_mask is None:
             return cloth_rgba
         
+        # 스프라이트 영역의 마스크만 사용 (머리 ROI 밖은 0)
+        if offset is not None:
+            face_mask = crop_mask_to_sprite(
+                face_mask, (offset[0] - mask_offset[0], offset[1] - mask_offset[1]), cloth_rgba.shape
+            )
+            if not face_mask.any():
+                return cloth_rgba  # 스프라이트와 얼굴/목 영역이 겹치지 않음
+        
         # 옷 이미지 크기와 마스크 크기가 다르면 리사이즈
         if cloth_rgba.shape[:2] != face_mask.shape[:2]:
             face_mask = cv2.resize(face_mask, (cloth_rgba.shape[1], cloth_rgba.shape[0]))
@@ -768,62 +1384,101 @@ class RTMPoseVirtualFitting:
         
         return result
     
-    def process_frame(self, frame, show_skeleton=False, use_warp=True):
+    def _apply_pose_result(self, pose, inference_timestamp, current_time):
+        """비동기 추론 결과 반영 (최근 결과 갱신 + 필터 update + 튜너 기록)"""
+        self.last_pose_result = pose
+        self.last_pose_captured_at = inference_timestamp
+        if self.use_person_tracking:
+            self.person_tracker.update(pose, inference_timestamp)
+        if self.use_pose_filter:
+            self.pose_filter.update(pose, inference_timestamp)
+        self.auto_tuner.record_result(current_time - inference_timestamp)
+    
+    def _run_auto_tuner(self, current_time):
+        """자동 튜너 주기 실행 → 변경된 파라미터 적용"""
+        changes = self.auto_tuner.update(current_time, {
+            "inference_scale": self.inference_scale,
+            "batch_size": 1 if self.use_frame_mailbox else self.batch_size,
+            "submit_interval": self.submit_interval,
+            "frame_timeout": self.frame_timeout
+        })
+        if not changes:
+            return
+        for name, value in changes.items():
+            setattr(self, name, value)
+    
+    def get_auto_tuner_stats(self):
+        """자동 튜너 목표/측정값/결정 내역 + 현재 파라미터"""
+        return dict(
+            self.auto_tuner.get_stats(),
+            enabled=self.use_auto_tuner,
+            params={
+                "inference_scale": self.inference_scale,
+                "batch_size": self.batch_size,
+                "submit_interval": self.submit_interval,
+                "frame_timeout": self.frame_timeout
+            }
+        )
+    
+    def _advance_pose(self, frame, current_time, frame_scale=1.0):
         """
-        프레임 처리 및 가상 피팅 적용 (비동기 추론 + 60 FPS 출력)
+        추론 제출/결과 반영 후 렌더링에 사용할 포즈 (process_frame, 클라이언트 렌더링 공통)
         
         Args:
-            frame: 입력 비디오 프레임 (BGR, 원본 해상도)
-            show_skeleton: 스켈레톤 표시 여부 (기본값: False - 최적 성능)
-            use_warp: 관절 매칭 변형 사용 여부
+            frame: 입력 프레임 (축소 디코딩된 프레임이면 frame_scale < 1)
+            frame_scale: 입력 프레임 크기 / 원본 크기 (IMREAD_REDUCED_COLOR_2 디코딩 시 0.5)
         
         Returns:
-            처리된 프레임 (원본 해상도, 60 FPS)
+            (17, 3) [x, y, score] 원본 해상도 (아직 결과가 없으면 None)
         """
-        # 스트리밍 비활성화 시 원본 프레임 반환 (백그라운드는 계속 실행)
-        if not self.is_streaming():
-            return frame
-        
-        if self.cloth_original is None:
-            return frame
-        
-        current_time = time.time()
-        
-        # 원본 프레임 크기 저장
-        original_h, original_w = frame.shape[:2]
+        # 원본 프레임 크기 저장 (축소 디코딩이면 원본 크기로 환산, 추론 배율은 입력 프레임 기준으로)
+        frame_h, frame_w = frame.shape[:2]
+        original_h, original_w = int(round(frame_h / frame_scale)), int(round(frame_w / frame_scale))
+        inference_scale = self.inference_scale / frame_scale
         
         # === 비동기 추론 처리 ===
         if self.use_async_inference:
-            # 추론용 저해상도 프레임 생성
-            if self.use_inference_downscale and self.inference_scale < 1.0:
-                inference_w = int(original_w * self.inference_scale)
-                inference_h = int(original_h * self.inference_scale)
-                inference_frame = cv2.resize(frame, (inference_w, inference_h), interpolation=cv2.INTER_LINEAR)
-            else:
-                inference_frame = frame.copy()
-            
-            # 추론 큐에 프레임 추가 (오래된 프레임 제거 후 최신 것만 추가)
-            try:
-                # 큐에 있는 오래된 프레임 전부 제거 (실시간성 보장)
-                while not self.inference_queue.empty():
-                    try:
-                        self.inference_queue.get_nowait()
-                    except queue.Empty:
-                        break
+            # 제출 주기가 지났을 때만 추론용 프레임 생성 (자동 튜너가 CPU 예산에 맞춰 조정)
+            if current_time - self.last_submit_time >= self.submit_interval:
+                self.last_submit_time = current_time
+                stage_start = time.perf_counter()
+                
+                # 추론용 저해상도 프레임 생성
+                if self.use_inference_downscale and inference_scale < 1.0:
+                    inference_w = int(frame_w * inference_scale)
+                    inference_h = int(frame_h * inference_scale)
+                    inference_frame = cv2.resize(frame, (inference_w, inference_h), interpolation=cv2.INTER_LINEAR)
+                else:
+                    inference_frame = frame.copy()
                 
-                # 최신 프레임만 추가
-                self.inference_queue.put_nowait((inference_frame, original_w, original_h))
-            except queue.Full:
-                pass  # 추론이 바쁘면 프레임 드롭
+                # 포즈 추론 + 세그멘테이션 큐에 같은 프레임 제출 (포즈는 추적 중인 사람 박스만 추론)
+                bbox = self._get_inference_bbox(inference_frame.shape, original_w, original_h, current_time)
+                self._submit_frame(inference_frame, original_w, original_h, current_time, bbox)
+                self.auto_tuner.record_submit()
+                self.stage_metrics.record("inference_submit", time.perf_counter() - stage_start)
             
-            # 최신 추론 결과 가져오기
-            try:
-                result_data = self.result_queue.get_nowait()
+            # 워커 프로세스 결과 (공유 배열의 최신 포즈)
+            if self.pose_channel is not None:
+                result_data = self.pose_channel.poll()
+                if result_data is not None:
+                    self._apply_pose_result(*result_data, current_time)
+            
+            # 최신 결과 셀 (메일박스 워커)
+            result_data = self.result_cell.take()
+            if result_data is not None:
+                self._apply_pose_result(*result_data, current_time)
+            
+            # 쌓인 추론 결과를 모두 가져와 시간 순서대로 필터에 반영 (배치 결과도 전부 활용)
+            while True:
+                try:
+                    result_data = self.result_queue.get_nowait()
+                except queue.Empty:
+                    break  # 더 이상 결과 없음, 이전 것 사용
                 if result_data:
-                    results, inference_timestamp = result_data
-                    self.last_pose_result = results
-            except queue.Empty:
-                pass  # 아직 결과 없음, 이전 것 사용
+                    self._apply_pose_result(*result_data, current_time)
+            
+            if self.use_auto_tuner:
+                self._run_auto_tuner(current_time)
         
         # === 동기 추론 처리 (비동기 비활성화 시) ===
         else:
@@ -840,130 +1495,212 @@ class RTMPoseVirtualFitting:
             
             if should_infer:
                 # 추론용 저해상도 프레임 생성
-                if self.use_inference_downscale and self.inference_scale < 1.0:
-                    inference_w = int(original_w * self.inference_scale)
-                    inference_h = int(original_h * self.inference_scale)
+                if self.use_inference_downscale and inference_scale < 1.0:
+                    inference_w = int(frame_w * inference_scale)
+                    inference_h = int(frame_h * inference_scale)
                     inference_frame = cv2.resize(frame, (inference_w, inference_h), interpolation=cv2.INTER_LINEAR)
                 else:
                     inference_frame = frame
                 
-                # RTMPose 추론
-                results = inference_topdown(self.model, inference_frame)
+                # RTMPose 추론 (추적 중인 사람 박스)
+                bbox = self._get_inference_bbox(inference_frame.shape, original_w, original_h, current_time)
+                pose = self._infer_single(inference_frame, bbox)
                 
-                if results and len(results) > 0:
+                if pose is not None:
                     # 키포인트를 원본 해상도로 스케일 업
-                    if self.use_inference_downscale and self.inference_scale < 1.0:
-                        scale_x = original_w / inference_w
-                        scale_y = original_h / inference_h
-                        
-                        for result in results:
-                            pred_instances = result.pred_instances
-                            pred_instances.keypoints[:, :, 0] *= scale_x
-                            pred_instances.keypoints[:, :, 1] *= scale_y
-                    
-                    self.last_pose_result = results
+                    self.last_pose_result = self._scale_pose_to_original(
+                        pose, inference_frame.shape, original_w, original_h
+                    )
+                    if self.use_person_tracking:
+                        self.person_tracker.update(self.last_pose_result, current_time)
+                    if self.use_pose_filter:
+                        self.pose_filter.update(self.last_pose_result, current_time)
                 else:
                     if self.last_pose_result is None:
-                        return frame
+                        return None
         
         # === 추론 결과 사용 ===
         if self.last_pose_result is None:
-            return frame
+            return None
         
-        results = self.last_pose_result
+        if self.last_pose_captured_at is not None:
+            self.auto_tuner.record_staleness(current_time - self.last_pose_captured_at)
+            self.stage_metrics.record("pose_staleness", current_time - self.last_pose_captured_at)
+        
+        # 필터 사용 시 렌더링 시각까지 외삽한 포즈, 아니면 최근 추론 결과 그대로
+        pose = None
+        if self.use_pose_filter:
+            pose = self.pose_filter.predict(current_time)
+        if pose is None:
+            pose = self.last_pose_result
+        return pose
+    
+    def render_frame(self, frame, show_skeleton=False, use_warp=True):
+        """
+        프레임 처리 및 가상 피팅 적용 + 옷이 그려진 영역 (ROI 델타 프레임용)
         
-        if not results or len(results) == 0:
-            print("[DEBUG] 포즈 감지 실패: 결과 없음")
-            return frame
+        Args:
+            frame: 입력 비디오 프레임 (BGR, 원본 해상도)
+            show_skeleton: 스켈레톤 표시 여부 (기본값: False - 최적 성능)
+            use_warp: 관절 매칭 변형 사용 여부
+        
+        Returns:
+            (처리된 프레임, 렌더링 영역 (x0, y0, x1, y1)) - 옷을 그리지 않았으면 영역 None
+        """
+        # 스트리밍 비활성화 시 원본 프레임 반환 (백그라운드는 계속 실행)
+        if not self.is_streaming():
+            return frame, None
+        
+        if self.cloth_original is None:
+            return frame, None
+        
+        current_time = time.time()
+        
+        pose = self._advance_pose(frame, current_time)
+        if pose is None:
+            return frame, None
         
         # === 렌더링 처리 ===
-        # 첫 번째 사람의 키포인트 추출
-        pred_instances = results[0].pred_instances
-        keypoints = pred_instances.keypoints[0]  # shape: (17, 2)
-        scores = pred_instances.keypoint_scores[0]  # shape: (17,)
+        # 첫 번째 사람의 키포인트 추출 (pose: (17, 3) [x, y, score])
+        keypoints = pose[:, :2]  # shape: (17, 2)
+        scores = pose[:, 2]  # shape: (17,)
         
         # 신뢰도가 낮은 키포인트는 건너뛰기
         if scores[5] < 0.3 or scores[6] < 0.3:  # 어깨 신뢰도
             print(f"[DEBUG] 어깨 신뢰도 부족: left={scores[5]:.2f}, right={scores[6]:.2f}")
-            return frame
+            return frame, None
+        
+        # 옷 이미지 스냅샷 (렌더링 도중 swap_cloth로 교체되어도 한 프레임은 일관되게)
+        cloth = self._cloth_snapshot()
+        cloth_original, cloth_keypoints = cloth[0], cloth[1]
         
         # 옷 이미지 확인
-        if self.cloth_original is None:
+        if cloth_original is None:
             print("[DEBUG] 옷 이미지가 로드되지 않음")
-            return frame
-        
-        # 키포인트에 score 추가
-        keypoints_with_score = np.concatenate([keypoints, scores[:, np.newaxis]], axis=1)
+            return frame, None
+        
+        # === 렌더 캐시: 관절이 거의 움직이지 않았으면 변형된 옷 레이어 재사용 (합성만 수행) ===
+        if use_warp and cloth_keypoints is not None and self.use_render_cache:
+            cached_layer = self._lookup_render_cache(pose, frame.shape, cloth_original, current_time)
+            if cached_layer is not None:
+                warped_cloth, cloth_offset, render_masks = cached_layer
+                stage_start = time.perf_counter()
+                if render_masks is not None:
+                    result = render_garment_fused(frame, warped_cloth, cloth_offset, self.render_pool, **render_masks)
+                else:
+                    result = overlay_cloth_on_body(frame, warped_cloth, position=None, alpha=1.0, offset=cloth_offset)
+                self.stage_metrics.record("blend", time.perf_counter() - stage_start)
+                return result, sprite_bounds(warped_cloth, cloth_offset, frame.shape)
         
-        # 신체 치수 계산
-        metrics = self.calculate_body_metrics(keypoints_with_score, frame.shape)
+        # 신체 치수 계산 (pose는 이미 [x, y, score] 형식)
+        metrics = self.calculate_body_metrics(pose, frame.shape)
         
         # 얼굴/목 영역 마스크 생성 (피부색 기반)
-        face_neck_mask = self.create_face_neck_mask(keypoints, scores, frame.shape, frame)
+        stage_start = time.perf_counter()
+        face_neck_mask, face_mask_offset = self.create_face_neck_mask(keypoints, scores, frame.shape, frame)
+        self.stage_metrics.record("face_mask", time.perf_counter() - stage_start)
         
         # 옷 처리
-        if use_warp and self.cloth_keypoints is not None:
+        if use_warp and cloth_keypoints is not None:
             # 어깨 매칭 + 관절 변형
             
             # 1단계: 어깨 매칭 기반 자동 리사이즈
-            resized_cloth = self.resize_cloth_by_shoulder_matching(metrics['shoulder_width'])
+            warp_start = time.perf_counter()
+            resized_cloth = self.resize_cloth_by_shoulder_matching(metrics['shoulder_width'], cloth)
             
             if resized_cloth is None:
-                resized_cloth = self.cloth_original.copy()
+                resized_cloth = cloth_original  # 읽기만 하므로 복사 불필요
             
             # 2단계: 옷을 신체 포즈에 맞춰 변형
             h_resized, w_resized = resized_cloth.shape[:2]
-            h_original, w_original = self.cloth_original.shape[:2]
+            h_original, w_original = cloth_original.shape[:2]
             scale_ratio = w_resized / w_original
             
             # 옷 키포인트 스케일 조정
-            scaled_cloth_keypoints = {}
-            exclude_keys = {'shoulder_width', 'bounding_box', 'cloth_center'}
+            scaled_cloth_keypoints = self._scale_cloth_keypoints(cloth_keypoints, scale_ratio)
             
-            for key, value in self.cloth_keypoints.items():
-                if key in exclude_keys:
-                    continue
-                if isinstance(value, (tuple, list)) and len(value) == 2:
-                    try:
-                        x, y = float(value[0]), float(value[1])
-                        scaled_cloth_keypoints[key] = (x * scale_ratio, y * scale_ratio)
-                    except (TypeError, ValueError) as e:
-                        print(f"[RTMPose] 키포인트 '{key}' 스케일 조정 실패: {e}")
-                        continue
+            # 비동기 세그멘테이션 결과 (없으면 이번 프레임은 세그멘테이션 정제 생략, 동기 호출 안 함)
+            async_segmentation = self.use_async_inference and self.use_async_segmentation
+            stage_start = time.perf_counter()
+            segmentation_mask = self._get_segmentation_mask(current_time) if async_segmentation else None
+            segmentation_elapsed = time.perf_counter() - stage_start
+            self.stage_metrics.record("segmentation", segmentation_elapsed)
+            
+            # 융합 렌더링: 정제는 합성 커널에서 함께 처리하므로 변형만 수행
+            fused_render = self.use_fused_render and async_segmentation
             
-            # 어파인 변형 + 세그멘테이션 기반 정제
-            warped_cloth = warp_cloth_to_pose(
+            # 어파인 변형 + 세그멘테이션 기반 정제 (옷이 차지하는 영역만)
+            warped_cloth, cloth_offset = warp_cloth_to_pose_roi(
                 resized_cloth,
                 scaled_cloth_keypoints,
                 metrics['keypoints'],
                 frame.shape,
-                use_segmentation=True,  # 세그멘테이션 활성화
-                frame=frame  # 원본 프레임 전달
+                use_segmentation=not fused_render and (segmentation_mask is not None or not async_segmentation),
+                frame=frame,  # 원본 프레임 전달
+                segmentation_mask=segmentation_mask,
+                sprite_cache=self.sprite_cache if self.use_sprite_cache else None,
+                source_key=(id(cloth_original), resized_cloth.shape[:2])  # 옷 + 리사이즈 구간
             )
+            self.stage_metrics.record("resize_warp", time.perf_counter() - warp_start - segmentation_elapsed)
+            
+            if warped_cloth is None:
+                return frame, None
+            
+            stage_start = time.perf_counter()
+            
+            if fused_render:
+                # 3단계: 세그멘테이션 교집합 + 얼굴/목 억제 + 블렌딩 (옷 ROI 단일 패스, 프레임에 직접 합성)
+                render_masks = {
+                    'segmentation_mask': segmentation_mask,
+                    'torso_rows': get_torso_row_range(metrics['keypoints'], frame.shape[0])
+                                  if segmentation_mask is not None else None,
+                    'face_mask': face_neck_mask,
+                    'face_offset': face_mask_offset
+                }
+                if self.use_render_cache:
+                    self._store_render_cache(pose, frame.shape, cloth_original, warped_cloth, cloth_offset,
+                                             current_time, render_masks)
+                self.render_pool.reserve(frame.shape)
+                result = render_garment_fused(frame, warped_cloth, cloth_offset, self.render_pool, **render_masks)
+                self.stage_metrics.record("blend", time.perf_counter() - stage_start)
+                return result, sprite_bounds(warped_cloth, cloth_offset, frame.shape)
             
             # 3단계: 얼굴/목 영역 정제 (옷이 얼굴을 가리지 않도록)
-            warped_cloth = self.refine_cloth_with_face_mask(warped_cloth, face_neck_mask)
+            warped_cloth = self.refine_cloth_with_face_mask(
+                warped_cloth, face_neck_mask, offset=cloth_offset, mask_offset=face_mask_offset
+            )
+            
+            if self.use_render_cache:
+                self._store_render_cache(pose, frame.shape, cloth_original, warped_cloth, cloth_offset, current_time)
             
-            # 알파 블렌딩
+            # 알파 블렌딩 (스프라이트 영역만)
             result = overlay_cloth_on_body(
                 frame,
                 warped_cloth,
                 position=None,
-                alpha=1.0
+                alpha=1.0,
+                offset=cloth_offset
             )
+            self.stage_metrics.record("blend", time.perf_counter() - stage_start)
+            render_roi = sprite_bounds(warped_cloth, cloth_offset, frame.shape)
         else:
             # 어깨 매칭 리사이즈만 사용
             
-            resized_cloth = self.resize_cloth_by_shoulder_matching(metrics['shoulder_width'])
+            resized_cloth = self.resize_cloth_by_shoulder_matching(metrics['shoulder_width'], cloth)
             
             if resized_cloth is None:
                 resized_cloth = resize_cloth_to_body(
-                    self.cloth_original,
+                    cloth_original,
                     metrics['shoulder_width'] * 1.2,
                     metrics['body_height'] * 1.5
                 )
             
             # 얼굴/목 영역 정제 (옷이 얼굴을 가리지 않도록)
+            if face_neck_mask is not None:
+                # 리사이즈 경로는 프레임 크기 마스크 사용
+                face_neck_mask = crop_mask_to_sprite(
+                    face_neck_mask, (-face_mask_offset[0], -face_mask_offset[1]), frame.shape
+                )
             resized_cloth = self.refine_cloth_with_face_mask(resized_cloth, face_neck_mask)
             
             # 옷 오버레이 위치
@@ -978,12 +1715,141 @@ class RTMPoseVirtualFitting:
                 cloth_position,
                 alpha=1.0
             )
+            render_roi = (0, 0, frame.shape[1], frame.shape[0])  # 배치 위치를 알 수 없으므로 프레임 전체
         
         # 스켈레톤 그리기 제거 (깔끔한 출력)
         # show_skeleton 매개변수는 하위 호환성을 위해 유지하지만 사용하지 않음
         
-        return result
+        return result, render_roi
     
+    def process_frame(self, frame, show_skeleton=False, use_warp=True):
+        """
+        프레임 처리 및 가상 피팅 적용 (비동기 추론 + 60 FPS 출력)
+        
+        Args:
+            frame: 입력 비디오 프레임 (BGR, 원본 해상도)
+            show_skeleton: 스켈레톤 표시 여부 (기본값: False - 최적 성능)
+            use_warp: 관절 매칭 변형 사용 여부
+        
+        Returns:
+            처리된 프레임 (원본 해상도, 60 FPS)
+        """
+        return self.render_frame(frame, show_skeleton=show_skeleton, use_warp=use_warp)[0]
+    
+    def compute_garment_transform(self, frame, mask_format='rle', frame_scale=1.0):
+        """
+        클라이언트 렌더링 모드: 합성/인코딩 없이 옷 변환만 계산
+        (추론 제출/포즈 필터는 process_frame과 동일, 클라이언트가 /api/fit/garment의 옷 이미지를 직접 합성)
+
+        Args:
+            frame: 입력 비디오 프레임 (BGR, 추론/얼굴 마스크에만 사용하므로 축소 디코딩 가능)
+            mask_format: 가림 마스크 형식 'rle' / 'png' / 'none'
+            frame_scale: 입력 프레임 크기 / 원본 크기 (결과 좌표는 항상 원본 해상도)
+
+        Returns:
+            dict: keypoints (평활화된 (17, 3) 또는 None), matrix (옷 원본 좌표 → 프레임 좌표 2x3 또는 None),
+                  mask (저해상도 가시성 마스크 또는 None), garment {id, width, height}, frameSize [w, h]
+        """
+        frame_h, frame_w = int(round(frame.shape[0] / frame_scale)), int(round(frame.shape[1] / frame_scale))
+        cloth = self._cloth_snapshot()
+        cloth_original, cloth_keypoints, garment_id = cloth[0], cloth[1], cloth[4]
+
+        result = {
+            "keypoints": None,
+            "matrix": None,
+            "mask": None,
+            "garment": None,
+            "frameSize": [frame_w, frame_h]
+        }
+        if not self.is_streaming() or cloth_original is None:
+            return result
+        result["garment"] = {"id": garment_id, "width": cloth_original.shape[1], "height": cloth_original.shape[0]}
+
+        current_time = time.time()
+        pose = self._advance_pose(frame, current_time, frame_scale)
+        if pose is None:
+            return result
+        result["keypoints"] = np.round(pose, 2).tolist()
+
+        keypoints = pose[:, :2]
+        scores = pose[:, 2]
+        if scores[5] < 0.3 or scores[6] < 0.3 or cloth_keypoints is None:
+            return result
+
+        # 옷 변환: 서버 렌더링과 같은 리사이즈 구간 + 어파인 (리사이즈까지 합쳐 원본 옷 기준으로)
+        stage_start = time.perf_counter()
+        metrics = self.calculate_body_metrics(pose, (frame_h, frame_w, 3))
+        resized_cloth = self.resize_cloth_by_shoulder_matching(metrics['shoulder_width'], cloth)
+        if resized_cloth is None:
+            resized_cloth = cloth_original
+        scale_x = resized_cloth.shape[1] / cloth_original.shape[1]
+        scale_y = resized_cloth.shape[0] / cloth_original.shape[0]
+        M, _ = compute_cloth_affine(self._scale_cloth_keypoints(cloth_keypoints, scale_x), metrics['keypoints'])
+        if M is None:
+            return result
+        result["matrix"] = garment_matrix(M, scale_x, scale_y)
+        self.stage_metrics.record("resize_warp", time.perf_counter() - stage_start)
+
+        if mask_format == 'none':
+            return result
+
+        # 가림 마스크: 신체 세그멘테이션 (상체 행) x 얼굴/목 억제, 세그멘테이션 해상도 그대로
+        # (얼굴 마스크는 입력 프레임 좌표에서 생성)
+        stage_start = time.perf_counter()
+        face_neck_mask, face_mask_offset = self.create_face_neck_mask(
+            keypoints * frame_scale, scores, frame.shape, frame
+        )
+        self.stage_metrics.record("face_mask", time.perf_counter() - stage_start)
+
+        stage_start = time.perf_counter()
+        async_segmentation = self.use_async_inference and self.use_async_segmentation
+        segmentation_mask = self._get_segmentation_mask(current_time) if async_segmentation else None
+        torso_rows = get_torso_row_range(metrics['keypoints'], frame_h) if segmentation_mask is not None else None
+        visibility = build_visibility_mask(
+            frame.shape,
+            segmentation_mask=segmentation_mask,
+            torso_rows=(torso_rows[0] * frame_scale, torso_rows[1] * frame_scale) if torso_rows else None,
+            face_mask=face_neck_mask,
+            face_offset=face_mask_offset
+        )
+        result["mask"] = encode_mask(visibility, mask_format)
+        self.stage_metrics.record("client_mask", time.perf_counter() - stage_start)
+        return result
+
+    def get_transform_decode_scale(self):
+        """
+        클라이언트 렌더링 모드 입력 디코딩 배율
+        (프레임을 합성하지 않으므로 추론 배율이 0.5 이하면 JPEG를 1/2 크기로 바로 디코딩)
+        """
+        if self.use_inference_downscale and self.inference_scale <= 0.5:
+            return 0.5
+        return 1.0
+
+    def get_garment_png(self):
+        """
+        클라이언트 렌더링용 배경 제거 옷 이미지 (BGRA PNG, 옷 교체 전까지 한 번만 인코딩)
+
+        Returns:
+            (garment_id, PNG 바이트), 옷이 없으면 (None, None)
+        """
+        with self.cloth_lock:
+            cloth_original = self.cloth_original
+            garment_id = self.garment_id
+            cached = self.garment_png
+        if cloth_original is None:
+            return None, None
+        if cached is not None and cached[0] == garment_id:
+            return cached
+
+        ok, buffer = cv2.imencode('.png', cloth_original)
+        if not ok:
+            return None, None
+        encoded = (garment_id, buffer.tobytes())
+        with self.cloth_lock:
+            if self.garment_id == garment_id:
+                self.garment_png = encoded
+        return encoded
+
     def run_webcam(self, camera_index=0):
         """
         웹캠을 사용한 실시간 가상 피팅
@@ -1037,8 +1903,7 @@ class RTMPoseVirtualFitting:
 
 def main():
     """메인 실행 함수"""
-    import torch
-    device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+    device = 'cuda:0' if cuda_enabled('cuda:0') else 'cpu'
     
     vf = RTMPoseVirtualFitting(
         cloth_image_path='input/cloth.jpg',
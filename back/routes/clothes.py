@@ -1,10 +1,14 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, session
 import base64
+import hashlib
 import os
 from datetime import datetime
 import sys
 import subprocess
 import importlib.util
+import threading
+import time
+import uuid
 import cv2
 import numpy as np
 
@@ -366,63 +370,48 @@ def try_on_clothes():
 
 # ========== 실시간 가상 피팅 API ==========
 
-# 전역 VirtualFitting 인스턴스
-virtual_fitting_instance = None
+# 전역 세션 매니저 (RTMPose/세그멘테이션 모델은 한 번만 로드, 세션별 엔진 관리)
+fitting_session_manager = None
+fitting_manager_lock = threading.Lock()
 
-def initialize_virtual_fitting():
+# 스트림 응답 모드 / 클라이언트 렌더링 가림 마스크 형식 (fit/client_render.py의 MASK_FORMATS와 동일)
+# / 델타 프레임 크롭 형식 (fit/delta_frames.py의 DELTA_FORMATS와 동일)
+FIT_STREAM_MODES = ('frame', 'transform', 'delta')
+FIT_MASK_FORMATS = ('rle', 'png', 'none')
+FIT_DELTA_FORMATS = ('jpeg', 'png')
+
+# 스트리밍 프레임 파이프라인 (get_frame_pipeline), 단계 대기열 자리 대기 시간 (초과 시 503)
+frame_pipeline = None
+PIPELINE_SUBMIT_TIMEOUT = 1.0
+
+def get_fit_session_id(data=None):
     """
-    서버 시작 시 VirtualFitting 백그라운드 초기화
-    - 인스턴스 생성 및 백그라운드 워커 시작
-    - 스트리밍은 비활성화 상태 (start_streaming() 호출 시 활성화)
+    가상 피팅 세션 키 결정
+    - 요청의 streamId (또는 X-Fit-Stream-Id 헤더) 우선
+    - 없으면 로그인 세션 사용자 ID
+    - 둘 다 없으면 'default'
     """
-    global virtual_fitting_instance
+    stream_id = (data or {}).get('streamId') or request.headers.get('X-Fit-Stream-Id')
+    if stream_id:
+        return str(stream_id)
     
-    if virtual_fitting_instance is not None:
-        print("[clothes.py] VirtualFitting 이미 초기화됨")
-        return
+    user = session.get("user")
+    if user and user.get('id'):
+        return f"user:{user['id']}"
     
-    fit_dir = os.path.join(BASE_DIR, 'fit')
+    return 'default'
+
+def get_fitting_session_manager():
+    """세션 매니저 싱글톤 반환 (없으면 공유 모델 로드 후 생성)"""
+    global fitting_session_manager
     
-    # fit 디렉토리를 sys.path에 추가 (중복 체크)
-    if fit_dir not in sys.path:
-        sys.path.insert(0, fit_dir)
+    if fitting_session_manager is not None:
+        return fitting_session_manager
     
-    try:
-        print(f"[clothes.py] VirtualFitting 백그라운드 초기화 시작...")
-        print(f"[clothes.py] fit_dir: {fit_dir}")
+    with fitting_manager_lock:
+        if fitting_session_manager is not None:
+            return fitting_session_manager
         
-        from virtual_fitting import RTMPoseVirtualFitting
-        
-        # device 설정
-        import torch
-        device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
-        print(f"[clothes.py] Device: {device}")
-        
-        # 옷 이미지 경로 (절대 경로)
-        cloth_image_path = os.path.join(fit_dir, 'input', 'cloth.jpg')
-        
-        # 이미지 파일 존재 확인
-        if not os.path.exists(cloth_image_path):
-            print(f"[clothes.py] 경고: 옷 이미지 없음 - {cloth_image_path}")
-            print(f"[clothes.py] 기본 이미지로 계속 진행...")
-        
-        virtual_fitting_instance = RTMPoseVirtualFitting(
-            cloth_image_path=cloth_image_path,
-            device=device
-        )
-        print("[clothes.py] RTMPoseVirtualFitting 인스턴스 생성 완료")
-        print("[clothes.py] 백그라운드 워커 실행 중 (스트리밍 대기)")
-        
-    except Exception as e:
-        print(f"[clothes.py] RTMPoseVirtualFitting 생성 실패: {e}")
-        import traceback
-        traceback.print_exc()
-
-def get_virtual_fitting():
-    """VirtualFitting 싱글톤 인스턴스 반환"""
-    global virtual_fitting_instance
-    
-    if virtual_fitting_instance is None:
         fit_dir = os.path.join(BASE_DIR, 'fit')
         
         # fit 디렉토리를 sys.path에 추가 (중복 체크)
@@ -430,16 +419,42 @@ def get_virtual_fitting():
             sys.path.insert(0, fit_dir)
         
         try:
-            print(f"[clothes.py] VirtualFitting 초기화 시작...")
+            print(f"[clothes.py] 가상 피팅 세션 매니저 초기화 시작...")
             print(f"[clothes.py] fit_dir: {fit_dir}")
             
-            from virtual_fitting import RTMPoseVirtualFitting
+            from session_manager import FittingSessionManager
+            from virtual_fitting import cuda_enabled
+            
+            # 포즈 백엔드: FIT_POSE_BACKEND 환경 변수 우선,
+            # 없으면 GPU 미탑재 + ONNX 모델이 내보내져 있을 때 ONNX Runtime 사용
+            pose_backend = os.getenv("FIT_POSE_BACKEND")
             
-            # device 설정
-            import torch
-            device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+            # device 설정 (ONNX 백엔드는 CPU 전용이므로 torch를 임포트하지 않음)
+            device = 'cpu' if pose_backend == 'onnx' else ('cuda:0' if cuda_enabled('cuda:0') else 'cpu')
             print(f"[clothes.py] Device: {device}")
             
+            if not pose_backend:
+                onnx_path = os.path.join(fit_dir, 'models', 'rtmpose-s_8xb256-420e_aic-coco-256x192.onnx')
+                pose_backend = 'onnx' if device == 'cpu' and os.path.exists(onnx_path) else 'torch'
+            onnx_threads = os.getenv("FIT_ONNX_THREADS")
+            onnx_model = os.getenv("FIT_ONNX_MODEL")  # 'fp32' (기본), 'int8' 또는 파일 경로
+            # 포즈 추론을 별도 워커 프로세스에서 실행 (동시 스트림에서 요청 스레드가 추론 스레드와 GIL 경합하지 않도록)
+            pose_process = os.getenv("FIT_POSE_PROCESS", "0").lower() in ("1", "true", "yes")
+            # 단계별 지연 측정 (POST /api/fit/metrics로 실행 중 끄고 켤 수 있음, 모든 세션은 FIT_METRICS_ADMINS 사용자만)
+            metrics_enabled = os.getenv("FIT_METRICS", "1").lower() in ("1", "true", "yes")
+            # 세션별 스트림 프레임 입장 정책: 'coalesce' (기본) / 'skip' / 'off'
+            admission_policy = os.getenv("FIT_ADMISSION", "coalesce").lower()
+            # 스프라이트 캐시 구간/예산 (설정한 항목만 기본값 덮어씀, 예산은 세션당 MB)
+            sprite_cache_options = {}
+            for env_name, option in (("FIT_SPRITE_SCALE_BIN", "scale_bin"),
+                                     ("FIT_SPRITE_ROTATION_BIN", "rotation_bin"),
+                                     ("FIT_SPRITE_SHEAR_BIN", "shear_bin")):
+                if os.getenv(env_name):
+                    sprite_cache_options[option] = float(os.getenv(env_name))
+            if os.getenv("FIT_SPRITE_CACHE_MB"):
+                sprite_cache_options["max_bytes"] = int(float(os.getenv("FIT_SPRITE_CACHE_MB")) * 1024 * 1024)
+            print(f"[clothes.py] Pose backend: {pose_backend}" + (f" ({onnx_model})" if onnx_model else ""))
+            
             # 옷 이미지 경로 (절대 경로)
             cloth_image_path = os.path.join(fit_dir, 'input', 'cloth.jpg')
             
@@ -448,19 +463,89 @@ def get_virtual_fitting():
                 print(f"[clothes.py] 경고: 옷 이미지 없음 - {cloth_image_path}")
                 print(f"[clothes.py] 기본 이미지로 계속 진행...")
             
-            virtual_fitting_instance = RTMPoseVirtualFitting(
+            fitting_session_manager = FittingSessionManager(
                 cloth_image_path=cloth_image_path,
-                device=device
+                device=device,
+                pose_backend=pose_backend,
+                onnx_num_threads=int(onnx_threads) if onnx_threads else None,
+                onnx_model=onnx_model,
+                pose_process=pose_process,
+                metrics_enabled=metrics_enabled,
+                admission_policy=admission_policy,
+                sprite_cache_options=sprite_cache_options
             )
-            print("[clothes.py] RTMPoseVirtualFitting 인스턴스 생성 완료")
+            print("[clothes.py] 세션 매니저 생성 완료")
             
         except Exception as e:
-            print(f"[clothes.py] RTMPoseVirtualFitting 생성 실패: {e}")
+            print(f"[clothes.py] 세션 매니저 생성 실패: {e}")
             import traceback
             traceback.print_exc()
             return None
     
-    return virtual_fitting_instance
+    return fitting_session_manager
+
+def get_frame_pipeline():
+    """스트리밍 프레임 파이프라인 싱글톤 (디코딩/렌더링/인코딩 단계별 스레드 풀, 모든 세션 공유)"""
+    global frame_pipeline
+    
+    if frame_pipeline is not None:
+        return frame_pipeline
+    
+    with fitting_manager_lock:
+        if frame_pipeline is None:
+            fit_dir = os.path.join(BASE_DIR, 'fit')
+            if fit_dir not in sys.path:
+                sys.path.insert(0, fit_dir)
+            from frame_pipeline import FramePipeline
+            
+            # 단계별 작업자 수 / 최대 대기 수: FIT_PIPELINE_WORKERS, FIT_PIPELINE_MAX_PENDING 환경 변수
+            workers = int(os.getenv("FIT_PIPELINE_WORKERS", "2"))
+            frame_pipeline = FramePipeline(
+                decode_workers=workers,
+                render_workers=workers,
+                encode_workers=workers,
+                max_pending=int(os.getenv("FIT_PIPELINE_MAX_PENDING", "8"))
+            )
+            print(f"[clothes.py] 프레임 파이프라인 생성 (단계별 작업자 {workers})")
+    return frame_pipeline
+
+def initialize_virtual_fitting():
+    """
+    서버 시작 시 VirtualFitting 백그라운드 초기화
+    - 공유 모델 로드 (세션 엔진은 첫 요청 시 생성)
+    - 스트리밍은 비활성화 상태 (start_streaming() 호출 시 활성화)
+    """
+    if fitting_session_manager is not None:
+        print("[clothes.py] VirtualFitting 이미 초기화됨")
+        return
+    
+    if get_fitting_session_manager() is not None:
+        print("[clothes.py] 백그라운드 워커 실행 중 (스트리밍 대기)")
+
+class FitSessionsFull(Exception):
+    """최대 세션 수에 도달했고 모든 세션이 스트리밍 중 (새 세션 거절, 503 응답)"""
+
+def get_virtual_fitting(session_id='default'):
+    """
+    세션별 VirtualFitting 엔진 반환 (생성 실패 시 None)
+    
+    Raises:
+        FitSessionsFull: 모든 세션이 사용 중이라 새 세션을 만들 수 없음
+    """
+    manager = get_fitting_session_manager()
+    if manager is None:
+        return None
+    
+    from session_manager import SessionLimitExceeded
+    try:
+        return manager.get_session(session_id)
+    except SessionLimitExceeded as e:
+        raise FitSessionsFull(str(e))
+    except Exception as e:
+        print(f"[clothes.py] 세션 엔진 생성 실패 ({session_id}): {e}")
+        import traceback
+        traceback.print_exc()
+        return None
 
 # 로딩 상태를 저장하는 전역 변수
 fitting_loading_status = {
@@ -475,10 +560,10 @@ def get_fitting_status():
     if request.method == 'OPTIONS':
         return '', 200
     
-    global fitting_loading_status, virtual_fitting_instance
+    global fitting_loading_status
     
-    # 인스턴스가 이미 있으면 ready 상태
-    if virtual_fitting_instance is not None:
+    # 세션 매니저가 이미 있으면 ready 상태
+    if fitting_session_manager is not None:
         return jsonify({
             "stage": "ready",
             "progress": 100,
@@ -493,11 +578,14 @@ def initialize_fitting():
     if request.method == 'OPTIONS':
         return '', 200
     
-    global fitting_loading_status, virtual_fitting_instance
+    global fitting_loading_status
     
     try:
+        session_id = get_fit_session_id(request.get_json(silent=True))
+        
         # 이미 초기화되어 있으면 바로 성공 반환
-        if virtual_fitting_instance is not None:
+        if fitting_session_manager is not None:
+            get_virtual_fitting(session_id)
             return jsonify({
                 "success": True,
                 "stage": "ready",
@@ -525,9 +613,8 @@ def initialize_fitting():
             "message": "RTMPose 모델 로딩 중..."
         }
         
-        from virtual_fitting import RTMPoseVirtualFitting
-        import torch
-        device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+        if get_fitting_session_manager() is None:
+            raise RuntimeError("RTMPose 모델 로딩 실패")
         
         # stage: loading_cloth
         fitting_loading_status = {
@@ -536,15 +623,8 @@ def initialize_fitting():
             "message": "옷 이미지 처리 중..."
         }
         
-        cloth_image_path = os.path.join(fit_dir, 'input', 'cloth.jpg')
-        
-        if not os.path.exists(cloth_image_path):
-            print(f"[clothes.py] 경고: 옷 이미지 없음 - {cloth_image_path}")
-        
-        virtual_fitting_instance = RTMPoseVirtualFitting(
-            cloth_image_path=cloth_image_path,
-            device=device
-        )
+        if get_virtual_fitting(session_id) is None:
+            raise RuntimeError("세션 엔진 생성 실패")
         
         # stage: ready
         fitting_loading_status = {
@@ -553,7 +633,7 @@ def initialize_fitting():
             "message": "가상 피팅 준비 완료!"
         }
         
-        print("[clothes.py] RTMPoseVirtualFitting 인스턴스 생성 완료")
+        print(f"[clothes.py] 가상 피팅 세션 준비 완료: {session_id}")
         
         return jsonify({
             "success": True,
@@ -562,6 +642,9 @@ def initialize_fitting():
             "message": "가상 피팅 준비 완료!"
         }), 200
         
+    except FitSessionsFull as e:
+        return jsonify({"success": False, "error": "세션 수 초과", "message": str(e)}), 503
+        
     except Exception as e:
         print(f"[clothes.py] 초기화 실패: {e}")
         import traceback
@@ -579,43 +662,94 @@ def initialize_fitting():
             "stage": "error"
         }), 500
 
+def _decode_stream_frame(frame_data, reduced):
+    """파이프라인 디코딩 단계: base64 (data URL) → BGR 프레임 (reduced면 1/2 크기)"""
+    from frame_pipeline import decode_frame
+    
+    encoded = frame_data.split(',', 1)[1] if ',' in frame_data else frame_data
+    return decode_frame(base64.b64decode(encoded), reduced)
+
+def render_stream_frame(vf, frame, mode, frame_scale, mask_format, show_skeleton, use_warp):
+    """
+    파이프라인 렌더링 단계 (세션 내 렌더링은 render_lock으로 직렬화)
+    
+    Returns:
+        transform 모드: (변환 dict, None) / 그 외: (렌더링 프레임, 옷 영역)
+    """
+    with vf.render_lock:
+        if mode == 'transform':
+            return vf.compute_garment_transform(frame, mask_format, frame_scale), None
+        return vf.render_frame(frame, show_skeleton=show_skeleton, use_warp=use_warp)
+
+def _encode_stream_frame(vf, processed_frame, render_roi, mode, delta_format, force_keyframe):
+    """파이프라인 인코딩 단계: 응답 JSON dict (실패 시 None)"""
+    if mode == 'delta':
+        # 옷이 그려진 영역만 인코딩 (클라이언트는 자기 카메라 프레임에 덮어씀)
+        delta = vf.delta_encoder.encode(processed_frame, render_roi, delta_format, force_keyframe=force_keyframe)
+        if delta is None:
+            return None
+        image_bytes = delta.pop('data')
+        if image_bytes is not None:
+            mime = 'image/png' if delta['format'] == 'png' else 'image/jpeg'
+            delta['frame'] = f"data:{mime};base64,{base64.b64encode(image_bytes).decode('utf-8')}"
+        else:
+            delta['frame'] = None
+        return dict(delta, success=True, mode='delta')
+    
+    # 결과를 Base64로 인코딩 (고화질 85%)
+    ok, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    if not ok:
+        return None
+    frame_base64 = base64.b64encode(buffer).decode('utf-8')
+    return {
+        "success": True,
+        "frame": f"data:image/jpeg;base64,{frame_base64}"
+    }
+
 @clothes_bp.route('/fit/stream', methods=['POST', 'OPTIONS'])
 def process_fit_frame():
     """
     실시간 가상 피팅 - 프레임 처리
     - 스트림 시작: 첫 프레임 수신 시 start_streaming() 호출
     - 스트림 중지: 프론트에서 stop_streaming API 호출
+    - mode: 'frame' (기본, 합성된 JPEG 반환) / 'transform' (클라이언트 렌더링: 키포인트 + 옷 어파인 + 가림 마스크만 반환,
+      옷 이미지는 GET /api/fit/garment로 한 번만 받음, mask: 'rle' / 'png' / 'none')
+      / 'delta' (옷이 그려진 영역 크롭 + x/y 오프셋, 키프레임 간격마다 전체 프레임,
+      deltaFormat: 'jpeg' / 'png', keyframe: true면 이번 프레임을 키프레임으로)
+    - 입장 제어: 세션이 프레임을 처리 중이면 {"skipped": true} 즉시 응답 (FIT_ADMISSION='skip')
+      또는 최신 프레임 하나만 대기 (기본 'coalesce', 'off'면 제한 없음)
+    - 모든 응답에 suggestedIntervalMs (측정한 처리 시간 기반 권장 전송 간격, 클라이언트가 전송 주기 조정)
     """
     
     if request.method == 'OPTIONS':
         return '', 200
     
     try:
+        request_start = time.perf_counter()
         data = request.get_json()
         frame_data = data.get('frame') if data else None
         show_skeleton = data.get('showSkeleton', True)
         use_warp = data.get('useWarp', True)  # 관절 매칭 변형 사용 여부
         is_first_frame = data.get('isFirstFrame', False)  # 첫 프레임 플래그
+        mode = data.get('mode', 'frame')
+        mask_format = data.get('mask', 'rle')
+        
+        if mode not in FIT_STREAM_MODES:
+            return jsonify({"error": f"알 수 없는 mode: {mode}"}), 400
+        if mask_format not in FIT_MASK_FORMATS:
+            return jsonify({"error": f"알 수 없는 mask 형식: {mask_format}"}), 400
+        delta_format = data.get('deltaFormat', 'jpeg')
+        if delta_format not in FIT_DELTA_FORMATS:
+            return jsonify({"error": f"알 수 없는 deltaFormat: {delta_format}"}), 400
         
         if not frame_data:
             return jsonify({"error": "프레임 데이터 없음"}), 400
         
-        # Base64 디코딩
-        if ',' in frame_data:
-            header, encoded = frame_data.split(',', 1)
-        else:
-            encoded = frame_data
-        
-        # 이미지 디코딩
-        img_bytes = base64.b64decode(encoded)
-        nparr = np.frombuffer(img_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-        
-        if frame is None:
-            return jsonify({"error": "프레임 디코딩 실패"}), 400
-        
-        # VirtualFitting 인스턴스 가져오기
-        vf = get_virtual_fitting()
+        # 세션별 VirtualFitting 엔진 가져오기 (모든 세션이 스트리밍 중이면 503)
+        try:
+            vf = get_virtual_fitting(get_fit_session_id(data))
+        except FitSessionsFull as full:
+            return jsonify({"error": "세션 수 초과", "message": str(full)}), 503
         if vf is None:
             return jsonify({
                 "error": "VirtualFitting 초기화 실패",
@@ -627,29 +761,79 @@ def process_fit_frame():
             vf.start_streaming()
             print("[clothes.py] 스트리밍 시작 - 출력 활성화")
         
-        # 프레임 처리 (관절 매칭 옵션 포함)
-        try:
-            processed_frame = vf.process_frame(frame, show_skeleton=show_skeleton, use_warp=use_warp)
-        except Exception as process_error:
-            print(f"[clothes.py] process_frame 에러: {process_error}")
-            import traceback
-            traceback.print_exc()
-            return jsonify({
-                "error": "프레임 처리 실패",
-                "message": str(process_error)
-            }), 500
+        # 디코딩 → 렌더링 → 인코딩을 단계별 스레드 풀에서 실행 (다른 요청의 단계와 겹쳐 실행)
+        pipeline = get_frame_pipeline()
+        from frame_pipeline import PipelineBusy
+        metrics = vf.stage_metrics
         
-        # 원본 해상도 그대로 출력 (추론은 저해상도, 렌더링은 원본 해상도)
-        # 업스케일 제거: 프론트에서 HD(1280x720) 전송 → 백엔드 HD 처리 → HD 출력
+        # 클라이언트 렌더링은 프레임을 합성하지 않으므로 추론 배율이 허용하면 1/2 크기로 바로 디코딩
+        frame_scale = vf.get_transform_decode_scale() if mode == 'transform' else 1.0
         
-        # 결과를 Base64로 인코딩 (고화질 85%)
-        _, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-        frame_base64 = base64.b64encode(buffer).decode('utf-8')
+        # 입장 제어: 이 세션이 이미 프레임을 처리 중이면 즉시 skipped 또는 최신 프레임 하나만 대기
+        # (고정 주기로 보내는 클라이언트의 요청이 스레드 풀에 쌓여 지연이 계속 늘어나지 않도록)
+        admission = vf.admission
+        if not admission.acquire():
+            return jsonify({
+                "success": True,
+                "skipped": True,
+                "suggestedIntervalMs": admission.suggested_interval_ms()
+            }), 200
+        admitted_at = time.perf_counter()
+        try:
+            try:
+                stage_start = time.perf_counter()
+                frame = pipeline.decode.run(_decode_stream_frame, frame_data, frame_scale < 1.0,
+                                            timeout=PIPELINE_SUBMIT_TIMEOUT)
+                metrics.record("decode", time.perf_counter() - stage_start)
+                if frame is None:
+                    return jsonify({"error": "프레임 디코딩 실패"}), 400
+                
+                # 프레임 처리 (관절 매칭 옵션 포함)
+                try:
+                    stage_start = time.perf_counter()
+                    rendered, render_roi = pipeline.render.run(
+                        render_stream_frame, vf, frame, mode, frame_scale, mask_format, show_skeleton, use_warp,
+                        timeout=PIPELINE_SUBMIT_TIMEOUT
+                    )
+                    metrics.record("process_frame", time.perf_counter() - stage_start)
+                except PipelineBusy:
+                    raise
+                except Exception as process_error:
+                    print(f"[clothes.py] process_frame 에러: {process_error}")
+                    import traceback
+                    traceback.print_exc()
+                    return jsonify({
+                        "error": "프레임 처리 실패",
+                        "message": str(process_error)
+                    }), 500
+            finally:
+                # 렌더링까지 끝나면 입장 해제 (다음 프레임 디코딩이 이번 프레임 인코딩과 겹치도록,
+                # 렌더링 순서는 render_lock이 보장) - 처리 시간도 디코딩 + 렌더링 기준
+                admission.release(time.perf_counter() - admitted_at)
+            
+            if mode == 'transform':
+                # 클라이언트 렌더링: 프레임 합성/JPEG 인코딩 없이 변환만 반환
+                metrics.record("request", time.perf_counter() - request_start)
+                return jsonify(dict(rendered, success=True, mode='transform',
+                                    suggestedIntervalMs=admission.suggested_interval_ms())), 200
+            
+            # 원본 해상도 그대로 출력 (추론은 저해상도, 렌더링은 원본 해상도)
+            # 업스케일 제거: 프론트에서 HD(1280x720) 전송 → 백엔드 HD 처리 → HD 출력
+            stage_start = time.perf_counter()
+            response = pipeline.encode.run(
+                _encode_stream_frame, vf, rendered, render_roi, mode, delta_format,
+                bool(data.get('keyframe', False)),
+                timeout=PIPELINE_SUBMIT_TIMEOUT
+            )
+            metrics.record("encode", time.perf_counter() - stage_start)
+        except PipelineBusy as busy:
+            return jsonify({"error": "서버 혼잡", "message": str(busy)}), 503
         
-        return jsonify({
-            "success": True,
-            "frame": f"data:image/jpeg;base64,{frame_base64}"
-        }), 200
+        if response is None:
+            return jsonify({"error": "프레임 인코딩 실패"}), 500
+        metrics.record("request", time.perf_counter() - request_start)
+        response["suggestedIntervalMs"] = admission.suggested_interval_ms()
+        return jsonify(response), 200
         
     except Exception as e:
         print(f"[clothes.py] 프레임 처리 에러: {e}")
@@ -657,6 +841,31 @@ def process_fit_frame():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+@clothes_bp.route('/fit/garment', methods=['GET', 'OPTIONS'])
+def get_fit_garment():
+    """
+    클라이언트 렌더링용 배경 제거 옷 이미지 (BGRA PNG)
+    - ?streamId=<스트림 ID> (없으면 요청 세션 키)
+    - ETag = 옷 ID (transform 응답의 garment.id), 옷이 바뀌지 않았으면 304
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    session_id = get_fit_session_id(request.args)
+    vf = fitting_session_manager.peek_session(session_id) if fitting_session_manager else None
+    if vf is None:
+        return jsonify({"error": "활성 세션 없음"}), 404
+    
+    garment_id, png_bytes = vf.get_garment_png()
+    if png_bytes is None:
+        return jsonify({"error": "옷 이미지가 로드되지 않음"}), 404
+    
+    etag = f'"{garment_id}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "X-Garment-Id": garment_id}
+    if etag in request.headers.get('If-None-Match', ''):
+        return Response(status=304, headers=headers)
+    return Response(png_bytes, mimetype='image/png', headers=headers)
+
 @clothes_bp.route('/fit/stop-streaming', methods=['POST', 'OPTIONS'])
 def stop_fit_streaming():
     """
@@ -668,11 +877,15 @@ def stop_fit_streaming():
         return '', 200
     
     try:
-        vf = get_virtual_fitting()
+        session_id = get_fit_session_id(request.get_json(silent=True))
+        
+        # 세션이 없으면 중지할 스트림도 없음
+        vf = fitting_session_manager.peek_session(session_id) if fitting_session_manager else None
         if vf is None:
             return jsonify({
-                "error": "VirtualFitting 초기화 실패"
-            }), 500
+                "success": True,
+                "message": "활성 스트림 없음"
+            }), 200
         
         vf.stop_streaming()
         print("[clothes.py] 스트리밍 중지 - 백그라운드는 계속 실행")
@@ -688,6 +901,30 @@ def stop_fit_streaming():
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
 
+def _prune_cloth_uploads(upload_dir, keep=None):
+    """
+    업로드 원본 정리: 옷 에셋 캐시 max_entries 개수만 남기고 오래된 것(수정 시각)부터 삭제
+    캐시에서 밀려난 옷은 원본이 없어도 다시 올리면 되므로 업로드 폴더가 끝없이 커지지 않도록
+    """
+    from garment_cache import get_garment_cache
+    
+    max_files = get_garment_cache().max_entries
+    try:
+        paths = [os.path.join(upload_dir, name) for name in os.listdir(upload_dir) if name.endswith('.jpg')]
+        paths.sort(key=os.path.getmtime)
+    except OSError as e:
+        print(f"[clothes.py] 업로드 폴더 정리 실패: {e}")
+        return
+    
+    for path in paths[:max(0, len(paths) - max_files)]:
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            print(f"[clothes.py] 오래된 업로드 삭제: {path}")
+        except OSError:
+            pass  # 다른 요청이 이미 삭제
+
 @clothes_bp.route('/fit/upload-cloth', methods=['POST', 'OPTIONS'])
 def upload_cloth_image():
     """옷 이미지 업로드 및 배경 제거"""
@@ -710,34 +947,104 @@ def upload_cloth_image():
         
         image_bytes = base64.b64decode(encoded)
         
-        # fit/input 폴더에 저장
+        # 업로드마다 내용 해시 경로에 저장 (fit/input/uploads/<해시>.jpg)
+        # 공용 cloth.jpg를 덮어쓰면 동시에 업로드한 다른 키오스크의 옷을 읽을 수 있음
+        # 같은 옷은 같은 경로 → 옷 에셋 캐시(내용 해시)와 그대로 맞물림
+        # 폴더는 교체 후 옷 에셋 캐시 max_entries 개수로 정리 (_prune_cloth_uploads)
         fit_dir = os.path.join(BASE_DIR, 'fit')
-        input_dir = os.path.join(fit_dir, 'input')
-        os.makedirs(input_dir, exist_ok=True)
-        
-        cloth_path = os.path.join(input_dir, 'cloth.jpg')
-        
-        with open(cloth_path, 'wb') as f:
-            f.write(image_bytes)
+        upload_dir = os.path.join(fit_dir, 'input', 'uploads')
+        os.makedirs(upload_dir, exist_ok=True)
+        
+        content_hash = hashlib.sha256(image_bytes).hexdigest()[:32]
+        cloth_path = os.path.join(upload_dir, f'{content_hash}.jpg')
+        
+        if not os.path.exists(cloth_path):
+            # 임시 파일에 쓴 뒤 교체 (같은 옷을 동시에 올려도 반쯤 쓴 파일을 읽지 않도록)
+            temp_path = f"{cloth_path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(image_bytes)
+            os.replace(temp_path, cloth_path)
+        else:
+            # 다시 올린 옷은 최근 사용으로 갱신 (정리 순서)
+            os.utime(cloth_path)
         
         print(f"[clothes.py] 옷 이미지 저장 완료: {cloth_path}")
         
-        # VirtualFitting 인스턴스 리로드
-        global virtual_fitting_instance
-        virtual_fitting_instance = None
-        vf = get_virtual_fitting()
+        # 실행 중인 세션 엔진에서 옷만 교체 (모델/추론 스레드 재사용)
+        vf = get_virtual_fitting(get_fit_session_id(data))
         
         if vf is None:
             return jsonify({"error": "옷 이미지 처리 실패"}), 500
         
+        swap_start = time.time()
+        if not vf.swap_cloth(cloth_path):
+            return jsonify({"error": "옷 이미지 처리 실패"}), 500
+        swap_ms = round((time.time() - swap_start) * 1000, 1)
+        
+        _prune_cloth_uploads(upload_dir, keep=cloth_path)
+        
         return jsonify({
             "success": True,
             "message": "옷 이미지 업로드 완료",
-            "path": cloth_path
+            "path": cloth_path,
+            "swap_ms": swap_ms
         }), 200
         
+    except FitSessionsFull as e:
+        return jsonify({"error": "세션 수 초과", "message": str(e)}), 503
+        
     except Exception as e:
         print(f"[clothes.py] 옷 업로드 에러: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+@clothes_bp.route('/fit/sessions', methods=['GET', 'OPTIONS'])
+def get_fit_sessions():
+    """가상 피팅 세션 현황 (유휴 세션 정리 후 반환)"""
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    if fitting_session_manager is None:
+        return jsonify({"active_sessions": 0, "sessions": {}}), 200
+    
+    fitting_session_manager.evict_idle()
+    return jsonify(fitting_session_manager.get_stats()), 200
+
+@clothes_bp.route('/fit/metrics', methods=['GET', 'POST', 'OPTIONS'])
+def fit_metrics():
+    """
+    세션별 단계 지연 p50/p95/p99 (ms, 최근 60초 롤링 히스토그램) + 프레임 파이프라인 단계별 큐 깊이 (로그인 필요)
+    - FIT_METRICS_ADMINS(쉼표 구분 사용자 ID)에 있는 사용자: 모든 세션 (GET ?session=<세션 키>로 한 세션만 조회 가능)
+    - 그 외 사용자: 자기 로그인 세션(user:<id>)만 조회/변경 (streamId 등 클라이언트가 보낸 세션 키는 사용 안 함)
+    - POST: {"enabled": true/false, "reset": true/false}로 측정 켜기/끄기
+    """
+    if request.method == 'OPTIONS':
+        return '', 200
+    
+    user = session.get("user")
+    if not user or not user.get('id'):
+        return jsonify({"error": "로그인이 필요합니다", "authenticated": False}), 401
+    
+    if fitting_session_manager is None:
+        return jsonify({"enabled": False, "sessions": {}}), 200
+    
+    admins = [a.strip() for a in os.getenv("FIT_METRICS_ADMINS", "").split(",") if a.strip()]
+    is_admin = str(user['id']) in admins
+    session_filter = request.args.get('session') if is_admin else f"user:{user['id']}"
+    
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        enabled = bool(data.get('enabled', fitting_session_manager.metrics_enabled))
+        reset = bool(data.get('reset', False))
+        if is_admin:
+            fitting_session_manager.set_metrics_enabled(enabled, reset=reset)
+            print(f"[clothes.py] 단계 지연 측정 {'활성화' if enabled else '비활성화'} (모든 세션, {user['id']})")
+        else:
+            if not fitting_session_manager.set_session_metrics_enabled(session_filter, enabled, reset=reset):
+                return jsonify({"error": "피팅 세션 없음", "session": session_filter}), 404
+            print(f"[clothes.py] 단계 지연 측정 {'활성화' if enabled else '비활성화'} ({session_filter})")
+    
+    result = fitting_session_manager.get_metrics(session_filter)
+    result["pipeline"] = frame_pipeline.get_stats() if frame_pipeline is not None else None
+    return jsonify(result), 200
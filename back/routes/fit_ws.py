@@ -0,0 +1,326 @@
+"""
+실시간 가상 피팅 WebSocket 전송 (바이너리 JPEG)
+- POST /api/fit/stream 대신 연결 하나로 JPEG 바이트를 그대로 주고받음
+  (요청마다 HTTP 연결/JSON 파싱/base64 33% 팽창 없음)
+- 연결당 세션 하나: ?streamId=<스트림 ID> (없으면 연결별 ID, 연결 종료 시 세션도 종료)
+- 렌더링 중 도착한 프레임은 버림 (요청이 쌓이지 않고 항상 최신 프레임 처리)
+- 디코딩/렌더링/인코딩은 POST와 같은 프레임 파이프라인 단계 풀에서 실행 (단계 대기열이 가득 차면 버림)
+- 바이너리 메시지: 입력 JPEG → 응답 JPEG (처리된 프레임)
+  ?mode=transform이면 응답은 텍스트 JSON (클라이언트 렌더링: 키포인트 + 옷 어파인 + 가림 마스크, ?mask=rle|png|none)
+  ?mode=delta면 응답은 10바이트 헤더 + 옷 영역 크롭 (헤더 '<ccHHHH': 종류 b'K'/b'D'/b'N', 형식 b'J'/b'P'/b'-',
+  x, y, width, height / 'N'은 이미지 없음, 'K'는 전체 프레임, ?deltaFormat=jpeg|png)
+- 텍스트 메시지: JSON 제어 {"useWarp": bool, "showSkeleton": bool, "mode": str, "mask": str,
+  "deltaFormat": str, "keyframe": true (다음 델타 응답을 키프레임으로)}
+  / 서버 → 클라이언트 에러 {"error": ...}
+  / 권장 전송 간격 {"suggestedIntervalMs": ms} (처리 시간 EMA 기반, 값이 크게 바뀔 때만 전송, transform 응답에는 항상 포함)
+- POST /api/fit/stream은 폴백으로 유지
+- 허용한 프론트엔드 Origin에서 온 연결만 수락 (다른 사이트 페이지가 사용자 브라우저로 연결하지 못하도록, 그 외는 HTTP 403)
+
+websockets asyncio 서버를 Flask 프로세스의 백그라운드 스레드에서 실행 (세션 매니저/모델 공유)
+프레임 파이프라인(단계 풀)은 첫 프레임에서 생성 (임포트만으로 sys.path 변경/스레드 풀 생성 없음)
+"""
+
+import asyncio
+import json
+import struct
+import threading
+import time
+import uuid
+from urllib.parse import urlparse, parse_qs
+
+import cv2
+
+try:
+    from websockets.asyncio.server import serve
+    from websockets.exceptions import ConnectionClosed
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    WEBSOCKETS_AVAILABLE = False
+
+from routes.clothes import (
+    get_virtual_fitting, get_fitting_session_manager, get_frame_pipeline, render_stream_frame,
+    FitSessionsFull, FIT_STREAM_MODES, FIT_MASK_FORMATS, FIT_DELTA_FORMATS
+)
+
+WS_PATH = '/fit-ws'  # CRA 개발 서버의 HMR 소켓(/ws)과 겹치지 않도록
+JPEG_QUALITY = 85
+MAX_MESSAGE_BYTES = 8 * 1024 * 1024
+DELTA_HEADER = struct.Struct('<ccHHHH')  # 종류, 형식, x, y, width, height
+DELTA_TYPES = {'key': b'K', 'delta': b'D', 'none': b'N'}
+DELTA_FORMAT_CODES = {'jpeg': b'J', 'png': b'P', None: b'-'}
+INTERVAL_NOTIFY_RATIO = 0.2  # 권장 전송 간격이 마지막으로 알린 값에서 20% 이상 바뀌면 다시 알림
+DEFAULT_ALLOWED_ORIGINS = ("https://localhost:3000", "https://127.0.0.1:3000")  # 프론트엔드 (server.py CORS와 동일)
+
+
+def _parse_bool(value, default):
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+class FitStreamConnection:
+    """WebSocket 연결별 상태 (세션 엔진, 옵션, 렌더링 중 플래그, 통계)"""
+
+    def __init__(self, websocket, vf, session_id, owns_session, show_skeleton=True, use_warp=True,
+                 mode='frame', mask_format='rle', delta_format='jpeg'):
+        """
+        Args:
+            websocket: websockets 서버 연결
+            vf: 세션 VirtualFitting 엔진
+            session_id: 세션 키
+            owns_session: True면 연결 종료 시 세션도 종료 (streamId 없이 연결한 경우)
+            mode: 'frame' (JPEG 응답) / 'transform' (클라이언트 렌더링 JSON 응답) / 'delta' (옷 영역 크롭)
+            mask_format: transform 모드 가림 마스크 형식
+            delta_format: delta 모드 크롭 형식
+        """
+        self.websocket = websocket
+        self.vf = vf
+        self.session_id = session_id
+        self.owns_session = owns_session
+        self.show_skeleton = show_skeleton
+        self.use_warp = use_warp
+        self.mode = mode if mode in FIT_STREAM_MODES else 'frame'
+        self.mask_format = mask_format if mask_format in FIT_MASK_FORMATS else 'rle'
+        self.delta_format = delta_format if delta_format in FIT_DELTA_FORMATS else 'jpeg'
+        self.force_keyframe = False
+        self.notified_interval_ms = None  # 마지막으로 알린 권장 전송 간격
+
+        self.render_task = None
+        self.started = False
+        self.stats = {"received": 0, "rendered": 0, "dropped": 0, "failed": 0}
+
+    async def run(self):
+        """메시지 수신 루프 (렌더링은 스레드에서, 수신은 계속)"""
+        try:
+            async for message in self.websocket:
+                if isinstance(message, str):
+                    self._handle_control(message)
+                    continue
+
+                self.stats["received"] += 1
+                if self.render_task is not None and not self.render_task.done():
+                    self.stats["dropped"] += 1  # 렌더링 중: 이 프레임은 버림
+                    continue
+                self.render_task = asyncio.create_task(self._render(message))
+        except ConnectionClosed:
+            pass
+        finally:
+            if self.render_task is not None:
+                await asyncio.gather(self.render_task, return_exceptions=True)
+            await asyncio.to_thread(self._close)
+
+    def _handle_control(self, message):
+        """JSON 제어 메시지 (옵션 변경)"""
+        try:
+            data = json.loads(message)
+        except ValueError:
+            return
+        self.use_warp = _parse_bool(data.get('useWarp'), self.use_warp)
+        self.show_skeleton = _parse_bool(data.get('showSkeleton'), self.show_skeleton)
+        if data.get('mode') in FIT_STREAM_MODES:
+            self.mode = data['mode']
+        if data.get('mask') in FIT_MASK_FORMATS:
+            self.mask_format = data['mask']
+        if data.get('deltaFormat') in FIT_DELTA_FORMATS:
+            self.delta_format = data['deltaFormat']
+        if _parse_bool(data.get('keyframe'), False):
+            self.force_keyframe = True
+
+    async def _render(self, data):
+        """프레임 1장 처리 후 응답 (디코딩/렌더링/인코딩은 프레임 파이프라인 단계 풀, OpenCV 코덱은 GIL 해제)"""
+        # 세션 매니저 접근 시각 갱신 (연결 중인 세션이 유휴 만료로 정리되지 않도록)
+        manager = get_fitting_session_manager()
+        if manager is not None and not manager.touch(self.session_id, self.vf):
+            # 다른 경로(세션 종료 API 등)로 이미 정리된 엔진: 계속 렌더링하지 않고 연결 종료
+            print(f"[FitWS] 세션이 정리됨, 연결 종료: {self.session_id}")
+            await self.websocket.close(1011, "session closed")
+            return
+
+        pipeline = get_frame_pipeline()  # 처음 호출 시 fit 디렉토리를 sys.path에 추가 + 단계 풀 생성
+        from frame_pipeline import PipelineBusy
+        try:
+            result = await self._process(data, pipeline)
+            if isinstance(result, str):
+                await self.websocket.send(json.dumps({"error": result}))
+            elif isinstance(result, dict):
+                await self.websocket.send(json.dumps(result))
+            else:
+                await self.websocket.send(result)
+                await self._notify_interval()
+        except PipelineBusy:
+            self.stats["dropped"] += 1  # 단계 대기열이 가득 참: 이 프레임은 버림
+        except ConnectionClosed:
+            pass
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"[FitWS] 프레임 처리 에러 ({self.session_id}): {e}")
+
+    async def _process(self, data, pipeline):
+        """
+        JPEG 바이트 → 처리된 프레임 JPEG 바이트 / transform 모드는 변환 dict / delta 모드는 헤더 + 크롭 바이트
+        (실패 시 에러 메시지 문자열, 단계 대기열이 가득 차면 PipelineBusy)
+        """
+        from frame_pipeline import decode_frame
+
+        request_start = time.perf_counter()
+        metrics = self.vf.stage_metrics
+        mode = self.mode
+
+        # 클라이언트 렌더링은 프레임을 합성하지 않으므로 추론 배율이 허용하면 1/2 크기로 바로 디코딩
+        frame_scale = self.vf.get_transform_decode_scale() if mode == 'transform' else 1.0
+        frame = await asyncio.wrap_future(pipeline.decode.submit(decode_frame, data, frame_scale < 1.0, timeout=0))
+        if frame is None:
+            self.stats["failed"] += 1
+            return "프레임 디코딩 실패"
+        metrics.record("decode", time.perf_counter() - request_start)
+
+        # 연결의 첫 프레임에서 스트리밍 활성화
+        if not self.started:
+            self.vf.start_streaming()
+            self.started = True
+            print(f"[FitWS] 스트리밍 시작: {self.session_id}")
+
+        process_start = time.perf_counter()
+        rendered, render_roi = await asyncio.wrap_future(pipeline.render.submit(
+            render_stream_frame, self.vf, frame, mode, frame_scale, self.mask_format, self.show_skeleton,
+            self.use_warp, timeout=0
+        ))
+        metrics.record("process_frame", time.perf_counter() - process_start)
+        # 렌더링 중 도착한 프레임은 연결에서 버리므로 입장 제어 없이 처리 시간만 기록 (권장 간격 계산용,
+        # POST와 같이 디코딩 + 렌더링 기준: 인코딩은 다음 프레임 디코딩과 겹쳐 실행 가능)
+        self.vf.admission.record_service(time.perf_counter() - request_start)
+
+        if mode == 'transform':
+            metrics.record("request", time.perf_counter() - request_start)
+            self.stats["rendered"] += 1
+            interval_ms = self.vf.admission.suggested_interval_ms()
+            self.notified_interval_ms = interval_ms
+            return dict(rendered, mode='transform', suggestedIntervalMs=interval_ms)
+
+        encode_start = time.perf_counter()
+        force_keyframe, self.force_keyframe = self.force_keyframe, False
+        payload = await asyncio.wrap_future(pipeline.encode.submit(
+            self._encode, rendered, render_roi, mode, force_keyframe, timeout=0
+        ))
+        if payload is None:
+            self.stats["failed"] += 1
+            return "프레임 인코딩 실패"
+        metrics.record("encode", time.perf_counter() - encode_start)
+        metrics.record("request", time.perf_counter() - request_start)
+
+        self.stats["rendered"] += 1
+        return payload
+
+    async def _notify_interval(self):
+        """권장 전송 간격이 크게 바뀌었으면 텍스트 JSON으로 알림 (클라이언트가 전송 주기 조정)"""
+        interval_ms = self.vf.admission.suggested_interval_ms()
+        last = self.notified_interval_ms
+        if last is not None and abs(interval_ms - last) < last * INTERVAL_NOTIFY_RATIO:
+            return
+        self.notified_interval_ms = interval_ms
+        await self.websocket.send(json.dumps({"suggestedIntervalMs": interval_ms}))
+
+    def _encode(self, processed_frame, render_roi, mode, force_keyframe):
+        """파이프라인 인코딩 단계: JPEG 바이트 / delta 모드는 헤더 + 크롭 바이트 (실패 시 None)"""
+        if mode == 'delta':
+            delta = self.vf.delta_encoder.encode(processed_frame, render_roi, self.delta_format, force_keyframe)
+            if delta is None:
+                return None
+            header = DELTA_HEADER.pack(DELTA_TYPES[delta['type']], DELTA_FORMAT_CODES[delta['format']],
+                                       delta['x'], delta['y'], delta['width'], delta['height'])
+            return header + (delta['data'] or b'')
+
+        ok, buffer = cv2.imencode('.jpg', processed_frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return buffer.tobytes() if ok else None
+
+    def _close(self):
+        """연결 종료: 스트리밍 중지 (연결 전용 세션이면 세션 종료)"""
+        manager = get_fitting_session_manager()
+        if self.owns_session and manager is not None:
+            manager.close_session(self.session_id)
+        elif self.started:
+            self.vf.stop_streaming()
+        print(f"[FitWS] 연결 종료: {self.session_id} "
+              f"(수신 {self.stats['received']}, 렌더링 {self.stats['rendered']}, 드롭 {self.stats['dropped']})")
+
+
+async def _handle_connection(websocket):
+    """연결 진입점: 경로/파라미터 확인 → 세션 엔진 → 수신 루프"""
+    parsed = urlparse(websocket.request.path)
+    if parsed.path.rstrip('/') != WS_PATH:
+        await websocket.close(1008, "unknown path")
+        return
+
+    params = parse_qs(parsed.query)
+    stream_id = params.get('streamId', [None])[0]
+    session_id = str(stream_id) if stream_id else f"ws-{uuid.uuid4().hex[:12]}"
+
+    # 세션 매니저가 없으면 모델 로드부터 (이벤트 루프를 막지 않도록 스레드에서)
+    try:
+        vf = await asyncio.to_thread(get_virtual_fitting, session_id)
+    except FitSessionsFull:
+        await websocket.close(1013, "too many sessions")  # 1013 Try Again Later
+        return
+    if vf is None:
+        await websocket.close(1011, "VirtualFitting init failed")
+        return
+
+    connection = FitStreamConnection(
+        websocket, vf, session_id,
+        owns_session=not stream_id,
+        show_skeleton=_parse_bool(params.get('showSkeleton', [None])[0], True),
+        use_warp=_parse_bool(params.get('useWarp', [None])[0], True),
+        mode=params.get('mode', ['frame'])[0],
+        mask_format=params.get('mask', ['rle'])[0],
+        delta_format=params.get('deltaFormat', ['jpeg'])[0]
+    )
+    print(f"[FitWS] 연결: {session_id}")
+    await connection.run()
+
+
+async def _serve(host, port, allowed_origins, ready):
+    # JPEG는 이미 압축되어 있으므로 permessage-deflate 비활성화 (CPU 낭비)
+    # origins: 목록에 없는 Origin 헤더(또는 Origin 없음)의 업그레이드 요청은 핸드셰이크 단계에서 403
+    async with serve(_handle_connection, host, port, max_size=MAX_MESSAGE_BYTES, compression=None,
+                     origins=list(allowed_origins)):
+        ready.set()
+        await asyncio.get_running_loop().create_future()  # 프로세스 종료까지 실행
+
+
+def start_fit_ws_server(host='localhost', port=5001, allowed_origins=DEFAULT_ALLOWED_ORIGINS):
+    """
+    WebSocket 서버를 백그라운드 스레드에서 시작
+
+    Args:
+        host: 바인딩 주소 (기본 localhost: 프론트 개발 서버 프록시 /fit-ws → localhost:5001만 허용,
+              외부에서 직접 연결하려면 FIT_WS_HOST로 지정)
+        port: 포트
+        allowed_origins: 연결을 허용할 브라우저 Origin 목록 (프론트엔드 주소)
+
+    Returns:
+        서버 스레드 (websockets 미설치 또는 시작 실패 시 None, POST 경로만 사용)
+    """
+    if not WEBSOCKETS_AVAILABLE:
+        print("[FitWS] websockets 미설치 - WebSocket 전송 비활성화 (POST /api/fit/stream 사용)")
+        return None
+
+    ready = threading.Event()
+    errors = []
+
+    def run():
+        try:
+            asyncio.run(_serve(host, port, allowed_origins, ready))
+        except Exception as e:
+            errors.append(e)
+            ready.set()
+
+    thread = threading.Thread(target=run, name='fit-ws-server', daemon=True)
+    thread.start()
+    ready.wait(timeout=5)
+    if errors:
+        print(f"[FitWS] WebSocket 서버 시작 실패: {errors[0]}")
+        return None
+    print(f"[FitWS] WebSocket 서버 시작: ws://{host}:{port}{WS_PATH} (허용 Origin: {', '.join(allowed_origins)})")
+    return thread
@@ -8,6 +8,7 @@ from routes.clothing import clothing_bp
 from chat.langspeech_openai_chroma import chat_bp
 from db_files.auth_db import auth_bp
 from routes.clothes import clothes_bp, initialize_models
+from routes.fit_ws import start_fit_ws_server
 import os
 
 # GPU 활성화 - CUDA 사용
@@ -24,12 +25,15 @@ os.environ['MEDIAPIPE_DISABLE_GPU'] = '0'  # GPU 활성화
 # ONNX Runtime GPU 설정 (rembg 배경 제거에 사용)
 os.environ['ORT_CUDA_UNAVAILABLE'] = '0'  # CUDA 사용 가능 표시
 
+# 프론트엔드 주소 (API CORS + 피팅 WebSocket Origin 확인)
+FRONT_ORIGINS = ["https://localhost:3000", "https://127.0.0.1:3000"]
+
 def create_app():
     app = Flask(__name__, instance_relative_config=True)
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev_secret_key_123")
     
     # 308에러 발생 방지
-    CORS(app,resources={r"/api/*": {"origins": ["https://localhost:3000", "https://127.0.0.1:3000"]}})
+    CORS(app,resources={r"/api/*": {"origins": FRONT_ORIGINS}})
     app.url_map.strict_slashes = False
     
     # Blueprint 등록
@@ -68,6 +72,15 @@ if __name__ == "__main__":
     # 가상 피팅 초기화는 건너뛰기 (mmengine 이슈)
     print("[server.py] 가상 피팅 초기화 건너뛰기 (별도 초기화 필요)\n")
 
+    # 실시간 피팅 WebSocket 전송 (바이너리 JPEG, 실패 시 프론트는 POST /api/fit/stream 사용)
+    # 바인딩 주소 FIT_WS_HOST (기본 localhost, 프론트 개발 서버 프록시 경유), 허용 Origin FIT_WS_ORIGINS (쉼표 구분)
+    ws_origins = os.getenv("FIT_WS_ORIGINS")
+    start_fit_ws_server(
+        host=os.getenv("FIT_WS_HOST", "localhost"),
+        port=int(os.getenv("FIT_WS_PORT", "5001")),
+        allowed_origins=[o.strip() for o in ws_origins.split(",") if o.strip()] if ws_origins else FRONT_ORIGINS
+    )
+
     # HTTP 모드로 서버 시작 (HTTPS는 nginx/프록시에서 처리)
     print("[server.py] HTTP 모드로 서버 시작...")
     app.run(
@@ -0,0 +1,191 @@
+"""
+클라이언트 렌더링 모드 페이로드 테스트
+========================================
+client_render (mode='transform' 응답)
+1. 옷 어파인: 원본 옷 + garment_matrix 변형이 서버 경로 (리사이즈 → 어파인)와 같은 위치/알파
+2. 가시성 마스크: 상체 행 밖 / 얼굴 영역은 0, 신체 영역은 255
+3. RLE / PNG 인코딩 왕복 (클라이언트 디코딩과 같은 규칙)
+4. 응답 크기: 합성 JPEG base64 vs 변환 JSON (RLE / PNG 마스크)
+
+사용법:
+    python test_client_render.py [프레임 폭] [프레임 높이]
+"""
+
+import sys
+import os
+import json
+import base64
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from client_render import garment_matrix, build_visibility_mask, encode_mask_rle, encode_mask_png
+
+MIN_ALPHA_IOU = 0.98
+
+
+def make_garment(w=600, h=720):
+    """합성 옷 이미지 (BGRA, 사다리꼴 몸판 + 무늬)"""
+    garment = np.zeros((h, w, 4), dtype=np.uint8)
+    body = np.array([[w * 0.2, h * 0.1], [w * 0.8, h * 0.1], [w * 0.9, h * 0.95], [w * 0.1, h * 0.95]], np.int32)
+    cv2.fillPoly(garment, [body], (40, 90, 200, 255))
+    for y in range(0, h, 40):
+        cv2.line(garment, (0, y), (w, y), (220, 220, 220, 255), 6)
+    garment[:, :, 3] = np.where(garment[:, :, 3] > 0, 255, 0)
+    garment[garment[:, :, 3] == 0] = 0
+    return garment
+
+
+def decode_rle(payload):
+    """클라이언트 디코딩과 같은 규칙 (0 런부터 교대, 행 우선)"""
+    w, h = payload["size"]
+    flat = np.zeros(w * h, dtype=np.uint8)
+    position, value = 0, 0
+    for count in payload["counts"]:
+        flat[position:position + count] = value
+        position += count
+        value = 255 - value
+    return flat.reshape(h, w)
+
+
+def test_matrix(frame_w, frame_h):
+    """서버 경로 (리사이즈 후 M) vs 클라이언트 경로 (원본 + M_full) 알파 IoU"""
+    garment = make_garment()
+    h, w = garment.shape[:2]
+    scale = 0.37
+    resized = cv2.resize(garment, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_LINEAR)
+    scale_x, scale_y = resized.shape[1] / w, resized.shape[0] / h
+
+    # 리사이즈된 옷 어깨 → 프레임 어깨 (약간 기울어진 포즈)
+    src = np.float32([[w * 0.8 * scale_x, h * 0.12 * scale_y],
+                      [w * 0.2 * scale_x, h * 0.12 * scale_y],
+                      [w * 0.5 * scale_x, h * 0.4 * scale_y]])
+    dst = np.float32([[frame_w * 0.38, frame_h * 0.33],
+                      [frame_w * 0.61, frame_h * 0.36],
+                      [frame_w * 0.5, frame_h * 0.6]])
+    M = cv2.getAffineTransform(src, dst)
+
+    server = cv2.warpAffine(resized, M, (frame_w, frame_h), flags=cv2.INTER_LINEAR)
+    client = cv2.warpAffine(garment, np.float32(garment_matrix(M, scale_x, scale_y)), (frame_w, frame_h),
+                            flags=cv2.INTER_LINEAR)
+
+    server_alpha, client_alpha = server[:, :, 3] > 127, client[:, :, 3] > 127
+    iou = (server_alpha & client_alpha).sum() / max(1, (server_alpha | client_alpha).sum())
+    print(f"  서버/클라이언트 옷 알파 IoU: {iou:.4f}")
+    return iou
+
+
+def test_visibility(frame_w, frame_h):
+    """상체 행 범위 / 얼굴 억제 / 세그멘테이션 해상도 유지"""
+    grid_w = 256
+    grid_h = int(round(frame_h * grid_w / frame_w))
+    segmentation = np.zeros((grid_h, grid_w), dtype=np.uint8)
+    segmentation[:, grid_w // 4:grid_w * 3 // 4] = 255  # 가운데 신체
+
+    face_mask = np.full((120, 120), 255, dtype=np.uint8)
+    face_offset = (frame_w // 2 - 60, int(frame_h * 0.4))
+    torso_rows = (frame_h * 0.3, frame_h * 0.9)
+
+    mask = build_visibility_mask((frame_h, frame_w, 3), segmentation, torso_rows, face_mask, face_offset)
+    sy, sx = grid_h / frame_h, grid_w / frame_w
+    body_x = grid_w // 2
+    face_y = int((face_offset[1] + 60) * sy)
+    below_face_y = int(frame_h * 0.75 * sy)
+
+    checks = {
+        "세그멘테이션 해상도": mask.shape == segmentation.shape,
+        "상체 위 행 숨김": mask[int(frame_h * 0.2 * sy), body_x] == 0,
+        "상체 아래 행 숨김": mask[int(frame_h * 0.95 * sy), body_x] == 0,
+        "신체 밖 숨김": mask[below_face_y, 5] == 0,
+        "얼굴 영역 숨김": mask[face_y, int((face_offset[0] + 60) * sx)] == 0,
+        "몸통 표시": mask[below_face_y, body_x] == 255,
+    }
+    no_segmentation = build_visibility_mask((frame_h, frame_w, 3), face_mask=face_mask, face_offset=face_offset)
+    checks["세그멘테이션 없으면 얼굴만 숨김"] = no_segmentation[0, 0] == 255 and no_segmentation[face_y, body_x] == 0
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return mask, all(checks.values())
+
+
+def test_encoding(mask):
+    """RLE (이진화) / PNG (알파) 왕복"""
+    binary = np.where(mask >= 128, 255, 0).astype(np.uint8)
+    rle = encode_mask_rle(mask)
+    rle_ok = np.array_equal(decode_rle(rle), binary)
+
+    full = np.full((4, 5), 255, dtype=np.uint8)  # 1로 시작하는 마스크는 첫 런 0
+    full_ok = encode_mask_rle(full)["counts"] == [0, 20]
+
+    png = encode_mask_png(mask)
+    decoded = cv2.imdecode(np.frombuffer(base64.b64decode(png["data"].split(',', 1)[1]), np.uint8),
+                           cv2.IMREAD_UNCHANGED)
+    png_ok = decoded is not None and decoded.shape[2] == 4 and np.array_equal(decoded[:, :, 3], mask)
+
+    print(f"  RLE 왕복: {'✅' if rle_ok else '❌'} (런 {len(rle['counts'])}개)")
+    print(f"  RLE 첫 런 0: {'✅' if full_ok else '❌'}")
+    print(f"  PNG 알파 왕복: {'✅' if png_ok else '❌'}")
+    return rle_ok and full_ok and png_ok
+
+
+def compare_payload_size(mask, frame_w, frame_h):
+    """합성 JPEG base64 응답 vs 변환 JSON 응답 크기"""
+    rng = np.random.default_rng(0)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (frame_h, frame_w, 3), dtype=np.uint8), (9, 9), 0)
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
+    frame_payload = len(json.dumps({"success": True, "frame": "data:image/jpeg;base64," +
+                                    base64.b64encode(buffer).decode('ascii')}))
+
+    transform = {
+        "success": True, "mode": "transform",
+        "keypoints": np.round(rng.uniform(0, frame_w, (17, 3)), 2).tolist(),
+        "matrix": [[0.4123, -0.0312, 301.25], [0.0298, 0.4087, 120.5]],
+        "garment": {"id": "0123456789abcdef", "width": 600, "height": 720},
+        "frameSize": [frame_w, frame_h]
+    }
+    sizes = {}
+    for name, encoded in (("none", None), ("rle", encode_mask_rle(mask)), ("png", encode_mask_png(mask))):
+        sizes[name] = len(json.dumps(dict(transform, mask=encoded)))
+
+    print(f"  합성 JPEG 응답: {frame_payload / 1024:.1f} KB")
+    for name, size in sizes.items():
+        print(f"  변환 응답 (mask={name}): {size / 1024:.1f} KB")
+    return frame_payload, sizes
+
+
+def main():
+    frame_w = int(sys.argv[1]) if len(sys.argv) > 1 else 1280
+    frame_h = int(sys.argv[2]) if len(sys.argv) > 2 else 720
+
+    print("="*70)
+    print(f"클라이언트 렌더링 페이로드 테스트 ({frame_w}x{frame_h})")
+    print("="*70)
+
+    print("\n[1] 옷 어파인 (리사이즈 합성)")
+    iou = test_matrix(frame_w, frame_h)
+
+    print("\n[2] 가시성 마스크")
+    mask, visibility_ok = test_visibility(frame_w, frame_h)
+
+    print("\n[3] 마스크 인코딩")
+    encoding_ok = test_encoding(mask)
+
+    print("\n[4] 응답 크기")
+    frame_payload, sizes = compare_payload_size(mask, frame_w, frame_h)
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        f'옷 어파인 IoU >= {MIN_ALPHA_IOU}': iou >= MIN_ALPHA_IOU,
+        '가시성 마스크': visibility_ok,
+        '마스크 인코딩 왕복': encoding_ok,
+        '변환 응답 < 합성 JPEG 응답': max(sizes.values()) < frame_payload,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+ROI 델타 프레임 테스트
+========================================
+delta_frames.DeltaFrameEncoder (mode='delta' 응답)
+1. 키프레임 주기: keyframe_interval마다 키프레임, 옷 없음 → none, 강제/큰 ROI → 키프레임
+2. 복원: 카메라 프레임 + 디코딩한 크롭 = 전체 JPEG 수준 화질, ROI 밖은 원본 그대로
+3. 인코딩 비용: 전체 프레임 JPEG vs ROI 크롭 (cv2.imencode 시간, 응답 크기)
+
+사용법:
+    python test_delta_frames.py [프레임 폭] [프레임 높이]
+"""
+
+import sys
+import os
+import glob
+import time
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from delta_frames import DeltaFrameEncoder, sprite_bounds
+
+REPEATS = 30
+MIN_SPEEDUP = 3.0
+MAX_PSNR_LOSS_DB = 1.0
+
+
+def load_camera_frame(frame_w, frame_h):
+    """카메라 프레임 대용 (저장소 테스트 이미지, 없으면 합성 텍스처)"""
+    paths = sorted(glob.glob(os.path.join(current_dir, 'fit', 'test_pic', '*.png')))
+    frame = cv2.imread(paths[0], cv2.IMREAD_COLOR) if paths else None
+    if frame is None:
+        rng = np.random.default_rng(0)
+        frame = cv2.GaussianBlur(rng.integers(0, 255, (frame_h, frame_w, 3), dtype=np.uint8), (15, 15), 0)
+    return cv2.resize(frame, (frame_w, frame_h), interpolation=cv2.INTER_AREA)
+
+
+def render_garment(frame):
+    """옷 스프라이트 합성 (상반신 크기, 타원 알파) → (렌더링 프레임, 스프라이트 영역)"""
+    frame_h, frame_w = frame.shape[:2]
+    sprite_w, sprite_h = int(frame_w * 0.3), int(frame_h * 0.6)
+    cloth = cv2.imread(os.path.join(current_dir, 'fit', 'input', 'cloth.jpg'), cv2.IMREAD_COLOR)
+    if cloth is None:
+        cloth = np.full((sprite_h, sprite_w, 3), (40, 90, 200), dtype=np.uint8)
+    sprite = cv2.resize(cloth, (sprite_w, sprite_h), interpolation=cv2.INTER_AREA)
+    alpha = np.zeros((sprite_h, sprite_w), dtype=np.uint8)
+    cv2.ellipse(alpha, (sprite_w // 2, sprite_h // 2), (sprite_w // 2 - 4, sprite_h // 2 - 4), 0, 0, 360, 255, -1)
+    alpha = cv2.GaussianBlur(alpha, (7, 7), 0)
+
+    offset = (int(frame_w * 0.36) + 3, int(frame_h * 0.3) + 5)  # MCU 경계가 아닌 위치
+    x0, y0, x1, y1 = sprite_bounds(sprite, offset, frame.shape)
+    rendered = frame.copy()
+    region = rendered[y0:y1, x0:x1].astype(np.float32)
+    a = alpha[..., None].astype(np.float32) / 255
+    rendered[y0:y1, x0:x1] = (sprite * a + region * (1 - a)).astype(np.uint8)
+    return rendered, (x0, y0, x1, y1)
+
+
+def psnr(a, b):
+    mse = np.mean((a.astype(np.float32) - b.astype(np.float32)) ** 2)
+    return 99.0 if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+
+def test_schedule():
+    """키프레임 / 델타 / none 순서"""
+    frame = np.zeros((360, 640, 3), dtype=np.uint8)
+    encoder = DeltaFrameEncoder(keyframe_interval=5)
+    roi = (200, 100, 320, 260)
+    types = [encoder.encode(frame, roi)['type'] for _ in range(11)]
+    expected = ['key', 'delta', 'delta', 'delta', 'delta'] * 2 + ['key']
+
+    none_type = encoder.encode(frame, None)['type']
+    forced = encoder.encode(frame, roi, force_keyframe=True)['type']
+    large = encoder.encode(frame, (0, 0, 600, 340))['type']
+    encoder.reset()
+    after_reset = encoder.encode(frame, roi)['type']
+
+    checks = {
+        "키프레임 주기": types == expected,
+        "옷 없음 → none": none_type == 'none',
+        "강제 키프레임": forced == 'key',
+        "큰 ROI → 키프레임": large == 'key',
+        "reset 후 키프레임": after_reset == 'key',
+    }
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_reconstruction(camera, rendered, roi):
+    """카메라 프레임 + 크롭 패치 vs 렌더링 프레임"""
+    encoder = DeltaFrameEncoder()
+    encoder.encode(rendered, roi)  # 첫 프레임은 키프레임
+    delta = encoder.encode(rendered, roi)
+    crop = cv2.imdecode(np.frombuffer(delta['data'], np.uint8), cv2.IMREAD_COLOR)
+
+    patched = camera.copy()
+    x, y = delta['x'], delta['y']
+    patched[y:y + delta['height'], x:x + delta['width']] = crop
+
+    _, full = cv2.imencode('.jpg', rendered, [cv2.IMWRITE_JPEG_QUALITY, encoder.jpeg_quality])
+    full_decoded = cv2.imdecode(full, cv2.IMREAD_COLOR)
+
+    aligned = x % encoder.align == 0 and y % encoder.align == 0
+    covers = x <= roi[0] and y <= roi[1] and x + delta['width'] >= roi[2] and y + delta['height'] >= roi[3]
+    outside = np.ones(camera.shape[:2], dtype=bool)
+    outside[y:y + delta['height'], x:x + delta['width']] = False
+    outside_exact = np.array_equal(patched[outside], rendered[outside])
+
+    delta_psnr, full_psnr = psnr(patched, rendered), psnr(full_decoded, rendered)
+    print(f"  ROI {roi} → 정렬 ({x}, {y}, {delta['width']}x{delta['height']})")
+    print(f"  PSNR: 델타 패치 {delta_psnr:.2f} dB, 전체 JPEG {full_psnr:.2f} dB")
+    print(f"  MCU 정렬: {'✅' if aligned else '❌'}, ROI 포함: {'✅' if covers else '❌'}, "
+          f"ROI 밖 원본 유지: {'✅' if outside_exact else '❌'}")
+    return aligned and covers and outside_exact and delta_psnr >= full_psnr - MAX_PSNR_LOSS_DB
+
+
+def benchmark(rendered, roi):
+    """전체 프레임 JPEG vs ROI 크롭 인코딩 시간/크기"""
+    encoder = DeltaFrameEncoder(keyframe_interval=10 ** 9)
+    encoder.encode(rendered, roi)  # 키프레임 소비
+
+    def measure(fn):
+        fn()
+        start = time.perf_counter()
+        for _ in range(REPEATS):
+            size = fn()
+        return (time.perf_counter() - start) / REPEATS * 1000, size
+
+    full_ms, full_size = measure(
+        lambda: len(cv2.imencode('.jpg', rendered, [cv2.IMWRITE_JPEG_QUALITY, 85])[1])
+    )
+    delta_ms, delta_size = measure(lambda: len(encoder.encode(rendered, roi)['data']))
+    png_ms, png_size = measure(lambda: len(encoder.encode(rendered, roi, image_format='png')['data']))
+
+    print(f"  전체 JPEG:   {full_ms:6.2f} ms, {full_size / 1024:7.1f} KB")
+    print(f"  델타 JPEG:   {delta_ms:6.2f} ms, {delta_size / 1024:7.1f} KB "
+          f"(시간 {full_ms / delta_ms:.1f}x, 크기 {full_size / delta_size:.1f}x)")
+    print(f"  델타 PNG:    {png_ms:6.2f} ms, {png_size / 1024:7.1f} KB")
+    return full_ms / delta_ms, full_size / delta_size
+
+
+def main():
+    frame_w = int(sys.argv[1]) if len(sys.argv) > 1 else 1280
+    frame_h = int(sys.argv[2]) if len(sys.argv) > 2 else 720
+
+    print("="*70)
+    print(f"ROI 델타 프레임 테스트 ({frame_w}x{frame_h})")
+    print("="*70)
+
+    camera = load_camera_frame(frame_w, frame_h)
+    rendered, roi = render_garment(camera)
+
+    print("\n[1] 키프레임 주기")
+    schedule_ok = test_schedule()
+
+    print("\n[2] 복원")
+    reconstruction_ok = test_reconstruction(camera, rendered, roi)
+
+    print("\n[3] 인코딩 비용")
+    time_speedup, size_ratio = benchmark(rendered, roi)
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '키프레임 주기': schedule_ok,
+        '델타 패치 복원': reconstruction_ok,
+        f'인코딩 시간 {MIN_SPEEDUP:.0f}x 이상 감소': time_speedup >= MIN_SPEEDUP,
+        f'응답 크기 {MIN_SPEEDUP:.0f}x 이상 감소': size_ratio >= MIN_SPEEDUP,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
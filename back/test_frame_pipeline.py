@@ -0,0 +1,186 @@
+"""
+스트리밍 프레임 파이프라인 테스트
+========================================
+frame_pipeline.FramePipeline (디코딩 → 렌더링 → 인코딩 단계별 스레드 풀)
+1. 축소 디코딩: imdecode + resize(0.5) vs IMREAD_REDUCED_COLOR_2 (클라이언트 렌더링 모드 입력)
+2. 처리량: 요청 스레드 직렬 처리 vs 단계 풀 (같은 세션 요청 여러 개 동시, 렌더링은 세션 락으로 직렬)
+   렌더링은 cv2 연산 기반 모의 렌더러 (실제 엔진 없이 GIL 해제 구간 재현)
+3. 대기열 제한: max_pending 초과 제출은 PipelineBusy, 단계별 큐 깊이 통계
+
+사용법:
+    python test_frame_pipeline.py [프레임 수] [동시 요청 수]
+"""
+
+import sys
+import os
+import threading
+import time
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from frame_pipeline import FramePipeline, PipelineBusy, decode_frame
+
+FRAME_W, FRAME_H = 1280, 720
+MIN_REDUCED_SPEEDUP = 1.5
+
+
+def make_jpeg(seed=0):
+    """카메라 프레임 대용 JPEG"""
+    rng = np.random.default_rng(seed)
+    frame = cv2.GaussianBlur(rng.integers(0, 255, (FRAME_H, FRAME_W, 3), dtype=np.uint8), (9, 9), 0)
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+
+
+class FakeSession:
+    """렌더링 모의 세션 (세션 락 + 옷 영역 블러/합성 수준의 cv2 연산)"""
+
+    def __init__(self):
+        self.render_lock = threading.Lock()
+
+    def render(self, frame):
+        with self.render_lock:
+            roi = frame[200:650, 450:850]
+            layer = cv2.GaussianBlur(roi, (31, 31), 0)
+            frame[200:650, 450:850] = cv2.addWeighted(roi, 0.3, layer, 0.7, 0)
+            return frame
+
+
+def encode(frame):
+    return cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+
+
+def test_reduced_decode(data, repeats=30):
+    """전체 디코딩 + 축소 vs 축소 디코딩"""
+    def full():
+        frame = decode_frame(data)
+        return cv2.resize(frame, (frame.shape[1] // 2, frame.shape[0] // 2), interpolation=cv2.INTER_LINEAR)
+
+    def reduced():
+        return decode_frame(data, reduced=True)
+
+    results = {}
+    for name, fn in (("전체 + resize", full), ("REDUCED_COLOR_2", reduced)):
+        fn()
+        start = time.perf_counter()
+        for _ in range(repeats):
+            shape = fn().shape
+        results[name] = (time.perf_counter() - start) / repeats * 1000
+        print(f"  {name:16s}: {results[name]:6.2f} ms {shape}")
+    speedup = results["전체 + resize"] / results["REDUCED_COLOR_2"]
+    shape_ok = decode_frame(data, reduced=True).shape[:2] == (FRAME_H // 2, FRAME_W // 2)
+    print(f"  속도 {speedup:.2f}x, 크기 1/2: {'✅' if shape_ok else '❌'}")
+    return speedup, shape_ok
+
+
+def run_serial(data, frames):
+    """기존 방식: 요청 스레드가 디코딩/렌더링/인코딩 직렬 (요청 하나씩)"""
+    session = FakeSession()
+    start = time.perf_counter()
+    for _ in range(frames):
+        encode(session.render(decode_frame(data)))
+    return frames / (time.perf_counter() - start)
+
+
+def run_pipelined(data, frames, concurrency):
+    """요청 concurrency개 동시 (브라우저가 응답 전에 다음 프레임 전송), 단계 풀 경유"""
+    session = FakeSession()
+    pipeline = FramePipeline(decode_workers=2, render_workers=2, encode_workers=2, max_pending=8)
+    remaining = [frames]
+    lock = threading.Lock()
+    depths = []
+
+    def client():
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            frame = pipeline.decode.run(decode_frame, data)
+            frame = pipeline.render.run(session.render, frame)
+            pipeline.encode.run(encode, frame)
+            stats = pipeline.get_stats()
+            depths.append(sum(stage["queued"] + stage["active"] for stage in stats.values()))
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    fps = frames / (time.perf_counter() - start)
+    stats = pipeline.get_stats()
+    pipeline.shutdown()
+    return fps, stats, max(depths)
+
+
+def test_busy():
+    """대기열 제한: 자리가 없으면 즉시 PipelineBusy, 끝나면 깊이 0"""
+    pipeline = FramePipeline(decode_workers=1, render_workers=1, encode_workers=1, max_pending=2)
+    gate = threading.Event()
+    futures = [pipeline.render.submit(gate.wait, timeout=0) for _ in range(2)]
+    try:
+        pipeline.render.submit(gate.wait, timeout=0)
+        busy = False
+    except PipelineBusy:
+        busy = True
+    during = pipeline.render.get_stats()
+    gate.set()
+    for future in futures:
+        future.result()
+    after = pipeline.render.get_stats()
+    pipeline.shutdown()
+
+    checks = {
+        "가득 차면 PipelineBusy": busy,
+        "대기 1 + 실행 1": during["queued"] == 1 and during["active"] == 1,
+        "거절 집계": after["rejected"] == 1,
+        "완료 후 깊이 0": after["queued"] == 0 and after["active"] == 0 and after["completed"] == 2,
+    }
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print("="*70)
+    print(f"프레임 파이프라인 테스트 ({FRAME_W}x{FRAME_H}, {frames}프레임, 동시 요청 {concurrency})")
+    print("="*70)
+    data = make_jpeg()
+
+    print("\n[1] 축소 디코딩")
+    speedup, shape_ok = test_reduced_decode(data)
+
+    print("\n[2] 처리량")
+    serial_fps = run_serial(data, frames)
+    pipelined_fps, stats, max_depth = run_pipelined(data, frames, concurrency)
+    print(f"  직렬 (요청 스레드):  {serial_fps:6.1f} FPS")
+    print(f"  단계 풀:             {pipelined_fps:6.1f} FPS ({pipelined_fps / serial_fps:.2f}x)")
+    for name, stage in stats.items():
+        print(f"    {name:6s}: 대기 평균 {stage['avg_wait_ms']:5.2f} ms, 실행 평균 {stage['avg_run_ms']:5.2f} ms, "
+              f"최대 깊이 {stage['peak_depth']}")
+    print(f"  전체 최대 깊이: {max_depth}")
+
+    print("\n[3] 대기열 제한")
+    busy_ok = test_busy()
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        f'축소 디코딩 {MIN_REDUCED_SPEEDUP}x 이상': speedup >= MIN_REDUCED_SPEEDUP and shape_ok,
+        '단계 풀 처리량 > 직렬': pipelined_fps > serial_fps,
+        '단계별 깊이 <= max_pending': all(stage['peak_depth'] <= stage['max_pending'] for stage in stats.values()),
+        '대기열 제한': busy_ok,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+추론 스케줄러 지연 비교 테스트
+================================
+기존 방식 (inference_queue 비우기 + 배치 수집 타임아웃 + result_queue) vs
+최신 프레임 메일박스 (LatestFrameMailbox + LatestResultCell)
+- 카메라 스레드가 일정 FPS로 프레임 제출, 추론은 배치 크기에 비례하는 가상 지연(sleep)으로 대체
+- 렌더링 루프가 가져간 결과 기준: 캡처 → 결과 수신 지연(p50/p95), 결과 간 간격(p50/p95), 결과 FPS
+
+사용법:
+    python test_frame_scheduler_latency.py [카메라 FPS] [프레임당 추론 ms] [측정 초]
+"""
+
+import sys
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from virtual_fitting import RTMPoseVirtualFitting
+from frame_mailbox import LatestFrameMailbox, LatestResultCell
+
+FRAME_SHAPE = (234, 416, 3)  # 640x360 * 0.65
+BATCH_OVERHEAD = 0.4         # 배치 추론 고정 비용 비율 (배치 시간 = 프레임당 시간 * (0.4 + 0.6 * n))
+
+
+def make_engine(use_frame_mailbox, infer_ms, batch_size=10, frame_timeout=0.05):
+    """모델 로드 없이 스케줄러 상태만 가진 엔진 (추론은 sleep으로 대체)"""
+    engine = RTMPoseVirtualFitting.__new__(RTMPoseVirtualFitting)
+    engine.running = True
+    engine.use_frame_mailbox = use_frame_mailbox
+    engine.use_batch_inference = True
+    engine.batch_size = batch_size
+    engine.frame_timeout = frame_timeout
+    engine.inference_queue = queue.Queue(maxsize=22)
+    engine.result_queue = queue.Queue(maxsize=30)
+    engine.frame_mailbox = LatestFrameMailbox()
+    engine.result_cell = LatestResultCell()
+    engine.inference_stats = {"batches": 0, "frames": 0, "last_batch_size": 0, "last_batch_ms": 0.0,
+                              "avg_batch_ms": 0.0, "avg_frame_ms": 0.0}
+    engine.model_lock = threading.Lock()
+
+    infer_s = infer_ms / 1000
+
+    def infer_single(frame, bbox=None):
+        time.sleep(infer_s)
+        return np.zeros((17, 3), dtype=np.float32)
+
+    def run_batch(frames, bboxes=None):
+        # 배치는 고정 비용을 나눠 가짐 (프레임당 비용은 낮지만 배치 전체를 기다려야 결과가 나옴)
+        time.sleep(infer_s * (BATCH_OVERHEAD + (1 - BATCH_OVERHEAD) * len(frames)))
+        return [np.zeros((17, 3), dtype=np.float32) for _ in frames]
+
+    engine._infer_single = infer_single
+    engine._run_batch_inference = run_batch
+    return engine
+
+
+def submit(engine, frame, captured_at):
+    """_submit_frame의 스케줄러 부분 (세그멘테이션 제출 제외)"""
+    h, w = frame.shape[:2]
+    if engine.use_frame_mailbox:
+        engine.frame_mailbox.put((frame, w, h, captured_at))
+    else:
+        engine._submit_to_queue(frame, w, h, captured_at)
+
+
+def collect(engine):
+    """process_frame의 결과 수집 부분 → 새 결과의 captured_at 목록"""
+    captured = []
+    result_data = engine.result_cell.take()
+    if result_data is not None:
+        captured.append(result_data[1])
+    while True:
+        try:
+            captured.append(engine.result_queue.get_nowait()[1])
+        except queue.Empty:
+            break
+    return captured
+
+
+def run_scheduler(use_frame_mailbox, fps, infer_ms, duration):
+    """
+    카메라 FPS로 제출 + 같은 주기로 렌더링 루프 실행
+
+    Returns:
+        dict: latency_p50/p95_ms (캡처 → 렌더링 루프 수신), interval_p50/p95_ms (표시 포즈 갱신 간격),
+              result_fps
+    """
+    engine = make_engine(use_frame_mailbox, infer_ms)
+    worker = engine._mailbox_worker if use_frame_mailbox else engine._inference_worker
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+
+    frame = np.zeros(FRAME_SHAPE, dtype=np.uint8)
+    period = 1.0 / fps
+    latencies = []
+    updates = []
+    start = time.perf_counter()
+    next_tick = start
+    while time.perf_counter() - start < duration:
+        now = time.time()
+        submit(engine, frame, now)
+        captured = collect(engine)
+        if captured:
+            latencies.extend(now - c for c in captured)
+            updates.append(now)
+        next_tick += period
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    engine.running = False
+    engine.frame_mailbox.close()
+    engine.inference_queue.put(None)
+    thread.join(timeout=2)
+
+    latencies = np.array(latencies[5:]) * 1000  # 워밍업 제외
+    intervals = np.diff(updates[5:]) * 1000
+    return {
+        "latency_p50_ms": float(np.percentile(latencies, 50)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "interval_p50_ms": float(np.percentile(intervals, 50)),
+        "interval_p95_ms": float(np.percentile(intervals, 95)),
+        "result_fps": len(updates) / duration
+    }
+
+
+def main():
+    """메인 테스트 실행"""
+    fps = float(sys.argv[1]) if len(sys.argv) > 1 else 30.0
+    infer_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 25.0
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 5.0
+
+    print("\n" + "="*70)
+    print(f"🔍 추론 스케줄러 지연 비교 (카메라 {fps:.0f} FPS, 추론 {infer_ms:.0f}ms/프레임, {duration:.0f}초)")
+    print("="*70)
+
+    results = {}
+    for name, use_frame_mailbox in (('큐 배치', False), ('메일박스', True)):
+        result = run_scheduler(use_frame_mailbox, fps, infer_ms, duration)
+        results[name] = result
+        print(f"  {name}: 캡처 → 수신 p50 {result['latency_p50_ms']:.1f}ms / p95 {result['latency_p95_ms']:.1f}ms, "
+              f"포즈 갱신 간격 p50 {result['interval_p50_ms']:.1f}ms / p95 {result['interval_p95_ms']:.1f}ms, "
+              f"{result['result_fps']:.1f} FPS")
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '지연 감소 (p95)': results['메일박스']['latency_p95_ms'] < results['큐 배치']['latency_p95_ms'],
+        '갱신 간격 유지 (p95)': results['메일박스']['interval_p95_ms'] <= results['큐 배치']['interval_p95_ms'] * 1.1,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+옷 에셋 캐시 테스트
+========================================
+garment_cache.GarmentAssetCache (원본 내용 SHA-256 키 → 배경 제거 RGBA + 키포인트 + 축소 피라미드)
+rembg 대신 결정적 배경 제거 (흰 배경 → 알파 0)로 교체해 모델 없이 실행
+1. 해시 키: 경로가 달라도 내용이 같으면 적중, 내용이 바뀌면 새 엔트리 (오래된 결과 재사용 안 함), 피라미드 레벨
+2. LRU 개수: max_entries 초과 시 가장 오래 안 쓴 엔트리부터 제거 (적중하면 순서 갱신), 디렉토리도 삭제
+3. LRU 용량: max_bytes 초과 시 오래된 엔트리 제거, 예산보다 큰 새 엔트리는 유지
+4. 배경 제거 실패: 원본으로 에셋 반환하되 캐시하지 않음 → 다음 로드에서 다시 시도해 캐시
+5. 인덱스 저장: 재시작 후 엔트리/LRU 순서 복원, 손상된 인덱스는 디렉토리 스캔으로 재구성, 삭제된 엔트리는 미스
+
+사용법:
+    python test_garment_cache.py
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+import garment_cache
+from garment_cache import GarmentAssetCache, hash_file, INDEX_FILENAME
+
+# 배경 제거 실패 모드 (True면 rembg 실패처럼 파일을 쓰지 않고 원본 반환)
+background_removal_fails = False
+
+
+def stub_remove_background(cloth_image_path, output_path):
+    """흰 배경을 투명하게 (rembg 대체, 실패 모드에서는 cloth_processor처럼 원본만 반환)"""
+    image = cv2.imread(cloth_image_path)
+    if background_removal_fails:
+        return image
+    rgba = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    rgba[:, :, 3] = np.where(np.all(image > 240, axis=2), 0, 255)
+    cv2.imwrite(output_path, rgba)
+    return rgba
+
+
+def make_cloth(path, marker, size=(360, 300)):
+    """흰 배경 위 합성 옷 (marker로 내용을 바꿔 다른 해시)"""
+    h, w = size
+    image = np.full((h, w, 3), 255, dtype=np.uint8)
+    polygon = np.array([
+        [w * 0.3, h * 0.05], [w * 0.7, h * 0.05], [w * 0.95, h * 0.3], [w * 0.75, h * 0.35],
+        [w * 0.75, h * 0.95], [w * 0.25, h * 0.95], [w * 0.25, h * 0.35], [w * 0.05, h * 0.3]
+    ], dtype=np.int32)
+    cv2.fillPoly(image, [polygon], (40, 90, 200))
+    cv2.putText(image, str(marker), (int(w * 0.4), int(h * 0.6)), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (0, 0, 0), 3)
+    cv2.imwrite(path, image)
+    return path
+
+
+def check(checks):
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_hash_key(work_dir):
+    """같은 내용 → 같은 엔트리, 내용 변경 → 새 엔트리"""
+    cache = GarmentAssetCache(os.path.join(work_dir, 'cache_hash'))
+    path_a = make_cloth(os.path.join(work_dir, 'a.png'), 1)
+    copy_a = os.path.join(work_dir, 'a_copy.png')
+    shutil.copyfile(path_a, copy_a)
+
+    first = cache.get_or_create(path_a)
+    same = cache.get_or_create(copy_a)
+    make_cloth(path_a, 2)  # 같은 경로, 다른 내용
+    changed = cache.get_or_create(path_a)
+    stats = cache.get_stats()
+
+    scales = [level_scale for level_scale, _ in first.pyramid]
+    print(f"  키 {first.content_hash[:12]} → 변경 후 {changed.content_hash[:12]}, 피라미드 {scales}, "
+          f"적중 {stats['hits']} / 미스 {stats['misses']}")
+    return check({
+        "키 = 파일 내용 SHA-256": first.content_hash == hash_file(copy_a),
+        "다른 경로 같은 내용 → 적중": same.content_hash == first.content_hash and stats['hits'] == 1,
+        "내용 변경 → 새 엔트리": changed.content_hash != first.content_hash and stats['entries'] == 2,
+        "배경 제거 RGBA + 키포인트": first.rgba.shape[2] == 4 and first.keypoints is not None,
+        "피라미드 1.0 → 0.5 → 0.25": scales == [1.0, 0.5, 0.25] and first.best_level(0.3)[0] == 0.5,
+    })
+
+
+def test_lru_entries(work_dir):
+    """max_entries 2: A, B 생성 → A 적중 → C 생성 시 B 제거"""
+    cache = GarmentAssetCache(os.path.join(work_dir, 'cache_entries'), max_entries=2)
+    paths = [make_cloth(os.path.join(work_dir, f'lru_{i}.png'), 10 + i) for i in range(3)]
+    hashes = [hash_file(path) for path in paths]
+
+    cache.get_or_create(paths[0])
+    cache.get_or_create(paths[1])
+    cache.get_or_create(paths[0])  # A 최근 사용
+    cache.get_or_create(paths[2])
+
+    print(f"  인덱스 순서 {[h[:8] for h in cache.index]}")
+    return check({
+        "엔트리 수 max_entries 이내": len(cache.index) == 2,
+        "가장 오래 안 쓴 B 제거": hashes[1] not in cache.index and hashes[0] in cache.index,
+        "제거된 엔트리 디렉토리 삭제": not os.path.exists(os.path.join(cache.root_dir, hashes[1])),
+        "LRU 순서 (A → C)": list(cache.index) == [hashes[0], hashes[2]],
+    })
+
+
+def test_lru_bytes(work_dir):
+    """max_bytes: 엔트리 1.5개 분량 → 두 번째 생성 시 첫 번째 제거, 예산보다 큰 엔트리는 유지"""
+    paths = [make_cloth(os.path.join(work_dir, f'bytes_{i}.png'), 20 + i) for i in range(2)]
+    probe = GarmentAssetCache(os.path.join(work_dir, 'cache_probe'))
+    probe.get_or_create(paths[0])
+    entry_bytes = probe.get_stats()['bytes']
+
+    cache = GarmentAssetCache(os.path.join(work_dir, 'cache_bytes'), max_bytes=int(entry_bytes * 1.5))
+    cache.get_or_create(paths[0])
+    cache.get_or_create(paths[1])
+    stats = cache.get_stats()
+
+    tiny = GarmentAssetCache(os.path.join(work_dir, 'cache_tiny'), max_bytes=entry_bytes // 2)
+    oversize = tiny.get_or_create(paths[0])
+
+    print(f"  엔트리 약 {entry_bytes / 1024:.0f}KB, 예산 {stats['max_bytes'] / 1024:.0f}KB, "
+          f"사용 {stats['bytes'] / 1024:.0f}KB, 엔트리 {stats['entries']}")
+    return check({
+        "용량 예산 이내": stats['bytes'] <= stats['max_bytes'],
+        "오래된 엔트리 제거": list(cache.index) == [hash_file(paths[1])],
+        "예산보다 큰 새 엔트리는 유지": oversize is not None and len(tiny.index) == 1,
+    })
+
+
+def test_degraded(work_dir):
+    """배경 제거 실패 → 원본 에셋 (캐시 안 함) → 성공 시 캐시"""
+    global background_removal_fails
+    cache = GarmentAssetCache(os.path.join(work_dir, 'cache_degraded'))
+    path = make_cloth(os.path.join(work_dir, 'degraded.png'), 30)
+    content_hash = hash_file(path)
+
+    background_removal_fails = True
+    try:
+        degraded = cache.get_or_create(path)
+    finally:
+        background_removal_fails = False
+    not_cached = content_hash not in cache.index and not os.path.exists(os.path.join(cache.root_dir, content_hash))
+    leftovers = [name for name in os.listdir(cache.root_dir) if '.tmp-' in name]
+
+    retried = cache.get_or_create(path)
+    stats = cache.get_stats()
+    print(f"  실패 시 degraded={degraded.degraded}, path={degraded.path} → 재시도 degraded={retried.degraded}, "
+          f"미스 {stats['misses']}")
+    return check({
+        "실패해도 원본으로 에셋 반환": degraded is not None and degraded.degraded and degraded.path is None,
+        "원본은 불투명 (알파 255)": degraded.rgba.shape[2] == 4 and int(degraded.rgba[:, :, 3].min()) == 255,
+        "캐시/임시 디렉토리 남기지 않음": not_cached and not leftovers,
+        "다음 로드에서 다시 시도 → 캐시": not retried.degraded and content_hash in cache.index and stats['misses'] == 2,
+    })
+
+
+def test_index_persistence(work_dir):
+    """재시작 후 인덱스/LRU 순서 복원, 손상된 인덱스 재구성, 삭제된 엔트리 미스"""
+    root = os.path.join(work_dir, 'cache_index')
+    cache = GarmentAssetCache(root)
+    paths = [make_cloth(os.path.join(work_dir, f'index_{i}.png'), 40 + i) for i in range(3)]
+    hashes = [hash_file(path) for path in paths]
+    for path in paths:
+        cache.get_or_create(path)
+
+    # 적중 순서 저장 (디바운스 없이)
+    saved_interval = garment_cache.INDEX_SAVE_INTERVAL
+    garment_cache.INDEX_SAVE_INTERVAL = 0.0
+    try:
+        cache.get(hashes[0])
+    finally:
+        garment_cache.INDEX_SAVE_INTERVAL = saved_interval
+    expected_order = [hashes[1], hashes[2], hashes[0]]
+
+    restarted = GarmentAssetCache(root)
+    order_restored = list(restarted.index) == expected_order
+    reloaded = restarted.get_or_create(paths[1])
+    reload_hit = reloaded is not None and restarted.get_stats()['hits'] == 1
+
+    with open(os.path.join(root, INDEX_FILENAME), 'w', encoding='utf-8') as f:
+        f.write('{손상')
+    rebuilt = GarmentAssetCache(root)
+    rebuilt_entries = set(rebuilt.index) == set(hashes)
+
+    shutil.rmtree(os.path.join(root, hashes[2]))
+    missing = rebuilt.get(hashes[2])
+    print(f"  재시작 후 순서 {[h[:8] for h in restarted.index]}, 재구성 엔트리 {len(rebuilt.index)}")
+    return check({
+        "재시작 후 LRU 순서 복원 (적중 반영)": order_restored,
+        "재시작 후 적중 (재생성 없음)": reload_hit,
+        "손상된 인덱스 → 디렉토리 스캔 재구성": rebuilt_entries,
+        "삭제된 엔트리 → 미스 + 인덱스에서 제거": missing is None and hashes[2] not in rebuilt.index,
+    })
+
+
+def main():
+    print("="*70)
+    print("옷 에셋 캐시 테스트 (배경 제거 모의)")
+    print("="*70)
+
+    garment_cache.remove_background = stub_remove_background
+    work_dir = tempfile.mkdtemp(prefix='garment_cache_test_')
+    try:
+        print("\n[1] 해시 키")
+        hash_ok = test_hash_key(work_dir)
+
+        print("\n[2] LRU (엔트리 수)")
+        entries_ok = test_lru_entries(work_dir)
+
+        print("\n[3] LRU (용량)")
+        bytes_ok = test_lru_bytes(work_dir)
+
+        print("\n[4] 배경 제거 실패")
+        degraded_ok = test_degraded(work_dir)
+
+        print("\n[5] 인덱스 저장")
+        index_ok = test_index_persistence(work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '내용 해시 키': hash_ok,
+        'LRU 엔트리 수': entries_ok,
+        'LRU 용량': bytes_ok,
+        '배경 제거 실패 시 캐시 안 함': degraded_ok,
+        '인덱스 저장/복원': index_ok,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
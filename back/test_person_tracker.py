@@ -0,0 +1,179 @@
+"""
+사람 박스 추적 (포즈 추론 ROI) 테스트
+========================================
+person_tracker.PersonTracker + RTMPose 사람 박스 추론
+1. 추적 동작: 키포인트 외접 박스 + 여백, 프레임 범위 자르기, 신뢰도 하락/오래된 결과 시 프레임 전체 폴백
+2. 어깨 정확도 (ONNX 모델이 있을 때): 원본 해상도 프레임 전체 추론을 기준으로
+   inference_scale별 프레임 전체 추론 vs 추적 박스 추론의 어깨 오차 비교
+
+사용법:
+    python test_person_tracker.py [녹화 프레임 디렉토리] [--onnx 모델 경로]
+"""
+
+import sys
+import os
+import glob
+import argparse
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from person_tracker import PersonTracker
+
+SCALES = (0.65, 0.5, 0.4)
+
+
+def load_test_frames(frame_dir=None, max_frames=100):
+    """녹화 프레임 로드 (없으면 저장소 내 테스트 이미지)"""
+    if frame_dir:
+        paths = [p for ext in ('*.jpg', '*.jpeg', '*.png') for p in glob.glob(os.path.join(frame_dir, ext))]
+    else:
+        paths = glob.glob(os.path.join(current_dir, 'fit', 'test_pic', '*.png'))
+        paths += glob.glob(os.path.join(current_dir, 'fit', 'input', '*.jpg'))
+    frames = [cv2.imread(path, cv2.IMREAD_COLOR) for path in sorted(paths)[:max_frames]]
+    return [frame for frame in frames if frame is not None]
+
+
+def make_pose(center_x, center_y, size, score=0.9):
+    """합성 상반신 포즈 (17, 3) (코, 눈, 어깨, 팔꿈치, 손목, 골반 + 낮은 신뢰도 다리)"""
+    pose = np.zeros((17, 3), dtype=np.float32)
+    offsets = {
+        0: (0.0, -0.45), 1: (0.05, -0.5), 2: (-0.05, -0.5), 3: (0.1, -0.48), 4: (-0.1, -0.48),
+        5: (0.25, -0.25), 6: (-0.25, -0.25), 7: (0.3, 0.0), 8: (-0.3, 0.0), 9: (0.3, 0.2), 10: (-0.3, 0.2),
+        11: (0.15, 0.3), 12: (-0.15, 0.3), 13: (0.15, 0.6), 14: (-0.15, 0.6), 15: (0.15, 0.9), 16: (-0.15, 0.9)
+    }
+    for index, (dx, dy) in offsets.items():
+        pose[index] = (center_x + dx * size, center_y + dy * size, score if index < 13 else 0.1)
+    return pose
+
+
+def test_tracking():
+    """추적/폴백 동작"""
+    print("="*70)
+    print("1. 추적 동작")
+    print("="*70)
+
+    frame_w, frame_h = 1280, 720
+    tracker = PersonTracker()
+    checks = {}
+
+    checks['초기 상태 = 프레임 전체'] = tracker.get_box(frame_w, frame_h, 0.0) is None
+
+    pose = make_pose(640, 360, 400)
+    tracker.update(pose, 0.0)
+    box = tracker.get_box(frame_w, frame_h, 0.1)
+    upper = pose[:13]
+    inside = box is not None and bool(((upper[:, 0] >= box[0]) & (upper[:, 0] <= box[2]) &
+                                       (upper[:, 1] >= box[1]) & (upper[:, 1] <= box[3])).all())
+    checks['상반신 키포인트 포함'] = inside
+    checks['박스 < 프레임'] = box is not None and (box[2] - box[0]) * (box[3] - box[1]) < frame_w * frame_h * 0.5
+    print(f"  박스: {tuple(round(v) for v in box) if box else None}")
+
+    edge = make_pose(60, 360, 400)
+    tracker.update(edge, 0.2)
+    box = tracker.get_box(frame_w, frame_h, 0.3)
+    checks['프레임 범위로 자르기'] = box is not None and box[0] >= 0 and box[2] <= frame_w
+
+    checks['오래된 결과 폴백'] = tracker.get_box(frame_w, frame_h, 0.2 + tracker.max_age + 0.01) is None
+
+    tracker.update(make_pose(640, 360, 400, score=0.2), 1.0)
+    checks['신뢰도 하락 폴백'] = tracker.get_box(frame_w, frame_h, 1.0) is None
+
+    tracker.update(make_pose(640, 360, 400), 2.0)
+    tracker.reset()
+    checks['reset 후 프레임 전체'] = tracker.get_box(frame_w, frame_h, 2.0) is None
+
+    for name, success in checks.items():
+        print(f"  {name}: {'✅' if success else '❌'}")
+    print(f"  통계: {tracker.get_stats()}")
+    return all(checks.values())
+
+
+def shoulder_error(ref, pred):
+    """기준 대비 어깨 평균 오차 (px, 원본 해상도)"""
+    return float(np.linalg.norm(ref[5:7, :2] - pred[5:7, :2], axis=1).mean())
+
+
+def test_shoulder_accuracy(frames, onnx_path):
+    """inference_scale별 프레임 전체 vs 추적 박스 어깨 오차"""
+    print("\n" + "="*70)
+    print("2. 어깨 정확도 (원본 해상도 프레임 전체 추론 기준)")
+    print("="*70)
+
+    from rtmpose_onnx import RTMPoseONNX
+    model = RTMPoseONNX(onnx_path)
+
+    refs = []
+    for frame in frames:
+        refs.append(model.inference_pose(frame))
+    pairs = [(f, r) for f, r in zip(frames, refs) if (r[5:7, 2] > 0.5).all()]
+    print(f"[Test] 어깨 검출 프레임: {len(pairs)}장")
+    if not pairs:
+        return {}
+    frames, refs = zip(*pairs)
+
+    results = {}
+    for scale in SCALES:
+        full_errors, tracked_errors = [], []
+        for frame, ref in zip(frames, refs):
+            h, w = frame.shape[:2]
+            small = cv2.resize(frame, (int(w * scale), int(h * scale)), interpolation=cv2.INTER_LINEAR)
+            sx, sy = w / small.shape[1], h / small.shape[0]
+
+            full = model.inference_pose(small).copy()
+            full[:, 0] *= sx
+            full[:, 1] *= sy
+            full_errors.append(shoulder_error(ref, full))
+
+            # 이전 프레임 결과 = 기준 포즈로 박스 추적 (정지 상태 근사)
+            tracker = PersonTracker()
+            tracker.update(ref, 0.0)
+            box = tracker.get_box(w, h, 0.0)
+            bbox = None if box is None else (box[0] / sx, box[1] / sy, box[2] / sx, box[3] / sy)
+            tracked = model.inference_pose(small, bbox).copy()
+            tracked[:, 0] *= sx
+            tracked[:, 1] *= sy
+            tracked_errors.append(shoulder_error(ref, tracked))
+
+        results[scale] = (float(np.mean(full_errors)), float(np.mean(tracked_errors)))
+        print(f"  scale {scale:.2f}: 프레임 전체 {results[scale][0]:.2f}px, 추적 박스 {results[scale][1]:.2f}px")
+    return results
+
+
+def main():
+    """메인 테스트 실행"""
+    parser = argparse.ArgumentParser(description='사람 박스 추적 테스트')
+    parser.add_argument('frame_dir', nargs='?', default=None, help='녹화 프레임 디렉토리')
+    parser.add_argument('--onnx', default=None, help='ONNX 모델 경로 (없으면 기본 경로)')
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print("🔍 사람 박스 추적 테스트")
+    print("="*70)
+
+    checks = {'추적 동작': test_tracking()}
+
+    try:
+        from rtmpose_onnx import resolve_onnx_path
+        onnx_path = resolve_onnx_path(args.onnx)
+    except Exception as e:
+        onnx_path = None
+        print(f"\n[Test] ONNX 모델 없음 - 어깨 정확도 비교 생략 ({e})")
+
+    if onnx_path and os.path.exists(onnx_path):
+        results = test_shoulder_accuracy(load_test_frames(args.frame_dir), onnx_path)
+        if results:
+            lowest = min(SCALES)
+            checks[f'scale {lowest} 어깨 오차 감소'] = results[lowest][1] <= results[lowest][0]
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
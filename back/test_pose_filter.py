@@ -0,0 +1,176 @@
+"""
+키포인트 시간 필터 테스트
+========================================
+pose_filter.OneEuroPoseFilter (캡처 시각 기준 update + 렌더링 시각 predict)
+1. 추적 오차: 200px/s 등속 이동, 25Hz 추론, 60ms 지연, 40fps 렌더링, 관측 잡음 σ 2px
+   마지막 포즈 유지 vs 필터 + 외삽 (렌더링 시각 실제 위치와의 평균 오차)
+2. 떨림: 정지 상태 관측 잡음 → 렌더링 시각 실제 위치와의 평균 오차 (원값 vs 필터, 잡음 속도는 외삽 감쇠)
+3. 외삽 상한: 추론이 끊기면 max_extrapolation(0.1초)까지만 외삽, 과거 시각은 외삽 안 함
+4. 상태 처리: 오래된 결과 무시, reset_interval 이후 재시작, 신뢰도 낮은 관절은 원값
+
+사용법:
+    python test_pose_filter.py [속도 px/s] [잡음 px]
+"""
+
+import sys
+import os
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from pose_filter import OneEuroPoseFilter
+
+INFERENCE_INTERVAL = 0.04  # 25Hz 추론
+LATENCY = 0.06             # 캡처 → 결과 도착
+RENDER_INTERVAL = 0.025    # 40fps 렌더링
+DURATION = 4.0
+WARMUP = 0.5               # 필터 수렴 전 구간은 오차 집계에서 제외
+MAX_ERROR_RATIO = 0.4      # 필터 오차 / 마지막 포즈 유지 오차 상한
+MAX_JITTER_RATIO = 0.6     # 정지 상태 필터 오차 / 원값 오차 상한
+
+
+def make_pose(x, y, score=0.9):
+    pose = np.zeros((17, 3), dtype=np.float32)
+    pose[:, 0] = x
+    pose[:, 1] = y
+    pose[:, 2] = score
+    return pose
+
+
+def simulate(truth, noise, seed=0, **filter_options):
+    """
+    추론 결과를 캡처 시각 순서로 도착 시각에 반영하며 렌더링 시각마다 포즈 계산
+
+    Returns:
+        (렌더링 시각 목록, 마지막 포즈 유지 x 목록, 필터 예측 x 목록)
+    """
+    rng = np.random.default_rng(seed)
+    pose_filter = OneEuroPoseFilter(**filter_options)
+    captures = np.arange(0.0, DURATION, INFERENCE_INTERVAL)
+    held = None
+    next_result = 0
+    times, held_x, filtered_x = [], [], []
+    for now in np.arange(WARMUP, DURATION, RENDER_INTERVAL):
+        while next_result < len(captures) and captures[next_result] + LATENCY <= now:
+            captured_at = captures[next_result]
+            held = make_pose(truth(captured_at) + rng.normal(0, noise, 17), 100.0)
+            pose_filter.update(held, captured_at)
+            next_result += 1
+        times.append(now)
+        held_x.append(held[:, 0].copy())
+        filtered_x.append(pose_filter.predict(now)[:, 0])
+    return np.array(times), np.array(held_x), np.array(filtered_x)
+
+
+def check(checks):
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_tracking(speed, noise):
+    """등속 이동: 렌더링 시각 실제 위치와의 평균 오차"""
+    truth = lambda t: speed * t
+    times, held_x, filtered_x = simulate(truth, noise)
+    actual = truth(times)[:, np.newaxis]
+    held_error = np.abs(held_x - actual).mean()
+    filtered_error = np.abs(filtered_x - actual).mean()
+    print(f"  평균 오차: 마지막 포즈 유지 {held_error:.1f}px → 필터 + 외삽 {filtered_error:.1f}px "
+          f"({filtered_error / held_error:.2f}배)")
+    return check({f"필터 오차 {MAX_ERROR_RATIO}배 이하": filtered_error <= held_error * MAX_ERROR_RATIO})
+
+
+def test_jitter(noise):
+    """정지 상태: 렌더링 시각 실제 위치와의 평균 오차 (잡음 속도가 외삽되면 평활화 효과가 사라짐)"""
+    _, held_x, filtered_x = simulate(lambda t: 320.0, noise)
+    held_jitter = np.abs(held_x - 320.0).mean()
+    filtered_jitter = np.abs(filtered_x - 320.0).mean()
+    _, _, undamped_x = simulate(lambda t: 320.0, noise, extrapolation_deadband=0.0)
+    undamped_jitter = np.abs(undamped_x - 320.0).mean()
+    print(f"  평균 오차: 원값 {held_jitter:.2f}px → 필터 {filtered_jitter:.2f}px "
+          f"({filtered_jitter / held_jitter:.2f}배), 외삽 감쇠 없이 {undamped_jitter:.2f}px")
+    return check({
+        f"떨림 {MAX_JITTER_RATIO}배 이하": filtered_jitter <= held_jitter * MAX_JITTER_RATIO,
+        "외삽 감쇠가 잡음 외삽 억제": filtered_jitter < undamped_jitter,
+    })
+
+
+def test_extrapolation_cap():
+    """추론이 끊겨도 0.1초 분량까지만 외삽"""
+    pose_filter = OneEuroPoseFilter()
+    for i in range(10):
+        pose_filter.update(make_pose(100.0 + 8.0 * i, 50.0), i * INFERENCE_INTERVAL)
+    last = pose_filter.last_timestamp
+    base = pose_filter.predict(last)[0, 0]
+    velocity = float(pose_filter.velocity[0, 0])
+    at_cap = pose_filter.predict(last + pose_filter.max_extrapolation)[0, 0]
+    long_gap = pose_filter.predict(last + 2.0)[0, 0]
+    half = pose_filter.predict(last + 0.05)[0, 0]
+    past = pose_filter.predict(last - 0.5)[0, 0]
+    print(f"  속도 {velocity:.0f}px/s, 기준 {base:.1f}, 0.05초 {half:.1f}, 0.1초 {at_cap:.1f}, 2초 {long_gap:.1f}")
+    return check({
+        "속도 추정 (양수)": velocity > 0,
+        "상한 이내 등속 외삽": half > base and np.isclose(at_cap - base, 2 * (half - base), atol=1e-3),
+        "상한 이후 더 이동하지 않음": np.isclose(long_gap, at_cap),
+        "과거 시각은 외삽 안 함": np.isclose(past, base),
+    })
+
+
+def test_state():
+    """오래된 결과 무시, reset_interval 재시작, 신뢰도 낮은 관절 원값"""
+    pose_filter = OneEuroPoseFilter()
+    checks = {"update 전 예측 없음": pose_filter.predict(0.0) is None}
+    pose_filter.update(make_pose(100.0, 100.0), 1.0)
+    pose_filter.update(make_pose(110.0, 100.0), 1.04)
+    checks["오래된 결과 무시"] = not pose_filter.update(make_pose(500.0, 100.0), 1.02)
+
+    low = make_pose(120.0, 100.0)
+    low[3] = (400.0, 300.0, 0.1)
+    pose_filter.update(low, 1.08)
+    predicted = pose_filter.predict(1.08)
+    checks["신뢰도 낮은 관절은 원값"] = np.allclose(predicted[3, :2], (400.0, 300.0))
+    checks["나머지 관절은 평활화"] = 110.0 < predicted[0, 0] < 120.0
+
+    pose_filter.update(make_pose(300.0, 100.0), 1.08 + pose_filter.reset_interval + 0.1)
+    restarted = pose_filter.predict(pose_filter.last_timestamp + 0.05)
+    checks["reset_interval 이후 재시작 (속도 0)"] = np.allclose(restarted[:, 0], 300.0)
+    return check(checks)
+
+
+def main():
+    speed = float(sys.argv[1]) if len(sys.argv) > 1 else 200.0
+    noise = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+
+    print("="*70)
+    print(f"키포인트 시간 필터 테스트 ({speed:.0f}px/s, 잡음 σ {noise:.1f}px, "
+          f"추론 {1 / INFERENCE_INTERVAL:.0f}Hz, 지연 {LATENCY * 1000:.0f}ms, 렌더링 {1 / RENDER_INTERVAL:.0f}fps)")
+    print("="*70)
+
+    print("\n[1] 추적 오차")
+    tracking_ok = test_tracking(speed, noise)
+
+    print("\n[2] 떨림")
+    jitter_ok = test_jitter(noise)
+
+    print("\n[3] 외삽 상한")
+    cap_ok = test_extrapolation_cap()
+
+    print("\n[4] 상태 처리")
+    state_ok = test_state()
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '추적 오차 감소': tracking_ok,
+        '정지 상태 떨림 감소': jitter_ok,
+        '외삽 상한 0.1초': cap_ok,
+        '상태 처리': state_ok,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+포즈 워커 프로세스 테스트
+========================================
+pose_worker.PoseWorkerProcess / PoseChannel (공유 메모리 링 + 워커 자동 재시작)
+모델 대신 모의 배치 추론 (config['model_factory']): 받은 슬롯 프레임 크기/사람 박스/마커 값을 포즈로 돌려줌
+1. 왕복: 제출 → 워커 추론 → 원본 해상도로 환산된 포즈 + 캡처 시각
+2. 큰 프레임: 슬롯보다 크면 축소해서 복사, 사람 박스도 같은 비율로 축소 → 결과는 원본 좌표
+3. 덮어쓴 슬롯: 추론 중 링이 한 바퀴 돌면 결과를 버림 (dropped), 최신 프레임 결과만 발행
+4. 재시작: 워커 SIGKILL → ensure_alive가 백오프 후 다시 띄움 → 새 워커로 왕복
+
+사용법:
+    python test_pose_worker.py
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from pose_worker import PoseWorkerProcess, FRAME_SLOTS
+
+READY_TIMEOUT = 20.0
+
+
+def stub_model_factory(config):
+    """
+    모의 배치 추론 (워커 프로세스에서 호출, 피클 가능한 최상위 함수)
+    포즈 0번 = 박스 좌상단 + 마커(프레임 [0, 0] 픽셀), 1번 = 박스 우하단, 2번 = 슬롯 프레임 크기
+    """
+    delay = config.get('stub_delay', 0.0)
+
+    def infer_batch(frames, bboxes):
+        time.sleep(delay)
+        poses = []
+        for frame, bbox in zip(frames, bboxes):
+            h, w = frame.shape[:2]
+            x1, y1, x2, y2 = bbox if bbox is not None else (0, 0, w, h)
+            pose = np.zeros((17, 3))
+            pose[0] = (x1, y1, frame[0, 0, 0])
+            pose[1] = (x2, y2, 1.0)
+            pose[2] = (w, h, 1.0)
+            poses.append(pose)
+        return poses
+
+    return infer_batch
+
+
+def make_frame(h, w, marker):
+    return np.full((h, w, 3), marker, dtype=np.uint8)
+
+
+def wait_ready(worker, timeout=READY_TIMEOUT):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if worker.ensure_alive(interval=0) and worker.is_ready():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def wait_pose(channel, timeout=5.0, marker=None):
+    """결과 대기 (marker를 주면 그 프레임 결과가 올 때까지)"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        result = channel.poll()
+        if result is not None and (marker is None or int(result[0][0, 2]) == marker):
+            return result
+        time.sleep(0.01)
+    return None
+
+
+def check(checks):
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_round_trip(worker):
+    """추론 해상도 320x240 → 원본 640x480 좌표"""
+    channel = worker.open_channel()
+    captured_at = time.time()
+    submitted = channel.submit(make_frame(240, 320, 7), 640, 480, captured_at, bbox=(10, 20, 100, 200))
+    result = wait_pose(channel, marker=7)
+    channel.close()
+    if not submitted or result is None:
+        return check({"제출 + 결과 수신": False})
+
+    pose, result_at = result
+    print(f"  박스 {pose[0, :2].tolist()} ~ {pose[1, :2].tolist()}, 크기 {pose[2, :2].tolist()}")
+    return check({
+        "제출 + 결과 수신": True,
+        "박스 원본 좌표 환산": np.allclose(pose[0, :2], (20, 40)) and np.allclose(pose[1, :2], (200, 400)),
+        "프레임 크기 → 원본 크기": np.allclose(pose[2, :2], (640, 480)),
+        "캡처 시각 유지": abs(result_at - captured_at) < 1e-3,
+    })
+
+
+def test_oversize(worker, max_shape):
+    """슬롯(max_shape)의 2배 프레임: 절반으로 축소 복사, 박스도 절반 → 결과는 원본 좌표"""
+    channel = worker.open_channel()
+    h, w = max_shape[0] * 2, max_shape[1] * 2
+    bbox = (40, 60, 200, 220)  # 제출 프레임 좌표
+    channel.submit(make_frame(h, w, 9), w * 2, h * 2, time.time(), bbox=bbox)
+    header = worker.layout.slot_header(channel.channel, channel.seq % FRAME_SLOTS).copy()
+    result = wait_pose(channel, marker=9)
+    channel.close()
+    if result is None:
+        return check({"결과 수신": False})
+
+    pose = result[0]
+    expected = np.array(bbox, dtype=np.float64) * 2  # 제출 프레임 → 원본 (2배)
+    print(f"  슬롯 {int(header[1])}x{int(header[2])}, 슬롯 박스 {header[6:10].tolist()}, "
+          f"결과 박스 {pose[0, :2].tolist()} ~ {pose[1, :2].tolist()}")
+    return check({
+        "슬롯 크기로 축소": (int(header[1]), int(header[2])) == tuple(max_shape),
+        "박스도 같은 비율로 축소": np.allclose(header[6:10], np.array(bbox) / 2),
+        "결과 박스 원본 좌표": np.allclose(pose[0, :2], expected[:2]) and np.allclose(pose[1, :2], expected[2:]),
+        "프레임 크기 → 원본 크기": np.allclose(pose[2, :2], (w * 2, h * 2)),
+    })
+
+
+def test_dropped_slot(worker):
+    """추론 중(stub_delay) 같은 슬롯이 덮어써지면 그 결과는 버리고 최신 프레임 결과만 발행"""
+    channel = worker.open_channel()
+    dropped_before = worker.get_stats()["dropped"]
+    channel.submit(make_frame(120, 160, 1), 160, 120, time.time())
+    time.sleep(0.1)  # 워커가 첫 프레임을 가져가 추론 중
+    for marker in range(2, FRAME_SLOTS + 2):
+        channel.submit(make_frame(120, 160, marker), 160, 120, time.time())
+    latest = FRAME_SLOTS + 1
+
+    first = wait_pose(channel)
+    if first is not None and int(first[0][0, 2]) != latest:
+        first = wait_pose(channel, marker=latest) or first
+    dropped = worker.get_stats()["dropped"] - dropped_before
+    channel.close()
+    marker = int(first[0][0, 2]) if first is not None else None
+    print(f"  덮어쓴 슬롯 결과 버림 {dropped}개, 발행된 결과 마커 {marker} (최신 {latest})")
+    return check({
+        "덮어쓴 슬롯 dropped": dropped >= 1,
+        "최신 프레임 결과 발행": marker == latest,
+    })
+
+
+def test_restart(worker):
+    """SIGKILL 후 백오프 재시작 → 새 워커로 왕복"""
+    old_pid = worker.process.pid
+    restarts_before = worker.restarts
+    worker.process.kill()  # SIGKILL (Windows는 TerminateProcess)
+    worker.process.join(timeout=5)
+
+    start = time.time()
+    ready = wait_ready(worker)
+    elapsed = time.time() - start
+    stats = worker.get_stats()
+    print(f"  pid {old_pid} → {stats['pid']}, 재시작 {stats['restarts']}회, 복구 {elapsed:.1f}초")
+
+    channel = worker.open_channel()
+    submitted = channel.submit(make_frame(240, 320, 5), 320, 240, time.time())
+    result = wait_pose(channel, marker=5)
+    channel.close()
+    return check({
+        "재시작 후 준비 완료": ready,
+        "새 프로세스": stats['pid'] != old_pid and stats['restarts'] == restarts_before + 1,
+        "재시작 후 왕복": submitted and result is not None,
+    })
+
+
+def main():
+    print("="*70)
+    print("포즈 워커 프로세스 테스트 (모의 추론)")
+    print("="*70)
+
+    max_shape = (120, 160)
+    worker = PoseWorkerProcess(
+        {'backend': 'stub', 'model_factory': stub_model_factory},
+        num_channels=2, max_frame_shape=max_shape, restart_backoff=0.2
+    )
+    slow_worker = PoseWorkerProcess(
+        {'backend': 'stub', 'model_factory': stub_model_factory, 'stub_delay': 0.3},
+        num_channels=1, max_frame_shape=max_shape
+    )
+    results = {}
+    try:
+        worker.start()
+        slow_worker.start()
+        ready = wait_ready(worker) and wait_ready(slow_worker)
+        print(f"\n워커 준비: {'✅' if ready else '❌'}")
+
+        if ready:
+            print("\n[1] 왕복")
+            worker_320 = PoseWorkerProcess({'backend': 'stub', 'model_factory': stub_model_factory}, num_channels=1)
+            try:
+                worker_320.start()
+                results['결과 왕복'] = wait_ready(worker_320) and test_round_trip(worker_320)
+            finally:
+                worker_320.stop()
+
+            print("\n[2] 큰 프레임 축소")
+            results['큰 프레임 축소 + 박스 환산'] = test_oversize(worker, max_shape)
+
+            print("\n[3] 덮어쓴 슬롯")
+            results['덮어쓴 슬롯 버림'] = test_dropped_slot(slow_worker)
+
+            print("\n[4] 워커 재시작")
+            results['SIGKILL 후 재시작'] = test_restart(worker)
+    finally:
+        worker.stop()
+        slow_worker.stop()
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = dict({'워커 준비': ready}, **results)
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+융합 렌더링 커널 할당량 테스트
+================================
+기존 렌더링 체인 vs render_kernel.render_garment_fused 비교 (tracemalloc)
+- 기존: refine_cloth_with_segmentation → refine_cloth_with_face_mask → overlay_cloth_on_body
+- 융합: 세그멘테이션 교집합 + 얼굴/목 억제 + 블렌딩 단일 패스 (버퍼 풀 재사용)
+- 프레임당 최대 임시 메모리 (tracemalloc), 잔류 할당 블록 수, 결과 차이, 프레임당 시간
+
+사용법:
+    python test_render_allocations.py [프레임 폭] [프레임 높이]
+"""
+
+import sys
+import os
+import time
+import tracemalloc
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from cloth_processor import refine_cloth_with_segmentation, overlay_cloth_on_body, get_torso_row_range
+from virtual_fitting import RTMPoseVirtualFitting
+from render_kernel import RenderBufferPool, render_garment_fused, NUMBA_AVAILABLE
+
+MAX_MEAN_DIFF = 4.0  # 기존 체인 대비 허용 평균 픽셀 차이 (마스크 경계 블러 차이)
+
+
+def make_scene(frame_w, frame_h):
+    """합성 프레임 + 옷 스프라이트 + 저해상도 신체 마스크 + 머리 ROI 얼굴 마스크"""
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, (frame_h, frame_w, 3), dtype=np.uint8)
+
+    # 옷 스프라이트 (프레임 중앙, 프레임 폭의 절반)
+    sprite_w, sprite_h = frame_w // 2, int(frame_h * 0.6)
+    sprite = np.zeros((sprite_h, sprite_w, 4), dtype=np.uint8)
+    sprite[:, :, :3] = rng.integers(0, 255, (sprite_h, sprite_w, 3), dtype=np.uint8)
+    alpha = np.zeros((sprite_h, sprite_w), dtype=np.uint8)
+    cv2.ellipse(alpha, (sprite_w // 2, sprite_h // 2), (sprite_w // 2 - 4, sprite_h // 2 - 4), 0, 0, 360, 255, -1)
+    sprite[:, :, 3] = cv2.GaussianBlur(alpha, (5, 5), 0)
+    offset = (frame_w // 4, int(frame_h * 0.25))
+
+    # 저해상도 신체 확률 마스크 (폭 256px)
+    small_w = 256
+    small_h = int(round(frame_h * small_w / frame_w))
+    segmentation_mask = np.zeros((small_h, small_w), dtype=np.uint8)
+    cv2.ellipse(segmentation_mask, (small_w // 2, int(small_h * 0.55)),
+                (int(small_w * 0.2), int(small_h * 0.4)), 0, 0, 360, 255, -1)
+    segmentation_mask = cv2.GaussianBlur(segmentation_mask, (7, 7), 0)
+
+    body_keypoints = {
+        'left_shoulder': (frame_w * 0.6, frame_h * 0.3),
+        'right_shoulder': (frame_w * 0.4, frame_h * 0.3),
+        'left_hip': (frame_w * 0.58, frame_h * 0.7),
+        'right_hip': (frame_w * 0.42, frame_h * 0.7),
+    }
+
+    # 머리 ROI 얼굴/목 마스크 (create_face_neck_mask 결과 형식)
+    face_size = frame_h // 4
+    face_mask = np.zeros((face_size, face_size), dtype=np.uint8)
+    cv2.ellipse(face_mask, (face_size // 2, face_size // 2), (face_size // 4, face_size // 2 - 10),
+                0, 0, 360, 255, -1)
+    face_mask = cv2.GaussianBlur(face_mask, (21, 21), 11)
+    face_offset = (frame_w // 2 - face_size // 2, int(frame_h * 0.3) - face_size // 2)
+
+    return frame, sprite, offset, segmentation_mask, body_keypoints, face_mask, face_offset
+
+
+def render_legacy(engine, frame, sprite, offset, segmentation_mask, body_keypoints, face_mask, face_offset):
+    """기존 렌더링 체인 (스프라이트 복사 + 마스크 임시 배열)"""
+    refined = refine_cloth_with_segmentation(
+        sprite, frame, body_keypoints, offset=offset, segmentation_mask=segmentation_mask
+    )
+    refined = engine.refine_cloth_with_face_mask(refined, face_mask, offset=offset, mask_offset=face_offset)
+    return overlay_cloth_on_body(frame, refined, position=None, alpha=1.0, offset=offset)
+
+
+def render_fused(pool, frame, sprite, offset, segmentation_mask, body_keypoints, face_mask, face_offset):
+    """융합 커널 (버퍼 풀 재사용)"""
+    pool.reserve(frame.shape)
+    return render_garment_fused(
+        frame, sprite, offset, pool,
+        segmentation_mask=segmentation_mask,
+        torso_rows=get_torso_row_range(body_keypoints, frame.shape[0]),
+        face_mask=face_mask,
+        face_offset=face_offset
+    )
+
+
+def measure_allocations(render, base_frame, iterations=20):
+    """
+    프레임당 할당량 (tracemalloc, numpy/OpenCV 출력 버퍼 포함)
+
+    Returns:
+        dict: peak_bytes (프레임 중 최대 임시 메모리), frame_buffers (peak_bytes / 프레임 크기),
+              blocks (프레임 후 남은 새 할당 블록 수, 버퍼 풀 확장 등)
+    """
+    frames = [base_frame.copy() for _ in range(iterations + 2)]
+    render(frames[0])  # 워밍업 (JIT 컴파일, 버퍼 풀 확장)
+    render(frames[1])
+
+    tracemalloc.start()
+    peak = 0
+    blocks = 0
+    for frame in frames[2:]:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        render(frame)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - start_bytes)
+        after = tracemalloc.take_snapshot()
+        blocks += sum(stat.count_diff for stat in after.compare_to(before, 'lineno') if stat.count_diff > 0)
+    tracemalloc.stop()
+
+    return {
+        "peak_bytes": peak,
+        "frame_buffers": peak / base_frame.nbytes,
+        "blocks": blocks / iterations
+    }
+
+
+def measure_time(render, base_frame, iterations=100):
+    """프레임당 렌더링 시간 (ms)"""
+    frame = base_frame.copy()
+    render(frame)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render(frame)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    """메인 테스트 실행"""
+    frame_w = int(sys.argv[1]) if len(sys.argv) > 1 else 1280
+    frame_h = int(sys.argv[2]) if len(sys.argv) > 2 else 720
+
+    print("\n" + "="*70)
+    print(f"🔍 융합 렌더링 커널 할당량 테스트 ({frame_w}x{frame_h}, numba: {'on' if NUMBA_AVAILABLE else 'off'})")
+    print("="*70)
+
+    frame, sprite, offset, segmentation_mask, body_keypoints, face_mask, face_offset = make_scene(frame_w, frame_h)
+    sprite.setflags(write=False)  # 스프라이트 캐시 결과와 동일하게 읽기 전용
+
+    # 모델 로드 없이 얼굴 마스크 정제 메서드만 사용
+    engine = RTMPoseVirtualFitting.__new__(RTMPoseVirtualFitting)
+    pool = RenderBufferPool()
+    args = (sprite, offset, segmentation_mask, body_keypoints, face_mask, face_offset)
+
+    def legacy(f):
+        return render_legacy(engine, f, *args)
+
+    def fused(f):
+        return render_fused(pool, f, *args)
+
+    # 결과 차이
+    legacy_out = legacy(frame.copy())
+    fused_out = fused(frame.copy())
+    warm_allocations = pool.allocations  # 첫 프레임에서 스트림 해상도 기준으로 할당
+    diff = np.abs(legacy_out.astype(np.int16) - fused_out.astype(np.int16))
+    mean_diff = float(diff.mean())
+    print(f"[Test] 기존 체인 대비 평균 차이: {mean_diff:.3f} (최대 {int(diff.max())})")
+
+    results = {}
+    for name, render in (('기존', legacy), ('융합', fused)):
+        allocations = measure_allocations(render, frame)
+        allocations["ms"] = measure_time(render, frame)
+        results[name] = allocations
+        print(f"  {name}: 프레임당 최대 임시 메모리 {allocations['peak_bytes'] / 1024:.0f}KB "
+              f"(프레임 {allocations['frame_buffers']:.2f}장 분량), "
+              f"잔류 블록 {allocations['blocks']:.1f}개, {allocations['ms']:.2f}ms")
+
+    print(f"[Test] 버퍼 풀: {pool.allocations}회 할당, {pool.nbytes() / 1024:.0f}KB")
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '결과 차이': mean_diff <= MAX_MEAN_DIFF,
+        '임시 메모리 감소': results['융합']['peak_bytes'] < results['기존']['peak_bytes'],
+        '버퍼 재사용': pool.allocations == warm_allocations,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
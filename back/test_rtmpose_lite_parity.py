@@ -0,0 +1,175 @@
+"""
+RTMPose 경량 추론 정합성 테스트
+================================
+inference_topdown(mmpose 파이프라인) vs rtmpose_lite.inference_pose(직접 호출) 결과 비교
+- 키포인트 좌표 오차 (SimCC 1 bin 이내)
+- 신뢰도 점수 오차
+- 프레임당 추론 시간
+
+사용법:
+    python test_rtmpose_lite_parity.py [녹화 프레임 디렉토리]
+"""
+
+import sys
+import os
+import glob
+import time
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+import torch
+from mmpose.apis import inference_topdown
+from virtual_fitting import load_rtmpose_model
+from rtmpose_lite import (
+    inference_pose,
+    inference_batch,
+    pose_array_from_results,
+    get_input_center_scale,
+    INPUT_SIZE,
+    SIMCC_SPLIT_RATIO
+)
+
+SCORE_THRESHOLD = 0.3  # 비교 대상 키포인트 최소 신뢰도
+SCORE_TOLERANCE = 1e-3
+
+
+def load_test_frames(frame_dir=None, max_frames=50):
+    """녹화 프레임 로드 (없으면 저장소 내 테스트 이미지 + 합성 프레임)"""
+    paths = []
+    if frame_dir:
+        for ext in ('*.jpg', '*.jpeg', '*.png'):
+            paths.extend(glob.glob(os.path.join(frame_dir, ext)))
+    else:
+        paths.extend(glob.glob(os.path.join(current_dir, 'fit', 'test_pic', '*.png')))
+        paths.extend(glob.glob(os.path.join(current_dir, 'fit', 'input', '*.jpg')))
+
+    frames = []
+    for path in sorted(paths)[:max_frames]:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+
+    # 추론 해상도(65%) 합성 프레임도 포함
+    rng = np.random.default_rng(0)
+    for _ in range(3):
+        frames.append(rng.integers(0, 255, (468, 832, 3), dtype=np.uint8))
+    return frames
+
+
+def simcc_bin_pixels(frame):
+    """프레임 좌표계에서 SimCC 1 bin 크기 (픽셀)"""
+    h, w = frame.shape[:2]
+    _, scale = get_input_center_scale((0, 0, w, h))
+    return scale[0] / INPUT_SIZE[0] / SIMCC_SPLIT_RATIO
+
+
+def test_parity(model, frames):
+    """좌표/점수 정합성"""
+    print("="*70)
+    print("1. 정합성 테스트 (inference_topdown vs inference_pose)")
+    print("="*70)
+
+    all_ok = True
+    errors = []
+    for i, frame in enumerate(frames):
+        with torch.no_grad():
+            ref = pose_array_from_results(inference_topdown(model, frame))
+        lite = inference_pose(model, frame)
+
+        mask = ref[:, 2] > SCORE_THRESHOLD
+        coord_err = np.abs(ref[:, :2] - lite[:, :2]).max(axis=1)
+        score_err = np.abs(ref[:, 2] - lite[:, 2]).max()
+        max_err = coord_err[mask].max() if mask.any() else 0.0
+        bin_px = simcc_bin_pixels(frame)
+
+        ok = max_err <= bin_px + 1e-3 and score_err <= SCORE_TOLERANCE
+        all_ok &= ok
+        errors.extend(coord_err[mask].tolist())
+        print(f"  프레임 {i:2d} ({frame.shape[1]}x{frame.shape[0]}): "
+              f"최대 좌표 오차 {max_err:.3f}px (1 bin={bin_px:.2f}px), 점수 오차 {score_err:.5f} "
+              f"{'✅' if ok else '❌'}")
+
+    if errors:
+        print(f"\n  평균 좌표 오차: {np.mean(errors):.4f}px, 최대: {np.max(errors):.4f}px")
+    return all_ok
+
+
+def test_batch_parity(model, frames):
+    """배치 추론이 단일 추론과 같은 결과인지"""
+    print("\n" + "="*70)
+    print("2. 배치 정합성 테스트 (inference_batch vs inference_pose)")
+    print("="*70)
+
+    singles = np.stack([inference_pose(model, f) for f in frames])
+    batched = inference_batch(model, frames)
+    max_err = np.abs(singles - batched).max()
+    ok = max_err < 1e-2
+    print(f"  {len(frames)}프레임 최대 오차: {max_err:.5f} {'✅' if ok else '❌'}")
+    return ok
+
+
+def test_latency(model, frames, iterations=50):
+    """프레임당 추론 시간 비교"""
+    print("\n" + "="*70)
+    print("3. 추론 시간 비교")
+    print("="*70)
+
+    frame = frames[-1]
+    is_cuda = next(model.parameters()).is_cuda
+
+    def measure(fn):
+        for _ in range(5):
+            fn()
+        if is_cuda:
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        if is_cuda:
+            torch.cuda.synchronize()
+        return (time.perf_counter() - start) / iterations * 1000
+
+    def run_topdown():
+        with torch.no_grad():
+            pose_array_from_results(inference_topdown(model, frame))
+
+    topdown_ms = measure(run_topdown)
+    lite_ms = measure(lambda: inference_pose(model, frame))
+
+    print(f"  inference_topdown: {topdown_ms:.2f}ms/프레임")
+    print(f"  inference_pose:    {lite_ms:.2f}ms/프레임")
+    print(f"  속도 향상: {topdown_ms / lite_ms:.2f}x")
+    return True
+
+
+def main():
+    """메인 테스트 실행"""
+    frame_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    device = 'cuda:0' if torch.cuda.is_available() else 'cpu'
+
+    print("\n" + "="*70)
+    print(f"🔍 RTMPose 경량 추론 정합성 테스트 (device: {device})")
+    print("="*70)
+
+    model = load_rtmpose_model(device)
+    frames = load_test_frames(frame_dir)
+    print(f"[Test] 테스트 프레임: {len(frames)}장\n")
+
+    results = {
+        '정합성': test_parity(model, frames),
+        '배치 정합성': test_batch_parity(model, frames[-3:]),
+        '추론 시간': test_latency(model, frames),
+    }
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    for name, success in results.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+RTMPose ONNX Runtime 백엔드 정확도 비교
+========================================
+녹화 프레임에서 PyTorch(rtmpose_lite.inference_pose) vs ONNX Runtime(RTMPoseONNX) 비교
+- 키포인트 평균/최대 픽셀 오차, PCK@0.05 (사람 박스 대각선 기준)
+- flip test on/off별 정확도
+- intra-op 스레드 수별 프레임당 추론 시간
+
+사용법:
+    python test_rtmpose_onnx_accuracy.py [녹화 프레임 디렉토리] [--onnx 모델 경로]
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+import torch
+from virtual_fitting import load_rtmpose_model
+from rtmpose_lite import inference_pose
+from rtmpose_onnx import RTMPoseONNX, DEFAULT_ONNX_PATH, get_thread_candidates
+
+SCORE_THRESHOLD = 0.3  # 비교 대상 키포인트 최소 신뢰도 (PyTorch 기준)
+PCK_THRESHOLD = 0.05   # 사람 박스 대각선 대비 허용 오차
+MAX_MEAN_ERROR_PX = 2.0
+
+
+def load_test_frames(frame_dir=None, max_frames=100):
+    """녹화 프레임 로드 (없으면 저장소 내 테스트 이미지 + 합성 프레임)"""
+    paths = []
+    if frame_dir:
+        for ext in ('*.jpg', '*.jpeg', '*.png'):
+            paths.extend(glob.glob(os.path.join(frame_dir, ext)))
+    else:
+        paths.extend(glob.glob(os.path.join(current_dir, 'fit', 'test_pic', '*.png')))
+        paths.extend(glob.glob(os.path.join(current_dir, 'fit', 'input', '*.jpg')))
+
+    frames = []
+    for path in sorted(paths)[:max_frames]:
+        frame = cv2.imread(path, cv2.IMREAD_COLOR)
+        if frame is not None:
+            frames.append(frame)
+
+    if not frames:
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 255, (468, 832, 3), dtype=np.uint8) for _ in range(5)]
+    return frames
+
+
+def compare_poses(refs, preds, score_threshold=SCORE_THRESHOLD, pck_threshold=PCK_THRESHOLD):
+    """
+    기준 포즈 대비 정확도
+
+    Args:
+        refs, preds: 프레임별 (17, 3) [x, y, score] 리스트
+
+    Returns:
+        dict: mean_error_px, max_error_px, pck, score_mae, keypoints
+    """
+    errors = []
+    hits = []
+    score_diffs = []
+    for ref, pred in zip(refs, preds):
+        valid = ref[:, 2] > score_threshold
+        score_diffs.extend(np.abs(ref[:, 2] - pred[:, 2]).tolist())
+        if not valid.any():
+            continue
+        dist = np.linalg.norm(ref[valid, :2] - pred[valid, :2], axis=1)
+        visible = ref[valid, :2]
+        diag = max(np.linalg.norm(visible.max(axis=0) - visible.min(axis=0)), 1.0)
+        errors.extend(dist.tolist())
+        hits.extend((dist <= pck_threshold * diag).tolist())
+
+    if not errors:
+        return {"mean_error_px": 0.0, "max_error_px": 0.0, "pck": 1.0, "score_mae": 0.0, "keypoints": 0}
+    return {
+        "mean_error_px": round(float(np.mean(errors)), 3),
+        "max_error_px": round(float(np.max(errors)), 3),
+        "pck": round(float(np.mean(hits)), 4),
+        "score_mae": round(float(np.mean(score_diffs)), 4),
+        "keypoints": len(errors)
+    }
+
+
+def measure_ms(fn, frame, iterations=30, warmup=5):
+    """프레임당 평균 추론 시간 (ms)"""
+    for _ in range(warmup):
+        fn(frame)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn(frame)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def test_accuracy(refs, frames, onnx_path, num_threads):
+    """flip test on/off별 ONNX 정확도"""
+    print("="*70)
+    print("1. 정확도 비교 (PyTorch 기준)")
+    print("="*70)
+
+    results = {}
+    for flip_test in (False, True):
+        onnx_model = RTMPoseONNX(onnx_path, num_threads=num_threads, flip_test=flip_test)
+        preds = [onnx_model.inference_pose(frame) for frame in frames]
+        metrics = compare_poses(refs, preds)
+        ok = metrics["mean_error_px"] <= MAX_MEAN_ERROR_PX
+        results[f"flip_{'on' if flip_test else 'off'}"] = metrics
+        print(f"  flip test {'on ' if flip_test else 'off'}: 평균 오차 {metrics['mean_error_px']:.3f}px, "
+              f"최대 {metrics['max_error_px']:.3f}px, PCK@{PCK_THRESHOLD} {metrics['pck'] * 100:.1f}%, "
+              f"점수 MAE {metrics['score_mae']:.4f} {'✅' if ok else '❌'}")
+    return results
+
+
+def test_latency(model, frames, onnx_path):
+    """PyTorch CPU vs ONNX 스레드 수별 추론 시간"""
+    print("\n" + "="*70)
+    print("2. 추론 시간 비교 (프레임당)")
+    print("="*70)
+
+    frame = frames[0]
+    results = {}
+    torch_ms = measure_ms(lambda f: inference_pose(model, f), frame)
+    results["torch"] = round(torch_ms, 2)
+    print(f"  PyTorch ({next(model.parameters()).device}): {torch_ms:.2f}ms")
+
+    for threads in get_thread_candidates():
+        onnx_model = RTMPoseONNX(onnx_path, num_threads=threads)
+        onnx_ms = measure_ms(onnx_model.inference_pose, frame)
+        results[f"onnx_{threads}t"] = round(onnx_ms, 2)
+        print(f"  ONNX Runtime ({threads} 스레드): {onnx_ms:.2f}ms ({1000 / onnx_ms:.1f} FPS, "
+              f"{torch_ms / onnx_ms:.2f}x)")
+    return results
+
+
+def main():
+    """메인 테스트 실행"""
+    parser = argparse.ArgumentParser(description='RTMPose ONNX 정확도 비교')
+    parser.add_argument('frame_dir', nargs='?', default=None, help='녹화 프레임 디렉토리')
+    parser.add_argument('--onnx', default=DEFAULT_ONNX_PATH, help='ONNX 모델 경로')
+    parser.add_argument('--threads', type=int, default=None, help='정확도 비교 시 intra-op 스레드 수')
+    args = parser.parse_args()
+
+    print("\n" + "="*70)
+    print(f"🔍 RTMPose ONNX 정확도 비교 ({os.path.basename(args.onnx)})")
+    print("="*70)
+
+    model = load_rtmpose_model('cpu')
+    frames = load_test_frames(args.frame_dir)
+    print(f"[Test] 테스트 프레임: {len(frames)}장\n")
+
+    # PyTorch 기준 (모델 config의 flip test 설정 그대로)
+    refs = [inference_pose(model, frame) for frame in frames]
+
+    report = {
+        "onnx_path": args.onnx,
+        "frames": len(frames),
+        "accuracy": test_accuracy(refs, frames, args.onnx, args.threads),
+        "latency_ms": test_latency(model, frames, args.onnx),
+    }
+
+    output_dir = os.path.join(current_dir, 'benchmark_results')
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_onnx_accuracy.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    flip_off = report["accuracy"]["flip_off"]
+    print(f"  정확도 (flip off): {'✅ 통과' if flip_off['mean_error_px'] <= MAX_MEAN_ERROR_PX else '❌ 실패'}")
+    print(f"[Saved] {report_path}")
+
+
+if __name__ == "__main__":
+    main()
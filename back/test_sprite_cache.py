@@ -0,0 +1,210 @@
+"""
+스프라이트 캐시 테스트
+========================================
+sprite_cache.SpriteCache (양자화된 어파인 키 → 변형된 옷 스프라이트, 평행이동은 오프셋)
+1. 키 양자화: 구간 안의 차이는 같은 키, 구간을 넘으면 다른 키, 분해/합성 왕복, 반전(음수 sy)
+2. 앵커 보정 오프셋: 양자화 오차가 있어도 앵커(어깨 중심)는 실제 어파인 위치에 (반올림 0.5px 이내)
+   평행이동만 바뀌면 캐시 적중 + 오프셋만 이동
+3. 정확도: 무작위 어파인 200개, 캐시 스프라이트 배치 vs 직접 warpAffine 알파 무게중심 차이
+4. 메모리 예산: max_bytes 초과 시 오래된 스프라이트부터 제거, 통계
+
+사용법:
+    python test_sprite_cache.py [어파인 수]
+"""
+
+import sys
+import os
+import math
+import numpy as np
+import cv2
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from sprite_cache import SpriteCache, decompose_affine, compose_affine
+
+MAX_CENTROID_ERROR = 1.4  # 기본 구간에서 허용하는 무게중심 차이 (px)
+CANVAS = 1600             # 직접 변형/배치 비교용 프레임 크기 (옷이 잘리지 않도록 충분히 크게)
+
+
+def make_cloth(w=300, h=360):
+    """합성 옷 이미지 (RGBA): 몸통 + 소매 다각형, 알파 바깥은 0"""
+    cloth = np.zeros((h, w, 4), dtype=np.uint8)
+    polygon = np.array([
+        [w * 0.3, 0], [w * 0.7, 0], [w, h * 0.25], [w * 0.85, h * 0.4], [w * 0.75, h * 0.3],
+        [w * 0.75, h], [w * 0.25, h], [w * 0.25, h * 0.3], [w * 0.15, h * 0.4], [0, h * 0.25]
+    ], dtype=np.int32)
+    cv2.fillPoly(cloth, [polygon], (40, 90, 200, 255))
+    return cloth
+
+
+def make_affine(sx, sy, theta_deg, shear, tx, ty):
+    A = compose_affine(sx, sy, math.radians(theta_deg), shear)
+    return np.hstack([A, [[tx], [ty]]])
+
+
+def alpha_centroid(alpha):
+    ys, xs = np.nonzero(alpha)
+    weights = alpha[ys, xs].astype(np.float64)
+    return np.array([np.sum(xs * weights), np.sum(ys * weights)]) / np.sum(weights)
+
+
+def place(sprite, offset, size=CANVAS):
+    """스프라이트를 빈 프레임 오프셋 위치에 배치 (잘리는 부분 제외)"""
+    canvas = np.zeros((size, size), dtype=sprite.dtype)
+    x0, y0 = offset
+    h, w = sprite.shape[:2]
+    sx1, sy1 = max(0, -x0), max(0, -y0)
+    dx1, dy1 = max(0, x0), max(0, y0)
+    dx2, dy2 = min(size, x0 + w), min(size, y0 + h)
+    if dx2 > dx1 and dy2 > dy1:
+        canvas[dy1:dy2, dx1:dx2] = sprite[sy1:sy1 + dy2 - dy1, sx1:sx1 + dx2 - dx1, 3]
+    return canvas
+
+
+def check(checks):
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_quantize():
+    """같은 구간 → 같은 키, 구간 밖 → 다른 키"""
+    cache = SpriteCache()
+    base = make_affine(1.0, 1.0, 10.0, 0.05, 100, 200)
+    key, A_q = cache.quantize(base)
+    near_key, _ = cache.quantize(make_affine(1.002, 0.998, 10.1, 0.052, 300, -50))  # 구간 안 + 평행이동만 다름
+    far_scale, _ = cache.quantize(make_affine(1.02, 1.0, 10.0, 0.05, 100, 200))
+    far_rotation, _ = cache.quantize(make_affine(1.0, 1.0, 11.0, 0.05, 100, 200))
+    far_shear, _ = cache.quantize(make_affine(1.0, 1.0, 10.0, 0.07, 100, 200))
+    mirrored_key, mirrored_A = cache.quantize(make_affine(1.0, -1.0, 10.0, 0.05, 100, 200))
+
+    sx, sy, theta, shear = decompose_affine(base)
+    round_trip = compose_affine(sx, sy, theta, shear)
+    coarse_key, _ = SpriteCache(scale_bin=0.05, rotation_bin=2.0).quantize(make_affine(1.02, 1.0, 10.6, 0.05, 0, 0))
+    coarse_base, _ = SpriteCache(scale_bin=0.05, rotation_bin=2.0).quantize(base)
+
+    print(f"  키 {key}, 양자화 오차 {np.abs(A_q - base[:, :2]).max():.4f}")
+    return check({
+        "분해/합성 왕복": np.allclose(round_trip, base[:, :2]),
+        "구간 안 + 평행이동 차이 → 같은 키": near_key == key,
+        "스케일 2% → 다른 키": far_scale != key,
+        "회전 1도 → 다른 키": far_rotation != key,
+        "전단 0.02 → 다른 키": far_shear != key,
+        "양자화 선형 행렬 오차 구간 절반 이내": np.abs(A_q - base[:, :2]).max() < 0.01,
+        "반전(음수 sy) 별도 키 + 부호 유지": mirrored_key != key and np.linalg.det(mirrored_A) < 0,
+        "구간 설정 반영 (넓은 구간 → 같은 키)": coarse_key == coarse_base,
+    })
+
+
+def test_anchor_offset(cloth):
+    """앵커는 실제 어파인 위치에 배치, 평행이동만 바뀌면 적중 + 오프셋 이동"""
+    cache = SpriteCache()
+    anchor = np.array([cloth.shape[1] / 2, cloth.shape[0] * 0.1])
+    M = make_affine(1.137, 1.093, 7.3, 0.034, 412.6, 233.2)
+    sprite, offset = cache.get_sprite('cloth', cloth, M, anchor)
+    _, A_q = cache.quantize(M)
+    _, origin = cache.entries[next(iter(cache.entries))]
+
+    # 스프라이트 내 앵커 위치 (A_q @ anchor - origin) + 오프셋 = 실제 어파인이 앵커를 보내는 위치
+    placed = A_q @ anchor - np.array(origin) + np.array(offset)
+    target = M[:, :2] @ anchor + M[:, 2]
+    error = np.abs(placed - target).max()
+
+    moved = M.copy()
+    moved[:, 2] += (37, -12)
+    moved_sprite, moved_offset = cache.get_sprite('cloth', cloth, moved, anchor)
+    stats = cache.get_stats()
+    print(f"  앵커 오차 {error:.3f}px, 오프셋 {offset} → {moved_offset}")
+    return check({
+        "앵커 오차 0.5px 이내 (정수 오프셋 반올림)": error <= 0.5 + 1e-9,
+        "평행이동만 변경 → 캐시 적중": stats["hits"] == 1 and stats["misses"] == 1,
+        "같은 스프라이트 재사용": moved_sprite is sprite,
+        "오프셋만 평행이동만큼 이동": (moved_offset[0] - offset[0], moved_offset[1] - offset[1]) == (37, -12),
+        "스프라이트 읽기 전용": not sprite.flags.writeable,
+    })
+
+
+def test_random_affines(cloth, count):
+    """
+    무작위 어파인: 캐시 스프라이트 배치 vs 직접 변형 (알파 무게중심 차이)
+    옷은 어깨 너비로 먼저 리사이즈되므로 어파인 스케일은 1 근처 (0.8~1.25), 회전 ±20도, 전단 ±0.1
+    """
+    rng = np.random.default_rng(0)
+    cache = SpriteCache()
+    anchor = (cloth.shape[1] / 2, cloth.shape[0] * 0.1)
+    errors = []
+    for _ in range(count):
+        M = make_affine(
+            rng.uniform(0.8, 1.25), rng.uniform(0.8, 1.25), rng.uniform(-20, 20), rng.uniform(-0.1, 0.1),
+            rng.uniform(500, 700), rng.uniform(500, 700)
+        )
+        direct = cv2.warpAffine(cloth, M.astype(np.float32), (CANVAS, CANVAS), flags=cv2.INTER_LINEAR,
+                                borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0, 0))[:, :, 3]
+        sprite, offset = cache.get_sprite('cloth', cloth, M, anchor)
+        cached = place(sprite, offset)
+        errors.append(np.linalg.norm(alpha_centroid(cached) - alpha_centroid(direct)))
+
+    errors = np.array(errors)
+    print(f"  {count}개: 무게중심 차이 평균 {errors.mean():.2f}px, p95 {np.percentile(errors, 95):.2f}px, "
+          f"최대 {errors.max():.2f}px")
+    return check({f"최대 {MAX_CENTROID_ERROR}px 이하": errors.max() <= MAX_CENTROID_ERROR})
+
+
+def test_budget(cloth):
+    """메모리 예산: 스프라이트 2개 분량 → 세 번째 추가 시 가장 오래된 것 제거"""
+    anchor = (cloth.shape[1] / 2, 0)
+    probe, _ = SpriteCache().get_sprite('cloth', cloth, make_affine(1.0, 1.0, 0, 0, 0, 0), anchor)
+    cache = SpriteCache(max_bytes=int(probe.nbytes * 2.5))
+    affines = [make_affine(1.0, 1.0, angle, 0, 0, 0) for angle in (0, 1, 2)]
+    for M in affines:
+        cache.get_sprite('cloth', cloth, M, anchor)
+    cache.get_sprite('cloth', cloth, affines[0], anchor)  # 제거된 첫 번째 → 다시 미스
+    stats = cache.get_stats()
+    print(f"  예산 {stats['max_bytes']} B, 사용 {stats['bytes']} B, 엔트리 {stats['entries']}, "
+          f"제거 {stats['evictions']}, 적중률 {stats['hit_rate']}")
+    oversize = SpriteCache(max_bytes=probe.nbytes // 2)
+    oversize.get_sprite('cloth', cloth, affines[0], anchor)
+    return check({
+        "예산 이내 유지": stats["bytes"] <= stats["max_bytes"],
+        "오래된 스프라이트부터 제거": stats["evictions"] == 2 and stats["misses"] == 4,
+        "예산보다 큰 스프라이트는 캐시 안 함": oversize.get_stats()["entries"] == 0,
+    })
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print("="*70)
+    print(f"스프라이트 캐시 테스트 (무작위 어파인 {count}개)")
+    print("="*70)
+
+    cloth = make_cloth()
+
+    print("\n[1] 키 양자화")
+    quantize_ok = test_quantize()
+
+    print("\n[2] 앵커 보정 오프셋")
+    anchor_ok = test_anchor_offset(cloth)
+
+    print("\n[3] 정확도")
+    accuracy_ok = test_random_affines(cloth, count)
+
+    print("\n[4] 메모리 예산")
+    budget_ok = test_budget(cloth)
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '키 양자화': quantize_ok,
+        '앵커 보정 오프셋': anchor_ok,
+        f'무작위 어파인 {count}개 무게중심 {MAX_CENTROID_ERROR}px 이하': accuracy_ok,
+        '메모리 예산': budget_ok,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+단계별 지연 히스토그램 테스트
+================================
+stage_metrics.StageMetrics / RollingHistogram
+- 백분위 정확도: numpy 백분위 대비 상대 오차 (로그-정규 분포 지연 샘플)
+- 롤링 구간: 오래된 구간이 집계에서 빠지는지
+- 오버헤드: 요청당 기록 횟수 * 기록 1회 비용 / 프레임 처리 시간 (< 1%), 비활성화 시 비용
+
+사용법:
+    python test_stage_metrics.py [프레임 처리 ms]
+"""
+
+import sys
+import os
+import time
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from stage_metrics import StageMetrics
+
+RECORDS_PER_REQUEST = 10   # decode, inference_submit, pose_staleness, face_mask, resize_warp,
+                           # segmentation, blend, process_frame, encode, request
+MAX_RELATIVE_ERROR = 0.02  # 버킷 폭 1/32 → 중앙값 대표 시 약 1.6%
+MAX_OVERHEAD = 0.01
+
+
+def measure_accuracy(samples):
+    """백분위별 (히스토그램 값, numpy 값, 상대 오차)"""
+    metrics = StageMetrics()
+    for value in samples:
+        metrics.record("stage", float(value))
+    summary = metrics.snapshot()["stages"]["stage"]
+    errors = {}
+    for q in (50, 95, 99):
+        expected = float(np.percentile(samples, q)) * 1000
+        errors[q] = (summary[f"p{q}_ms"], expected, abs(summary[f"p{q}_ms"] - expected) / expected)
+    return errors
+
+
+def check_rolling():
+    """짧은 구간으로 기록 → 전체 구간보다 오래 기다린 뒤 새 값만 남는지"""
+    metrics = StageMetrics(window_seconds=0.05, windows=3)
+    for _ in range(100):
+        metrics.record("stage", 0.010)
+    time.sleep(0.2)
+    metrics.record("stage", 0.020)
+    summary = metrics.snapshot()["stages"]["stage"]
+    return summary["count"] == 1 and abs(summary["p50_ms"] - 20.0) < 0.5
+
+
+def measure_record_cost(enabled, iterations=200000):
+    """record 1회 비용 (µs)"""
+    metrics = StageMetrics(enabled=enabled)
+    stages = [f"stage{i}" for i in range(RECORDS_PER_REQUEST)]
+    start = time.perf_counter()
+    for i in range(iterations):
+        metrics.record(stages[i % RECORDS_PER_REQUEST], 0.004)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    """메인 테스트 실행"""
+    frame_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 25.0
+
+    print("\n" + "="*70)
+    print(f"🔍 단계별 지연 히스토그램 테스트 (프레임 처리 {frame_ms:.0f}ms 기준)")
+    print("="*70)
+
+    rng = np.random.default_rng(0)
+    samples = rng.lognormal(np.log(0.008), 0.6, 50000)
+    errors = measure_accuracy(samples)
+    for q, (value, expected, error) in errors.items():
+        print(f"  p{q}: {value:.3f}ms (numpy {expected:.3f}ms, 오차 {error * 100:.2f}%)")
+
+    rolling_ok = check_rolling()
+    print(f"  롤링 구간 만료: {'정상' if rolling_ok else '실패'}")
+
+    cost_on = measure_record_cost(True)
+    cost_off = measure_record_cost(False)
+    overhead = cost_on * RECORDS_PER_REQUEST / (frame_ms * 1000)
+    print(f"  기록 1회: {cost_on:.2f}µs (비활성화 {cost_off:.2f}µs), "
+          f"요청당 {RECORDS_PER_REQUEST}회 → 오버헤드 {overhead * 100:.3f}%")
+
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '백분위 정확도': all(error <= MAX_RELATIVE_ERROR for _, _, error in errors.values()),
+        '롤링 구간': rolling_ok,
+        '오버헤드 < 1%': overhead < MAX_OVERHEAD,
+        '비활성화 비용 감소': cost_off < cost_on,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
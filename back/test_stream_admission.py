@@ -0,0 +1,208 @@
+"""
+스트림 입장 제어 테스트
+========================================
+stream_admission.StreamAdmission (POST /api/fit/stream 세션별 입장 제어 + suggestedIntervalMs)
+1. 정책: skip은 처리 중이면 즉시 거절, coalesce는 최신 프레임 하나만 대기 (이전 대기 프레임은 밀려남), 대기 시간 초과
+2. 권장 전송 간격: 처리 시간 EMA × headroom, 최소/최대 범위
+3. 부하: 고정 주기 전송 (브라우저 25ms setInterval) + 처리 시간이 더 긴 세션
+   요청 스레드마다 렌더링 락 대기 (입장 제어 없음) vs coalesce vs coalesce + 클라이언트가 권장 간격으로 전송
+
+사용법:
+    python test_stream_admission.py [처리 시간 ms] [전송 간격 ms] [시간 초]
+"""
+
+import sys
+import os
+import threading
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(current_dir, 'fit'))
+
+from stream_admission import StreamAdmission
+
+MAX_LATENCY_FACTOR = 3.0  # 입장 제어 시 응답 지연 상한 (처리 시간 배수)
+
+
+def run_in_thread(fn):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', fn()))
+    thread.start()
+    return thread, result
+
+
+def test_policies():
+    """skip / coalesce / 대기 시간 초과"""
+    checks = {}
+
+    skip = StreamAdmission(policy='skip')
+    first = skip.acquire()
+    start = time.perf_counter()
+    second = skip.acquire()
+    skip_elapsed = time.perf_counter() - start
+    skip.release(0.01)
+    checks["skip: 처리 중이면 즉시 거절"] = first and not second and skip_elapsed < 0.01
+    checks["skip: 끝나면 다시 입장"] = skip.acquire()
+    skip.release(0.01)
+
+    coalesce = StreamAdmission(policy='coalesce', max_wait=2.0)
+    coalesce.acquire()
+    older, older_result = run_in_thread(coalesce.acquire)
+    time.sleep(0.05)
+    newer, newer_result = run_in_thread(coalesce.acquire)
+    older.join(timeout=1.0)
+    older_superseded = not older.is_alive() and older_result.get('value') is False
+    time.sleep(0.05)
+    newer_waiting = newer.is_alive()
+    coalesce.release(0.05)
+    newer.join(timeout=1.0)
+    checks["coalesce: 이전 대기 프레임은 밀려남"] = older_superseded
+    checks["coalesce: 최신 프레임은 처리 종료까지 대기"] = newer_waiting
+    checks["coalesce: 처리 종료 후 최신 프레임 입장"] = newer_result.get('value') is True
+    coalesce.release(0.05)
+    stats = coalesce.get_stats()
+    checks["coalesce: 통계"] = stats["coalesced"] == 1 and stats["waited"] == 1 and not stats["busy"]
+
+    timeout = StreamAdmission(policy='coalesce', max_wait=0.1)
+    timeout.acquire()
+    start = time.perf_counter()
+    timed_out = not timeout.acquire()
+    elapsed = time.perf_counter() - start
+    timeout.release(0.01)
+    checks["coalesce: 대기 시간 초과 시 거절"] = timed_out and 0.09 <= elapsed < 0.5
+
+    off = StreamAdmission(policy='off')
+    checks["off: 제한 없음"] = off.acquire() and off.acquire()
+
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def test_interval():
+    """권장 전송 간격"""
+    admission = StreamAdmission(min_interval=0.02, max_interval=0.5, headroom=1.1, smoothing=0.5)
+    initial = admission.suggested_interval_ms()
+    for _ in range(20):
+        admission.acquire()
+        admission.release(0.1)
+    steady = admission.suggested_interval_ms()
+    for _ in range(20):
+        admission.record_service(0.001)
+    fast = admission.suggested_interval_ms()
+    for _ in range(20):
+        admission.record_service(5.0)
+    slow = admission.suggested_interval_ms()
+
+    checks = {
+        "측정 전 최소 간격": initial == 20.0,
+        "처리 시간 × headroom": abs(steady - 110.0) < 1.0,
+        "최소 간격 제한": fast == 20.0,
+        "최대 간격 제한": slow == 500.0,
+    }
+    print(f"  측정 전 {initial} ms, 100 ms 처리 → {steady} ms, 1 ms → {fast} ms, 5 s → {slow} ms")
+    for name, ok in checks.items():
+        print(f"  {name}: {'✅' if ok else '❌'}")
+    return all(checks.values())
+
+
+def simulate(service_time, send_interval, duration, admission=None, adaptive=False):
+    """
+    고정 주기 클라이언트 + 요청마다 스레드 (Flask threaded), 렌더링은 세션 락으로 직렬
+
+    Returns:
+        (처리한 프레임 응답 지연 목록, skipped 수, 전송 수)
+    """
+    render_lock = threading.Lock()
+    latencies = []
+    skipped = [0]
+    record_lock = threading.Lock()
+    threads = []
+
+    def handle(sent_at):
+        if admission is not None and not admission.acquire():
+            with record_lock:
+                skipped[0] += 1
+            return
+        admitted_at = time.perf_counter()
+        try:
+            with render_lock:
+                time.sleep(service_time)
+        finally:
+            if admission is not None:
+                admission.release(time.perf_counter() - admitted_at)
+        with record_lock:
+            latencies.append(time.perf_counter() - sent_at)
+
+    start = time.perf_counter()
+    next_send = start
+    sent = 0
+    while next_send - start < duration:
+        time.sleep(max(0.0, next_send - time.perf_counter()))
+        thread = threading.Thread(target=handle, args=(time.perf_counter(),))
+        thread.start()
+        threads.append(thread)
+        sent += 1
+        interval = send_interval
+        if adaptive and admission is not None:
+            interval = max(send_interval, admission.suggested_interval())
+        next_send += interval
+    for thread in threads:
+        thread.join()
+    return latencies, skipped[0], sent
+
+
+def summarize(name, latencies, skipped, sent):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+    print(f"  {name:22s}: 전송 {sent:3d}, 처리 {len(latencies):3d}, skipped {skipped:3d}, "
+          f"지연 평균 {sum(latencies) / max(len(latencies), 1) * 1000:7.1f} ms, "
+          f"p95 {p95 * 1000:7.1f} ms, 최대 {latencies[-1] * 1000 if latencies else 0.0:7.1f} ms")
+    return latencies
+
+
+def main():
+    service_ms = float(sys.argv[1]) if len(sys.argv) > 1 else 60.0
+    send_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 25.0
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    service_time, send_interval = service_ms / 1000, send_ms / 1000
+
+    print("="*70)
+    print(f"스트림 입장 제어 테스트 (처리 {service_ms:.0f} ms, 전송 간격 {send_ms:.0f} ms, {duration:.0f}초)")
+    print("="*70)
+
+    print("\n[1] 정책")
+    policies_ok = test_policies()
+
+    print("\n[2] 권장 전송 간격")
+    interval_ok = test_interval()
+
+    print("\n[3] 부하")
+    unbounded = summarize("입장 제어 없음", *simulate(service_time, send_interval, duration))
+    coalesce = StreamAdmission(policy='coalesce')
+    bounded = summarize("coalesce", *simulate(service_time, send_interval, duration, coalesce))
+    adaptive_admission = StreamAdmission(policy='coalesce')
+    adaptive_latencies, adaptive_skipped, adaptive_sent = simulate(
+        service_time, send_interval, duration, adaptive_admission, adaptive=True
+    )
+    adaptive = summarize("coalesce + 권장 간격", adaptive_latencies, adaptive_skipped, adaptive_sent)
+    print(f"  권장 전송 간격: {adaptive_admission.suggested_interval_ms()} ms")
+
+    latency_bound = service_time * MAX_LATENCY_FACTOR
+    print("\n" + "="*70)
+    print("📊 최종 결과")
+    print("="*70)
+    checks = {
+        '입장 정책': policies_ok,
+        '권장 전송 간격': interval_ok,
+        '입장 제어 없으면 지연 누적': unbounded[-1] > latency_bound,
+        f'coalesce 최대 지연 처리 시간 {MAX_LATENCY_FACTOR:.0f}배 이하': bool(bounded) and bounded[-1] <= latency_bound,
+        '권장 간격 전송 시 skipped 감소': adaptive_skipped < coalesce.get_stats()["skipped"],
+        '권장 간격 전송 시 최대 지연 유지': bool(adaptive) and adaptive[-1] <= latency_bound,
+    }
+    for name, success in checks.items():
+        print(f"  {name}: {'✅ 통과' if success else '❌ 실패'}")
+
+
+if __name__ == "__main__":
+    main()
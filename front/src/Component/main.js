@@ -518,6 +518,113 @@ function Main() {
     
     // 실시간 피팅 프레임 전송 및 처리 (최적화)
     const sendFittingFrameRef = useRef(false); // 전송 중 플래그
+    // 키오스크(탭)별 스트림 ID - 서버가 세션별 피팅 엔진을 구분하는 키
+    const fittingStreamIdRef = useRef(
+        `stream-${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 8)}`
+    );
+    // WebSocket 전송 (JPEG 바이트 그대로, 연결 실패 시 POST /api/fit/stream 폴백)
+    const fittingSocketRef = useRef(null);
+    const fittingSocketSentAtRef = useRef(0); // 응답 대기 중인 프레임 전송 시각 (0 = 대기 없음)
+    const fittingFrameUrlRef = useRef(null); // 표시 중인 결과 프레임 Blob URL
+    // 서버 권장 전송 간격 (응답의 suggestedIntervalMs, 서버 처리 시간 기반) + 마지막 전송 시각
+    const fittingSendIntervalRef = useRef(25);
+    const fittingLastSendRef = useRef(0);
+    
+    const openFittingSocket = () => new Promise((resolve) => {
+        const protocol = window.location.protocol === "https:" ? "wss" : "ws";
+        const params = new URLSearchParams({
+            streamId: fittingStreamIdRef.current,
+            showSkeleton: String(showSkeleton),
+            useWarp: String(useWarp)
+        });
+        
+        let socket;
+        try {
+            socket = new WebSocket(`${protocol}://${window.location.host}/fit-ws?${params}`);
+        } catch (error) {
+            resolve(null);
+            return;
+        }
+        socket.binaryType = "blob";
+        
+        const timer = setTimeout(() => {
+            socket.close();
+            resolve(null);
+        }, 2000);
+        socket.onopen = () => {
+            clearTimeout(timer);
+            resolve(socket);
+        };
+        socket.onerror = () => {
+            clearTimeout(timer);
+            resolve(null);
+        };
+        socket.onmessage = (event) => {
+            if (typeof event.data === "string") {
+                let message = null;
+                try {
+                    message = JSON.parse(event.data);
+                } catch (error) {
+                    message = null;
+                }
+                if (message && message.suggestedIntervalMs && !message.error) {
+                    fittingSendIntervalRef.current = message.suggestedIntervalMs; // 프레임 응답이 아님
+                    return;
+                }
+                fittingSocketSentAtRef.current = 0;
+                console.error("[프론트] 피팅 프레임 처리 실패:", event.data);
+                return;
+            }
+            fittingSocketSentAtRef.current = 0;
+            const url = URL.createObjectURL(event.data);
+            if (fittingFrameUrlRef.current) {
+                URL.revokeObjectURL(fittingFrameUrlRef.current);
+            }
+            fittingFrameUrlRef.current = url;
+            setFittingFrame(url);
+        };
+        socket.onclose = () => {
+            if (fittingSocketRef.current === socket) {
+                fittingSocketRef.current = null; // 다음 프레임부터 POST 폴백
+            }
+            fittingSocketSentAtRef.current = 0;
+        };
+    });
+    
+    const closeFittingSocket = () => {
+        if (fittingSocketRef.current) {
+            fittingSocketRef.current.close();
+            fittingSocketRef.current = null;
+        }
+        if (fittingFrameUrlRef.current) {
+            URL.revokeObjectURL(fittingFrameUrlRef.current);
+            fittingFrameUrlRef.current = null;
+        }
+    };
+    
+    // WebSocket으로 프레임 전송 (이전 응답 대기 중이면 스킵, 500ms 넘게 응답 없으면 다시 전송)
+    const sendFittingFrameWs = (socket) => {
+        if (!videoRef.current || !canvasRef.current) return;
+        if (fittingSocketSentAtRef.current && performance.now() - fittingSocketSentAtRef.current < 500) {
+            return;
+        }
+        
+        const video = videoRef.current;
+        const canvas = canvasRef.current;
+        canvas.width = video.videoWidth || 1280;
+        canvas.height = video.videoHeight || 720;
+        canvas.getContext("2d", { alpha: false }).drawImage(video, 0, 0, canvas.width, canvas.height);
+        
+        fittingSocketSentAtRef.current = performance.now();
+        fittingLastSendRef.current = fittingSocketSentAtRef.current;
+        canvas.toBlob((blob) => {
+            if (blob && socket.readyState === WebSocket.OPEN) {
+                socket.send(blob);
+            } else {
+                fittingSocketSentAtRef.current = 0;
+            }
+        }, "image/jpeg", 0.85);
+    };
     
     const sendFittingFrame = async () => {
         if (!videoRef.current || !canvasRef.current) return;
@@ -528,6 +635,7 @@ function Main() {
         }
         
         sendFittingFrameRef.current = true;
+        fittingLastSendRef.current = performance.now();
         
         try {
             const video = videoRef.current;
@@ -553,6 +661,7 @@ function Main() {
                     "Content-Type": "application/json",
                 },
                 body: JSON.stringify({
+                    streamId: fittingStreamIdRef.current,
                     frame: frameData,
                     showSkeleton: showSkeleton,
                     useWarp: useWarp,
@@ -567,12 +676,23 @@ function Main() {
             }
             
             if (!response.ok) {
+                if (response.status === 503) {
+                    // 서버 혼잡: 전송 간격을 늘림 (다음 성공 응답의 권장 간격으로 복구)
+                    fittingSendIntervalRef.current = Math.min(fittingSendIntervalRef.current * 2, 500);
+                }
                 console.error("[프론트] 피팅 프레임 처리 실패:", response.status);
                 return;
             }
             
             const result = await response.json();
             
+            if (result.suggestedIntervalMs) {
+                fittingSendIntervalRef.current = result.suggestedIntervalMs;
+            }
+            if (result.skipped) {
+                return; // 서버가 이전 프레임 처리 중이라 이 프레임은 버림 (표시 프레임 유지)
+            }
+            
             if (result.success && result.frame) {
                 setFittingFrame(result.frame);
             }
@@ -601,7 +721,8 @@ function Main() {
             // 백엔드 초기화 요청
             const initRes = await fetch("/api/fit/initialize", {
                 method: "POST",
-                headers: { "Content-Type": "application/json" }
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ streamId: fittingStreamIdRef.current })
             });
             
             // 취소 확인
@@ -656,7 +777,7 @@ function Main() {
             setFittingMessage("가상 피팅 준비 완료!");
             
             // 로딩 완료
-            setTimeout(() => {
+            setTimeout(async () => {
                 // 취소 확인
                 if (fittingCancelRef.current) {
                     console.log("[프론트] 가상 피팅 시작 취소됨 (ready)");
@@ -669,9 +790,23 @@ function Main() {
                 // 첫 프레임 플래그 초기화
                 isFirstFrameRef.current = true;
                 
-                // 실시간 프레임 전송 시작 (25ms 간격 = 40 FPS)
+                // WebSocket 연결 (실패하면 POST 전송)
+                fittingSocketRef.current = await openFittingSocket();
+                console.log(`[프론트] 피팅 프레임 전송: ${fittingSocketRef.current ? "WebSocket" : "POST"}`);
+                
+                // 실시간 프레임 전송 시작 (25ms 틱 = 최대 40 FPS, 실제 전송은 서버 권장 간격마다)
+                fittingSendIntervalRef.current = 25;
+                fittingLastSendRef.current = 0;
                 fittingIntervalRef.current = setInterval(() => {
-                    sendFittingFrame();
+                    if (performance.now() - fittingLastSendRef.current < fittingSendIntervalRef.current) {
+                        return;
+                    }
+                    const socket = fittingSocketRef.current;
+                    if (socket && socket.readyState === WebSocket.OPEN) {
+                        sendFittingFrameWs(socket);
+                    } else {
+                        sendFittingFrame();
+                    }
                 }, 25);
             }, 800);
             
@@ -701,7 +836,9 @@ function Main() {
         if (isFittingMode) {
             try {
                 await fetch("/api/fit/stop-streaming", {
-                    method: "POST"
+                    method: "POST",
+                    headers: { "Content-Type": "application/json" },
+                    body: JSON.stringify({ streamId: fittingStreamIdRef.current })
                 });
                 console.log("[프론트] 스트리밍 중지 요청 완료");
             } catch (error) {
@@ -710,6 +847,7 @@ function Main() {
         }
         
         // 피팅 모드 종료
+        closeFittingSocket();
         setIsFittingMode(false);
         setFittingFrame(null);
         
@@ -740,6 +878,9 @@ function Main() {
             if (fittingIntervalRef.current) {
                 clearInterval(fittingIntervalRef.current);
             }
+            if (fittingSocketRef.current) {
+                fittingSocketRef.current.close();
+            }
         };
     }, []);
 
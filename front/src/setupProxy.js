@@ -34,4 +34,14 @@ module.exports = function(app) {
             }
         })
     );
+    // 실시간 가상 피팅 WebSocket (백엔드 fit_ws 서버, 바이너리 JPEG)
+    // 경로 필터를 프록시에 직접 지정 (업그레이드 요청이 개발 서버 HMR 소켓 /ws까지 가로채지 않도록)
+    app.use(
+        createProxyMiddleware('/fit-ws', {
+            target: 'http://localhost:5001',
+            ws: true,
+            changeOrigin: true,
+            secure: false
+        })
+    );
 };
\ No newline at end of file